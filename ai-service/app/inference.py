@@ -0,0 +1,226 @@
+"""
+Batched, cached model inference for the AI service.
+
+Requests are not run one at a time on the event loop. Instead:
+
+- Each model has a ``MicroBatcher`` queue. Its worker collects requests
+  until ``max_batch_size`` is reached or ``max_wait_ms`` has passed since the
+  first one, then runs the whole batch in one pipeline call.
+- Pipeline calls run in a thread pool, so the event loop keeps accepting
+  requests while a batch is computed.
+- Results are cached in Redis under a hash of model, task and input, so
+  repeated texts (re-opened tickets, retries) skip inference entirely.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "32"))
+MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "10"))
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "2"))
+CACHE_TTL = int(os.getenv("INFERENCE_CACHE_TTL", str(24 * 60 * 60)))
+MAX_TEXT_LENGTH = 512
+
+
+class MicroBatcher:
+    """Dynamic micro-batching queue in front of a batch inference function."""
+
+    def __init__(
+        self,
+        name: str,
+        infer_batch: Callable[[List[Any]], List[Any]],
+        executor: ThreadPoolExecutor,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait_ms: float = MAX_WAIT_MS,
+    ):
+        self.name = name
+        self.infer_batch = infer_batch
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one input and wait for its result."""
+        loop = asyncio.get_running_loop()
+        if self.worker is None or self.worker.done():
+            self.queue = asyncio.Queue()
+            self.worker = loop.create_task(self._run())
+
+        future = loop.create_future()
+        await self.queue.put((item, future))
+        return await future
+
+    async def _next_batch(self):
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            inputs = [item for item, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, self.infer_batch, inputs
+                )
+            except Exception as e:
+                logger.error(f"{self.name} batch of {len(inputs)} failed: {str(e)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(inputs)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "average_batch_size": self.items / self.batches if self.batches else 0,
+            "queued": self.queue.qsize() if self.queue else 0,
+        }
+
+
+class ResultCache:
+    """Content-addressed inference results in Redis (``redis.asyncio``)."""
+
+    def __init__(self, client, ttl: int = CACHE_TTL):
+        self.client = client
+        self.ttl = ttl
+
+    @staticmethod
+    def key(task: str, model: str, payload: Any) -> str:
+        digest = hashlib.sha256(
+            json.dumps([model, payload], sort_keys=True).encode()
+        ).hexdigest()
+        return f"inference:{task}:{digest}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        if self.client is None:
+            return None
+        try:
+            value = await self.client.get(key)
+        except Exception as e:
+            logger.warning(f"Inference cache read failed: {str(e)}")
+            return None
+        return json.loads(value) if value else None
+
+    async def set(self, key: str, value: Any):
+        if self.client is None:
+            return
+        try:
+            await self.client.set(key, json.dumps(value), ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"Inference cache write failed: {str(e)}")
+
+
+class InferenceService:
+    """Sentiment and zero-shot categorization behind batchers and a cache."""
+
+    def __init__(
+        self,
+        registry,
+        cache: ResultCache,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        self.registry = registry
+        self.cache = cache
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=INFERENCE_THREADS, thread_name_prefix="inference"
+        )
+        self.sentiment_batcher = MicroBatcher(
+            "sentiment", self._sentiment_batch, self.executor
+        )
+        self.categorization_batcher = MicroBatcher(
+            "categorization", self._categorization_batch, self.executor
+        )
+
+    def _sentiment_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        # Runs in the executor, so a first-use model load stays off the loop
+        model = self.registry.get("sentiment")
+        return model(texts, batch_size=len(texts), truncation=True)
+
+    def _categorization_batch(self, items: List[tuple]) -> List[Dict[str, Any]]:
+        # Zero-shot labels are per call, so group the batch by label set
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        groups: Dict[tuple, List[int]] = {}
+        for index, (_, labels) in enumerate(items):
+            groups.setdefault(labels, []).append(index)
+
+        model = self.registry.get("categorization")
+        for labels, indexes in groups.items():
+            outputs = model(
+                [items[index][0] for index in indexes],
+                list(labels),
+                batch_size=len(indexes),
+            )
+            if isinstance(outputs, dict):
+                outputs = [outputs]
+            for index, output in zip(indexes, outputs):
+                results[index] = output
+        return results
+
+    async def sentiment(self, text: str) -> Dict[str, Any]:
+        """``{"label", "score"}`` for ``text``."""
+        text = text[:MAX_TEXT_LENGTH]
+        key = self.cache.key("sentiment", self.registry.model_name("sentiment"), text)
+        result = await self.cache.get(key)
+        if result is None:
+            output = await self.sentiment_batcher.submit(text)
+            result = {"label": output["label"], "score": float(output["score"])}
+            await self.cache.set(key, result)
+        return result
+
+    async def categorize(self, text: str, labels: Sequence[str]) -> Dict[str, Any]:
+        """``{"labels", "scores"}`` (best first) for ``text`` over ``labels``."""
+        labels = tuple(labels)
+        key = self.cache.key(
+            "categorize",
+            self.registry.model_name("categorization"),
+            [text, list(labels)],
+        )
+        result = await self.cache.get(key)
+        if result is None:
+            output = await self.categorization_batcher.submit((text, labels))
+            result = {
+                "labels": list(output["labels"]),
+                "scores": [float(score) for score in output["scores"]],
+            }
+            await self.cache.set(key, result)
+        return result
+
+    async def warm_up(self, names=None) -> List[str]:
+        """Load and exercise models in the executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.registry.warm_up, names)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sentiment": self.sentiment_batcher.stats(),
+            "categorization": self.categorization_batcher.stats(),
+            "models": self.registry.status(),
+        }
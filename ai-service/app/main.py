@@ -4,15 +4,19 @@ FastAPI AI service for helpdesk platform.
 
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Literal, Optional
 import openai
 import os
-from transformers import pipeline
 import redis
+import redis.asyncio as aioredis
+import asyncio
 import json
 import logging
 
+from app.inference import InferenceService, ResultCache
+from app.model_registry import PRELOAD_MODELS, ModelRegistry
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -33,16 +37,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize AI models
-sentiment_analyzer = pipeline("sentiment-analysis")
-categorization_model = pipeline("zero-shot-classification")
+# AI models load on first use (or through /warmup), not at import
+models = ModelRegistry()
 
 # Initialize Redis
 redis_client = redis.Redis(host=os.getenv("REDIS_HOST", "localhost"), port=6379, db=1)
+async_redis_client = aioredis.Redis(host=os.getenv("REDIS_HOST", "localhost"), port=6379, db=1)
+
+# Batched, cached inference over the local models
+inference = InferenceService(models, ResultCache(async_redis_client))
 
 # OpenAI client
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
+MAX_BATCH_ITEMS = int(os.getenv("MAX_BATCH_ITEMS", "256"))
+
 
 # Pydantic models
 class TicketData(BaseModel):
@@ -81,6 +90,45 @@ class ChatbotRequest(BaseModel):
     context: Dict[str, Any] = {}
 
 
+class BatchItem(BaseModel):
+    task: Literal["sentiment", "categorize"]
+    text: Optional[str] = None
+    subject: str = ""
+    description: str = ""
+    categories: List[str] = CategorizationRequest.model_fields["categories"].default
+
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem] = Field(..., max_length=MAX_BATCH_ITEMS)
+
+
+def categorization_response(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "category": result["labels"][0],
+        "confidence": result["scores"][0],
+        "all_scores": dict(zip(result["labels"], result["scores"]))
+    }
+
+
+def sentiment_response(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "sentiment": result["label"],
+        "score": result["score"],
+        "confidence": abs(result["score"])
+    }
+
+
+class WarmUpRequest(BaseModel):
+    models: Optional[List[str]] = None
+
+
+@app.on_event("startup")
+async def preload_models():
+    """Warm up PRELOAD_MODELS in the background; /ready/ reports progress."""
+    if PRELOAD_MODELS:
+        app.state.preload = asyncio.create_task(inference.warm_up(PRELOAD_MODELS))
+
+
 # Health check endpoint
 @app.get("/health/")
 async def health_check():
@@ -88,6 +136,31 @@ async def health_check():
     return {"status": "healthy", "service": "ai-service"}
 
 
+# Readiness probe
+@app.get("/ready/")
+async def readiness_check():
+    """Ready once every model in PRELOAD_MODELS is loaded."""
+    pending = [name for name in PRELOAD_MODELS if not models.is_loaded(name)]
+    if pending:
+        raise HTTPException(status_code=503, detail=f"Loading models: {', '.join(pending)}")
+    return {"status": "ready", "models": models.status()}
+
+
+# Model warm-up
+@app.post("/warmup")
+async def warm_up_models(request: WarmUpRequest = WarmUpRequest()):
+    """Load and exercise models (default: all) before traffic arrives."""
+    unknown = set(request.models or []) - set(models.specs)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown models: {', '.join(sorted(unknown))}")
+    try:
+        warmed = await inference.warm_up(request.models)
+        return {"warmed": warmed, "models": models.status()}
+    except Exception as e:
+        logger.error(f"Warm-up error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Warm-up failed")
+
+
 # Ticket categorization
 @app.post("/categorize")
 async def categorize_ticket(request: CategorizationRequest):
@@ -97,13 +170,9 @@ async def categorize_ticket(request: CategorizationRequest):
         text = f"{request.subject}\n{request.description}"
         
         # Use zero-shot classification
-        result = categorization_model(text, request.categories)
+        result = await inference.categorize(text, request.categories)
         
-        return {
-            "category": result["labels"][0],
-            "confidence": result["scores"][0],
-            "all_scores": dict(zip(result["labels"], result["scores"]))
-        }
+        return categorization_response(result)
     except Exception as e:
         logger.error(f"Categorization error: {str(e)}")
         raise HTTPException(status_code=500, detail="Categorization failed")
@@ -114,12 +183,8 @@ async def categorize_ticket(request: CategorizationRequest):
 async def analyze_sentiment(request: SentimentRequest):
     """Analyze sentiment of text."""
     try:
-        result = sentiment_analyzer(request.text[:512])  # Limit text length
-        return {
-            "sentiment": result[0]["label"],
-            "score": result[0]["score"],
-            "confidence": abs(result[0]["score"])
-        }
+        result = await inference.sentiment(request.text)
+        return sentiment_response(result)
     except Exception as e:
         logger.error(f"Sentiment analysis error: {str(e)}")
         raise HTTPException(status_code=500, detail="Sentiment analysis failed")
@@ -211,13 +276,13 @@ async def auto_assign_ticket(ticket_data: TicketData):
         # Analyze ticket content
         text = f"{ticket_data.subject}\n{ticket_data.description}"
         
-        # Get sentiment
-        sentiment_result = sentiment_analyzer(text[:512])
-        sentiment = sentiment_result[0]["label"]
-        
-        # Get category
+        # Get sentiment and category concurrently
         categories = ["Technical", "Billing", "General", "Bug", "Feature"]
-        category_result = categorization_model(text, categories)
+        sentiment_result, category_result = await asyncio.gather(
+            inference.sentiment(text),
+            inference.categorize(text, categories),
+        )
+        sentiment = sentiment_result["label"]
         category = category_result["labels"][0]
         
         # Determine priority based on sentiment and content
@@ -235,7 +300,7 @@ async def auto_assign_ticket(ticket_data: TicketData):
             "priority": priority,
             "confidence": category_result["scores"][0]
         }
-        redis_client.setex(cache_key, 3600, json.dumps(analysis_data))  # Cache for 1 hour
+        await async_redis_client.setex(cache_key, 3600, json.dumps(analysis_data))  # Cache for 1 hour
         
         return analysis_data
     except Exception as e:
@@ -243,6 +308,41 @@ async def auto_assign_ticket(ticket_data: TicketData):
         raise HTTPException(status_code=500, detail="Auto-assignment failed")
 
 
+# Batch inference
+@app.post("/batch")
+async def batch_inference(request: BatchRequest):
+    """Run many sentiment/categorization items in one request.
+    
+    Items share the model batches with concurrent single-item requests and
+    results are returned in request order; a failed item gets an ``error``
+    instead of failing the whole batch.
+    """
+    async def run(item: BatchItem):
+        if item.task == "sentiment":
+            result = await inference.sentiment(item.text or f"{item.subject}\n{item.description}")
+            return sentiment_response(result)
+        text = item.text or f"{item.subject}\n{item.description}"
+        result = await inference.categorize(text, item.categories)
+        return categorization_response(result)
+    
+    results = await asyncio.gather(*(run(item) for item in request.items), return_exceptions=True)
+    
+    response = []
+    for item, result in zip(request.items, results):
+        if isinstance(result, Exception):
+            logger.error(f"Batch {item.task} error: {str(result)}")
+            result = {"error": f"{item.task} failed"}
+        response.append({"task": item.task, **result})
+    return {"results": response}
+
+
+# Inference statistics
+@app.get("/inference/stats")
+async def inference_stats():
+    """Micro-batching statistics per model."""
+    return inference.stats()
+
+
 # Knowledge base search
 @app.post("/search-kb")
 async def search_knowledge_base(query: str, organization_id: str):
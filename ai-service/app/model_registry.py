@@ -0,0 +1,147 @@
+"""
+Lazily loaded transformer pipelines for the AI service.
+
+Models are not loaded at import time. Each model loads the first time it is
+used, or ahead of time through ``warm_up`` (readiness probes, startup
+preloading), so a replica that only serves OpenAI-backed endpoints never
+pays for the local models.
+
+When ``MODEL_DIR`` contains a directory for a model, that directory is used
+instead of the hub download:
+
+- ``model_quantized.onnx`` or ``model.onnx`` is run with ONNX Runtime via
+  ``optimum`` if it is installed. Quantized CPU variants go here.
+- Otherwise the directory is loaded as a regular ``transformers`` checkpoint
+  with ``local_files_only``, preferring safetensors weights.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = os.getenv("MODEL_DIR", "/models")
+PRELOAD_MODELS = [
+    name.strip() for name in os.getenv("PRELOAD_MODELS", "").split(",") if name.strip()
+]
+ONNX_FILES = ("model_quantized.onnx", "model.onnx")
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    task: str
+    model_id: Optional[str]
+    warm_up_input: tuple
+
+
+MODEL_SPECS = {
+    "sentiment": ModelSpec(
+        task="sentiment-analysis",
+        model_id=os.getenv("SENTIMENT_MODEL") or None,
+        warm_up_input=("warm up",),
+    ),
+    "categorization": ModelSpec(
+        task="zero-shot-classification",
+        model_id=os.getenv("CATEGORIZATION_MODEL") or None,
+        warm_up_input=("warm up", ["one", "two"]),
+    ),
+}
+
+
+class ModelRegistry:
+    """Loads each registered pipeline once, on first use."""
+
+    def __init__(self, specs: Dict[str, ModelSpec] = None, model_dir: str = MODEL_DIR):
+        self.specs = specs or MODEL_SPECS
+        self.model_dir = model_dir
+        self.models: Dict[str, Any] = {}
+        self.load_times: Dict[str, float] = {}
+        self.sources: Dict[str, str] = {}
+        self.locks = {name: threading.Lock() for name in self.specs}
+
+    def model_name(self, name: str) -> str:
+        """Stable identifier of a model's weights, without loading it."""
+        local = self._local_path(name)
+        if local:
+            return local
+        return self.specs[name].model_id or self.specs[name].task
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self.models
+
+    def get(self, name: str):
+        """The pipeline for ``name``, loading it on first use (blocking)."""
+        model = self.models.get(name)
+        if model is not None:
+            return model
+        if name not in self.specs:
+            raise KeyError(f"Unknown model: {name}")
+
+        with self.locks[name]:
+            if name not in self.models:
+                started = time.monotonic()
+                self.models[name] = self._load(name)
+                self.load_times[name] = time.monotonic() - started
+                logger.info(
+                    f"Loaded {name} from {self.sources[name]} "
+                    f"in {self.load_times[name]:.1f}s"
+                )
+        return self.models[name]
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """Load ``names`` (default: all) and run one inference through each."""
+        names = list(names or self.specs)
+        for name in names:
+            model = self.get(name)
+            model(*self.specs[name].warm_up_input)
+        return names
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "loaded": self.is_loaded(name),
+                "source": self.sources.get(name),
+                "load_seconds": self.load_times.get(name),
+            }
+            for name in self.specs
+        }
+
+    def _local_path(self, name: str) -> Optional[str]:
+        path = os.path.join(self.model_dir, name)
+        return path if os.path.isdir(path) else None
+
+    def _load(self, name: str):
+        from transformers import AutoTokenizer, pipeline
+
+        spec = self.specs[name]
+        path = self._local_path(name)
+        if path is None:
+            self.sources[name] = spec.model_id or "default"
+            return pipeline(spec.task, model=spec.model_id)
+
+        onnx_file = next(
+            (f for f in ONNX_FILES if os.path.exists(os.path.join(path, f))), None
+        )
+        if onnx_file:
+            try:
+                from optimum.onnxruntime import ORTModelForSequenceClassification
+            except ImportError:
+                logger.warning(
+                    f"{name}: optimum is not installed, ignoring {onnx_file}"
+                )
+            else:
+                self.sources[name] = os.path.join(path, onnx_file)
+                model = ORTModelForSequenceClassification.from_pretrained(
+                    path, file_name=onnx_file, local_files_only=True
+                )
+                tokenizer = AutoTokenizer.from_pretrained(path, local_files_only=True)
+                return pipeline(spec.task, model=model, tokenizer=tokenizer)
+
+        # safetensors checkpoints are memory-mapped on load, so workers on
+        # one host read the weights through the shared page cache.
+        self.sources[name] = path
+        return pipeline(spec.task, model=path, model_kwargs={"local_files_only": True})
@@ -0,0 +1,509 @@
+"""
+Batched activity log writer.
+
+``log_activity`` is called from ticket views, SLA checks and automation
+actions. Instead of inserting an ActivityLog row on the caller's write
+path, it registers the entry to be queued when the surrounding transaction
+commits. Entries of a rolled back transaction are dropped with it.
+
+The process-wide ``ActivityLogWriter`` writes queued entries with
+``bulk_create`` from a background thread. It flushes every
+``ACTIVITY_LOG_FLUSH_INTERVAL`` seconds, or as soon as
+``ACTIVITY_LOG_BATCH_SIZE`` entries are waiting. When
+``ACTIVITY_LOG_MAX_QUEUE`` entries are waiting, the writer has fallen
+behind and the logging thread flushes synchronously instead (backpressure).
+``ACTIVITY_LOG_FLUSH_INTERVAL = None`` writes every batch on commit, with
+no thread.
+
+Queued entries are also appended to a spool file in
+``ACTIVITY_LOG_SPOOL_DIR``, and a segment is deleted once its entries are
+written. Segments left by a crashed process are replayed by the next
+writer, or by ``manage.py ingest_activity_log --replay-spool``. Each entry has a
+unique ``entry_id``, so an entry replayed after it was already written is
+skipped. Segments that fail to replay are kept with a ``.bad`` suffix.
+The spool is local rather than a Redis stream, so queued entries survive
+a Redis outage as well as a crash, and committing adds no network round
+trip.
+
+``ingest_entries`` loads large backfills with ``COPY`` on PostgreSQL; see
+``manage.py ingest_activity_log``.
+"""
+
+import atexit
+import fcntl
+import io
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.organizations.middleware import get_current_organization
+
+from .models import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+ENTRY_FIELDS = (
+    "entry_id",
+    "organization_id",
+    "user_id",
+    "action",
+    "entity_type",
+    "entity_id",
+    "old_values",
+    "new_values",
+    "changes",
+    "ip_address",
+    "user_agent",
+    "request_path",
+    "request_method",
+    "timestamp",
+    "description",
+)
+# Spool segments younger than this may still be queued by their writer
+SPOOL_STALE_AFTER = 60
+SPOOL_REPLAY_INTERVAL = 60
+COPY_CHUNK_SIZE = 50000
+
+
+def _json_safe(values):
+    # Decimals, dates and UUIDs in change sets become their JSON forms now,
+    # so the spool and the JSONField see the same values
+    return json.loads(json.dumps(values or {}, cls=DjangoJSONEncoder))
+
+
+def make_entry(
+    organization_id,
+    action,
+    entity_type,
+    entity_id,
+    old_values=None,
+    new_values=None,
+    changes=None,
+    user_id=None,
+    ip_address=None,
+    user_agent=None,
+    request_path=None,
+    request_method=None,
+    description=None,
+):
+    """One activity log entry, as a dict of ActivityLog column values."""
+    return {
+        "entry_id": str(uuid.uuid4()),
+        "organization_id": organization_id,
+        "user_id": user_id,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": str(entity_id),
+        "old_values": _json_safe(old_values),
+        "new_values": _json_safe(new_values),
+        "changes": _json_safe(changes),
+        "ip_address": ip_address or None,
+        "user_agent": user_agent or "",
+        "request_path": request_path or "",
+        "request_method": request_method or "",
+        "timestamp": timezone.now(),
+        "description": description or f"{action} {entity_type} {entity_id}",
+    }
+
+
+def write_entries(entries, batch_size=None):
+    """Insert ``entries`` with ``bulk_create``, skipping already written ones."""
+    ActivityLog.objects.bulk_create(
+        [ActivityLog(**entry) for entry in entries],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, dict):
+        value = json.dumps(value, cls=DjangoJSONEncoder)
+    elif hasattr(value, "isoformat"):
+        value = value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_entries(entries, using="default"):
+    """
+    Load ``entries`` with PostgreSQL ``COPY``.
+
+    Rows are copied into a temporary table and moved with
+    ``INSERT ... ON CONFLICT DO NOTHING``, so entries already written are
+    skipped as in ``write_entries``.
+    """
+    table = ActivityLog._meta.db_table
+    columns = ", ".join(ENTRY_FIELDS)
+    stream = io.StringIO()
+    for entry in entries:
+        stream.write("\t".join(_copy_value(entry[name]) for name in ENTRY_FIELDS))
+        stream.write("\n")
+    stream.seek(0)
+
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE activity_log_import "
+            f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        cursor.copy_expert(f"COPY activity_log_import ({columns}) FROM STDIN", stream)
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) "
+            f"SELECT {columns} FROM activity_log_import "
+            f"ON CONFLICT (entry_id) DO NOTHING"
+        )
+
+
+def ingest_entries(entries, chunk_size=COPY_CHUNK_SIZE, using="default"):
+    """
+    Bulk load an iterable of entries, e.g. a backfill; returns the count.
+
+    Uses ``COPY`` on PostgreSQL and ``bulk_create`` elsewhere, one
+    transaction per ``chunk_size`` entries.
+    """
+    entries = iter(entries)
+    total = 0
+    while chunk := list(islice(entries, chunk_size)):
+        if connections[using].vendor == "postgresql":
+            copy_entries(chunk, using=using)
+        else:
+            write_entries(chunk, batch_size=1000)
+        total += len(chunk)
+    return total
+
+
+def _dump(entry):
+    return json.dumps(entry, cls=DjangoJSONEncoder)
+
+
+def _load(line):
+    raw = json.loads(line)
+    entry = {name: raw.get(name) for name in ENTRY_FIELDS}
+    # Backfill files may leave out the optional columns
+    entry["entry_id"] = entry["entry_id"] or str(uuid.uuid4())
+    entry["timestamp"] = (
+        parse_datetime(entry["timestamp"]) if entry["timestamp"] else timezone.now()
+    )
+    for name in ("old_values", "new_values", "changes"):
+        entry[name] = entry[name] or {}
+    for name in ("user_agent", "request_path", "request_method", "description"):
+        entry[name] = entry[name] or ""
+    return entry
+
+
+def read_entries(path):
+    """Entries of a JSON-lines file; a truncated last line is skipped."""
+    with open(path) as lines:
+        for number, line in enumerate(lines, 1):
+            try:
+                yield _load(line)
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"Skipping unreadable activity log line {path}:{number}")
+
+
+class Spool:
+    """
+    Append-only JSON-lines segments holding queued entries.
+
+    The segment being appended to is locked with ``flock``, so a replay
+    can tell it apart from segments whose writer has died.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.file = None
+        self.pid = None
+        self.sequence = 0
+
+    def append(self, entries):
+        if self.file is None or self.pid != os.getpid():
+            self._open()
+        self.file.write("".join(_dump(entry) + "\n" for entry in entries))
+        self.file.flush()
+
+    def rotate(self):
+        """Close the current segment and return its path, if any."""
+        if self.file is None or self.pid != os.getpid():
+            return None
+        path = Path(self.file.name)
+        self.file.close()
+        self.file = None
+        return path
+
+    def _open(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.pid = os.getpid()
+        self.sequence += 1
+        name = f"{socket.gethostname()}-{self.pid}-{time.time_ns()}-{self.sequence}"
+        self.file = open(self.directory / f"{name}.jsonl", "a")
+        fcntl.flock(self.file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def replay_spool(directory, stale_after=SPOOL_STALE_AFTER):
+    """
+    Write the entries of abandoned spool segments; returns the count.
+
+    Each segment is written in its own transaction. A segment that fails
+    (e.g. an entry referencing a deleted user) is renamed to ``.bad`` for
+    inspection, so it doesn't block the segments after it.
+    """
+    replayed = 0
+    for path in sorted(Path(directory).glob("*.jsonl")):
+        try:
+            if time.time() - path.stat().st_mtime < stale_after:
+                continue
+            with open(path) as segment:
+                try:
+                    fcntl.flock(segment, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                try:
+                    with transaction.atomic():
+                        count = ingest_entries(read_entries(path))
+                except Exception as e:
+                    logger.error(f"Quarantined activity log spool {path.name}: {e}")
+                    path.rename(path.with_suffix(".bad"))
+                    continue
+                replayed += count
+                path.unlink()
+        except FileNotFoundError:
+            continue
+    if replayed:
+        logger.info(f"Replayed {replayed} spooled activity log entries")
+    return replayed
+
+
+class ActivityLogWriter:
+    """
+    Queues committed entries and writes them in batches.
+
+    Args:
+        batch_size: entries per ``bulk_create``; a full batch wakes the
+            flush thread early.
+        flush_interval: seconds between background flushes; None writes
+            synchronously on every submit.
+        max_queue: queued entries at which submitters flush themselves.
+        spool_dir: directory for spool segments; None keeps entries in
+            memory only.
+    """
+
+    def __init__(
+        self, batch_size=500, flush_interval=1.0, max_queue=10000, spool_dir=None
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.spool = Spool(spool_dir) if spool_dir else None
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.queue = []
+        self.segments = []
+        self.counts = Counter()
+        self.last_flush_ms = 0.0
+        self.thread = None
+        self.thread_pid = None
+
+    def submit(self, entries):
+        """Queue ``entries``, flushing if the queue is full."""
+        with self.lock:
+            if self.spool is not None:
+                self.spool.append(entries)
+            self.queue.extend(entries)
+            self.counts["enqueued"] += len(entries)
+            queued = len(self.queue)
+
+        if self.flush_interval is None:
+            self.flush()
+        elif queued >= self.max_queue:
+            self.counts["backpressure_flushes"] += 1
+            self.flush()
+        else:
+            self._ensure_thread()
+            if queued >= self.batch_size:
+                self.wakeup.set()
+
+    def flush(self):
+        """Write every queued entry; returns the number written."""
+        with self.flush_lock:
+            with self.lock:
+                batch, self.queue = self.queue, []
+                if self.spool is not None:
+                    segment = self.spool.rotate()
+                    if segment is not None:
+                        self.segments.append(segment)
+                segments = list(self.segments)
+            if not batch:
+                return 0
+
+            started = time.perf_counter()
+            try:
+                write_entries(batch, self.batch_size)
+            except Exception as e:
+                self.counts["failed_flushes"] += 1
+                logger.error(f"Activity log flush of {len(batch)} entries failed: {e}")
+                self._requeue(batch)
+                return 0
+
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+            self.counts["flushes"] += 1
+            self.counts["written"] += len(batch)
+            with self.lock:
+                self.segments = self.segments[len(segments) :]
+            for segment in segments:
+                segment.unlink(missing_ok=True)
+            return len(batch)
+
+    def _requeue(self, batch):
+        with self.lock:
+            self.queue[:0] = batch
+            overflow = len(self.queue) - self.max_queue
+            if overflow <= 0:
+                return
+            if self.spool is not None:
+                # Leave the entries to the spool replay rather than memory
+                self.counts["spilled"] += len(self.queue)
+                self.queue = []
+                self.segments = []
+            else:
+                self.counts["dropped"] += overflow
+                del self.queue[:overflow]
+                logger.error(f"Dropped {overflow} activity log entries")
+
+    def stats(self):
+        """Queue depth and throughput counters of this process."""
+        with self.lock:
+            queued = len(self.queue)
+        return {
+            "queued": queued,
+            "max_queue": self.max_queue,
+            "saturation": round(queued / self.max_queue, 3),
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            **{
+                name: self.counts[name]
+                for name in (
+                    "enqueued",
+                    "written",
+                    "flushes",
+                    "failed_flushes",
+                    "backpressure_flushes",
+                    "spilled",
+                    "dropped",
+                )
+            },
+        }
+
+    def _ensure_thread(self):
+        if self.thread is not None and self.thread_pid == os.getpid():
+            return
+        with self.lock:
+            if self.thread is not None and self.thread_pid == os.getpid():
+                return
+            self.thread_pid = os.getpid()
+            self.thread = threading.Thread(
+                target=self._run, name="activity-log-writer", daemon=True
+            )
+            self.thread.start()
+
+    def _run(self):
+        next_replay = time.monotonic()
+        while True:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+                if self.spool is not None and time.monotonic() >= next_replay:
+                    next_replay = time.monotonic() + SPOOL_REPLAY_INTERVAL
+                    replay_spool(self.spool.directory)
+            except Exception as e:
+                logger.error(f"Activity log writer error: {e}")
+            finally:
+                close_old_connections()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """Process-wide writer configured from settings."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = ActivityLogWriter(
+                    batch_size=getattr(settings, "ACTIVITY_LOG_BATCH_SIZE", 500),
+                    flush_interval=getattr(
+                        settings, "ACTIVITY_LOG_FLUSH_INTERVAL", 1.0
+                    ),
+                    max_queue=getattr(settings, "ACTIVITY_LOG_MAX_QUEUE", 10000),
+                    spool_dir=getattr(settings, "ACTIVITY_LOG_SPOOL_DIR", None),
+                )
+                atexit.register(_writer.flush)
+    return _writer
+
+
+def log_activity(
+    action,
+    entity_type,
+    entity_id,
+    old_values=None,
+    new_values=None,
+    changes=None,
+    user=None,
+    ip_address=None,
+    user_agent=None,
+    request_path=None,
+    request_method=None,
+    description=None,
+    organization=None,
+):
+    """
+    Record an activity once the current transaction commits.
+
+    The organization defaults to the user's, then to the current request's;
+    ``organization`` may be an Organization or its id.
+    """
+    organization_id = getattr(organization, "pk", organization)
+    if organization_id is None:
+        organization_id = getattr(user, "organization_id", None)
+    if organization_id is None:
+        organization_id = getattr(get_current_organization(), "pk", None)
+    if organization_id is None:
+        return
+
+    entry = make_entry(
+        organization_id,
+        action,
+        entity_type,
+        entity_id,
+        old_values=old_values,
+        new_values=new_values,
+        changes=changes,
+        user_id=getattr(user, "pk", None),
+        ip_address=ip_address,
+        user_agent=user_agent,
+        request_path=request_path,
+        request_method=request_method,
+        description=description,
+    )
+    transaction.on_commit(lambda: get_writer().submit([entry]))
@@ -0,0 +1,75 @@
+"""
+Management command to bulk load activity log entries.
+"""
+
+import os
+import time
+from itertools import chain
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts.activity_log import (
+    COPY_CHUNK_SIZE,
+    ingest_entries,
+    read_entries,
+    replay_spool,
+)
+
+
+class Command(BaseCommand):
+    """Ingest activity log command."""
+
+    help = (
+        "Load activity log entries from JSON-lines files (COPY on PostgreSQL), "
+        "or replay spool segments left by crashed writers"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "files",
+            nargs="*",
+            help="JSON-lines files with one ActivityLog entry per line",
+        )
+        parser.add_argument(
+            "--replay-spool",
+            action="store_true",
+            help="Replay abandoned segments in ACTIVITY_LOG_SPOOL_DIR",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=COPY_CHUNK_SIZE,
+            help=f"Entries per transaction (default: {COPY_CHUNK_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        if not options["files"] and not options["replay_spool"]:
+            raise CommandError("Give files to load or --replay-spool")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive")
+        for path in options["files"]:
+            if not os.path.isfile(path):
+                raise CommandError(f"File {path} not found")
+
+        if options["replay_spool"]:
+            spool_dir = getattr(settings, "ACTIVITY_LOG_SPOOL_DIR", None)
+            if not spool_dir:
+                raise CommandError("ACTIVITY_LOG_SPOOL_DIR is not set")
+            replayed = replay_spool(spool_dir)
+            self.stdout.write(f"Replayed {replayed} spooled entries")
+
+        if options["files"]:
+            started = time.perf_counter()
+            loaded = ingest_entries(
+                chain.from_iterable(read_entries(path) for path in options["files"]),
+                chunk_size=options["chunk_size"],
+            )
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"Loaded {loaded} entries in {elapsed:.1f}s "
+                f"({loaded / max(elapsed, 1e-9):,.0f} rows/s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Activity log ingestion complete"))
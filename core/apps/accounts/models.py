@@ -2,6 +2,8 @@
 User and authentication models with multi-tenant support.
 """
 
+import uuid
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.utils import timezone
@@ -181,3 +183,43 @@ class UserPermission(models.Model):
         if self.expires_at and timezone.now() > self.expires_at:
             return False
         return True
+
+
+class ActivityLog(models.Model):
+    """Audit trail entry, written in batches by ``apps.accounts.activity_log``."""
+
+    # Set when the entry is logged, so replayed entries are written once
+    entry_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, related_name="activity_logs"
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="activity_logs",
+    )
+    action = models.CharField(max_length=50)
+    entity_type = models.CharField(max_length=50)
+    entity_id = models.CharField(max_length=64)
+    old_values = models.JSONField(default=dict)
+    new_values = models.JSONField(default=dict)
+    changes = models.JSONField(default=dict)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    user_agent = models.TextField(blank=True)
+    request_path = models.CharField(max_length=500, blank=True)
+    request_method = models.CharField(max_length=10, blank=True)
+    timestamp = models.DateTimeField(default=timezone.now)
+    description = models.TextField(blank=True)
+
+    class Meta:
+        db_table = "accounts_activity_log"
+        ordering = ["-timestamp"]
+        indexes = [
+            models.Index(fields=["organization", "-timestamp"]),
+            models.Index(fields=["entity_type", "entity_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.action} {self.entity_type} {self.entity_id}"
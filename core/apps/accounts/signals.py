@@ -6,8 +6,8 @@ from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from django.contrib.auth.signals import user_logged_in, user_logged_out
-from .models import User, UserProfile, ActivityLog, UserSession
-from apps.organizations.middleware import get_current_organization
+from .models import User, UserProfile, UserSession
+from .activity_log import log_activity
 
 
 @receiver(post_save, sender=User)
@@ -96,41 +96,3 @@ def log_user_logout(sender, request, user, **kwargs):
             request_method=request.method,
             description=f"User {user.email} logged out",
         )
-
-
-def log_activity(
-    action,
-    entity_type,
-    entity_id,
-    old_values=None,
-    new_values=None,
-    changes=None,
-    user=None,
-    ip_address=None,
-    user_agent=None,
-    request_path=None,
-    request_method=None,
-    description=None,
-):
-    """
-    Helper function to log activities.
-    """
-    organization = get_current_organization()
-    if not organization:
-        return
-
-    ActivityLog.objects.create(
-        organization=organization,
-        user=user,
-        action=action,
-        entity_type=entity_type,
-        entity_id=entity_id,
-        old_values=old_values or {},
-        new_values=new_values or {},
-        changes=changes or {},
-        ip_address=ip_address or "",
-        user_agent=user_agent or "",
-        request_path=request_path or "",
-        request_method=request_method or "",
-        description=description or f"{action} {entity_type} {entity_id}",
-    )
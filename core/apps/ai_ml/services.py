@@ -414,18 +414,19 @@ class PredictiveAnalytics:
 
     def _get_historical_data(self, metric_type: str, days: int) -> List[Dict]:
         """Get historical data for forecasting."""
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=days)
+        from apps.analytics.metrics import daily_series, metrics_queryset
 
+        end_date = timezone.localdate()
+        start_date = end_date - timedelta(days=days - 1)
+
+        data = []
         if metric_type == "ticket_volume":
-            # Get daily ticket counts
-            data = []
-            for i in range(days):
-                date = start_date + timedelta(days=i)
-                count = Ticket.objects.filter(
-                    organization=self.organization, created_at__date=date
-                ).count()
-                data.append({"date": date.isoformat(), "value": count})
+            # Daily ticket counts from the fact table, one row read per day
+            data = daily_series(
+                metrics_queryset(self.organization, "ticket", start_date, end_date),
+                start_date,
+                end_date,
+            )
 
         return data
 
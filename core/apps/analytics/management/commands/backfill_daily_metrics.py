@@ -0,0 +1,53 @@
+"""
+Management command to backfill the daily organization metrics fact table.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.analytics.metrics import backfill
+from apps.organizations.models import Organization
+
+
+class Command(BaseCommand):
+    """Backfill daily metrics command."""
+
+    help = "Recompute daily_org_metrics rows from raw tickets and work orders"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Number of days back from today to recompute (default: 365)",
+        )
+        parser.add_argument(
+            "--organization",
+            type=int,
+            help="Only backfill this organization ID (default: all active)",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        days = options["days"]
+        if days < 0:
+            raise CommandError("--days must be zero or positive")
+
+        organizations = Organization.objects.filter(is_active=True)
+        if options["organization"]:
+            organizations = organizations.filter(id=options["organization"])
+            if not organizations.exists():
+                raise CommandError(f"Organization {options['organization']} not found")
+
+        end_date = timezone.localdate()
+        start_date = end_date - timedelta(days=days)
+
+        for organization in organizations:
+            self.stdout.write(
+                f"Backfilling {organization.name} from {start_date} to {end_date}..."
+            )
+            backfill(organization.id, start_date, end_date)
+
+        self.stdout.write(self.style.SUCCESS("Daily metrics backfill complete"))
@@ -0,0 +1,257 @@
+"""
+Daily organization metrics fact table maintenance and reads.
+
+Ticket and work order changes mark the affected days dirty; a periodic task
+recomputes only those days from the raw tables (``refresh_dirty_days``).
+Dashboards and forecasting read the fact table, so range queries touch one
+small set of rows per day instead of scanning every ticket.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+
+from apps.field_service.models import WorkOrder
+from apps.tickets.models import Ticket
+
+from .models import DailyOrgMetrics, DailyOrgMetricsDirtyDay
+
+logger = logging.getLogger(__name__)
+
+OPEN_TICKET_STATUSES = ["open", "pending", "in_progress"]
+REFRESH_BATCH_SIZE = 500
+RECONCILE_DAYS = 7
+
+_METRIC_FIELDS = [
+    "created_count",
+    "resolved_count",
+    "breached_count",
+    "response_time_sum",
+    "response_count",
+    "resolution_time_sum",
+    "resolution_count",
+]
+
+
+def _duration(end_field, start_field):
+    return ExpressionWrapper(
+        F(end_field) - F(start_field), output_field=DurationField()
+    )
+
+
+def _day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def _seconds(value):
+    return value.total_seconds() if value else 0
+
+
+def mark_dirty(organization_id, *datetimes):
+    """Flag the local days containing ``datetimes`` for recomputation."""
+    days = {timezone.localdate(value) for value in datetimes if value}
+    if not days:
+        return
+
+    # Re-marking must move marked_at forward, otherwise a refresh already in
+    # progress would delete the mark and lose this change. auto_now is not
+    # applied to the conflict update, so set it explicitly.
+    marked_at = timezone.now()
+    DailyOrgMetricsDirtyDay.objects.bulk_create(
+        [
+            DailyOrgMetricsDirtyDay(
+                organization_id=organization_id, date=day, marked_at=marked_at
+            )
+            for day in days
+        ],
+        update_conflicts=True,
+        unique_fields=["organization", "date"],
+        update_fields=["marked_at"],
+    )
+
+
+def _ticket_rows(organization_id, start, end):
+    rows = defaultdict(lambda: dict.fromkeys(_METRIC_FIELDS, 0))
+    tickets = Ticket.objects.filter(organization_id=organization_id)
+
+    for row in (
+        tickets.filter(created_at__gte=start, created_at__lt=end)
+        .values("channel", "priority", "status")
+        .annotate(
+            created=Count("id"),
+            breached=Count("id", filter=Q(sla_breach=True)),
+            response_sum=Sum(_duration("first_response_at", "created_at")),
+            response_count=Count("first_response_at"),
+            resolution_sum=Sum(_duration("resolved_at", "created_at")),
+            resolution_count=Count("resolved_at"),
+        )
+        .order_by()
+    ):
+        bucket = rows[(row["channel"], row["priority"], row["status"])]
+        bucket["created_count"] = row["created"]
+        bucket["breached_count"] = row["breached"]
+        bucket["response_time_sum"] = _seconds(row["response_sum"])
+        bucket["response_count"] = row["response_count"]
+        bucket["resolution_time_sum"] = _seconds(row["resolution_sum"])
+        bucket["resolution_count"] = row["resolution_count"]
+
+    for row in (
+        tickets.filter(resolved_at__gte=start, resolved_at__lt=end)
+        .values("channel", "priority", "status")
+        .annotate(resolved=Count("id"))
+        .order_by()
+    ):
+        rows[(row["channel"], row["priority"], row["status"])]["resolved_count"] = row[
+            "resolved"
+        ]
+
+    return rows
+
+
+def _work_order_rows(organization_id, start, end):
+    rows = defaultdict(lambda: dict.fromkeys(_METRIC_FIELDS, 0))
+    work_orders = WorkOrder.objects.for_organization(organization_id)
+    completed = Q(status="completed", actual_end__isnull=False)
+
+    for row in (
+        work_orders.filter(created_at__gte=start, created_at__lt=end)
+        .values("priority", "status")
+        .annotate(
+            created=Count("id"),
+            resolution_sum=Sum(_duration("actual_end", "created_at"), filter=completed),
+            resolution_count=Count("id", filter=completed),
+        )
+        .order_by()
+    ):
+        bucket = rows[("", row["priority"], row["status"])]
+        bucket["created_count"] = row["created"]
+        bucket["resolution_time_sum"] = _seconds(row["resolution_sum"])
+        bucket["resolution_count"] = row["resolution_count"]
+
+    for row in (
+        work_orders.filter(completed, actual_end__gte=start, actual_end__lt=end)
+        .values("priority", "status")
+        .annotate(resolved=Count("id"))
+        .order_by()
+    ):
+        rows[("", row["priority"], row["status"])]["resolved_count"] = row["resolved"]
+
+    return rows
+
+
+def refresh_day(organization_id, day):
+    """Recompute every fact row for one organization and day."""
+    start, end = _day_bounds(day)
+    facts = []
+    for source, rows in (
+        ("ticket", _ticket_rows(organization_id, start, end)),
+        ("work_order", _work_order_rows(organization_id, start, end)),
+    ):
+        for (channel, priority, status), metrics in rows.items():
+            facts.append(
+                DailyOrgMetrics(
+                    organization_id=organization_id,
+                    date=day,
+                    source=source,
+                    channel=channel,
+                    priority=priority,
+                    status=status,
+                    **metrics,
+                )
+            )
+
+    with transaction.atomic():
+        DailyOrgMetrics.objects.filter(
+            organization_id=organization_id, date=day
+        ).delete()
+        DailyOrgMetrics.objects.bulk_create(facts)
+
+    from .widgets import invalidate_widget_data
+
+    invalidate_widget_data(organization_id)
+
+
+def refresh_dirty_days(limit=REFRESH_BATCH_SIZE):
+    """Drain up to ``limit`` dirty days. Returns the number refreshed."""
+    dirty = list(
+        DailyOrgMetricsDirtyDay.objects.order_by("marked_at").values(
+            "id", "organization_id", "date", "marked_at"
+        )[:limit]
+    )
+
+    for entry in dirty:
+        refresh_day(entry["organization_id"], entry["date"])
+        # A newer mark means the day changed again while we were refreshing
+        DailyOrgMetricsDirtyDay.objects.filter(
+            id=entry["id"], marked_at__lte=entry["marked_at"]
+        ).delete()
+
+    return len(dirty)
+
+
+def backfill(organization_id, start_date, end_date):
+    """Recompute every day in ``[start_date, end_date]`` for an organization."""
+    current_date = start_date
+    while current_date <= end_date:
+        refresh_day(organization_id, current_date)
+        current_date += timedelta(days=1)
+
+
+def metrics_queryset(organization, source="ticket", start_date=None, end_date=None):
+    """Fact rows for an organization, optionally limited to a date range."""
+    queryset = DailyOrgMetrics.objects.filter(organization=organization, source=source)
+    if start_date:
+        queryset = queryset.filter(date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(date__lte=end_date)
+    return queryset
+
+
+def summarize(queryset):
+    """Aggregate fact rows into headline counters and average durations (hours)."""
+    totals = queryset.aggregate(
+        created=Sum("created_count"),
+        resolved=Sum("resolved_count"),
+        breached=Sum("breached_count"),
+        open=Sum("created_count", filter=Q(status__in=OPEN_TICKET_STATUSES)),
+        current_resolved=Sum("created_count", filter=Q(status="resolved")),
+        current_closed=Sum("created_count", filter=Q(status="closed")),
+        current_completed=Sum("created_count", filter=Q(status="completed")),
+        current_in_progress=Sum("created_count", filter=Q(status="in_progress")),
+        response_time_sum=Sum("response_time_sum"),
+        response_count=Sum("response_count"),
+        resolution_time_sum=Sum("resolution_time_sum"),
+        resolution_count=Sum("resolution_count"),
+    )
+    summary = {key: value or 0 for key, value in totals.items()}
+    summary["avg_response_time"] = (
+        round(summary["response_time_sum"] / summary["response_count"] / 3600, 2)
+        if summary["response_count"]
+        else None
+    )
+    summary["avg_resolution_time"] = (
+        round(summary["resolution_time_sum"] / summary["resolution_count"] / 3600, 2)
+        if summary["resolution_count"]
+        else None
+    )
+    return summary
+
+
+def daily_series(queryset, start_date, end_date, field="created_count"):
+    """Dense ``[{date, value}]`` series of ``field`` summed per day."""
+    values = dict(
+        queryset.values("date").annotate(value=Sum(field)).values_list("date", "value")
+    )
+    series = []
+    current_date = start_date
+    while current_date <= end_date:
+        series.append(
+            {"date": current_date.isoformat(), "value": values.get(current_date, 0)}
+        )
+        current_date += timedelta(days=1)
+    return series
@@ -0,0 +1,58 @@
+"""
+Create the daily organization metrics fact table.
+"""
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyOrgMetrics',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('date', models.DateField(help_text='Bucket date')),
+                ('source', models.CharField(choices=[('ticket', 'Ticket'), ('work_order', 'Work Order')], max_length=20)),
+                ('channel', models.CharField(blank=True, max_length=20)),
+                ('priority', models.CharField(blank=True, max_length=20)),
+                ('status', models.CharField(blank=True, max_length=20)),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('resolved_count', models.PositiveIntegerField(default=0)),
+                ('breached_count', models.PositiveIntegerField(default=0)),
+                ('response_time_sum', models.FloatField(default=0, help_text='Seconds')),
+                ('response_count', models.PositiveIntegerField(default=0)),
+                ('resolution_time_sum', models.FloatField(default=0, help_text='Seconds')),
+                ('resolution_count', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_metrics', to='organizations.organization')),
+            ],
+            options={
+                'verbose_name': 'Daily Organization Metrics',
+                'verbose_name_plural': 'Daily Organization Metrics',
+                'db_table': 'daily_org_metrics',
+                'unique_together': {('organization', 'date', 'source', 'channel', 'priority', 'status')},
+                'indexes': [models.Index(fields=['organization', 'source', 'date'], name='daily_metrics_org_src_date_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyOrgMetricsDirtyDay',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('marked_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='organizations.organization')),
+            ],
+            options={
+                'db_table': 'daily_org_metrics_dirty',
+                'unique_together': {('organization', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,166 @@
+"""
+Analytics fact tables.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+
+class DailyOrgMetrics(models.Model):
+    """
+    Daily per-organization metrics fact table.
+
+    One row per (organization, date, source, channel, priority, status).
+    Created/breached counts and response/resolution time sums belong to the
+    cohort created on ``date``; ``resolved_count`` counts items resolved on
+    ``date``. Time sums are in seconds so averages over any range are
+    ``sum(*_time_sum) / sum(*_count)``.
+    """
+
+    SOURCE_CHOICES = [
+        ("ticket", "Ticket"),
+        ("work_order", "Work Order"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    organization = models.ForeignKey(
+        "organizations.Organization",
+        on_delete=models.CASCADE,
+        related_name="daily_metrics",
+    )
+    date = models.DateField(help_text="Bucket date")
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    channel = models.CharField(max_length=20, blank=True)
+    priority = models.CharField(max_length=20, blank=True)
+    status = models.CharField(max_length=20, blank=True)
+
+    created_count = models.PositiveIntegerField(default=0)
+    resolved_count = models.PositiveIntegerField(default=0)
+    breached_count = models.PositiveIntegerField(default=0)
+    response_time_sum = models.FloatField(default=0, help_text="Seconds")
+    response_count = models.PositiveIntegerField(default=0)
+    resolution_time_sum = models.FloatField(default=0, help_text="Seconds")
+    resolution_count = models.PositiveIntegerField(default=0)
+
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "daily_org_metrics"
+        verbose_name = "Daily Organization Metrics"
+        verbose_name_plural = "Daily Organization Metrics"
+        unique_together = [
+            "organization",
+            "date",
+            "source",
+            "channel",
+            "priority",
+            "status",
+        ]
+        indexes = [
+            models.Index(
+                fields=["organization", "source", "date"],
+                name="daily_metrics_org_src_date_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.organization_id} {self.source} @ {self.date}"
+
+
+class DailyOrgMetricsDirtyDay(models.Model):
+    """
+    Days whose ``DailyOrgMetrics`` rows need recomputing.
+
+    Rows are inserted when tickets or work orders change and drained by the
+    periodic refresh task.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    organization = models.ForeignKey(
+        "organizations.Organization", on_delete=models.CASCADE
+    )
+    date = models.DateField()
+    marked_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "daily_org_metrics_dirty"
+        unique_together = ["organization", "date"]
+
+    def __str__(self):
+        return f"{self.organization_id} @ {self.date}"
+
+
+class ReportExport(models.Model):
+    """
+    Background report export job.
+
+    Parameters are snapshotted at request time so edits to the source
+    report do not affect a running export.
+    """
+
+    FORMAT_CHOICES = [
+        ("csv", "CSV"),
+        ("excel", "Excel"),
+    ]
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    organization = models.ForeignKey(
+        "organizations.Organization",
+        on_delete=models.CASCADE,
+        related_name="report_exports",
+    )
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="report_exports",
+    )
+    report_name = models.CharField(max_length=255)
+    report_type = models.CharField(max_length=50)
+    parameters = models.JSONField(default=dict, blank=True)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default="csv")
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    rows_written = models.PositiveIntegerField(default=0)
+    file_name = models.CharField(max_length=500, blank=True)
+    file_size = models.BigIntegerField(null=True, blank=True)
+    error_message = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "report_exports"
+        verbose_name = "Report Export"
+        verbose_name_plural = "Report Exports"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["organization", "status"],
+                name="report_exports_org_status_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.report_name} ({self.format}) - {self.status}"
+
+    @property
+    def progress(self):
+        """Completion percentage, or None while the total is unknown."""
+        if self.status == "completed":
+            return 100
+        if not self.total_rows:
+            return None
+        return round(min(self.rows_written / self.total_rows, 1) * 100, 1)
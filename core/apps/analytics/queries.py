@@ -0,0 +1,327 @@
+"""
+Analytics query layer.
+
+Report builders in this module push all aggregation into the database.
+Ticket reports are folded from the ``DailyOrgMetrics`` fact table; field
+service reports aggregate work orders directly, with averages computed as
+``Avg(F(end) - F(start))``, daily trends from a single ``TruncDate`` GROUP
+BY, and per-status/priority counts with conditional aggregates. Each report
+costs a fixed number of round trips regardless of the date range, and
+results are cached briefly so the HTML views and API callers asking for the
+same range share one computation.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.field_service.models import JobAssignment, WorkOrder
+
+from .metrics import OPEN_TICKET_STATUSES, metrics_queryset
+
+logger = logging.getLogger(__name__)
+
+REPORT_CACHE_TTL = 60  # seconds
+DEFAULT_RANGE_DAYS = 30
+
+
+def parse_date_range(params, default_days=DEFAULT_RANGE_DAYS):
+    """
+    Read ``start_date``/``end_date`` (YYYY-MM-DD) from a query dict.
+
+    Raises ``ValueError`` for malformed dates.
+    """
+    today = timezone.localdate()
+    start_date = params.get("start_date")
+    end_date = params.get("end_date")
+
+    if start_date:
+        start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+    else:
+        start_date = today - timedelta(days=default_days)
+
+    if end_date:
+        end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+    else:
+        end_date = today
+
+    return start_date, end_date
+
+
+def date_range_bounds(start_date, end_date):
+    """Aware ``[start, end)`` datetimes so range filters can use the index."""
+    start = timezone.make_aware(datetime.combine(start_date, time.min))
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+    return start, end
+
+
+def _duration(end_field, start_field):
+    return ExpressionWrapper(
+        F(end_field) - F(start_field), output_field=DurationField()
+    )
+
+
+def _hours(value):
+    """Convert an aggregated ``timedelta`` to hours rounded for display."""
+    if value is None:
+        return None
+    return round(value.total_seconds() / 3600, 2)
+
+
+def _average_hours(total_seconds, count):
+    if not count:
+        return None
+    return round(total_seconds / count / 3600, 2)
+
+
+def _fill_daily_trends(start_date, end_date, rows, keys):
+    """Expand grouped per-day rows into a dense list covering every day."""
+    by_date = {row["date"]: row for row in rows}
+    trends = []
+    current_date = start_date
+    while current_date <= end_date:
+        row = by_date.get(current_date, {})
+        entry = {"date": current_date.isoformat()}
+        for key in keys:
+            entry[key] = row.get(key, 0)
+        trends.append(entry)
+        current_date += timedelta(days=1)
+    return trends
+
+
+def _cached_report(name, organization, start_date, end_date, builder):
+    cache_key = (
+        f"analytics_report:{name}:{organization.id}:"
+        f"{start_date.isoformat()}:{end_date.isoformat()}"
+    )
+    report = cache.get(cache_key)
+    if report is None:
+        report = builder(organization, start_date, end_date)
+        cache.set(cache_key, report, REPORT_CACHE_TTL)
+    return report
+
+
+def _build_ticket_report(organization, start_date, end_date):
+    # One GROUP BY over the daily fact rows, folded into every section
+    grouped = (
+        metrics_queryset(organization, "ticket", start_date, end_date)
+        .values("date", "status", "priority", "channel")
+        .annotate(
+            created=Sum("created_count"),
+            resolved=Sum("resolved_count"),
+            breached=Sum("breached_count"),
+            response_time_sum=Sum("response_time_sum"),
+            response_count=Sum("response_count"),
+            resolution_time_sum=Sum("resolution_time_sum"),
+            resolution_count=Sum("resolution_count"),
+        )
+        .order_by()
+    )
+
+    totals = defaultdict(float)
+    status_counts = defaultdict(int)
+    priority_counts = defaultdict(int)
+    channel_counts = defaultdict(int)
+    daily = defaultdict(lambda: {"created": 0, "resolved": 0})
+    for row in grouped:
+        for key in (
+            "created",
+            "breached",
+            "response_time_sum",
+            "response_count",
+            "resolution_time_sum",
+            "resolution_count",
+        ):
+            totals[key] += row[key] or 0
+        status_counts[row["status"]] += row["created"]
+        priority_counts[row["priority"]] += row["created"]
+        channel_counts[row["channel"]] += row["created"]
+        daily[row["date"]]["created"] += row["created"]
+        daily[row["date"]]["resolved"] += row["resolved"]
+
+    top_agents = (
+        User.objects.filter(organization=organization, role__in=["agent", "admin"])
+        .annotate(
+            tickets_resolved=Count(
+                "assigned_tickets", filter=Q(assigned_tickets__status="resolved")
+            )
+        )
+        .only("id", "first_name", "last_name", "username")
+        .order_by("-tickets_resolved")[:5]
+    )
+
+    total_tickets = int(totals["created"])
+    sla_breached = int(totals["breached"])
+    sla_compliance = (
+        ((total_tickets - sla_breached) / total_tickets * 100)
+        if total_tickets > 0
+        else 100
+    )
+
+    return {
+        "total_tickets": total_tickets,
+        "open_tickets": sum(status_counts[s] for s in OPEN_TICKET_STATUSES),
+        "resolved_tickets": status_counts["resolved"],
+        "closed_tickets": status_counts["closed"],
+        "sla_breached": sla_breached,
+        "sla_compliance": round(sla_compliance, 2),
+        "avg_response_time": _average_hours(
+            totals["response_time_sum"], totals["response_count"]
+        ),
+        "avg_resolution_time": _average_hours(
+            totals["resolution_time_sum"], totals["resolution_count"]
+        ),
+        "status_distribution": [
+            {"status": key, "count": count}
+            for key, count in status_counts.items()
+            if count
+        ],
+        "priority_distribution": [
+            {"priority": key, "count": count} for key, count in priority_counts.items()
+        ],
+        "channel_distribution": [
+            {"channel": key, "count": count} for key, count in channel_counts.items()
+        ],
+        "daily_trends": _fill_daily_trends(
+            start_date,
+            end_date,
+            [{"date": day, **counts} for day, counts in daily.items()],
+            ["created", "resolved"],
+        ),
+        "top_agents": [
+            {
+                "id": str(agent.id),
+                "name": agent.get_full_name(),
+                "tickets_resolved": agent.tickets_resolved,
+            }
+            for agent in top_agents
+        ],
+    }
+
+
+def _build_field_service_report(organization, start_date, end_date):
+    start, end = date_range_bounds(start_date, end_date)
+    work_orders = WorkOrder.objects.for_organization(organization).filter(
+        created_at__gte=start, created_at__lt=end
+    )
+
+    # Round trip 1: headline counters and average completion time
+    totals = work_orders.aggregate(
+        total_work_orders=Count("id"),
+        completed_work_orders=Count("id", filter=Q(status="completed")),
+        in_progress_work_orders=Count("id", filter=Q(status="in_progress")),
+        scheduled_work_orders=Count("id", filter=Q(status="scheduled")),
+        avg_completion_time=Avg(
+            _duration("actual_end", "created_at"),
+            filter=Q(status="completed", actual_end__isnull=False),
+        ),
+    )
+
+    # Round trip 2: distributions and daily trends
+    grouped = (
+        work_orders.annotate(date=TruncDate("created_at"))
+        .values("date", "work_type", "priority")
+        .annotate(
+            created=Count("id"),
+            completed=Count("id", filter=Q(actual_end__date=TruncDate("created_at"))),
+        )
+        .order_by()
+    )
+
+    type_counts = defaultdict(int)
+    priority_counts = defaultdict(int)
+    daily = defaultdict(lambda: {"created": 0, "completed": 0})
+    for row in grouped:
+        type_counts[row["work_type"]] += row["created"]
+        priority_counts[row["priority"]] += row["created"]
+        daily[row["date"]]["created"] += row["created"]
+        daily[row["date"]]["completed"] += row["completed"]
+
+    # Round trip 3: per-technician totals in one GROUP BY instead of a loop
+    per_technician = {
+        row["technician__user_id"]: row
+        for row in JobAssignment.objects.filter(work_order__in=work_orders)
+        .values("technician__user_id")
+        .annotate(
+            total=Count("work_order", distinct=True),
+            completed=Count(
+                "work_order",
+                filter=Q(work_order__status="completed"),
+                distinct=True,
+            ),
+        )
+        .order_by()
+    }
+
+    technician_performance = []
+    for tech in User.objects.filter(
+        organization=organization, role__in=["agent", "admin"]
+    ).only("id", "first_name", "last_name", "username"):
+        stats = per_technician.get(tech.id, {})
+        tech_total = stats.get("total", 0)
+        tech_completed = stats.get("completed", 0)
+        technician_performance.append(
+            {
+                "id": str(tech.id),
+                "name": tech.get_full_name(),
+                "total_work_orders": tech_total,
+                "completed_work_orders": tech_completed,
+                "completion_rate": (
+                    (tech_completed / tech_total * 100) if tech_total > 0 else 0
+                ),
+            }
+        )
+
+    total_work_orders = totals["total_work_orders"]
+    completion_rate = (
+        (totals["completed_work_orders"] / total_work_orders * 100)
+        if total_work_orders > 0
+        else 0
+    )
+
+    return {
+        "total_work_orders": total_work_orders,
+        "completed_work_orders": totals["completed_work_orders"],
+        "in_progress_work_orders": totals["in_progress_work_orders"],
+        "scheduled_work_orders": totals["scheduled_work_orders"],
+        "completion_rate": round(completion_rate, 2),
+        "avg_completion_time": _hours(totals["avg_completion_time"]),
+        "technician_performance": technician_performance,
+        "type_distribution": [
+            {"work_order_type": key, "count": count}
+            for key, count in type_counts.items()
+        ],
+        "priority_distribution": [
+            {"priority": key, "count": count} for key, count in priority_counts.items()
+        ],
+        "daily_trends": _fill_daily_trends(
+            start_date,
+            end_date,
+            [{"date": day, **counts} for day, counts in daily.items()],
+            ["created", "completed"],
+        ),
+    }
+
+
+def get_ticket_report(organization, start_date, end_date):
+    """Ticket metrics, distributions and daily trends for a date range."""
+    return _cached_report(
+        "tickets", organization, start_date, end_date, _build_ticket_report
+    )
+
+
+def get_field_service_report(organization, start_date, end_date):
+    """Work order metrics, technician performance and daily trends."""
+    return _cached_report(
+        "field_service",
+        organization,
+        start_date,
+        end_date,
+        _build_field_service_report,
+    )
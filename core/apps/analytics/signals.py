@@ -0,0 +1,30 @@
+"""
+Signal handlers that mark daily metrics days dirty.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.field_service.models import WorkOrder
+from apps.tickets.models import Ticket
+
+from .metrics import mark_dirty
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def mark_ticket_days_dirty(sender, instance, **kwargs):
+    """A ticket contributes to the day it was created and the day it was resolved."""
+    organization_id = instance.organization_id
+    created_at, resolved_at = instance.created_at, instance.resolved_at
+    transaction.on_commit(lambda: mark_dirty(organization_id, created_at, resolved_at))
+
+
+@receiver(post_save, sender=WorkOrder)
+@receiver(post_delete, sender=WorkOrder)
+def mark_work_order_days_dirty(sender, instance, **kwargs):
+    """A work order contributes to the day it was created and the day it ended."""
+    organization_id = instance.organization_id
+    created_at, actual_end = instance.created_at, instance.actual_end
+    transaction.on_commit(lambda: mark_dirty(organization_id, created_at, actual_end))
@@ -0,0 +1,63 @@
+"""
+Celery tasks for the daily metrics fact table.
+"""
+
+from celery import shared_task
+from django.utils import timezone
+from datetime import timedelta
+import logging
+
+from apps.organizations.models import Organization
+from .metrics import RECONCILE_DAYS, backfill, refresh_dirty_days
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_daily_metrics():
+    """Recompute fact rows for days touched since the last run."""
+    refreshed = refresh_dirty_days()
+    if refreshed:
+        logger.info(f"Refreshed {refreshed} dirty daily metrics days")
+    return refreshed
+
+
+@shared_task
+def reconcile_daily_metrics(days=RECONCILE_DAYS):
+    """
+    Nightly safety net: recompute the last ``days`` days for every org.
+
+    Catches changes the dirty marks cannot see, such as a reopened ticket
+    whose previous resolution day still counts it as resolved.
+    """
+    end_date = timezone.localdate()
+    start_date = end_date - timedelta(days=days)
+
+    for organization in Organization.objects.filter(is_active=True):
+        try:
+            backfill(organization.id, start_date, end_date)
+        except Exception as e:
+            logger.error(
+                f"Error reconciling daily metrics for organization {organization.id}: {str(e)}"
+            )
+
+
+@shared_task
+def run_report_export(export_id):
+    """Write a report export to file storage, recording progress as it goes."""
+    from .exports import run_export
+    from .models import ReportExport
+
+    try:
+        export = ReportExport.objects.select_related("organization").get(id=export_id)
+    except ReportExport.DoesNotExist:
+        logger.error(f"Report export {export_id} not found")
+        return
+
+    try:
+        run_export(export)
+    except Exception as e:
+        logger.error(f"Report export {export_id} failed: {str(e)}")
+        ReportExport.objects.filter(id=export_id).update(
+            status="failed", error_message=str(e), completed_at=timezone.now()
+        )
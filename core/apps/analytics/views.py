@@ -5,18 +5,32 @@ Analytics and reporting views for helpdesk platform.
 import logging
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, HttpResponse
+from django.http import FileResponse, JsonResponse, HttpResponse
 from django.views.decorators.http import require_http_methods
-from django.db.models import Count, Avg, Sum, Q
+from django.db.models import Count, Avg, Sum
 from django.utils import timezone
 from datetime import timedelta, datetime
 import json
-import csv
 import io
-
-from .models import Report, ReportTemplate, Dashboard, DashboardWidget
+import os
+
+from .models import Report, ReportTemplate, Dashboard, DashboardWidget, ReportExport
+from .exports import (
+    CONTENT_TYPES,
+    EXTENSIONS,
+    SYNC_ROW_LIMIT,
+    ExportError,
+    build_queryset,
+    ranged_file_response,
+    stream_csv_response,
+    write_export_file,
+)
+from .metrics import metrics_queryset, summarize
+from .tasks import run_report_export
+from .widgets import WidgetDataPlanner
+from .queries import get_field_service_report, get_ticket_report, parse_date_range
 from apps.tickets.models import Ticket, TicketComment
-from apps.field_service.models import WorkOrder, ServiceReport
+from apps.field_service.models import ServiceReport
 from apps.accounts.models import User
 from apps.organizations.models import Organization
 
@@ -44,125 +58,12 @@ def analytics_dashboard(request):
 @login_required
 def ticket_analytics(request):
     """Ticket analytics and metrics."""
-    organization = request.user.organization
-
-    # Date range
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
-
-    if not start_date:
-        start_date = (timezone.now() - timedelta(days=30)).date()
-    else:
-        start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
-
-    if not end_date:
-        end_date = timezone.now().date()
-    else:
-        end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
-
-    # Base queryset
-    tickets = Ticket.objects.filter(
-        organization=organization,
-        created_at__date__gte=start_date,
-        created_at__date__lte=end_date,
-    )
-
-    # Basic metrics
-    total_tickets = tickets.count()
-    open_tickets = tickets.filter(status__in=["open", "pending", "in_progress"]).count()
-    resolved_tickets = tickets.filter(status="resolved").count()
-    closed_tickets = tickets.filter(status="closed").count()
-
-    # SLA metrics
-    sla_breached = tickets.filter(sla_breach=True).count()
-    sla_compliance = (
-        ((total_tickets - sla_breached) / total_tickets * 100)
-        if total_tickets > 0
-        else 100
-    )
-
-    # Response time metrics
-    responded_tickets = tickets.filter(first_response_at__isnull=False)
-    avg_response_time = None
-    if responded_tickets.exists():
-        response_times = []
-        for ticket in responded_tickets:
-            response_time = (
-                ticket.first_response_at - ticket.created_at
-            ).total_seconds() / 3600
-            response_times.append(response_time)
-        avg_response_time = sum(response_times) / len(response_times)
-
-    # Resolution time metrics
-    resolved_tickets_with_time = tickets.filter(resolved_at__isnull=False)
-    avg_resolution_time = None
-    if resolved_tickets_with_time.exists():
-        resolution_times = []
-        for ticket in resolved_tickets_with_time:
-            resolution_time = (
-                ticket.resolved_at - ticket.created_at
-            ).total_seconds() / 3600
-            resolution_times.append(resolution_time)
-        avg_resolution_time = sum(resolution_times) / len(resolution_times)
-
-    # Status distribution
-    status_distribution = tickets.values("status").annotate(count=Count("id"))
-
-    # Priority distribution
-    priority_distribution = tickets.values("priority").annotate(count=Count("id"))
-
-    # Channel distribution
-    channel_distribution = tickets.values("channel").annotate(count=Count("id"))
-
-    # Daily trends
-    daily_trends = []
-    current_date = start_date
-    while current_date <= end_date:
-        day_tickets = tickets.filter(created_at__date=current_date)
-        daily_trends.append(
-            {
-                "date": current_date.isoformat(),
-                "created": day_tickets.count(),
-                "resolved": day_tickets.filter(resolved_at__date=current_date).count(),
-            }
-        )
-        current_date += timedelta(days=1)
-
-    # Top agents
-    top_agents = (
-        User.objects.filter(organization=organization, role__in=["agent", "admin"])
-        .annotate(
-            tickets_resolved=Count(
-                "assigned_tickets", filter=Q(assigned_tickets__status="resolved")
-            )
-        )
-        .order_by("-tickets_resolved")[:5]
-    )
+    try:
+        start_date, end_date = parse_date_range(request.GET)
+    except ValueError:
+        return JsonResponse({"error": "Invalid date format"}, status=400)
 
-    analytics = {
-        "total_tickets": total_tickets,
-        "open_tickets": open_tickets,
-        "resolved_tickets": resolved_tickets,
-        "closed_tickets": closed_tickets,
-        "sla_breached": sla_breached,
-        "sla_compliance": round(sla_compliance, 2),
-        "avg_response_time": round(avg_response_time, 2) if avg_response_time else None,
-        "avg_resolution_time": (
-            round(avg_resolution_time, 2) if avg_resolution_time else None
-        ),
-        "status_distribution": list(status_distribution),
-        "priority_distribution": list(priority_distribution),
-        "channel_distribution": list(channel_distribution),
-        "daily_trends": daily_trends,
-        "top_agents": [
-            {
-                "id": str(agent.id),
-                "name": agent.full_name,
-                "tickets_resolved": agent.tickets_resolved,
-            }
-            for agent in top_agents
-        ],
-    }
+    analytics = get_ticket_report(request.user.organization, start_date, end_date)
 
     return JsonResponse(analytics)
 
@@ -170,116 +71,15 @@ def ticket_analytics(request):
 @login_required
 def field_service_analytics(request):
     """Field service analytics and metrics."""
-    organization = request.user.organization
-
-    # Date range
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
-
-    if not start_date:
-        start_date = (timezone.now() - timedelta(days=30)).date()
-    else:
-        start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
-
-    if not end_date:
-        end_date = timezone.now().date()
-    else:
-        end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
-
-    # Base queryset
-    work_orders = WorkOrder.objects.filter(
-        organization=organization,
-        created_at__date__gte=start_date,
-        created_at__date__lte=end_date,
-    )
-
-    # Basic metrics
-    total_work_orders = work_orders.count()
-    completed_work_orders = work_orders.filter(status="completed").count()
-    in_progress_work_orders = work_orders.filter(status="in_progress").count()
-    scheduled_work_orders = work_orders.filter(status="scheduled").count()
-
-    # Completion rate
-    completion_rate = (
-        (completed_work_orders / total_work_orders * 100)
-        if total_work_orders > 0
-        else 0
-    )
-
-    # Average completion time
-    completed_with_time = work_orders.filter(
-        status="completed", completed_at__isnull=False
-    )
-    avg_completion_time = None
-    if completed_with_time.exists():
-        completion_times = []
-        for wo in completed_with_time:
-            completion_time = (wo.completed_at - wo.created_at).total_seconds() / 3600
-            completion_times.append(completion_time)
-        avg_completion_time = sum(completion_times) / len(completion_times)
-
-    # Technician performance
-    technician_performance = []
-    technicians = User.objects.filter(
-        organization=organization, role__in=["agent", "admin"]
-    )
-
-    for tech in technicians:
-        tech_work_orders = work_orders.filter(assigned_technician__user=tech)
-        tech_completed = tech_work_orders.filter(status="completed").count()
-        tech_total = tech_work_orders.count()
-
-        technician_performance.append(
-            {
-                "id": str(tech.id),
-                "name": tech.full_name,
-                "total_work_orders": tech_total,
-                "completed_work_orders": tech_completed,
-                "completion_rate": (
-                    (tech_completed / tech_total * 100) if tech_total > 0 else 0
-                ),
-            }
-        )
+    try:
+        start_date, end_date = parse_date_range(request.GET)
+    except ValueError:
+        return JsonResponse({"error": "Invalid date format"}, status=400)
 
-    # Work order type distribution
-    type_distribution = work_orders.values("work_order_type").annotate(
-        count=Count("id")
+    analytics = get_field_service_report(
+        request.user.organization, start_date, end_date
     )
 
-    # Priority distribution
-    priority_distribution = work_orders.values("priority").annotate(count=Count("id"))
-
-    # Daily trends
-    daily_trends = []
-    current_date = start_date
-    while current_date <= end_date:
-        day_work_orders = work_orders.filter(created_at__date=current_date)
-        daily_trends.append(
-            {
-                "date": current_date.isoformat(),
-                "created": day_work_orders.count(),
-                "completed": day_work_orders.filter(
-                    completed_at__date=current_date
-                ).count(),
-            }
-        )
-        current_date += timedelta(days=1)
-
-    analytics = {
-        "total_work_orders": total_work_orders,
-        "completed_work_orders": completed_work_orders,
-        "in_progress_work_orders": in_progress_work_orders,
-        "scheduled_work_orders": scheduled_work_orders,
-        "completion_rate": round(completion_rate, 2),
-        "avg_completion_time": (
-            round(avg_completion_time, 2) if avg_completion_time else None
-        ),
-        "technician_performance": technician_performance,
-        "type_distribution": list(type_distribution),
-        "priority_distribution": list(priority_distribution),
-        "daily_trends": daily_trends,
-    }
-
     return JsonResponse(analytics)
 
 
@@ -389,56 +189,122 @@ def create_custom_report(request):
 
 @login_required
 def export_report(request, report_id):
-    """Export report to CSV/Excel."""
+    """
+    Export report to CSV/Excel.
+
+    CSV streams straight from a server-side cursor. Excel exports above
+    ``SYNC_ROW_LIMIT`` rows, and any export requested with
+    ``background=true``, run as a background job instead (202 + job id).
+    """
     report = get_object_or_404(
         Report, id=report_id, organization=request.user.organization
     )
 
     format_type = request.GET.get("format", "csv")
-
-    if format_type == "csv":
-        return export_csv_report(report)
-    elif format_type == "excel":
-        return export_excel_report(report)
-    else:
+    if format_type not in EXTENSIONS:
         return JsonResponse({"error": "Invalid format"}, status=400)
 
-
-def export_csv_report(report):
-    """Export report as CSV."""
     try:
-        # Execute report query
-        # This is a simplified version - in practice, you'd need to handle SQL queries safely
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = f'attachment; filename="{report.name}.csv"'
+        queryset = build_queryset(
+            request.user.organization, report.report_type, report.parameters
+        )
+    except (ExportError, ValueError) as e:
+        return JsonResponse({"error": str(e)}, status=400)
 
-        writer = csv.writer(response)
+    background = request.GET.get("background") == "true"
+    if not background and format_type == "excel":
+        background = queryset.count() > SYNC_ROW_LIMIT
 
-        # Add headers
-        writer.writerow(["Report", "Generated", "Parameters"])
-        writer.writerow(
-            [report.name, timezone.now().isoformat(), str(report.parameters)]
+    if background:
+        export = ReportExport.objects.create(
+            organization=request.user.organization,
+            requested_by=request.user,
+            report_name=report.name,
+            report_type=report.report_type,
+            parameters=report.parameters or {},
+            format=format_type,
+        )
+        run_report_export.delay(str(export.id))
+        return JsonResponse(
+            {"export_id": str(export.id), "status": export.status}, status=202
         )
 
-        # Add data rows (simplified)
-        writer.writerow(["Data would be here based on report query"])
+    if format_type == "csv":
+        return export_csv_report(report, queryset)
+    return export_excel_report(report, queryset)
 
-        return response
 
-    except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
+def export_csv_report(report, queryset):
+    """Export report as a streamed CSV response."""
+    return stream_csv_response(queryset, report.report_type, report.name)
 
 
-def export_excel_report(report):
-    """Export report as Excel."""
+def export_excel_report(report, queryset):
+    """Export report as an XLSX file written in constant-memory mode."""
     try:
-        # This would require openpyxl or xlsxwriter
-        # For now, return a placeholder response
-        return JsonResponse({"message": "Excel export not implemented yet"})
-
+        path, _ = write_export_file(queryset, report.report_type, "excel")
     except Exception as e:
+        logger.error(f"Error exporting report {report.id}: {str(e)}")
         return JsonResponse({"error": str(e)}, status=500)
 
+    fileobj = open(path, "rb")
+    # The open handle keeps the data readable after the path is unlinked
+    os.remove(path)
+    return FileResponse(
+        fileobj,
+        as_attachment=True,
+        filename=f"{report.name}.xlsx",
+        content_type=CONTENT_TYPES["excel"],
+    )
+
+
+@login_required
+def report_export_status(request, export_id):
+    """Progress of a background report export."""
+    export = get_object_or_404(
+        ReportExport, id=export_id, organization=request.user.organization
+    )
+
+    return JsonResponse(
+        {
+            "export_id": str(export.id),
+            "status": export.status,
+            "format": export.format,
+            "rows_written": export.rows_written,
+            "total_rows": export.total_rows,
+            "progress": export.progress,
+            "file_size": export.file_size,
+            "error": export.error_message or None,
+            "created_at": export.created_at.isoformat(),
+            "completed_at": (
+                export.completed_at.isoformat() if export.completed_at else None
+            ),
+        }
+    )
+
+
+@login_required
+def download_report_export(request, export_id):
+    """Download a finished export; supports Range requests for resuming."""
+    export = get_object_or_404(
+        ReportExport, id=export_id, organization=request.user.organization
+    )
+
+    if export.status != "completed" or not export.file_name:
+        return JsonResponse({"error": "Export is not ready"}, status=409)
+
+    response = ranged_file_response(
+        export.file_name,
+        export.file_size,
+        request.META.get("HTTP_RANGE"),
+        CONTENT_TYPES[export.format],
+        f"{export.report_name}.{EXTENSIONS[export.format]}",
+    )
+    if response is None:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{export.file_size}"
+    return response
+
 
 @login_required
 def real_time_metrics(request):
@@ -447,16 +313,15 @@ def real_time_metrics(request):
 
     # Current metrics
     current_time = timezone.now()
+    today = timezone.localdate()
 
-    # Tickets created today
-    tickets_today = Ticket.objects.filter(
-        organization=organization, created_at__date=current_time.date()
-    ).count()
-
-    # Work orders completed today
-    work_orders_completed_today = WorkOrder.objects.filter(
-        organization=organization, completed_at__date=current_time.date()
-    ).count()
+    # Today's counters come from the daily fact table
+    tickets_today = summarize(metrics_queryset(organization, "ticket", today, today))[
+        "created"
+    ]
+    work_orders_completed_today = summarize(
+        metrics_queryset(organization, "work_order", today, today)
+    )["resolved"]
 
     # Active technicians
     active_technicians = User.objects.filter(
@@ -465,7 +330,7 @@ def real_time_metrics(request):
         last_activity__gte=current_time - timedelta(hours=1),
     ).count()
 
-    # SLA breaches in last 24 hours
+    # SLA breaches in last 24 hours (rolling window, bounded by created_at index)
     sla_breaches_24h = Ticket.objects.filter(
         organization=organization,
         sla_breach=True,
@@ -492,6 +357,9 @@ def dashboard_widgets(request):
         dashboard__organization=organization, is_active=True
     ).order_by("position")
 
+    # All widgets share one planned set of aggregate queries
+    planned_data = WidgetDataPlanner(organization, widgets).widget_data()
+
     widget_data = []
 
     for widget in widgets:
@@ -502,7 +370,7 @@ def dashboard_widgets(request):
             "position": widget.position,
             "size": widget.size,
             "config": widget.config,
-            "data": get_widget_data(widget),
+            "data": planned_data.get(widget.id, {}),
         }
         widget_data.append(data)
 
@@ -511,108 +379,5 @@ def dashboard_widgets(request):
 
 def get_widget_data(widget):
     """Get data for a specific widget."""
-    try:
-        if widget.widget_type == "ticket_stats":
-            return get_ticket_stats_data(widget)
-        elif widget.widget_type == "work_order_stats":
-            return get_work_order_stats_data(widget)
-        elif widget.widget_type == "sla_compliance":
-            return get_sla_compliance_data(widget)
-        elif widget.widget_type == "technician_performance":
-            return get_technician_performance_data(widget)
-        else:
-            return {}
-    except Exception as e:
-        logger.error(f"Error getting widget data: {str(e)}")
-        return {}
-
-
-def get_ticket_stats_data(widget):
-    """Get ticket statistics data."""
-    organization = widget.dashboard.organization
-
-    # Optimized single query for all ticket statistics
-    from django.db.models import Count, Q
-    
-    stats = Ticket.objects.filter(organization=organization).aggregate(
-        total_tickets=Count('id'),
-        open_tickets=Count('id', filter=Q(status__in=["open", "pending", "in_progress"])),
-        resolved_tickets=Count('id', filter=Q(status="resolved"))
-    )
-    
-    total_tickets = stats['total_tickets']
-    open_tickets = stats['open_tickets']
-    resolved_tickets = stats['resolved_tickets']
-
-    return {
-        "total_tickets": total_tickets,
-        "open_tickets": open_tickets,
-        "resolved_tickets": resolved_tickets,
-    }
-
-
-def get_work_order_stats_data(widget):
-    """Get work order statistics data."""
-    organization = widget.dashboard.organization
-
-    total_work_orders = WorkOrder.objects.filter(organization=organization).count()
-    completed_work_orders = WorkOrder.objects.filter(
-        organization=organization, status="completed"
-    ).count()
-    in_progress_work_orders = WorkOrder.objects.filter(
-        organization=organization, status="in_progress"
-    ).count()
-
-    return {
-        "total_work_orders": total_work_orders,
-        "completed_work_orders": completed_work_orders,
-        "in_progress_work_orders": in_progress_work_orders,
-    }
-
-
-def get_sla_compliance_data(widget):
-    """Get SLA compliance data."""
-    organization = widget.dashboard.organization
-
-    # Optimized single query for SLA compliance statistics
-    from django.db.models import Count, Q
-    
-    sla_stats = Ticket.objects.filter(organization=organization).aggregate(
-        total_tickets=Count('id'),
-        breached_tickets=Count('id', filter=Q(sla_breach=True))
-    )
-    
-    total_tickets = sla_stats['total_tickets']
-    breached_tickets = sla_stats['breached_tickets']
-
-    compliance_rate = (
-        ((total_tickets - breached_tickets) / total_tickets * 100)
-        if total_tickets > 0
-        else 100
-    )
-
-    return {
-        "total_tickets": total_tickets,
-        "breached_tickets": breached_tickets,
-        "compliance_rate": round(compliance_rate, 2),
-    }
-
-
-def get_technician_performance_data(widget):
-    """Get technician performance data."""
-    organization = widget.dashboard.organization
-
-    technicians = (
-        User.objects.filter(organization=organization, role__in=["agent", "admin"])
-        .annotate(
-            tickets_resolved=Count(
-                "assigned_tickets", filter=Q(assigned_tickets__status="resolved")
-            )
-        )
-        .order_by("-tickets_resolved")[:5]
-    )
-
-    return [
-        {"name": tech.full_name, "tickets_resolved": tech.tickets_resolved}
-        for tech in technicians
-    ]
+    planner = WidgetDataPlanner(widget.dashboard.organization, [widget])
+    return planner.widget_data().get(widget.id, {})
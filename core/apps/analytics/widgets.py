@@ -0,0 +1,183 @@
+"""
+Batched dashboard widget data resolution.
+
+``WidgetDataPlanner`` collects the metrics every active widget on a
+dashboard needs, computes them with one conditional-aggregate query over
+the daily metrics fact table (plus one query for technician rankings when
+a widget asks for them), and caches the combined result per organization.
+Fact table refreshes invalidate the cache, so widgets never lag behind the
+facts by more than one refresh cycle.
+"""
+
+import logging
+
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+from apps.accounts.models import User
+
+from .metrics import OPEN_TICKET_STATUSES
+from .models import DailyOrgMetrics
+
+logger = logging.getLogger(__name__)
+
+WIDGET_CACHE_TTL = 30  # seconds
+WIDGET_CACHE_KEY = "analytics_widget_data:{organization_id}"
+TECHNICIAN_METRIC = "technician_performance"
+
+# Conditional aggregates over DailyOrgMetrics, keyed by metric name
+FACT_METRICS = {
+    "tickets_total": Sum("created_count", filter=Q(source="ticket")),
+    "tickets_open": Sum(
+        "created_count", filter=Q(source="ticket", status__in=OPEN_TICKET_STATUSES)
+    ),
+    "tickets_resolved": Sum(
+        "created_count", filter=Q(source="ticket", status="resolved")
+    ),
+    "tickets_breached": Sum("breached_count", filter=Q(source="ticket")),
+    "work_orders_total": Sum("created_count", filter=Q(source="work_order")),
+    "work_orders_completed": Sum(
+        "created_count", filter=Q(source="work_order", status="completed")
+    ),
+    "work_orders_in_progress": Sum(
+        "created_count", filter=Q(source="work_order", status="in_progress")
+    ),
+}
+
+WIDGET_REQUIREMENTS = {
+    "ticket_stats": {"tickets_total", "tickets_open", "tickets_resolved"},
+    "work_order_stats": {
+        "work_orders_total",
+        "work_orders_completed",
+        "work_orders_in_progress",
+    },
+    "sla_compliance": {"tickets_total", "tickets_breached"},
+    "technician_performance": {TECHNICIAN_METRIC},
+}
+
+
+def _ticket_stats(results):
+    return {
+        "total_tickets": results["tickets_total"],
+        "open_tickets": results["tickets_open"],
+        "resolved_tickets": results["tickets_resolved"],
+    }
+
+
+def _work_order_stats(results):
+    return {
+        "total_work_orders": results["work_orders_total"],
+        "completed_work_orders": results["work_orders_completed"],
+        "in_progress_work_orders": results["work_orders_in_progress"],
+    }
+
+
+def _sla_compliance(results):
+    total_tickets = results["tickets_total"]
+    breached_tickets = results["tickets_breached"]
+    compliance_rate = (
+        ((total_tickets - breached_tickets) / total_tickets * 100)
+        if total_tickets > 0
+        else 100
+    )
+    return {
+        "total_tickets": total_tickets,
+        "breached_tickets": breached_tickets,
+        "compliance_rate": round(compliance_rate, 2),
+    }
+
+
+def _technician_performance(results):
+    return results[TECHNICIAN_METRIC]
+
+
+WIDGET_BUILDERS = {
+    "ticket_stats": _ticket_stats,
+    "work_order_stats": _work_order_stats,
+    "sla_compliance": _sla_compliance,
+    "technician_performance": _technician_performance,
+}
+
+
+def invalidate_widget_data(organization_id):
+    """Drop the cached combined widget result for an organization."""
+    cache.delete(WIDGET_CACHE_KEY.format(organization_id=organization_id))
+
+
+class WidgetDataPlanner:
+    """Resolve data for a set of widgets with a minimal number of queries."""
+
+    def __init__(self, organization, widgets):
+        self.organization = organization
+        self.widgets = list(widgets)
+
+    def required_metrics(self):
+        """Union of the metrics needed by every widget."""
+        metrics = set()
+        for widget in self.widgets:
+            metrics |= WIDGET_REQUIREMENTS.get(widget.widget_type, set())
+        return metrics
+
+    def _compute(self, metrics):
+        results = {}
+
+        fact_metrics = {
+            name: FACT_METRICS[name] for name in metrics if name in FACT_METRICS
+        }
+        if fact_metrics:
+            totals = DailyOrgMetrics.objects.filter(
+                organization=self.organization
+            ).aggregate(**fact_metrics)
+            results.update({name: value or 0 for name, value in totals.items()})
+
+        if TECHNICIAN_METRIC in metrics:
+            technicians = (
+                User.objects.filter(
+                    organization=self.organization, role__in=["agent", "admin"]
+                )
+                .annotate(
+                    tickets_resolved=Count(
+                        "assigned_tickets",
+                        filter=Q(assigned_tickets__status="resolved"),
+                    )
+                )
+                .only("id", "first_name", "last_name", "username")
+                .order_by("-tickets_resolved")[:5]
+            )
+            results[TECHNICIAN_METRIC] = [
+                {
+                    "name": tech.get_full_name(),
+                    "tickets_resolved": tech.tickets_resolved,
+                }
+                for tech in technicians
+            ]
+
+        return results
+
+    def resolve(self):
+        """Combined metric results, served from cache when it covers the plan."""
+        metrics = self.required_metrics()
+        if not metrics:
+            return {}
+
+        cache_key = WIDGET_CACHE_KEY.format(organization_id=self.organization.id)
+        cached = cache.get(cache_key) or {}
+        missing = metrics - cached.keys()
+        if missing:
+            # Recompute everything requested so cached values stay consistent
+            cached.update(self._compute(metrics | cached.keys()))
+            cache.set(cache_key, cached, WIDGET_CACHE_TTL)
+        return cached
+
+    def widget_data(self):
+        """``{widget_id: data}`` for every widget in the plan."""
+        results = self.resolve()
+        data = {}
+        for widget in self.widgets:
+            builder = WIDGET_BUILDERS.get(widget.widget_type)
+            try:
+                data[widget.id] = builder(results) if builder else {}
+            except Exception as e:
+                logger.error(f"Error getting widget data: {str(e)}")
+                data[widget.id] = {}
+        return data
@@ -5,3 +5,8 @@ class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.api"
     verbose_name = "API"
+
+    def ready(self):
+        from .list_cache import track_models
+
+        track_models()
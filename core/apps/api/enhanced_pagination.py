@@ -2,10 +2,16 @@
 Enhanced pagination with page size limits and metadata.
 """
 
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
 from django.utils import timezone
+import base64
+import json
 import uuid
 
 
@@ -86,6 +92,249 @@ class EnhancedPageNumberPagination(PageNumberPagination):
         return list(self.page)
 
 
+def estimate_count(queryset):
+    """
+    Planner estimate of ``queryset.count()`` without scanning the rows.
+    
+    Uses ``pg_class.reltuples`` for unfiltered tables and the row estimate of
+    ``EXPLAIN`` otherwise. Returns None when no estimate is available (e.g.
+    non-PostgreSQL databases or tables that were never analyzed).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            return max(row[0], 0) if row and row[0] >= 0 else None
+        
+        sql, params = queryset.order_by().query.sql_with_params()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over the queryset's ordering.
+    
+    Pages are fetched with ``WHERE (ordering) > (last row)`` instead of an
+    OFFSET, so every page costs the same index range scan however deep it
+    is. The queryset's ordering (or the view's ``ordering``) is used, with
+    the primary key appended as a tie-breaker; orderings over related,
+    nullable or non-column fields fall back to ``-created_at``/``-pk``.
+    
+    Totals are controlled with ``?count=``: ``estimate`` (default, planner
+    estimate), ``exact`` (a full COUNT) or ``none``.
+    """
+    
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    count_modes = ('estimate', 'exact', 'none')
+    default_count_mode = 'estimate'
+    invalid_cursor_message = 'Invalid cursor'
+    
+    get_page_size = EnhancedPageNumberPagination.get_page_size
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Return the page of ``queryset`` that follows the request's cursor.
+        """
+        self.request = request
+        self.model = queryset.model
+        self.limit = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+        self.count = self.get_count(request, queryset)
+        
+        cursor = self.decode_cursor(request)
+        self.reverse = bool(cursor and cursor['r'])
+        
+        queryset = queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = self.apply_cursor(queryset, cursor['v'], self.reverse)
+        if self.reverse:
+            queryset = queryset.reverse()
+        
+        rows = list(queryset[:self.limit + 1])
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        
+        self.page = rows
+        return rows
+    
+    def get_ordering(self, queryset, view):
+        """
+        Keyset ordering for ``queryset``: its (or the view's) ordering plus a
+        primary-key tie-breaker, or ``-created_at, -pk`` if that ordering
+        cannot be used as a keyset.
+        """
+        model = queryset.model
+        ordering = (
+            list(queryset.query.order_by)
+            or list(getattr(view, 'ordering', None) or [])
+            or list(model._meta.ordering)
+        )
+        
+        keyset = []
+        for item in ordering:
+            if not isinstance(item, str):
+                return self.default_ordering(model)
+            direction, name = ('-', item[1:]) if item.startswith('-') else ('', item)
+            field = model._meta.pk if name == 'pk' else self._column_field(model, name)
+            if field is None:
+                return self.default_ordering(model)
+            if field.primary_key:
+                return keyset + [f'{direction}pk']
+            keyset.append(f'{direction}{field.attname}')
+        
+        direction = '-' if keyset and keyset[-1].startswith('-') else ''
+        return keyset + [f'{direction}pk']
+    
+    def default_ordering(self, model):
+        if self._column_field(model, 'created_at') is not None:
+            return ['-created_at', '-pk']
+        return ['-pk']
+    
+    @staticmethod
+    def _column_field(model, name):
+        """The non-null local column ``name`` of ``model``, if there is one."""
+        if '__' in name or name == '?':
+            return None
+        try:
+            field = model._meta.get_field(name)
+        except Exception:
+            return None
+        if not getattr(field, 'concrete', False) or field.null or field.many_to_many:
+            return None
+        return field
+    
+    def apply_cursor(self, queryset, values, reverse):
+        """
+        Rows strictly after ``values`` in the keyset ordering (before them
+        when ``reverse``).
+        """
+        condition = Q()
+        for index, item in enumerate(self.ordering):
+            descending = item.startswith('-') != reverse
+            lookup = f"{item.lstrip('-')}__{'lt' if descending else 'gt'}"
+            clause = Q(**{lookup: values[index]})
+            for prior, value in zip(self.ordering[:index], values[:index]):
+                clause &= Q(**{prior.lstrip('-'): value})
+            condition |= clause
+        
+        # A plain range on the leading column lets the index bound the scan
+        first = self.ordering[0]
+        descending = first.startswith('-') != reverse
+        lookup = f"{first.lstrip('-')}__{'lte' if descending else 'gte'}"
+        return queryset.filter(**{lookup: values[0]}).filter(condition)
+    
+    def get_count(self, request, queryset):
+        """
+        Total for ``?count=``; ``estimate`` falls back to an exact count where
+        the database cannot estimate.
+        """
+        mode = request.query_params.get(self.count_query_param, self.default_count_mode)
+        if mode not in self.count_modes:
+            mode = self.default_count_mode
+        
+        count = None
+        if mode == 'estimate':
+            count = estimate_count(queryset)
+            if count is None:
+                mode = 'exact'
+        if mode == 'exact':
+            count = queryset.order_by().count()
+        self.count_mode = mode
+        return count
+    
+    def encode_cursor(self, row, reverse):
+        values = [getattr(row, item.lstrip('-')) for item in self.ordering]
+        # str() keeps full microsecond precision for datetimes
+        payload = json.dumps({'v': values, 'r': int(reverse)}, default=str)
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, cursor
+        )
+    
+    def decode_cursor(self, request):
+        """
+        The ``{'v': values, 'r': reverse}`` cursor of the request, or None.
+        
+        Raises:
+            NotFound: If the cursor is malformed or does not match the ordering
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            if len(cursor['v']) != len(self.ordering):
+                raise ValueError('Cursor does not match ordering')
+            values = []
+            for item, value in zip(self.ordering, cursor['v']):
+                name = item.lstrip('-')
+                meta = self.model._meta
+                field = meta.pk if name == 'pk' else meta.get_field(name)
+                values.append(field.to_python(value))
+            return {'v': values, 'r': bool(cursor.get('r'))}
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+    
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+    
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(
+                self.request.build_absolute_uri(), self.cursor_query_param
+            )
+        return self.encode_cursor(self.page[0], reverse=True)
+    
+    def get_paginated_response(self, data):
+        """
+        Return a cursor-paginated response with the standard metadata.
+        """
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+            'pagination': {
+                'type': 'cursor',
+                'page_size': self.limit,
+                'has_next': self.has_next,
+                'has_previous': self.has_previous,
+                'count_type': self.count_mode,
+                'ordering': self.ordering,
+            },
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'version': 'v1',
+                'request_id': str(uuid.uuid4()),
+            }
+        })
+
+
 class StandardizedOrderingMixin:
     """
     Mixin to provide standardized ordering across all list endpoints.
@@ -151,9 +400,30 @@ class AdvancedPaginationViewSet:
     """
     
     pagination_class = EnhancedPageNumberPagination
+    cursor_pagination_class = KeysetCursorPagination
     ordering_fields = ['created_at', 'updated_at', 'id']
     ordering = ['-created_at']
     
+    @property
+    def paginator(self):
+        """
+        Cursor paginator for ``?pagination=cursor`` (or a ``cursor``
+        parameter), otherwise ``pagination_class``.
+        """
+        if not hasattr(self, '_paginator'):
+            params = getattr(self.request, 'query_params', {})
+            cursor_class = self.cursor_pagination_class
+            if cursor_class is not None and (
+                params.get('pagination') == 'cursor'
+                or cursor_class.cursor_query_param in params
+            ):
+                self._paginator = cursor_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+    
     def get_queryset(self):
         """
         Get queryset with ordering applied.
@@ -7,11 +7,17 @@ from django.http import JsonResponse
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.response import Response
+import math
 import time
+import uuid
 import logging
-from typing import Dict, Optional, Tuple
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
 from functools import wraps
 
+from .global_error_handler import get_client_ip
+from .rate_limit_engine import Limit, RateLimitEngine, get_engine
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,12 +26,13 @@ class RateLimiter:
     Enhanced rate limiter with multiple algorithms and bulk operation support.
     """
     
-    def __init__(self):
+    def __init__(self, engine=None):
+        self._engine = engine
         self.rate_limits = {
             # Standard API endpoints
-            'api_general': {'requests': 1000, 'window': 3600},  # 1000/hour
+            'api_general': {'requests': 1000, 'window': 3600, 'algorithm': 'gcra'},  # 1000/hour
             'api_authentication': {'requests': 10, 'window': 60},  # 10/minute
-            'api_file_upload': {'requests': 100, 'window': 3600},  # 100/hour
+            'api_file_upload': {'requests': 100, 'window': 3600, 'algorithm': 'gcra'},  # 100/hour
             
             # Bulk operations (stricter limits)
             'bulk_create': {'requests': 50, 'window': 3600},  # 50/hour
@@ -37,6 +44,67 @@ class RateLimiter:
             'bulk_organization_operations': {'requests': 5, 'window': 3600},  # 5/hour
             'bulk_security_operations': {'requests': 3, 'window': 3600},  # 3/hour
         }
+        
+        # Authenticated requests also count against the organization's budget,
+        # anonymous ones against the client IP's, as multiples of the per-user
+        # limit. Authenticated users skip the IP budget: many of them can sit
+        # behind one NAT address.
+        self.scope_multipliers = {'organization': 10, 'ip': 2}
+    
+    @property
+    def engine(self) -> RateLimitEngine:
+        """Shared engine; Redis-backed when the default cache is Redis."""
+        if self._engine is None:
+            self._engine = get_engine()
+        return self._engine
+    
+    def get_limits(self, limit_type: str, route: str, user=None, ip: Optional[str] = None) -> List[Limit]:
+        """
+        Limits one request is checked against, bucketed by route template.
+        
+        Args:
+            limit_type: Type of rate limit to apply
+            route: Route key, e.g. ``GET:api/v1/tickets/<uuid:pk>/``
+            user: Authenticated user, if any
+            ip: Client IP address
+        """
+        rate_config = self.rate_limits.get(limit_type)
+        if not rate_config:
+            return []
+        
+        scopes = []
+        if user is not None and getattr(user, 'is_authenticated', False):
+            scopes.append(('user', user.pk, 1))
+            if getattr(user, 'organization_id', None):
+                scopes.append(('organization', user.organization_id, self.scope_multipliers['organization']))
+        elif ip:
+            scopes.append(('ip', ip, self.scope_multipliers['ip']))
+        
+        return [
+            Limit(
+                key=f"rate_limit:{limit_type}:{scope}:{identity}:{route}",
+                limit=rate_config['requests'] * multiplier,
+                window=rate_config['window'],
+                algorithm=rate_config.get('algorithm', 'sliding_log'),
+            )
+            for scope, identity, multiplier in scopes
+        ]
+    
+    def check_request(self, request, limit_type: str) -> Tuple[bool, Dict]:
+        """
+        Check a request against its user and organization limits (or, for
+        anonymous requests, its IP limit) in one round trip.
+        """
+        try:
+            user = getattr(request, 'user', None)
+            limits = self.get_limits(limit_type, get_route_key(request), user, get_client_ip(request))
+            if not limits:
+                return True, {'message': 'No rate limit configured'}
+            return self._result_info(self.engine.check(limits))
+        
+        except Exception as e:
+            logger.error(f"Rate limiting error: {e}")
+            return True, {'error': str(e)}
     
     def is_allowed(self, key: str, limit_type: str, user_id: Optional[str] = None) -> Tuple[bool, Dict]:
         """
@@ -56,37 +124,33 @@ class RateLimiter:
             if not rate_config:
                 return True, {'message': 'No rate limit configured'}
             
-            # Create cache key
-            cache_key = self._create_cache_key(key, limit_type, user_id)
-            
-            # Get current request count
-            current_count = cache.get(cache_key, 0)
-            
-            # Check if limit is exceeded
-            if current_count >= rate_config['requests']:
-                return False, {
-                    'limit_exceeded': True,
-                    'current_count': current_count,
-                    'limit': rate_config['requests'],
-                    'window': rate_config['window'],
-                    'reset_time': self._get_reset_time(cache_key, rate_config['window'])
-                }
-            
-            # Increment counter
-            cache.set(cache_key, current_count + 1, rate_config['window'])
-            
-            return True, {
-                'limit_exceeded': False,
-                'current_count': current_count + 1,
-                'limit': rate_config['requests'],
-                'window': rate_config['window'],
-                'remaining': rate_config['requests'] - (current_count + 1)
-            }
+            limit = Limit(
+                key=self._create_cache_key(key, limit_type, user_id),
+                limit=rate_config['requests'],
+                window=rate_config['window'],
+                algorithm=rate_config.get('algorithm', 'sliding_log'),
+            )
+            return self._result_info(self.engine.check([limit]))
             
         except Exception as e:
             logger.error(f"Rate limiting error: {e}")
             return True, {'error': str(e)}
     
+    def _result_info(self, result) -> Tuple[bool, Dict]:
+        """Rate limit info of the limit closest to running out."""
+        tightest = result.tightest
+        info = {
+            'limit_exceeded': not result.allowed,
+            'current_count': tightest.limit.limit - tightest.remaining,
+            'limit': tightest.limit.limit,
+            'window': tightest.limit.window,
+            'remaining': tightest.remaining,
+            'reset_time': (timezone.now() + timedelta(seconds=tightest.reset)).isoformat(),
+        }
+        if not result.allowed:
+            info['retry_after'] = math.ceil(result.retry_after)
+        return result.allowed, info
+    
     def _create_cache_key(self, key: str, limit_type: str, user_id: Optional[str] = None) -> str:
         """Create cache key for rate limiting."""
         if user_id:
@@ -211,30 +275,15 @@ def rate_limit(limit_type: str, user_based: bool = False):
             if user_based and hasattr(request, 'user') and request.user.is_authenticated:
                 user_id = str(request.user.id)
             
-            # Create rate limiter
-            rate_limiter = RateLimiter()
-            
-            # Check rate limit
+            # Check rate limit, one bucket per route template
             is_allowed, rate_info = rate_limiter.is_allowed(
-                f"{request.method}_{request.path}",
+                get_route_key(request),
                 limit_type,
                 user_id
             )
             
             if not is_allowed:
-                return JsonResponse({
-                    'error': {
-                        'code': 'RATE_LIMIT_EXCEEDED',
-                        'message': 'Rate limit exceeded',
-                        'details': rate_info,
-                        'timestamp': timezone.now().isoformat()
-                    },
-                    'meta': {
-                        'timestamp': timezone.now().isoformat(),
-                        'version': 'v1',
-                        'request_id': str(uuid.uuid4()),
-                    }
-                }, status=429)
+                return rate_limit_exceeded_response(rate_info)
             
             # Add rate limit headers
             response = view_func(request, *args, **kwargs)
@@ -271,11 +320,8 @@ def bulk_operation_rate_limit(operation_type: str):
             elif hasattr(request, 'data') and 'ids' in request.data:
                 item_count = len(request.data.get('ids', []))
             
-            # Create bulk rate limiter
-            bulk_limiter = BulkOperationRateLimiter()
-            
             # Validate bulk request
-            is_allowed, validation_info = bulk_limiter.validate_bulk_request(
+            is_allowed, validation_info = bulk_rate_limiter.validate_bulk_request(
                 operation_type,
                 item_count,
                 user_id
@@ -311,52 +357,40 @@ def bulk_operation_rate_limit(operation_type: str):
 class RateLimitMiddleware:
     """
     Middleware for applying rate limits to all requests.
+    
+    Limits are checked once the URL is resolved, so buckets follow the route
+    template (``/tickets/<uuid:pk>/``) rather than each concrete path.
     """
     
     def __init__(self, get_response):
         self.get_response = get_response
-        self.rate_limiter = RateLimiter()
+        self.rate_limiter = rate_limiter
     
     def __call__(self, request):
-        # Apply rate limiting based on request path
-        limit_type = self._get_limit_type(request.path)
-        
-        if limit_type:
-            user_id = None
-            if hasattr(request, 'user') and request.user.is_authenticated:
-                user_id = str(request.user.id)
-            
-            is_allowed, rate_info = self.rate_limiter.is_allowed(
-                f"{request.method}_{request.path}",
-                limit_type,
-                user_id
-            )
-            
-            if not is_allowed:
-                return JsonResponse({
-                    'error': {
-                        'code': 'RATE_LIMIT_EXCEEDED',
-                        'message': 'Rate limit exceeded',
-                        'details': rate_info,
-                        'timestamp': timezone.now().isoformat()
-                    },
-                    'meta': {
-                        'timestamp': timezone.now().isoformat(),
-                        'version': 'v1',
-                        'request_id': str(uuid.uuid4()),
-                    }
-                }, status=429)
-        
         response = self.get_response(request)
         
         # Add rate limit headers
-        if limit_type:
+        rate_info = getattr(request, '_rate_limit_info', None)
+        if rate_info and 'limit' in rate_info:
             response['X-RateLimit-Limit'] = rate_info.get('limit', 0)
             response['X-RateLimit-Remaining'] = rate_info.get('remaining', 0)
             response['X-RateLimit-Reset'] = rate_info.get('reset_time', '')
         
         return response
     
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Apply rate limiting based on request path
+        limit_type = self._get_limit_type(request.path)
+        if not limit_type:
+            return None
+        
+        is_allowed, rate_info = self.rate_limiter.check_request(request, limit_type)
+        request._rate_limit_info = rate_info
+        
+        if not is_allowed:
+            return rate_limit_exceeded_response(rate_info)
+        return None
+    
     def _get_limit_type(self, path: str) -> Optional[str]:
         """Get rate limit type based on request path."""
         if '/api/v1/users/' in path:
@@ -371,6 +405,33 @@ class RateLimitMiddleware:
             return 'api_general'
 
 
+def get_route_key(request) -> str:
+    """Method and route template of a resolved request (path if unresolved)."""
+    match = getattr(request, 'resolver_match', None)
+    route = match.route if match is not None and match.route else request.path
+    return f"{request.method}:{route}"
+
+
+def rate_limit_exceeded_response(rate_info: Dict) -> JsonResponse:
+    """429 response with Retry-After."""
+    response = JsonResponse({
+        'error': {
+            'code': 'RATE_LIMIT_EXCEEDED',
+            'message': 'Rate limit exceeded',
+            'details': rate_info,
+            'timestamp': timezone.now().isoformat()
+        },
+        'meta': {
+            'timestamp': timezone.now().isoformat(),
+            'version': 'v1',
+            'request_id': str(uuid.uuid4()),
+        }
+    }, status=429)
+    if 'retry_after' in rate_info:
+        response['Retry-After'] = str(rate_info['retry_after'])
+    return response
+
+
 # Global rate limiter instances
 rate_limiter = RateLimiter()
 bulk_rate_limiter = BulkOperationRateLimiter()
@@ -4,26 +4,44 @@ Enhanced ViewSets with comprehensive validation, security, and standardized resp
 
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.utils import timezone
 from django.core.cache import cache
 from django.core.paginator import Paginator
-from django.db.models import Q, Count, Avg, Max, Min
+from django.db.models import Q, Avg, Max, Min
 from django.contrib.auth import get_user_model
+from collections import defaultdict
+from functools import partial
 import logging
 
 from .enhanced_pagination import EnhancedPageNumberPagination, AdvancedPaginationViewSet
+from .list_cache import (
+    LIST_CACHE_TIMEOUT, bump_generation_for, etag_for, etag_matches, list_cache_key, track_model
+)
+from .fast_serializers import FastJSONRenderer
+from .prefetch_plans import apply_prefetch_plan
+from .serializers import (
+    TicketCommentSerializer, TicketSerializer, WorkOrderSerializer,
+    ticket_comment_fast_serializer, ticket_fast_serializer, work_order_fast_serializer
+)
+from .statistics import DEFAULT_DISTRIBUTIONS, compute_statistics
 from .file_upload_security import FileUploadViewMixin, get_file_upload_config
 from .standardized_responses import APIResponseMixin, error_manager
 from .enhanced_validation import EnhancedValidationMixin, validation_manager
+from apps.analytics.metrics import mark_dirty
+from apps.field_service.models import WorkOrder
 from apps.organizations.models import Organization
 from apps.tickets.models import Ticket, TicketComment
 from apps.accounts.models import User
 
 logger = logging.getLogger(__name__)
 
+# Rows per INSERT/UPDATE statement in the bulk endpoints
+BULK_BATCH_SIZE = 500
+
 
 class BaseEnhancedViewSet(APIResponseMixin, AdvancedPaginationViewSet, FileUploadViewMixin):
     """
@@ -33,6 +51,47 @@ class BaseEnhancedViewSet(APIResponseMixin, AdvancedPaginationViewSet, FileUploa
     pagination_class = EnhancedPageNumberPagination
     permission_classes = [permissions.IsAuthenticated]
     
+    # List cache: "user" scope caches per requester, "role" shares lists
+    # between users with the same role. Writes to the model or to any of
+    # list_cache_dependencies invalidate the organization's cached lists.
+    list_cache_scope = 'user'
+    list_cache_dependencies = ()
+    
+    # Lookup that scopes rows to the requester's organization
+    organization_field = 'organization'
+    list_cache_timeout = LIST_CACHE_TIMEOUT
+    
+    # Actions whose querysets get the serializer's prefetch_plan
+    prefetch_plan_actions = ('list', 'retrieve')
+    
+    # Optional FastReadSerializer wrapping serializer_class; list then reads
+    # values_list() rows instead of instances and renders with orjson
+    fast_serializer = None
+    
+    # Fields the statistics action reports per-value counts for
+    statistics_distributions = DEFAULT_DISTRIBUTIONS
+    
+    # Datetime fields whose days feed the daily metrics fact table. The bulk
+    # endpoints skip the signals that mark those days dirty, so they mark
+    # them themselves.
+    metrics_date_fields = ()
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        queryset = cls.__dict__.get('queryset')
+        if queryset is not None:
+            track_model(queryset.model)
+        for model in cls.list_cache_dependencies:
+            track_model(model)
+    
+    def get_list_cache_models(self):
+        """
+        Models whose writes invalidate this view's cached lists.
+        """
+        queryset = getattr(self, 'queryset', None)
+        model = queryset.model if queryset is not None else self.get_queryset().model
+        return [model, *self.list_cache_dependencies]
+    
     def get_queryset(self):
         """
         Get queryset with organization filtering and optimization.
@@ -41,10 +100,37 @@ class BaseEnhancedViewSet(APIResponseMixin, AdvancedPaginationViewSet, FileUploa
         
         # Apply organization filtering
         if hasattr(self.request.user, 'organization'):
-            queryset = queryset.filter(organization=self.request.user.organization)
+            queryset = queryset.filter(**{self.organization_field: self.request.user.organization})
+        
+        # Load what the serializer reads up front, not once per row
+        if self.serializer_class is not None and getattr(self, 'action', None) in self.prefetch_plan_actions:
+            queryset = apply_prefetch_plan(self.get_serializer_class(), queryset)
         
         return queryset
     
+    def get_fast_serializer(self):
+        """
+        The fast read path, if it wraps the serializer this request uses.
+        """
+        fast = self.fast_serializer
+        if fast is None or self.serializer_class is None:
+            return None
+        if fast.serializer_class is not self.get_serializer_class():
+            return None
+        return fast
+    
+    def get_renderers(self):
+        """
+        Render JSON with orjson on views that have a fast read path.
+        """
+        renderers = super().get_renderers()
+        if self.fast_serializer is None:
+            return renderers
+        return [
+            FastJSONRenderer() if type(renderer) is JSONRenderer else renderer
+            for renderer in renderers
+        ]
+    
     def perform_create(self, serializer):
         """
         Perform create with enhanced validation and organization assignment.
@@ -76,33 +162,50 @@ class BaseEnhancedViewSet(APIResponseMixin, AdvancedPaginationViewSet, FileUploa
     
     def list(self, request, *args, **kwargs):
         """
-        Enhanced list method with caching and optimization.
-        """
-        # Generate cache key
-        cache_key = f"{self.__class__.__name__}_list_{request.user.organization.id}_{request.GET.urlencode()}"
+        Enhanced list method with generation-keyed caching and ETags.
+        """
+        # Generate cache key from the current data generation and the
+        # requester's permission scope
+        cache_key = list_cache_key(
+            self.__class__.__name__,
+            self.get_list_cache_models(),
+            request.user,
+            request.GET.urlencode(),
+            scope=self.list_cache_scope,
+        )
+        etag = etag_for(cache_key)
+        
+        # Unchanged since the client's copy
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
         
         # Try to get from cache
         cached_data = cache.get(cache_key)
-        if cached_data:
-            return Response(cached_data)
+        if cached_data is not None:
+            return Response(cached_data, headers={'ETag': etag})
         
         # Get queryset with filtering
         queryset = self.get_queryset()
         queryset = self.filter_queryset(queryset)
         
+        # Read plain rows when the serializer has a fast path
+        fast = self.get_fast_serializer()
+        if fast is not None:
+            queryset = fast.get_queryset(queryset)
+        
         # Apply pagination
         page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            response_data = self.get_paginated_response(serializer.data).data
+        rows = page if page is not None else queryset
+        if fast is not None:
+            data = fast.to_representation(rows, self.get_serializer_context())
         else:
-            serializer = self.get_serializer(queryset, many=True)
-            response_data = serializer.data
+            data = self.get_serializer(rows, many=True).data
+        response_data = self.get_paginated_response(data).data if page is not None else data
         
-        # Cache response for 5 minutes
-        cache.set(cache_key, response_data, 300)
+        # Cache response until the generation changes (or the timeout)
+        cache.set(cache_key, response_data, self.list_cache_timeout)
         
-        return Response(response_data)
+        return Response(response_data, headers={'ETag': etag})
     
     def create(self, request, *args, **kwargs):
         """
@@ -226,23 +329,19 @@ class BaseEnhancedViewSet(APIResponseMixin, AdvancedPaginationViewSet, FileUploa
         Get statistics for the model.
         """
         try:
-            queryset = self.get_queryset()
-            
-            # Calculate basic statistics
-            stats = {
-                'total_count': queryset.count(),
-                'active_count': queryset.filter(is_active=True).count() if hasattr(queryset.model, 'is_active') else queryset.count(),
-                'created_today': queryset.filter(created_at__date=timezone.now().date()).count(),
-                'created_this_week': queryset.filter(created_at__week=timezone.now().isocalendar()[1]).count(),
-                'created_this_month': queryset.filter(created_at__month=timezone.now().month).count(),
-            }
-            
-            # Add model-specific statistics
-            if hasattr(queryset.model, 'status'):
-                stats['status_distribution'] = dict(queryset.values('status').annotate(count=Count('id')).values_list('status', 'count'))
-            
-            if hasattr(queryset.model, 'priority'):
-                stats['priority_distribution'] = dict(queryset.values('priority').annotate(count=Count('id')).values_list('priority', 'count'))
+            # Keyed like cached lists, plus the date the period counters
+            # are relative to
+            cache_key = list_cache_key(
+                f'{self.__class__.__name__}.statistics',
+                self.get_list_cache_models(),
+                request.user,
+                timezone.localdate().isoformat(),
+                scope=self.list_cache_scope,
+            )
+            stats = cache.get(cache_key)
+            if stats is None:
+                stats = compute_statistics(self.get_queryset(), self.statistics_distributions)
+                cache.set(cache_key, stats, self.list_cache_timeout)
             
             return self.success_response(data=stats)
             
@@ -250,37 +349,130 @@ class BaseEnhancedViewSet(APIResponseMixin, AdvancedPaginationViewSet, FileUploa
             logger.error(f"Statistics error in {self.__class__.__name__}: {e}")
             return self.internal_server_error("Failed to get statistics")
     
+    def get_bulk_model(self):
+        """
+        Model written by the bulk endpoints.
+        """
+        return self.get_list_cache_models()[0]
+    
+    def get_bulk_create_fields(self, model):
+        """
+        Fields set on every bulk-created instance (what perform_create adds).
+        """
+        fields = {}
+        field_names = {field.name for field in model._meta.concrete_fields}
+        if 'organization' in field_names:
+            fields['organization'] = self.request.user.organization
+        if 'created_by' in field_names:
+            fields['created_by'] = self.request.user
+        return fields
+    
+    def bulk_create_instances(self, instances):
+        """
+        Insert unsaved instances; override for models whose save() does more
+        than an INSERT.
+        """
+        model = self.get_bulk_model()
+        return model._base_manager.bulk_create(instances, batch_size=BULK_BATCH_SIZE)
+    
+    def _validate_many(self, data):
+        """
+        Validate a list with one list serializer.
+        
+        Returns:
+            tuple: ``([(index, validated_data), ...], [per-item errors])``
+        """
+        serializer = self.get_serializer(data=data, many=True)
+        if serializer.is_valid():
+            return list(enumerate(serializer.validated_data)), []
+        
+        errors = [
+            {'index': i, 'errors': item_errors}
+            for i, item_errors in enumerate(serializer.errors)
+            if item_errors
+        ]
+        valid_indexes = [i for i, item_errors in enumerate(serializer.errors) if not item_errors]
+        if not valid_indexes:
+            return [], errors
+        
+        # Re-validate the valid subset to get its validated data
+        serializer = self.get_serializer(data=[data[i] for i in valid_indexes], many=True)
+        serializer.is_valid(raise_exception=True)
+        return list(zip(valid_indexes, serializer.validated_data)), errors
+    
+    @staticmethod
+    def _to_pk(model, value):
+        """
+        Primary key value for a submitted ID, or None if it is malformed.
+        """
+        try:
+            return model._meta.pk.to_python(value)
+        except ValidationError:
+            return None
+    
+    def collect_metrics_dates(self, dates, instance):
+        """
+        Add the instance's metrics datetimes to ``dates`` (organization -> set).
+        """
+        for name in self.metrics_date_fields:
+            dates[instance.organization_id].add(getattr(instance, name))
+    
+    def mark_metrics_dirty(self, dates):
+        """
+        Mark the collected days dirty once the bulk write commits.
+        """
+        for organization_id, datetimes in dates.items():
+            transaction.on_commit(partial(mark_dirty, organization_id, *datetimes))
+    
+    @staticmethod
+    def _concrete_values(model, validated_data):
+        """
+        Split validated data into column values and many-to-many values.
+        """
+        many_to_many = {field.name for field in model._meta.many_to_many}
+        values = {k: v for k, v in validated_data.items() if k not in many_to_many}
+        related = {k: v for k, v in validated_data.items() if k in many_to_many}
+        return values, related
+    
     @action(detail=False, methods=['post'])
     def bulk_create(self, request):
         """
         Bulk create multiple instances.
+        
+        Items are validated with one list serializer and inserted with
+        bulk_create in batches; invalid items are reported by index and
+        skipped.
         """
         try:
             data = request.data
             if not isinstance(data, list):
                 return self.validation_error("Data must be a list of objects")
             
-            created_instances = []
-            errors = []
+            valid_items, errors = self._validate_many(data)
+            model = self.get_bulk_model()
+            extra_fields = self.get_bulk_create_fields(model)
+            
+            instances = []
+            for index, validated_data in valid_items:
+                values, related = self._concrete_values(model, validated_data)
+                if related:
+                    errors.append({
+                        'index': index,
+                        'errors': [f"Many-to-many fields are not supported in bulk create: {', '.join(related)}"]
+                    })
+                    continue
+                instances.append(model(**{**values, **extra_fields}))
             
             with transaction.atomic():
-                for i, item_data in enumerate(data):
-                    try:
-                        serializer = self.get_serializer(data=item_data)
-                        if serializer.is_valid():
-                            instance = serializer.save()
-                            self.perform_create(serializer)
-                            created_instances.append(serializer.data)
-                        else:
-                            errors.append({
-                                'index': i,
-                                'errors': serializer.errors
-                            })
-                    except Exception as e:
-                        errors.append({
-                            'index': i,
-                            'errors': [str(e)]
-                        })
+                created = self.bulk_create_instances(instances)
+                dates = defaultdict(set)
+                for instance in created:
+                    self.collect_metrics_dates(dates, instance)
+                self.mark_metrics_dirty(dates)
+                bump_generation_for(model, request.user)
+            
+            created_instances = self.get_serializer(created, many=True).data
+            errors.sort(key=lambda error: error['index'])
             
             return self.success_response(
                 data={
@@ -300,44 +492,95 @@ class BaseEnhancedViewSet(APIResponseMixin, AdvancedPaginationViewSet, FileUploa
     def bulk_update(self, request):
         """
         Bulk update multiple instances.
+        
+        Targets are loaded in one query and written with bulk_update in
+        batches, touching only the submitted fields.
         """
         try:
             data = request.data
             if not isinstance(data, list):
                 return self.validation_error("Data must be a list of objects with 'id' field")
             
-            updated_instances = []
+            model = self.get_bulk_model()
             errors = []
+            items = []
+            for i, item_data in enumerate(data):
+                if not isinstance(item_data, dict) or 'id' not in item_data:
+                    errors.append({
+                        'index': i,
+                        'errors': ['ID field is required for bulk update']
+                    })
+                    continue
+                pk = self._to_pk(model, item_data['id'])
+                if pk is None:
+                    errors.append({'index': i, 'id': item_data['id'], 'errors': ['Invalid ID']})
+                else:
+                    items.append((i, pk, item_data))
+            
+            instances = {
+                instance.pk: instance
+                for instance in self.get_queryset().prefetch_related(None).filter(
+                    pk__in=[pk for _, pk, _ in items]
+                )
+            }
+            
+            updated = []
+            fields = set()
+            dates = defaultdict(set)
+            for i, pk, item_data in items:
+                instance = instances.get(pk)
+                if instance is None:
+                    errors.append({'index': i, 'id': item_data['id'], 'errors': ['Not found']})
+                    continue
+                
+                # Validation only; the writes below are batched
+                serializer = self.get_serializer(instance, data=item_data, partial=True)
+                if not serializer.is_valid():
+                    errors.append({
+                        'index': i,
+                        'id': item_data['id'],
+                        'errors': serializer.errors
+                    })
+                    continue
+                
+                values, related = self._concrete_values(model, serializer.validated_data)
+                if related:
+                    errors.append({
+                        'index': i,
+                        'id': item_data['id'],
+                        'errors': [f"Many-to-many fields are not supported in bulk update: {', '.join(related)}"]
+                    })
+                    continue
+                # Both the old and the new days change
+                self.collect_metrics_dates(dates, instance)
+                for field, value in values.items():
+                    setattr(instance, field, value)
+                self.collect_metrics_dates(dates, instance)
+                fields.update(values)
+                updated.append(instance)
+            
+            # bulk_update() bypasses save(), so set what perform_update and
+            # auto_now fields would have
+            stamped = {}
+            for field in model._meta.concrete_fields:
+                if field.name == 'updated_by':
+                    stamped['updated_by'] = request.user
+                elif getattr(field, 'auto_now', False):
+                    stamped[field.name] = timezone.now()
+            if updated:
+                fields.update(stamped)
+                for instance in updated:
+                    for name, value in stamped.items():
+                        setattr(instance, name, value)
             
             with transaction.atomic():
-                for i, item_data in enumerate(data):
-                    try:
-                        if 'id' not in item_data:
-                            errors.append({
-                                'index': i,
-                                'errors': ['ID field is required for bulk update']
-                            })
-                            continue
-                        
-                        instance = self.get_queryset().get(id=item_data['id'])
-                        serializer = self.get_serializer(instance, data=item_data, partial=True)
-                        
-                        if serializer.is_valid():
-                            serializer.save()
-                            self.perform_update(serializer)
-                            updated_instances.append(serializer.data)
-                        else:
-                            errors.append({
-                                'index': i,
-                                'id': item_data['id'],
-                                'errors': serializer.errors
-                            })
-                    except Exception as e:
-                        errors.append({
-                            'index': i,
-                            'id': item_data.get('id'),
-                            'errors': [str(e)]
-                        })
+                if updated and fields:
+                    model._base_manager.bulk_update(updated, sorted(fields), batch_size=BULK_BATCH_SIZE)
+                self.mark_metrics_dirty(dates)
+                bump_generation_for(model, request.user)
+            
+            updated_instances = self.get_serializer(updated, many=True).data
+            errors.sort(key=lambda error: error['index'])
             
             return self.success_response(
                 data={
@@ -357,32 +600,48 @@ class BaseEnhancedViewSet(APIResponseMixin, AdvancedPaginationViewSet, FileUploa
     def bulk_delete(self, request):
         """
         Bulk delete multiple instances.
+        
+        Permitted IDs are resolved in one query and removed with a single
+        UPDATE (soft delete) or DELETE.
         """
         try:
             ids = request.data.get('ids', [])
             if not isinstance(ids, list):
                 return self.validation_error("IDs must be a list")
             
-            deleted_count = 0
+            model = self.get_bulk_model()
+            pks = [self._to_pk(model, id_value) for id_value in ids]
+            instances = {
+                instance.pk: instance
+                for instance in self.get_queryset().prefetch_related(None).filter(
+                    pk__in=[pk for pk in pks if pk is not None]
+                )
+            }
+            
+            permitted = []
             errors = []
+            dates = defaultdict(set)
+            for id_value, pk in zip(ids, pks):
+                instance = instances.get(pk)
+                if pk is None:
+                    errors.append({'id': id_value, 'error': 'Invalid ID'})
+                elif instance is None:
+                    errors.append({'id': id_value, 'error': 'Not found'})
+                elif not self._can_delete(instance):
+                    errors.append({'id': id_value, 'error': 'Permission denied'})
+                else:
+                    permitted.append(instance.pk)
+                    self.collect_metrics_dates(dates, instance)
             
             with transaction.atomic():
-                for id_value in ids:
-                    try:
-                        instance = self.get_queryset().get(id=id_value)
-                        if self._can_delete(instance):
-                            self.perform_destroy(instance)
-                            deleted_count += 1
-                        else:
-                            errors.append({
-                                'id': id_value,
-                                'error': 'Permission denied'
-                            })
-                    except Exception as e:
-                        errors.append({
-                            'id': id_value,
-                            'error': str(e)
-                        })
+                targets = model._base_manager.filter(pk__in=permitted)
+                if hasattr(model, 'is_active'):
+                    deleted_count = targets.update(is_active=False)
+                else:
+                    targets.delete()
+                    deleted_count = len(permitted)
+                self.mark_metrics_dirty(dates)
+                bump_generation_for(model, request.user)
             
             return self.success_response(
                 data={
@@ -404,7 +663,17 @@ class EnhancedTicketViewSet(BaseEnhancedViewSet):
     """
     
     queryset = Ticket.objects.all()
-    serializer_class = None  # Will be set in the actual implementation
+    serializer_class = TicketSerializer
+    fast_serializer = ticket_fast_serializer
+    # Lists include customer and agent names
+    list_cache_dependencies = (TicketComment, User)
+    metrics_date_fields = ('created_at', 'resolved_at')
+    
+    def bulk_create_instances(self, instances):
+        """
+        Insert tickets with their numbers and outbox events in bulk.
+        """
+        return Ticket.bulk_create_with_events(instances, batch_size=BULK_BATCH_SIZE)
     
     def get_queryset(self):
         """
@@ -518,6 +787,51 @@ class EnhancedTicketViewSet(BaseEnhancedViewSet):
             return self.internal_server_error("Failed to add comment")
 
 
+class EnhancedTicketCommentViewSet(BaseEnhancedViewSet):
+    """
+    Enhanced Ticket Comment ViewSet; lists use the fast read path.
+    """
+    
+    queryset = TicketComment.objects.all()
+    serializer_class = TicketCommentSerializer
+    fast_serializer = ticket_comment_fast_serializer
+    list_cache_dependencies = (User,)
+    organization_field = 'ticket__organization'
+    
+    def get_queryset(self):
+        """
+        Get comments on the organization's tickets; customers see only the
+        public comments on their own tickets.
+        """
+        queryset = super().get_queryset()
+        if self.request.user.role == 'customer':
+            queryset = queryset.filter(ticket__customer=self.request.user, comment_type='public')
+        return queryset
+
+
+class EnhancedWorkOrderViewSet(BaseEnhancedViewSet):
+    """
+    Enhanced Work Order ViewSet; lists use the fast read path.
+    """
+    
+    # The tenant manager would scope to the organization set at import time;
+    # get_queryset scopes to the requester's instead
+    queryset = WorkOrder._base_manager.all()
+    serializer_class = WorkOrderSerializer
+    fast_serializer = work_order_fast_serializer
+    list_cache_dependencies = (User,)
+    metrics_date_fields = ('created_at', 'actual_end')
+    
+    def get_queryset(self):
+        """
+        Get work orders; customers see only their own.
+        """
+        queryset = super().get_queryset()
+        if self.request.user.role == 'customer':
+            queryset = queryset.filter(customer=self.request.user)
+        return queryset
+
+
 class EnhancedUserViewSet(BaseEnhancedViewSet):
     """
     Enhanced User ViewSet with comprehensive validation and features.
@@ -525,6 +839,7 @@ class EnhancedUserViewSet(BaseEnhancedViewSet):
     
     queryset = User.objects.all()
     serializer_class = None  # Will be set in the actual implementation
+    list_cache_scope = 'role'
     
     def get_queryset(self):
         """
@@ -576,6 +891,7 @@ class EnhancedOrganizationViewSet(BaseEnhancedViewSet):
     
     queryset = Organization.objects.all()
     serializer_class = None  # Will be set in the actual implementation
+    list_cache_scope = 'role'
     
     def get_queryset(self):
         """
@@ -0,0 +1,297 @@
+"""
+Read-only fast path for high-volume list and export endpoints.
+
+``FastReadSerializer`` is compiled once from an existing ``ModelSerializer``.
+It produces the same output as that serializer, but reads
+``values_list()`` rows instead of model instances:
+
+    ticket_fast_serializer = FastReadSerializer(TicketSerializer)
+
+    rows = ticket_fast_serializer.get_queryset(queryset)
+    data = ticket_fast_serializer.to_representation(rows)
+
+Compiling maps each readable field to a precomputed getter:
+
+- columns, including forward foreign-key paths such as
+  ``customer.email``;
+- annotations from the serializer's ``prefetch_plan``;
+- model properties and ``SerializerMethodField`` methods, which are
+  called with the row in place of the instance.
+
+The per-row work is then a loop over getters. It skips model
+instantiation and DRF's per-field attribute resolution.
+
+``FastJSONRenderer`` encodes responses with orjson and returns the same
+bytes as ``JSONRenderer`` does, except for floats:
+
+- outside roughly ``1e-4 <= abs(x) < 1e16`` the two pick different
+  notations for the same value (``1e16`` vs ``1e+16``, ``1e-7`` vs
+  ``1e-07``, ``0.000025`` vs ``2.5e-05``), which JSON parsers read alike;
+- NaN and infinity are written as ``null``, where ``JSONRenderer`` (with
+  ``STRICT_JSON``) raises ``ValueError``.
+"""
+
+import orjson
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import models
+from django.utils.functional import cached_property
+from rest_framework import serializers
+from rest_framework.fields import empty
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.renderers import JSONRenderer
+
+_SKIP = object()
+
+# DRF field / model field pairs whose to_representation is the identity on
+# the values the database returns
+_IDENTITY_FIELDS = (
+    (serializers.CharField, (models.CharField, models.TextField)),
+    (serializers.BooleanField, (models.BooleanField,)),
+    (serializers.IntegerField, (models.IntegerField,)),
+    (serializers.JSONField, (models.JSONField,)),
+)
+
+
+class FastReadSerializer:
+    """Row-based, read-only twin of a ``ModelSerializer``."""
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def plan(self):
+        """``(columns, specs)`` compiled from the serializer's fields."""
+        serializer = self.serializer_class()
+        model = serializer.Meta.model
+        prefetch_plan = getattr(self.serializer_class, "prefetch_plan", None)
+        annotations = set(prefetch_plan.annotations) if prefetch_plan else set()
+
+        # Every local column, so properties and methods can read the row
+        # like an instance; "pk" for cursor pagination
+        columns = [field.attname for field in model._meta.concrete_fields]
+        columns += ["pk", *sorted(annotations)]
+        positions = {name: index for index, name in enumerate(columns)}
+
+        def position(lookup):
+            if lookup not in positions:
+                positions[lookup] = len(columns)
+                columns.append(lookup)
+            return positions[lookup]
+
+        specs = []
+        for field in serializer._readable_fields:
+            spec = self._compile_field(field, model, annotations, position)
+            if spec is not None:
+                specs.append((field.field_name, spec))
+        return columns, specs
+
+    def _compile_field(self, field, model, annotations, position):
+        if isinstance(field, serializers.SerializerMethodField):
+            return ("method", field.method_name)
+        if isinstance(field, serializers.ModelField):
+            return ("instance", field.to_representation)
+        if field.source == "*" or isinstance(field, serializers.BaseSerializer):
+            raise self._unsupported(field, "nested serializers are not supported")
+
+        resolved = self._resolve(field, model, annotations)
+        if resolved[0] == "missing":
+            # Same outcome as the AttributeError DRF would hit per row
+            if field.default is not empty:
+                return ("const", self._convert(field, field.get_default()))
+            if field.allow_null:
+                return ("const", None)
+            if not field.required:
+                return None
+            raise self._unsupported(field, "its source does not exist")
+        if resolved[0] == "property":
+            return ("property", resolved[1], self._missing(field), field)
+
+        _, lookup, guards, model_field = resolved
+        convert = self._converter(field, model_field)
+        guards = tuple(position(guard) for guard in guards)
+        return ("column", position(lookup), guards, self._missing(field), convert)
+
+    def _resolve(self, field, model, annotations):
+        attrs = field.source_attrs
+        prefix = ""
+        guards = []
+        for index, attr in enumerate(attrs):
+            last = index == len(attrs) - 1
+            if attr == "pk":
+                attr = model._meta.pk.name
+            if index == 0 and last and attr in annotations:
+                return ("column", attr, guards, None)
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                model_field = None
+
+            if model_field is None or not model_field.concrete:
+                if not hasattr(model, attr):
+                    return ("missing",)
+                if index == 0 and last and isinstance(getattr(model, attr), property):
+                    return ("property", getattr(model, attr).fget)
+                raise self._unsupported(field, f"{attr} is not a column")
+
+            if last:
+                if model_field.is_relation:
+                    if not isinstance(field, PrimaryKeyRelatedField):
+                        raise self._unsupported(
+                            field, "relations are only readable as primary keys"
+                        )
+                    lookup = model_field.attname if not prefix else prefix + attr
+                    return ("column", lookup, guards, None)
+                return ("column", prefix + attr, guards, model_field)
+
+            if not (model_field.many_to_one or model_field.one_to_one):
+                raise self._unsupported(field, f"{attr} is not a forward relation")
+            guards.append(model_field.attname if not prefix else prefix + attr)
+            prefix += f"{attr}__"
+            model = model_field.related_model
+        raise self._unsupported(field, "empty source")
+
+    @staticmethod
+    def _converter(field, model_field):
+        if isinstance(field, PrimaryKeyRelatedField):
+            if field.pk_field is not None:
+                return field.pk_field.to_representation
+            return None
+        for serializer_field, model_fields in _IDENTITY_FIELDS:
+            if type(field) is serializer_field and isinstance(
+                model_field, model_fields
+            ):
+                if not getattr(field, "binary", False):
+                    return None
+        return field.to_representation
+
+    @staticmethod
+    def _convert(field, value):
+        return None if value is None else field.to_representation(value)
+
+    @staticmethod
+    def _missing(field):
+        """Value for a row whose source is unreachable (e.g. a null FK)."""
+        if field.default is not empty:
+            return lambda: FastReadSerializer._convert(field, field.get_default())
+        if field.allow_null:
+            return lambda: None
+        if not field.required:
+            return lambda: _SKIP
+
+        def fail():
+            raise AttributeError(
+                f"Got no value for field `{field.field_name}` on serializer "
+                f"`{field.parent.__class__.__name__}`."
+            )
+
+        return fail
+
+    def _unsupported(self, field, reason):
+        return ImproperlyConfigured(
+            f"{self.serializer_class.__name__}.{field.field_name} cannot be read "
+            f"from rows: {reason}."
+        )
+
+    def get_queryset(self, queryset):
+        """``queryset`` as named rows carrying every column the fields read."""
+        columns, _ = self.plan
+        prefetch_plan = getattr(self.serializer_class, "prefetch_plan", None)
+        if prefetch_plan is not None:
+            queryset = prefetch_plan.apply(queryset)
+        return queryset.prefetch_related(None).values_list(*columns, named=True)
+
+    def to_representation(self, rows, context=None):
+        """Serialize rows from ``get_queryset`` to a list of dicts."""
+        rows = list(rows)
+        _, specs = self.plan
+        serializer = self.serializer_class(context=context or {})
+        prepare = getattr(serializer, "prepare_instances", None)
+        if prepare is not None:
+            prepare(rows)
+        getters = [(name, self._bind(spec, serializer)) for name, spec in specs]
+
+        data = []
+        for row in rows:
+            item = {}
+            for name, getter in getters:
+                value = getter(row)
+                if value is not _SKIP:
+                    item[name] = value
+            data.append(item)
+        return data
+
+    def serialize(self, queryset, context=None):
+        """Fetch and serialize ``queryset`` in one go."""
+        return self.to_representation(self.get_queryset(queryset), context)
+
+    @staticmethod
+    def _bind(spec, serializer):
+        kind = spec[0]
+        if kind == "const":
+            value = spec[1]
+            return lambda row: value
+        if kind == "method":
+            return getattr(serializer, spec[1])
+        if kind == "instance":
+            return spec[1]
+        if kind == "property":
+            _, fget, missing, field = spec
+
+            def get_property(row):
+                try:
+                    value = fget(row)
+                except AttributeError:
+                    return missing()
+                return None if value is None else field.to_representation(value)
+
+            return get_property
+
+        _, index, guards, missing, convert = spec
+        if guards:
+
+            def get_related(row):
+                for guard in guards:
+                    if row[guard] is None:
+                        return missing()
+                value = row[index]
+                if value is None or convert is None:
+                    return value
+                return convert(value)
+
+            return get_related
+        if convert is None:
+            return lambda row: row[index]
+        return lambda row: None if row[index] is None else convert(row[index])
+
+
+_encoder = JSONRenderer.encoder_class()
+_ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+def dumps(data):
+    """
+    orjson encoding matching ``JSONRenderer``'s compact, unicode output.
+
+    Datetimes and other non-JSON types go through DRF's encoder, so they are
+    formatted exactly as before. Floats may differ in notation; see the
+    module docstring.
+    """
+    content = orjson.dumps(data, default=_encoder.default, option=_ORJSON_OPTIONS)
+    # JSONRenderer escapes these to keep the output a JavaScript subset
+    if b"\xe2\x80\xa8" in content or b"\xe2\x80\xa9" in content:
+        content = content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+    return content
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` that encodes compact responses with orjson."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
@@ -17,6 +17,10 @@ import psutil
 import requests
 import time
 
+from apps.accounts.activity_log import get_writer
+
+from .service_client import client_stats
+
 logger = logging.getLogger(__name__)
 
 
@@ -101,12 +105,16 @@ def detailed_health_check(request):
         # External services health
         external_health = check_external_services_health()
         
+        # Activity log writer health
+        activity_log_health = check_activity_log_health()
+        
         # Overall health assessment
         overall_health = assess_overall_health({
             'database': db_health,
             'cache': cache_health,
             'system': system_health,
-            'external': external_health
+            'external': external_health,
+            'activity_log': activity_log_health
         })
         
         response_data = {
@@ -118,7 +126,8 @@ def detailed_health_check(request):
                 'database': db_health,
                 'cache': cache_health,
                 'system': system_health,
-                'external': external_health
+                'external': external_health,
+                'activity_log': activity_log_health
             },
             'metrics': {
                 'response_time': time.time(),
@@ -313,9 +322,24 @@ def check_external_services_health():
                 'response_time': 0
             }
     
+    # Latency percentiles and circuit state of this process's shared clients
+    results['clients'] = client_stats()
+    
     return results
 
 
+def check_activity_log_health():
+    """Check queue depth and backpressure of this process's activity log writer"""
+    stats = get_writer().stats()
+    
+    # A queue past half its bound means flushes are falling behind
+    status_value = 'healthy'
+    if stats['saturation'] >= 0.5 or stats['dropped']:
+        status_value = 'degraded'
+    
+    return {'status': status_value, **stats}
+
+
 def assess_overall_health(health_data):
     """Assess overall system health based on individual service health"""
     unhealthy_services = []
@@ -0,0 +1,166 @@
+"""
+Invalidation-aware cache for list responses.
+
+Each (model, organization) pair has a generation counter in the cache. Every
+write to a tracked model bumps the counter via post_save/post_delete, on
+commit. List responses are cached under a key built from:
+
+- the generations of the view's model and its dependencies,
+- the requester's permission scope,
+- the query string.
+
+A write therefore invalidates every cached list for that organization
+without deleting anything; stale entries simply stop being addressed and
+expire.
+
+The ETag of a list is a hash of the same key. A client whose
+``If-None-Match`` matches gets a 304 after one generation read, with no
+query and no serialization.
+"""
+
+import hashlib
+import logging
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "list_generation:{label}:{organization_id}"
+LIST_CACHE_TIMEOUT = 60 * 60
+DEFAULT_TRACKED_MODELS = (
+    "tickets.Ticket",
+    "tickets.TicketComment",
+    "accounts.User",
+    "organizations.Organization",
+)
+
+
+def _organization_id(model, instance=None, user=None):
+    """Tenant of a model's rows; None for models that are not tenant-scoped."""
+    try:
+        model._meta.get_field("organization")
+    except Exception:
+        return None
+    if instance is not None:
+        return instance.organization_id
+    return getattr(user, "organization_id", None)
+
+
+def _generation_key(model, organization_id):
+    return GENERATION_KEY.format(
+        label=model._meta.label_lower, organization_id=organization_id or "all"
+    )
+
+
+def get_generations(models, user):
+    """Current generation of each model for the user's organization."""
+    keys = [
+        _generation_key(model, _organization_id(model, user=user)) for model in models
+    ]
+    values = cache.get_many(keys)
+    for key in keys:
+        if key not in values:
+            cache.add(key, _initial_generation(), None)
+            values[key] = cache.get(key)
+    return [values[key] for key in keys]
+
+
+def _initial_generation():
+    # Clock-based, so a counter recreated after eviction never repeats a
+    # generation that older cache entries were stored under
+    return time.time_ns()
+
+
+def bump_generation(model, organization_id):
+    """
+    Invalidate cached lists of ``model`` for an organization once the
+    current transaction commits. Call this after writes that bypass model
+    signals (``QuerySet.update``, ``bulk_create``, raw SQL).
+    """
+    key = _generation_key(model, organization_id)
+
+    def bump():
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _initial_generation(), None)
+
+    transaction.on_commit(bump)
+
+
+def bump_generation_for(model, user):
+    """``bump_generation`` for the organization ``user`` lists ``model`` in."""
+    bump_generation(model, _organization_id(model, user=user))
+
+
+def _bump_for_instance(sender, instance, **kwargs):
+    bump_generation(sender, _organization_id(sender, instance=instance))
+
+
+def track_model(model):
+    """Bump ``model``'s generation on every save and delete."""
+    uid = f"list_cache:{model._meta.label_lower}"
+    post_save.connect(_bump_for_instance, sender=model, dispatch_uid=uid)
+    post_delete.connect(_bump_for_instance, sender=model, dispatch_uid=uid)
+
+
+def track_models(labels=None):
+    """Track ``settings.LIST_CACHE_MODELS`` (or ``labels``)."""
+    if labels is None:
+        labels = getattr(settings, "LIST_CACHE_MODELS", DEFAULT_TRACKED_MODELS)
+    for label in labels:
+        try:
+            track_model(apps.get_model(label))
+        except LookupError:
+            logger.warning(f"List cache model {label} is not installed")
+
+
+def permission_scope(user, scope="user"):
+    """
+    The part of a user that determines which rows a list shows.
+
+    ``"user"`` keys lists per user (safe for querysets filtered on the
+    requester); ``"role"`` shares them between users with the same role and
+    staff flags.
+    """
+    if scope == "role":
+        return (
+            f"role:{getattr(user, 'role', '')}:"
+            f"{int(user.is_staff)}{int(user.is_superuser)}"
+        )
+    return f"user:{user.pk}"
+
+
+def list_cache_key(view_name, models, user, query_string, scope="user"):
+    """Cache key (also the ETag source) of one list response."""
+    generations = get_generations(models, user)
+    raw = "|".join(
+        [
+            view_name,
+            str(getattr(user, "organization_id", None)),
+            ".".join(str(generation) for generation in generations),
+            permission_scope(user, scope),
+            query_string,
+        ]
+    )
+    return f"list_cache:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+def etag_for(cache_key):
+    return f'"{cache_key.rsplit(":", 1)[-1]}"'
+
+
+def etag_matches(request, etag):
+    """Whether the request's If-None-Match covers ``etag``."""
+    header = request.META.get("HTTP_IF_NONE_MATCH", "")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
@@ -0,0 +1,117 @@
+"""
+Management command to load test the rate limiting engine.
+"""
+
+import statistics
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.api.rate_limit_engine import (
+    ALGORITHMS,
+    Limit,
+    MemoryBackend,
+    RateLimitEngine,
+    default_backend,
+)
+
+
+class Command(BaseCommand):
+    """Benchmark rate limiter command."""
+
+    help = (
+        "Measure checks/sec and latency of each rate limiting algorithm, "
+        "with and without local admission, on concurrent threads"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="Concurrent callers (default: 8)",
+        )
+        parser.add_argument(
+            "--checks",
+            type=int,
+            default=2000,
+            help="Checks per thread (default: 2000)",
+        )
+        parser.add_argument(
+            "--callers",
+            type=int,
+            default=50,
+            help="Distinct users spread over the threads (default: 50)",
+        )
+        parser.add_argument(
+            "--memory",
+            action="store_true",
+            help="Use the in-process backend instead of the default cache's Redis",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        if min(options["threads"], options["checks"], options["callers"]) < 1:
+            raise CommandError("--threads, --checks and --callers must be positive")
+        backend = MemoryBackend() if options["memory"] else default_backend()
+        self.stdout.write(f"Backend: {type(backend).__name__}")
+        self.stdout.write(
+            f"{'algorithm':>14} {'local':>6} {'checks/s':>10} {'p50 ms':>8} "
+            f"{'p99 ms':>8} {'denied':>7} {'local hits':>11}"
+        )
+
+        for algorithm in ALGORITHMS:
+            for local_threshold in (0, 0.5):
+                engine = RateLimitEngine(backend, local_threshold=local_threshold)
+                self._run(engine, algorithm, options)
+
+        self.stdout.write(self.style.SUCCESS("Rate limiter benchmark complete"))
+
+    def _run(self, engine, algorithm, options):
+        # Fresh keys per run so earlier runs don't eat the budget
+        run = uuid.uuid4().hex[:8]
+        organization = Limit(f"rate_limit:bench:{run}:org", 10**7, 3600, algorithm)
+        callers = [
+            [
+                Limit(f"rate_limit:bench:{run}:user:{index}", 10**5, 3600, algorithm),
+                organization,
+            ]
+            for index in range(options["callers"])
+        ]
+        latencies, denied, local = [], [0], [0]
+        lock = threading.Lock()
+
+        def worker(offset):
+            timings = []
+            rejected = hits = 0
+            for index in range(options["checks"]):
+                limits = callers[(offset + index) % len(callers)]
+                started = time.perf_counter()
+                result = engine.check(limits)
+                timings.append(time.perf_counter() - started)
+                rejected += not result.allowed
+                hits += result.local
+            with lock:
+                latencies.extend(timings)
+                denied[0] += rejected
+                local[0] += hits
+
+        threads = [
+            threading.Thread(target=worker, args=(offset,))
+            for offset in range(options["threads"])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        cuts = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"{algorithm:>14} {'yes' if engine.local_threshold else 'no':>6} "
+            f"{len(latencies) / elapsed:>10,.0f} {cuts[49] * 1000:>8.3f} "
+            f"{cuts[98] * 1000:>8.3f} {denied[0]:>7} {local[0]:>11}"
+        )
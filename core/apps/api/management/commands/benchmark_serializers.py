@@ -0,0 +1,178 @@
+"""
+Management command to benchmark list serialization throughput.
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.accounts.models import User
+from apps.api.fast_serializers import FastJSONRenderer
+from apps.api.prefetch_plans import apply_prefetch_plan
+from apps.api.serializers import (
+    TicketCommentSerializer,
+    TicketSerializer,
+    WorkOrderSerializer,
+    ticket_comment_fast_serializer,
+    ticket_fast_serializer,
+    work_order_fast_serializer,
+)
+from apps.field_service.models import WorkOrder
+from apps.organizations.models import Organization
+from apps.tickets.models import Ticket, TicketComment
+
+
+class Rollback(Exception):
+    """Discards the benchmark data."""
+
+
+class Command(BaseCommand):
+    """Benchmark serializers command."""
+
+    help = (
+        "Compare rows/sec of the DRF serializers and their fast read paths "
+        "on generated data (rolled back afterwards)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=str,
+            default="100,1000,10000",
+            help="Comma-separated page sizes (default: 100,1000,10000)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Runs per measurement; the best is reported (default: 3)",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        try:
+            sizes = [int(size) for size in options["sizes"].split(",")]
+        except ValueError:
+            raise CommandError("--sizes must be comma-separated integers")
+        self.repeat = max(1, options["repeat"])
+
+        try:
+            with transaction.atomic():
+                querysets = self._create_data(max(sizes))
+                self.stdout.write(
+                    f"{'serializer':>24} {'rows':>7} {'drf rows/s':>12} "
+                    f"{'fast rows/s':>12} {'speedup':>8}"
+                )
+                for serializer_class, fast, queryset in querysets:
+                    for size in sizes:
+                        self._compare(serializer_class, fast, queryset, size)
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("Serializer benchmark complete"))
+
+    def _create_data(self, count):
+        organization = Organization.objects.create(name="Serializer benchmark")
+        customer = User.objects.create_user(
+            email="serializer-benchmark@example.com",
+            password=None,
+            organization=organization,
+            role="customer",
+            first_name="Bench",
+            last_name="Customer",
+        )
+        now = timezone.now()
+
+        tickets = Ticket.objects.bulk_create(
+            [
+                Ticket(
+                    organization=organization,
+                    customer=customer,
+                    ticket_number=f"BENCH-{index:07d}",
+                    subject=f"Benchmark ticket {index}",
+                    description="Generated for the serializer benchmark",
+                    tags=["benchmark"],
+                    custom_fields={"index": index},
+                )
+                for index in range(count)
+            ],
+            batch_size=1000,
+        )
+        TicketComment.objects.bulk_create(
+            [
+                TicketComment(
+                    ticket=tickets[index % len(tickets)],
+                    author=customer,
+                    content="Benchmark comment",
+                )
+                for index in range(count)
+            ],
+            batch_size=1000,
+        )
+        WorkOrder.objects.bulk_create(
+            [
+                WorkOrder(
+                    organization=organization,
+                    customer=customer,
+                    work_order_number=f"BENCH-{index:07d}",
+                    title=f"Benchmark work order {index}",
+                    description="Generated for the serializer benchmark",
+                    actual_start=now,
+                    actual_end=now + timedelta(minutes=index % 120),
+                )
+                for index in range(count)
+            ],
+            batch_size=1000,
+        )
+
+        return [
+            (
+                TicketSerializer,
+                ticket_fast_serializer,
+                Ticket._base_manager.filter(organization=organization).order_by("pk"),
+            ),
+            (
+                TicketCommentSerializer,
+                ticket_comment_fast_serializer,
+                TicketComment.objects.filter(
+                    ticket__organization=organization
+                ).order_by("pk"),
+            ),
+            (
+                WorkOrderSerializer,
+                work_order_fast_serializer,
+                WorkOrder._base_manager.filter(organization=organization).order_by(
+                    "pk"
+                ),
+            ),
+        ]
+
+    def _compare(self, serializer_class, fast, queryset, size):
+        def drf():
+            page = apply_prefetch_plan(serializer_class, queryset)[:size]
+            return JSONRenderer().render(serializer_class(page, many=True).data)
+
+        def fast_path():
+            rows = fast.get_queryset(queryset)[:size]
+            return FastJSONRenderer().render(fast.to_representation(rows))
+
+        drf_seconds = self._best(drf)
+        fast_seconds = self._best(fast_path)
+        self.stdout.write(
+            f"{serializer_class.__name__:>24} {size:>7} "
+            f"{size / drf_seconds:>12,.0f} {size / fast_seconds:>12,.0f} "
+            f"{drf_seconds / fast_seconds:>7.1f}x"
+        )
+
+    def _best(self, func):
+        timings = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
@@ -0,0 +1,67 @@
+"""
+Serializer-declared query plans.
+
+A serializer that reads relations declares what it needs once, as a
+``prefetch_plan``:
+
+    class TicketSerializer(serializers.ModelSerializer):
+        prefetch_plan = PrefetchPlan(
+            select_related=("customer",),
+            annotations={"comments_count": Count("comments", distinct=True)},
+        )
+
+Viewsets apply the plan of their serializer to every queryset they list, so
+a page costs the same number of queries whatever its size. Values that
+cannot be expressed as joins or annotations are loaded for a whole page at
+once by ``PlannedListSerializer`` through the child's ``prepare_instances``.
+"""
+
+from rest_framework import serializers
+
+
+class PrefetchPlan:
+    """The joins, prefetches and annotations a serializer's fields read."""
+
+    def __init__(self, select_related=(), prefetch_related=(), annotations=None):
+        self.select_related = tuple(select_related)
+        self.prefetch_related = tuple(prefetch_related)
+        self.annotations = dict(annotations or {})
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        # Views may already annotate the same name (e.g. for ordering)
+        annotations = {
+            name: expression
+            for name, expression in self.annotations.items()
+            if name not in queryset.query.annotations
+        }
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        return queryset
+
+
+def apply_prefetch_plan(serializer_class, queryset):
+    """Apply ``serializer_class.prefetch_plan`` to ``queryset`` if it has one."""
+    plan = getattr(serializer_class, "prefetch_plan", None)
+    if plan is None or queryset is None:
+        return queryset
+    return plan.apply(queryset)
+
+
+class PlannedListSerializer(serializers.ListSerializer):
+    """
+    List serializer that lets the child batch-load page-wide data.
+
+    Before any row is serialized, ``child.prepare_instances(instances)`` is
+    called once with the whole page.
+    """
+
+    def to_representation(self, data):
+        instances = list(data.all() if hasattr(data, "all") else data)
+        prepare = getattr(self.child, "prepare_instances", None)
+        if prepare is not None:
+            prepare(instances)
+        return super().to_representation(instances)
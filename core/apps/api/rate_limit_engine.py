@@ -0,0 +1,372 @@
+"""
+Atomic multi-limit rate limiting.
+
+A check covers several limits at once, typically the user's and the
+organization's (or the client IP's, for anonymous callers). The check is
+all-or-nothing: a request denied by one limit consumes none of the
+others.
+
+Three algorithms are supported per limit:
+
+- ``sliding_log``: a sorted set of request times within the window. Exact,
+  with memory proportional to the limit.
+- ``gcra``: the generic cell rate algorithm (a token bucket stored as one
+  "theoretical arrival time"). Smooth, with O(1) memory; bursts of up to
+  ``limit`` requests are allowed.
+- ``fixed_window``: one counter whose TTL is set once, when the window
+  opens. Cheapest, but allows up to twice the limit across a window
+  boundary.
+
+With Redis, every check is one ``EVALSHA`` of ``CHECK_SCRIPT``: one round
+trip however many limits apply. The script reads the Redis clock, so app
+servers with skewed clocks agree. Without Redis, a lock-protected
+in-process backend runs the same algorithms, which suits tests and
+single-process development.
+
+A caller far below all of its limits gets a small local allowance of
+requests admitted in-process, without a round trip. The requests
+admitted locally are charged to Redis on that caller's next check.
+"""
+
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+
+ALGORITHMS = ("sliding_log", "gcra", "fixed_window")
+
+# KEYS[i]: bucket of limit i
+# ARGV[1]: call id; then per limit: algorithm, limit, window (ms), cost, debt
+# ``debt`` is requests already admitted locally; it is recorded even when
+# the check is denied. Returns {allowed, then remaining, reset, retry (ms)
+# per limit}.
+CHECK_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local allowed = 1
+local state = {}
+
+for i, key in ipairs(KEYS) do
+    local base = 1 + (i - 1) * 5
+    local algorithm = ARGV[base + 1]
+    local limit = tonumber(ARGV[base + 2])
+    local window = tonumber(ARGV[base + 3])
+    local wanted = tonumber(ARGV[base + 4]) + tonumber(ARGV[base + 5])
+    local s = {algorithm = algorithm, limit = limit, window = window,
+               debt = tonumber(ARGV[base + 5])}
+
+    if algorithm == 'gcra' then
+        s.interval = window / limit
+        s.tat = math.max(tonumber(redis.call('GET', key)) or now, now)
+        local allow_at = s.tat + wanted * s.interval - window
+        s.ok = allow_at <= now
+        s.retry = math.max(math.ceil(allow_at - now), 0)
+    elseif algorithm == 'fixed_window' then
+        s.used = tonumber(redis.call('GET', key)) or 0
+        s.ok = s.used + wanted <= limit
+        local ttl = redis.call('PTTL', key)
+        s.retry = ttl > 0 and ttl or window
+    else
+        redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+        s.used = redis.call('ZCARD', key)
+        s.ok = s.used + wanted <= limit
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        s.retry = oldest[2] and math.max(tonumber(oldest[2]) + window - now, 0) or 0
+    end
+
+    if not s.ok then allowed = 0 end
+    state[i] = s
+end
+
+local result = {allowed}
+for i, key in ipairs(KEYS) do
+    local s = state[i]
+    local base = 1 + (i - 1) * 5
+    local amount = s.debt
+    if allowed == 1 then amount = amount + tonumber(ARGV[base + 4]) end
+    local remaining, reset
+
+    if s.algorithm == 'gcra' then
+        local tat = s.tat + amount * s.interval
+        if amount > 0 then
+            redis.call('SET', key, string.format('%.3f', tat),
+                       'PX', math.max(math.ceil(tat - now), 1))
+        end
+        remaining = s.limit - math.ceil((tat - now) / s.interval)
+        reset = math.ceil(tat - now)
+    elseif s.algorithm == 'fixed_window' then
+        local used = s.used
+        if amount > 0 then
+            used = redis.call('INCRBY', key, amount)
+            if redis.call('PTTL', key) < 0 then
+                redis.call('PEXPIRE', key, s.window)
+            end
+        end
+        remaining = s.limit - used
+        reset = redis.call('PTTL', key)
+        if reset < 0 then reset = s.window end
+    else
+        if amount > 0 then
+            local members = {}
+            for j = 1, amount do
+                members[#members + 1] = now
+                members[#members + 1] = ARGV[1] .. ':' .. i .. ':' .. j
+            end
+            redis.call('ZADD', key, unpack(members))
+            redis.call('PEXPIRE', key, s.window)
+        end
+        remaining = s.limit - s.used - amount
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        reset = oldest[2] and math.max(tonumber(oldest[2]) + s.window - now, 0) or 0
+    end
+
+    result[#result + 1] = math.max(remaining, 0)
+    result[#result + 1] = reset
+    result[#result + 1] = s.ok and 0 or s.retry
+end
+return result
+"""
+
+
+@dataclass(frozen=True)
+class Limit:
+    """``limit`` requests per ``window`` seconds in the bucket ``key``."""
+
+    key: str
+    limit: int
+    window: int
+    algorithm: str = "sliding_log"
+
+    def __post_init__(self):
+        if self.algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown rate limit algorithm: {self.algorithm}")
+        if self.limit < 1 or self.window <= 0:
+            raise ValueError("Rate limits need a positive limit and window")
+
+
+@dataclass
+class LimitStatus:
+    """State of one limit after a check; times in seconds."""
+
+    limit: Limit
+    remaining: int
+    reset: float
+    retry_after: float
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of checking a request against all its limits."""
+
+    allowed: bool
+    statuses: list
+    local: bool = False
+
+    @property
+    def tightest(self):
+        """The limit closest to running out."""
+        return min(self.statuses, key=lambda status: status.remaining)
+
+    @property
+    def retry_after(self):
+        return max((status.retry_after for status in self.statuses), default=0)
+
+
+class MemoryBackend:
+    """In-process backend with the same algorithms as ``CHECK_SCRIPT``."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}
+
+    def check(self, limits, cost, debt):
+        now = time.time() * 1000
+        with self.lock:
+            state = [self._inspect(limit, cost + debt, now) for limit in limits]
+            allowed = all(ok for ok, _ in state)
+            statuses = []
+            for limit, (ok, retry) in zip(limits, state):
+                amount = debt + (cost if allowed else 0)
+                remaining, reset = self._commit(limit, amount, now)
+                statuses.append(
+                    LimitStatus(
+                        limit,
+                        max(remaining, 0),
+                        reset / 1000,
+                        0 if ok else retry / 1000,
+                    )
+                )
+        return RateLimitResult(allowed, statuses)
+
+    def _inspect(self, limit, wanted, now):
+        window = limit.window * 1000
+        bucket = self.buckets.get(limit.key)
+        if limit.algorithm == "gcra":
+            interval = window / limit.limit
+            tat = max(bucket or now, now)
+            allow_at = tat + wanted * interval - window
+            return allow_at <= now, max(math.ceil(allow_at - now), 0)
+        if limit.algorithm == "fixed_window":
+            if bucket is None or bucket[1] <= now:
+                return wanted <= limit.limit, window
+            return bucket[0] + wanted <= limit.limit, bucket[1] - now
+        times = [at for at in bucket or [] if at > now - window]
+        self.buckets[limit.key] = times
+        retry = max(times[0] + window - now, 0) if times else 0
+        return len(times) + wanted <= limit.limit, retry
+
+    def _commit(self, limit, amount, now):
+        window = limit.window * 1000
+        bucket = self.buckets.get(limit.key)
+        if limit.algorithm == "gcra":
+            interval = window / limit.limit
+            tat = max(bucket or now, now) + amount * interval
+            if amount:
+                self.buckets[limit.key] = tat
+            return limit.limit - math.ceil((tat - now) / interval), tat - now
+        if limit.algorithm == "fixed_window":
+            if bucket is None or bucket[1] <= now:
+                bucket = [0, now + window]
+            bucket[0] += amount
+            if amount:
+                self.buckets[limit.key] = bucket
+            return limit.limit - bucket[0], bucket[1] - now
+        times = bucket
+        times.extend([now] * amount)
+        reset = max(times[0] + window - now, 0) if times else 0
+        return limit.limit - len(times), reset
+
+
+class RedisBackend:
+    """Runs ``CHECK_SCRIPT``: one round trip per check."""
+
+    def __init__(self, client):
+        self.script = client.register_script(CHECK_SCRIPT)
+
+    def check(self, limits, cost, debt):
+        args = [uuid.uuid4().hex]
+        for limit in limits:
+            args += [limit.algorithm, limit.limit, limit.window * 1000, cost, debt]
+        reply = self.script(keys=[limit.key for limit in limits], args=args)
+
+        statuses = [
+            LimitStatus(limit, int(remaining), reset / 1000, retry / 1000)
+            for limit, remaining, reset, retry in zip(
+                limits, reply[1::3], reply[2::3], reply[3::3]
+            )
+        ]
+        return RateLimitResult(bool(reply[0]), statuses)
+
+
+class _Allowance:
+    __slots__ = ("remaining", "pending", "expires", "result")
+
+    def __init__(self, remaining, expires, result):
+        self.remaining = remaining
+        self.pending = 0
+        self.expires = expires
+        self.result = result
+
+
+class RateLimitEngine:
+    """
+    Checks requests against sets of limits.
+
+    Args:
+        backend: ``RedisBackend`` or ``MemoryBackend``.
+        local_threshold: fraction of every limit that must remain before a
+            caller gets a local allowance (0 disables local admission).
+        local_share: fraction of the remaining requests admitted locally.
+        local_horizon: seconds a local allowance stays valid.
+    """
+
+    def __init__(
+        self,
+        backend,
+        local_threshold=0.5,
+        local_share=0.05,
+        local_horizon=1.0,
+        max_local_entries=10000,
+    ):
+        self.backend = backend
+        self.local_threshold = local_threshold
+        self.local_share = local_share
+        self.local_horizon = local_horizon
+        self.max_local_entries = max_local_entries
+        self.lock = threading.Lock()
+        self.allowances = OrderedDict()
+
+    def check(self, limits, cost=1):
+        """Admit (and count) a request of ``cost`` against every limit."""
+        limits = list(limits)
+        if not limits:
+            return RateLimitResult(True, [])
+        bucket = tuple(limit.key for limit in limits)
+        now = time.monotonic()
+
+        with self.lock:
+            allowance = self.allowances.pop(bucket, None)
+            if allowance is not None and allowance.expires > now:
+                if allowance.remaining >= cost:
+                    allowance.remaining -= cost
+                    allowance.pending += cost
+                    self.allowances[bucket] = allowance
+                    return self._local_result(allowance)
+        debt = allowance.pending if allowance is not None else 0
+
+        result = self.backend.check(limits, cost, debt)
+        if result.allowed and self.local_threshold:
+            self._grant(bucket, result, now)
+        return result
+
+    def _grant(self, bucket, result, now):
+        if any(
+            status.remaining < status.limit.limit * self.local_threshold
+            for status in result.statuses
+        ):
+            return
+        budget = int(result.tightest.remaining * self.local_share)
+        if budget < 1:
+            return
+        with self.lock:
+            self.allowances[bucket] = _Allowance(
+                budget, now + self.local_horizon, result
+            )
+            while len(self.allowances) > self.max_local_entries:
+                self.allowances.popitem(last=False)
+
+    @staticmethod
+    def _local_result(allowance):
+        statuses = [
+            LimitStatus(
+                status.limit,
+                max(status.remaining - allowance.pending, 0),
+                status.reset,
+                0,
+            )
+            for status in allowance.result.statuses
+        ]
+        return RateLimitResult(True, statuses, local=True)
+
+
+def default_backend():
+    """Redis behind the default cache if available, else in-process."""
+    try:
+        from django_redis import get_redis_connection
+
+        return RedisBackend(get_redis_connection("default"))
+    except Exception:
+        return MemoryBackend()
+
+
+_engine = None
+
+
+def get_engine():
+    """Process-wide engine on the default backend."""
+    global _engine
+    if _engine is None:
+        _engine = RateLimitEngine(default_backend())
+    return _engine
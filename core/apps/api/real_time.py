@@ -4,16 +4,70 @@ Real-time integration service for microservices communication.
 
 import asyncio
 import json
-import aiohttp
 import logging
-from django.conf import settings
-
-# Configure logging
-logger = logging.getLogger(__name__)
+from django.urls import re_path
 from django.utils import timezone
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from .models import IntegrationLog, APIService
+from .service_client import get_client
+from .realtime_deltas import (
+    Subscriptions,
+    catch_up_message,
+    current_sequence,
+    entity_attributes,
+    publish_delta,
+    topic_group,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+LOCATION_FANOUT_INTERVAL = 1.0  # seconds
+
+
+class LocationBroadcaster:
+    """
+    Coalesce technician location pings into one message per group per window.
+
+    Every ping within ``interval`` seconds is merged (latest position per
+    technician wins) and sent to the group as a single ``location_batch``
+    message, instead of one channel-layer message per ping.
+    """
+
+    def __init__(self, interval=LOCATION_FANOUT_INTERVAL):
+        self.interval = interval
+        self.pending = {}
+        self.channel_layer = None
+        self._task = None
+
+    def add(self, channel_layer, group, technician_id, location):
+        """Queue a location; it is sent with the next batch for ``group``."""
+        self.channel_layer = channel_layer
+        self.pending.setdefault(group, {})[str(technician_id)] = location
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._send_batches())
+
+    async def _send_batches(self):
+        while self.pending:
+            await asyncio.sleep(self.interval)
+            pending, self.pending = self.pending, {}
+            for group, locations in pending.items():
+                try:
+                    await self.channel_layer.group_send(
+                        group,
+                        {
+                            "type": "location_batch",
+                            "locations": list(locations.values()),
+                            "timestamp": timezone.now().isoformat(),
+                        },
+                    )
+                except Exception as e:
+                    logger.error(f"Error broadcasting location batch: {e}")
+
+
+# Shared by all consumers in this process
+location_broadcaster = LocationBroadcaster()
 
 
 class RealTimeConsumer(AsyncWebsocketConsumer):
@@ -23,6 +77,8 @@ class RealTimeConsumer(AsyncWebsocketConsumer):
         """Accept WebSocket connection."""
         self.room_name = self.scope["url_route"]["kwargs"]["room_name"]
         self.room_group_name = f"room_{self.room_name}"
+        self.subscriptions = Subscriptions()
+        self.delta_group = None
 
         # Join room group
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
@@ -43,6 +99,8 @@ class RealTimeConsumer(AsyncWebsocketConsumer):
     async def disconnect(self, close_code):
         """Leave room group."""
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+        if self.delta_group:
+            await self.channel_layer.group_discard(self.delta_group, self.channel_name)
 
     async def receive(self, text_data):
         """Receive message from WebSocket."""
@@ -60,6 +118,12 @@ class RealTimeConsumer(AsyncWebsocketConsumer):
                 await self.handle_location_update(data)
             elif message_type == "notification":
                 await self.handle_notification(data)
+            elif message_type == "subscribe":
+                await self.handle_subscribe(data)
+            elif message_type == "unsubscribe":
+                await self.handle_unsubscribe(data)
+            elif message_type == "catch_up":
+                await self.handle_catch_up(data)
 
         except json.JSONDecodeError:
             await self.send(
@@ -111,14 +175,18 @@ class RealTimeConsumer(AsyncWebsocketConsumer):
         latitude = data.get("latitude")
         longitude = data.get("longitude")
 
-        # Update technician location in database
-        await self.update_technician_location(technician_id, latitude, longitude)
+        # Record the live position; the database is updated in batches
+        if not await self.update_technician_location(
+            technician_id, latitude, longitude
+        ):
+            return
 
-        # Broadcast location update to admin dashboard
-        await self.channel_layer.group_send(
+        # Broadcast to admin dashboard with the next coalesced batch
+        location_broadcaster.add(
+            self.channel_layer,
             "admin_dashboard",
+            technician_id,
             {
-                "type": "location_update",
                 "technician_id": technician_id,
                 "latitude": latitude,
                 "longitude": longitude,
@@ -126,6 +194,74 @@ class RealTimeConsumer(AsyncWebsocketConsumer):
             },
         )
 
+    def _organization_id(self):
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            return None
+        return getattr(user, "organization_id", None)
+
+    async def send_error(self, message):
+        await self.send(text_data=json.dumps({"type": "error", "message": message}))
+
+    async def handle_subscribe(self, data):
+        """Subscribe to deltas for a ticket or a named filter (queue view)."""
+        organization_id = self._organization_id()
+        if organization_id is None:
+            await self.send_error("Authentication required for subscriptions")
+            return
+
+        try:
+            if "ticket_id" in data:
+                self.subscriptions.add_id(data["ticket_id"])
+            else:
+                self.subscriptions.add_filter(data["filter"], data.get("criteria"))
+        except (KeyError, ValueError) as e:
+            await self.send_error(f"Invalid subscription: {e}")
+            return
+
+        if self.delta_group is None:
+            self.delta_group = topic_group(organization_id, "tickets")
+            await self.channel_layer.group_add(self.delta_group, self.channel_name)
+
+        # Clients catch up from this sequence after reconnecting
+        seq = await database_sync_to_async(current_sequence)(organization_id)
+        await self.send(
+            text_data=json.dumps(
+                {
+                    "type": "subscribed",
+                    "ticket_id": data.get("ticket_id"),
+                    "filter": data.get("filter"),
+                    "seq": seq,
+                }
+            )
+        )
+
+    async def handle_unsubscribe(self, data):
+        """Drop a ticket or named filter subscription."""
+        self.subscriptions.remove(data.get("ticket_id"), data.get("filter"))
+        if not self.subscriptions and self.delta_group:
+            await self.channel_layer.group_discard(self.delta_group, self.channel_name)
+            self.delta_group = None
+
+    async def handle_catch_up(self, data):
+        """Replay subscribed deltas missed since sequence ``since``."""
+        organization_id = self._organization_id()
+        if organization_id is None:
+            await self.send_error("Authentication required for catch-up")
+            return
+
+        try:
+            since = int(data.get("since", 0))
+        except (TypeError, ValueError):
+            await self.send_error("Invalid catch-up sequence")
+            return
+
+        await self.send(
+            text_data=await database_sync_to_async(catch_up_message)(
+                organization_id, since, self.subscriptions
+            )
+        )
+
     async def handle_notification(self, data):
         """Handle notification broadcast."""
         notification_type = data.get("notification_type")
@@ -181,6 +317,29 @@ class RealTimeConsumer(AsyncWebsocketConsumer):
             )
         )
 
+    async def location_batch(self, event):
+        """Send a batch of location updates to WebSocket."""
+        await self.send(
+            text_data=json.dumps(
+                {
+                    "type": "location_batch",
+                    "locations": event["locations"],
+                    "timestamp": event["timestamp"],
+                }
+            )
+        )
+
+    async def realtime_delta(self, event):
+        """Forward a pre-serialised delta if this socket subscribed to it."""
+        if self.subscriptions.wants(event["id"], event["attributes"]):
+            await self.send(text_data=event["text"])
+
+    async def realtime_batch(self, event):
+        """Send a batch of pre-serialised real-time events to WebSocket."""
+        await self.send(
+            text_data='{"type": "batch", "events": [' + ",".join(event["events"]) + "]}"
+        )
+
     async def notification(self, event):
         """Send notification to WebSocket."""
         await self.send(
@@ -224,57 +383,68 @@ class RealTimeConsumer(AsyncWebsocketConsumer):
 
     @database_sync_to_async
     def update_technician_location(self, technician_id, latitude, longitude):
-        """Update technician location in database."""
+        """Record technician location in the live location store."""
         try:
-            from apps.field_service.models import Technician
+            from apps.field_service.locations import (
+                record_location,
+                technician_organization,
+            )
 
-            technician = Technician.objects.get(id=technician_id)
-            technician.current_location = f"POINT({longitude} {latitude})"
-            technician.save()
+            organization_id = technician_organization(technician_id)
+            if organization_id is None:
+                logger.warning(
+                    f"Location update for unknown technician {technician_id}"
+                )
+                return False
+            record_location(organization_id, technician_id, latitude, longitude)
+            return True
         except Exception as e:
             logger.error(f"Error updating technician location: {e}")
+            return False
 
 
 class MicroserviceIntegration:
     """Integration class for microservices communication."""
 
-    def __init__(self):
-        self.ai_service_url = getattr(
-            settings, "AI_SERVICE_URL", "http://ai-service:8001"
-        )
-        self.realtime_service_url = getattr(
-            settings, "REALTIME_SERVICE_URL", "http://realtime-service:8002"
-        )
-
     async def send_to_ai_service(self, endpoint, data):
         """Send request to AI service."""
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(
-                    f"{self.ai_service_url}/{endpoint}", json=data
-                ) as response:
-                    return await response.json()
-            except Exception as e:
-                logger.error(f"Error communicating with AI service: {e}")
-                return None
+        try:
+            return await get_client("ai").apost(endpoint, data)
+        except Exception as e:
+            logger.error(f"Error communicating with AI service: {e}")
+            return None
 
     async def send_to_realtime_service(self, endpoint, data):
         """Send request to real-time service."""
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(
-                    f"{self.realtime_service_url}/{endpoint}", json=data
-                ) as response:
-                    return await response.json()
-            except Exception as e:
-                logger.error(f"Error communicating with real-time service: {e}")
-                return None
+        try:
+            # Broadcasts are not safe to repeat, so no retries or hedging
+            return await get_client("realtime").apost(endpoint, data, idempotent=False)
+        except Exception as e:
+            logger.error(f"Error communicating with real-time service: {e}")
+            return None
 
     async def categorize_ticket(self, subject, description):
         """Categorize ticket using AI service."""
         data = {"subject": subject, "description": description}
         return await self.send_to_ai_service("categorize", data)
 
+    async def categorize_tickets(self, tickets):
+        """
+        Categorize many ``(subject, description)`` pairs through the AI
+        service's batch endpoint; returns results in order, with ``None``
+        for items that failed.
+        """
+        items = [
+            {"task": "categorize", "subject": subject, "description": description}
+            for subject, description in tickets
+        ]
+        try:
+            results = await get_client("ai").apost_many("batch", items)
+        except Exception as e:
+            logger.error(f"Error communicating with AI service: {e}")
+            return [None] * len(items)
+        return [None if "error" in result else result for result in results]
+
     async def analyze_sentiment(self, text):
         """Analyze sentiment using AI service."""
         data = {"text": text}
@@ -315,12 +485,24 @@ async def handle_ticket_update(ticket_id, status, message):
 
     try:
         ticket = await database_sync_to_async(Ticket.objects.get)(id=ticket_id)
+        previous_attributes = entity_attributes(ticket)
         ticket.status = status
         await database_sync_to_async(ticket.save)()
     except Exception as e:
         logger.error(f"Error updating ticket: {e}")
         return
 
+    # Delta for sockets subscribed to this ticket or to a queue view it
+    # entered or left
+    await database_sync_to_async(publish_delta)(
+        ticket.organization_id,
+        "ticket",
+        ticket_id,
+        {"status": status, "message": message},
+        attributes=entity_attributes(ticket),
+        previous_attributes=previous_attributes,
+    )
+
     # Broadcast update to real-time clients
     await microservice_integration.broadcast_update(
         "ticket_update", {"ticket_id": ticket_id, "status": status, "message": message}
@@ -351,15 +533,19 @@ async def handle_work_order_update(work_order_id, status, message):
 
 async def handle_technician_location_update(technician_id, latitude, longitude):
     """Handle technician location update."""
-    # Update location in database
-    from apps.field_service.models import Technician
+    # Record the live position; the database is updated in batches
+    from apps.field_service.locations import record_location, technician_organization
 
     try:
-        technician = await database_sync_to_async(Technician.objects.get)(
-            id=technician_id
+        organization_id = await database_sync_to_async(technician_organization)(
+            technician_id
+        )
+        if organization_id is None:
+            logger.warning(f"Location update for unknown technician {technician_id}")
+            return
+        await database_sync_to_async(record_location)(
+            organization_id, technician_id, latitude, longitude
         )
-        technician.current_location = f"POINT({longitude} {latitude})"
-        await database_sync_to_async(technician.save)()
     except Exception as e:
         logger.error(f"Error updating technician location: {e}")
         return
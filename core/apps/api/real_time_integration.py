@@ -3,19 +3,103 @@ Comprehensive real-time integration system for all features.
 """
 
 import asyncio
+import itertools
 import json
 import logging
+import random
+import threading
+import time
+from collections import Counter, deque
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
-import aiohttp
 import redis
 
+from .service_client import get_client
+from .realtime_deltas import (
+    FILTER_FIELDS,
+    entity_attributes,
+    filter_attributes,
+    publish_delta,
+    topic_group,
+)
+
 logger = logging.getLogger(__name__)
 
+BATCH_WINDOW = 0.1  # seconds
+LOG_BUFFER_SIZE = 1000
+LOG_SAMPLE_RATE = 0.01
+
+
+class BroadcastBatcher:
+    """
+    Collect real-time events per group and send them in batches.
+
+    Events arrive already serialised, and every ``window`` seconds each group
+    with pending events receives a single ``realtime.batch`` message. An
+    event queued with a coalesce key replaces an earlier pending event with
+    the same key in that group. With a window of 0, events are sent
+    immediately.
+    """
+
+    def __init__(self, channel_layer, window=BATCH_WINDOW):
+        self.channel_layer = channel_layer
+        self.window = window
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._sequence = itertools.count()
+
+    def add(self, groups, text, coalesce_key=None):
+        """Queue serialised event ``text`` for each group in ``groups``."""
+        key = next(self._sequence) if coalesce_key is None else coalesce_key
+        with self._lock:
+            for group in groups:
+                events = self._pending.setdefault(group, {})
+                # Re-insert so a coalesced event keeps its latest position
+                events.pop(key, None)
+                events[key] = text
+            if self.window and self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="realtime-broadcast", daemon=True
+                )
+                self._thread.start()
+
+        if not self.window:
+            self.flush()
+
+    def flush(self):
+        """Send all pending events now; returns the number of messages sent."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        if self.channel_layer is None:
+            return 0
+
+        sent = 0
+        for group, events in pending.items():
+            try:
+                async_to_sync(self.channel_layer.group_send)(
+                    group, {"type": "realtime.batch", "events": list(events.values())}
+                )
+                sent += 1
+            except Exception as e:
+                logger.error(f"Error sending real-time batch to {group}: {e}")
+        return sent
+
+    def _run(self):
+        while True:
+            time.sleep(self.window)
+            self.flush()
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+
 
 class RealTimeIntegration:
     """Comprehensive real-time integration system."""
@@ -27,6 +111,18 @@ class RealTimeIntegration:
             port=getattr(settings, "REDIS_PORT", 6379),
             db=getattr(settings, "REDIS_DB", 0),
         )
+        self.batcher = BroadcastBatcher(
+            self.channel_layer, getattr(settings, "REALTIME_BATCH_WINDOW", BATCH_WINDOW)
+        )
+        self.log_sample_rate = getattr(
+            settings, "REALTIME_LOG_SAMPLE_RATE", LOG_SAMPLE_RATE
+        )
+
+        # In-process monitoring: counters plus ring buffers of sampled entries
+        self.update_counts = Counter()
+        self.recent_updates = deque(maxlen=LOG_BUFFER_SIZE)
+        self.recent_connections = deque(maxlen=LOG_BUFFER_SIZE)
+
         self.websocket_channels = {
             "tickets": "ticket_updates",
             "work_orders": "work_order_updates",
@@ -43,72 +139,94 @@ class RealTimeIntegration:
         organization_id: Optional[int] = None,
         user_id: Optional[int] = None,
         feature: Optional[str] = None,
+        coalesce_key: Optional[str] = None,
+        broadcast: bool = False,
     ):
-        """Send real-time update to connected clients."""
+        """
+        Queue a real-time update for connected clients.
+
+        The update goes to the organization's topic group for ``feature`` and
+        to the user's group. It reaches every client only with
+        ``broadcast=True``. Pending updates that share a ``coalesce_key`` are
+        collapsed to the latest one.
+        """
         try:
-            message = {
-                "type": "websocket.message",
-                "event_type": event_type,
-                "payload": payload,
-                "timestamp": timezone.now().isoformat(),
-                "feature": feature,
-            }
-
-            # Determine target channels
-            channels = self._get_target_channels(organization_id, user_id, feature)
+            # Serialised once, however many groups and clients receive it
+            text = json.dumps(
+                {
+                    "event_type": event_type,
+                    "payload": payload,
+                    "timestamp": timezone.now().isoformat(),
+                    "feature": feature,
+                },
+                cls=DjangoJSONEncoder,
+            )
 
-            # Send to all target channels
-            for channel in channels:
-                async_to_sync(self.channel_layer.group_send)(channel, message)
+            channels = self._get_target_channels(
+                organization_id, user_id, feature, broadcast
+            )
+            if channels:
+                self.batcher.add(
+                    channels,
+                    text,
+                    coalesce_key=(event_type, coalesce_key) if coalesce_key else None,
+                )
 
-            # Log the update
-            self._log_realtime_update(event_type, payload, organization_id, user_id)
+            self._log_realtime_update(event_type, len(text), organization_id, user_id)
 
         except Exception as e:
             logger.error(f"Error sending real-time update: {e}")
 
+    def topic_group(self, organization_id, topic: str) -> str:
+        """Group of clients in an organization subscribed to ``topic``."""
+        return topic_group(organization_id, topic)
+
     def _get_target_channels(
         self,
         organization_id: Optional[int],
         user_id: Optional[int],
         feature: Optional[str],
+        broadcast: bool = False,
     ) -> List[str]:
         """Get target channels for real-time updates."""
         channels = []
 
         if organization_id:
-            channels.append(f"org_{organization_id}")
+            if feature:
+                channels.append(self.topic_group(organization_id, feature))
+            else:
+                channels.append(f"org_{organization_id}")
 
         if user_id:
             channels.append(f"user_{user_id}")
 
-        if feature:
-            channels.append(f"feature_{feature}")
-
-        # Always include broadcast channel for system-wide updates
-        channels.append("broadcast")
+        # System-wide updates only when explicitly requested
+        if broadcast:
+            channels.append("broadcast")
 
         return channels
 
     def _log_realtime_update(
         self,
         event_type: str,
-        payload: Dict[str, Any],
+        payload_size: int,
         organization_id: Optional[int],
         user_id: Optional[int],
     ):
-        """Log real-time update for monitoring."""
-        log_data = {
-            "event_type": event_type,
-            "organization_id": organization_id,
-            "user_id": user_id,
-            "timestamp": timezone.now().isoformat(),
-            "payload_size": len(json.dumps(payload)),
-        }
+        """Count every update and keep a sample in memory for monitoring."""
+        self.update_counts[event_type] += 1
+        if random.random() >= self.log_sample_rate:
+            return
 
-        # Store in Redis for monitoring
-        self.redis_client.lpush("realtime_logs", json.dumps(log_data))
-        self.redis_client.ltrim("realtime_logs", 0, 1000)  # Keep last 1000 logs
+        self.recent_updates.appendleft(
+            {
+                "event_type": event_type,
+                "organization_id": organization_id,
+                "user_id": user_id,
+                "timestamp": timezone.now().isoformat(),
+                "payload_size": payload_size,
+            }
+        )
 
     # Feature-specific real-time updates
 
@@ -119,22 +237,37 @@ class RealTimeIntegration:
         data: Dict[str, Any],
         organization_id: int,
         user_id: Optional[int] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+        previous_attributes: Optional[Dict[str, Any]] = None,
     ):
-        """Send ticket update in real-time."""
-        payload = {
-            "ticket_id": ticket_id,
-            "action": action,
-            "data": data,
-            "user_id": user_id,
-        }
-
-        self.send_realtime_update(
-            event_type="ticket_update",
-            payload=payload,
-            organization_id=organization_id,
-            user_id=user_id,
-            feature="tickets",
-        )
+        """
+        Publish a ticket delta to clients subscribed to the ticket.
+
+        ``data`` holds the changed fields. ``attributes`` are the ticket's
+        filterable fields after the change (read from the ticket if not
+        given) and ``previous_attributes`` those before it; sockets receive
+        the delta if they subscribed to the ticket or to a filter matching
+        either, so views the ticket leaves are notified too.
+        """
+        try:
+            if attributes is None:
+                from apps.tickets.models import Ticket
+
+                ticket = (
+                    Ticket.objects.filter(pk=ticket_id).only(*FILTER_FIELDS).first()
+                )
+                attributes = entity_attributes(ticket) if ticket else data
+            publish_delta(
+                organization_id,
+                "ticket",
+                ticket_id,
+                {"action": action, "user_id": user_id, **data},
+                attributes=filter_attributes(attributes),
+                previous_attributes=filter_attributes(previous_attributes or {}),
+            )
+            self.update_counts["ticket_update"] += 1
+        except Exception as e:
+            logger.error(f"Error sending ticket update: {e}")
 
     def send_work_order_update(
         self,
@@ -175,6 +308,7 @@ class RealTimeIntegration:
             payload=payload,
             organization_id=organization_id,
             feature="technicians",
+            coalesce_key=str(technician_id),
         )
 
     def send_notification(
@@ -219,6 +353,8 @@ class RealTimeIntegration:
             payload=payload,
             organization_id=organization_id,
             feature="system",
+            coalesce_key="system",
+            broadcast=organization_id is None,
         )
 
     def send_feature_status_update(
@@ -241,12 +377,20 @@ class RealTimeIntegration:
             payload=payload,
             organization_id=organization_id,
             feature="features",
+            coalesce_key=feature_name,
+            broadcast=organization_id is None,
         )
 
     # WebSocket connection management
 
-    def connect_user(self, user_id: int, organization_id: int, websocket_channel: str):
-        """Connect user to real-time updates."""
+    def connect_user(
+        self,
+        user_id: int,
+        organization_id: int,
+        websocket_channel: str,
+        topics: Optional[List[str]] = None,
+    ):
+        """Connect user to real-time updates (all topics unless given)."""
         try:
             # Add user to organization channel
             async_to_sync(self.channel_layer.group_add)(
@@ -258,6 +402,8 @@ class RealTimeIntegration:
                 f"user_{user_id}", websocket_channel
             )
 
+            self.subscribe(websocket_channel, organization_id, topics)
+
             # Log connection
             self._log_connection(user_id, organization_id, "connected")
 
@@ -279,45 +425,63 @@ class RealTimeIntegration:
                 f"user_{user_id}", websocket_channel
             )
 
+            self.unsubscribe(websocket_channel, organization_id)
+
             # Log disconnection
             self._log_connection(user_id, organization_id, "disconnected")
 
         except Exception as e:
             logger.error(f"Error disconnecting user {user_id}: {e}")
 
+    def subscribe(
+        self,
+        websocket_channel: str,
+        organization_id: int,
+        topics: Optional[List[str]] = None,
+    ):
+        """Subscribe a connection to organization topics (default: all)."""
+        for topic in topics or self.websocket_channels:
+            async_to_sync(self.channel_layer.group_add)(
+                self.topic_group(organization_id, topic), websocket_channel
+            )
+
+    def unsubscribe(
+        self,
+        websocket_channel: str,
+        organization_id: int,
+        topics: Optional[List[str]] = None,
+    ):
+        """Unsubscribe a connection from organization topics (default: all)."""
+        for topic in topics or self.websocket_channels:
+            async_to_sync(self.channel_layer.group_discard)(
+                self.topic_group(organization_id, topic), websocket_channel
+            )
+
     def _log_connection(self, user_id: int, organization_id: int, action: str):
         """Log user connection/disconnection."""
-        log_data = {
-            "user_id": user_id,
-            "organization_id": organization_id,
-            "action": action,
-            "timestamp": timezone.now().isoformat(),
-        }
-
-        self.redis_client.lpush("connection_logs", json.dumps(log_data))
-        self.redis_client.ltrim("connection_logs", 0, 1000)
+        self.recent_connections.appendleft(
+            {
+                "user_id": user_id,
+                "organization_id": organization_id,
+                "action": action,
+                "timestamp": timezone.now().isoformat(),
+            }
+        )
 
     # Integration with external services
 
     async def sync_with_ai_service(self, event_type: str, data: Dict[str, Any]):
         """Sync with AI service for real-time processing."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "http://ai-service:8001/realtime/process",
-                    json={
-                        "event_type": event_type,
-                        "data": data,
-                        "timestamp": timezone.now().isoformat(),
-                    },
-                    timeout=5,
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result
-                    else:
-                        logger.error(f"AI service error: {response.status}")
-                        return None
+            return await get_client("ai").apost(
+                "realtime/process",
+                {
+                    "event_type": event_type,
+                    "data": data,
+                    "timestamp": timezone.now().isoformat(),
+                },
+                idempotent=False,
+            )
         except Exception as e:
             logger.error(f"Error syncing with AI service: {e}")
             return None
@@ -325,22 +489,15 @@ class RealTimeIntegration:
     async def sync_with_realtime_service(self, event_type: str, data: Dict[str, Any]):
         """Sync with real-time service for additional processing."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "http://realtime-service:8002/realtime/process",
-                    json={
-                        "event_type": event_type,
-                        "data": data,
-                        "timestamp": timezone.now().isoformat(),
-                    },
-                    timeout=5,
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result
-                    else:
-                        logger.error(f"Real-time service error: {response.status}")
-                        return None
+            return await get_client("realtime").apost(
+                "realtime/process",
+                {
+                    "event_type": event_type,
+                    "data": data,
+                    "timestamp": timezone.now().isoformat(),
+                },
+                idempotent=False,
+            )
         except Exception as e:
             logger.error(f"Error syncing with real-time service: {e}")
             return None
@@ -353,9 +510,8 @@ class RealTimeIntegration:
             # Get connection count
             connection_count = len(self.redis_client.keys("connection_*"))
 
-            # Get recent activity
-            recent_logs = self.redis_client.lrange("realtime_logs", 0, 10)
-            recent_activity = [json.loads(log) for log in recent_logs]
+            # Get recent activity (sampled, newest first)
+            recent_activity = list(itertools.islice(self.recent_updates, 11))
 
             # Get feature usage
             feature_usage = {}
@@ -367,6 +523,7 @@ class RealTimeIntegration:
                 "connection_count": connection_count,
                 "recent_activity": recent_activity,
                 "feature_usage": feature_usage,
+                "event_counts": dict(self.update_counts),
                 "timestamp": timezone.now().isoformat(),
             }
         except Exception as e:
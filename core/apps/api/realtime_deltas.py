@@ -0,0 +1,270 @@
+"""
+Sequenced entity deltas for real-time clients.
+
+A change is published once per organization as a compact delta (entity, ID
+and changed fields only) with a sequence number that increases monotonically
+per organization. Each delta is:
+
+- appended to a bounded Redis stream (``realtime_deltas:{organization_id}``)
+  so that clients that missed deltas can catch up, and
+- sent to the organization's topic group together with the entity's filter
+  attributes before and after the change. Consumers then forward the
+  pre-serialised text only to sockets whose subscriptions match either, so
+  a view also hears about entities that leave it.
+
+A subscription is either a set of entity IDs or a named filter over
+``FILTER_FIELDS`` (queue views and saved filters), e.g.
+``{"status": ["new", "open"], "assigned_agent": "<user id>"}``.
+"""
+
+import json
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "realtime_deltas:{organization_id}"
+SEQUENCE_KEY = "realtime_sequence:{organization_id}"
+STREAM_MAXLEN = 10000  # approximate; older deltas require a full reload
+CATCH_UP_LIMIT = 500
+FILTER_FIELDS = ("status", "priority", "assigned_agent", "category", "channel")
+
+# Sequence and stream entry are written atomically, so stream IDs and
+# sequence numbers always agree.
+PUBLISH_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[1], seq .. '-0',
+           'i', ARGV[2], 'd', ARGV[3], 'a', ARGV[4])
+return seq
+"""
+
+
+def get_redis():
+    """Raw Redis client behind the default cache, or ``None`` if not Redis."""
+    try:
+        from django_redis import get_redis_connection
+
+        return get_redis_connection("default")
+    except Exception:
+        return None
+
+
+def _text(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def topic_group(organization_id, topic):
+    """Group of clients in an organization subscribed to ``topic``."""
+    return f"org_{organization_id}_{topic}"
+
+
+def with_sequence(seq, body):
+    """Add ``seq`` to a serialised delta without re-encoding it."""
+    return f'{{"seq": {seq}, {body[1:]}'
+
+
+def filter_attributes(data):
+    """The filterable attributes of an entity, as strings."""
+    return {
+        field: None if data.get(field) is None else str(data[field])
+        for field in FILTER_FIELDS
+        if field in data
+    }
+
+
+def entity_attributes(instance):
+    """The filterable attributes of a model instance (foreign keys as IDs)."""
+    fields = {field.name for field in instance._meta.concrete_fields}
+    return filter_attributes(
+        {
+            field: instance.serializable_value(field)
+            for field in FILTER_FIELDS
+            if field in fields
+        }
+    )
+
+
+def validate_filter(criteria):
+    """
+    Normalise filter criteria to ``{field: [str, ...]}``.
+
+    Raises:
+        ValueError: If the criteria are not a dict over ``FILTER_FIELDS``
+    """
+    if not isinstance(criteria, dict) or not criteria:
+        raise ValueError("Filter criteria must be a non-empty object")
+    unknown = set(criteria) - set(FILTER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unsupported filter fields: {', '.join(sorted(unknown))}")
+    return {
+        field: [
+            str(value) for value in (values if isinstance(values, list) else [values])
+        ]
+        for field, values in criteria.items()
+    }
+
+
+def matches_filter(criteria, attributes):
+    """Whether attributes satisfy every field of normalised ``criteria``."""
+    return all(attributes.get(field) in values for field, values in criteria.items())
+
+
+class Subscriptions:
+    """Entity IDs and named filters one client is subscribed to."""
+
+    def __init__(self):
+        self.ids = set()
+        self.filters = {}
+
+    def __bool__(self):
+        return bool(self.ids or self.filters)
+
+    def add_id(self, entity_id):
+        self.ids.add(str(entity_id))
+
+    def add_filter(self, name, criteria):
+        """Add or replace a named filter; raises ValueError if invalid."""
+        self.filters[str(name)] = validate_filter(criteria)
+
+    def remove(self, entity_id=None, name=None):
+        if entity_id is not None:
+            self.ids.discard(str(entity_id))
+        if name is not None:
+            self.filters.pop(str(name), None)
+
+    def wants(self, entity_id, attributes):
+        """
+        Whether a delta for ``entity_id`` is wanted.
+
+        ``attributes`` is an attribute dict or a list of them (the entity
+        after and before the change); a filter matching any of them wants it.
+        """
+        if entity_id in self.ids:
+            return True
+        if isinstance(attributes, dict):
+            attributes = [attributes]
+        return any(
+            matches_filter(criteria, values)
+            for criteria in self.filters.values()
+            for values in attributes
+        )
+
+
+def current_sequence(organization_id):
+    """Latest sequence number published for an organization."""
+    client = get_redis()
+    if client is None:
+        return 0
+    return int(client.get(SEQUENCE_KEY.format(organization_id=organization_id)) or 0)
+
+
+def publish_delta(
+    organization_id,
+    entity,
+    entity_id,
+    changes,
+    attributes=None,
+    topic=None,
+    previous_attributes=None,
+):
+    """
+    Record and fan out a delta; returns its sequence number.
+
+    ``attributes`` and ``previous_attributes`` (the entity after and before
+    the change) are used for subscription filtering only and are not sent to
+    clients. Without Redis the delta is still sent, with sequence 0.
+    """
+    body = json.dumps(
+        {"entity": entity, "id": str(entity_id), "changes": changes},
+        cls=DjangoJSONEncoder,
+    )
+    attributes = [attributes or {}]
+    if previous_attributes and previous_attributes != attributes[0]:
+        attributes.append(previous_attributes)
+
+    seq = None
+    client = get_redis()
+    if client is not None:
+        try:
+            seq = client.eval(
+                PUBLISH_SCRIPT,
+                2,
+                SEQUENCE_KEY.format(organization_id=organization_id),
+                STREAM_KEY.format(organization_id=organization_id),
+                STREAM_MAXLEN,
+                str(entity_id),
+                body,
+                json.dumps(attributes),
+            )
+        except Exception as e:
+            logger.warning(f"Delta stream write failed: {str(e)}")
+
+    channel_layer = get_channel_layer()
+    if channel_layer is not None:
+        async_to_sync(channel_layer.group_send)(
+            topic_group(organization_id, topic or f"{entity}s"),
+            {
+                "type": "realtime.delta",
+                "entity": entity,
+                "id": str(entity_id),
+                "attributes": attributes,
+                "text": with_sequence(seq or 0, body),
+            },
+        )
+    return seq
+
+
+def deltas_since(organization_id, since, limit=CATCH_UP_LIMIT):
+    """
+    Deltas published after sequence ``since``, oldest first.
+
+    Returns:
+        ``(deltas, complete)`` where ``deltas`` is a list of
+        ``(seq, entity_id, text, attributes)``. ``complete`` is False when deltas after
+        ``since`` were already trimmed from the stream, in which case the
+        client must reload instead of applying them.
+    """
+    client = get_redis()
+    if client is None:
+        return [], False
+
+    key = STREAM_KEY.format(organization_id=organization_id)
+    entries = client.xrange(key, min=f"{since + 1}-0", max="+", count=limit)
+
+    deltas = []
+    for entry_id, fields in entries:
+        seq = int(_text(entry_id).split("-")[0])
+        fields = {_text(name): _text(value) for name, value in fields.items()}
+        deltas.append(
+            (seq, fields["i"], with_sequence(seq, fields["d"]), json.loads(fields["a"]))
+        )
+
+    if deltas:
+        complete = deltas[0][0] == since + 1
+    else:
+        complete = since >= current_sequence(organization_id)
+    return deltas, complete
+
+
+def catch_up_message(organization_id, since, subscriptions=None, limit=CATCH_UP_LIMIT):
+    """
+    Serialised ``catch_up`` message replaying deltas after ``since``.
+
+    ``seq`` is the last sequence examined (resume from it), ``more`` means
+    another page follows and ``complete: false`` means deltas were lost and
+    the client should reload.
+    """
+    deltas, complete = deltas_since(organization_id, since, limit)
+    texts = [
+        text
+        for _, entity_id, text, attributes in deltas
+        if subscriptions is None or subscriptions.wants(entity_id, attributes)
+    ]
+    last = deltas[-1][0] if deltas else since
+    return (
+        f'{{"type": "catch_up", "seq": {last}, "complete": {json.dumps(complete)}, '
+        f'"more": {json.dumps(len(deltas) == limit)}, "deltas": [{",".join(texts)}]}}'
+    )
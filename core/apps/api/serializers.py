@@ -4,6 +4,7 @@ API serializers for helpdesk platform.
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import Count, Q
 from django.utils import timezone
 
 # Import models
@@ -26,6 +27,9 @@ from apps.field_service.models import (
 )
 from apps.automation.models import AutomationRule, EmailTemplate, Webhook
 
+from .fast_serializers import FastReadSerializer
+from .prefetch_plans import PlannedListSerializer, PrefetchPlan
+
 User = get_user_model()
 
 
@@ -126,6 +130,11 @@ class TicketSerializer(serializers.ModelSerializer):
     resolution_time = serializers.FloatField(read_only=True)
     comments_count = serializers.SerializerMethodField()
 
+    prefetch_plan = PrefetchPlan(
+        select_related=("customer", "assigned_agent"),
+        annotations={"comments_count": Count("comments", distinct=True)},
+    )
+
     class Meta:
         model = Ticket
         fields = [
@@ -141,16 +150,11 @@ class TicketSerializer(serializers.ModelSerializer):
             "customer_name",
             "assigned_agent",
             "assigned_agent_name",
-            "department",
             "department_name",
-            "parent_ticket",
-            "due_date",
             "resolved_at",
             "closed_at",
             "first_response_at",
             "sla_breach",
-            "satisfaction_rating",
-            "satisfaction_comment",
             "tags",
             "custom_fields",
             "is_open",
@@ -174,7 +178,10 @@ class TicketSerializer(serializers.ModelSerializer):
 
     def get_comments_count(self, obj):
         """Get number of comments."""
-        return obj.comments.count()
+        count = getattr(obj, "comments_count", None)
+        if count is None:
+            count = obj.comments.count()
+        return count
 
 
 class TicketCommentSerializer(serializers.ModelSerializer):
@@ -188,13 +195,9 @@ class TicketCommentSerializer(serializers.ModelSerializer):
         fields = [
             "id",
             "ticket",
-            "user",
             "user_name",
             "user_email",
             "content",
-            "is_public",
-            "is_note",
-            "attachments",
             "created_at",
             "updated_at",
         ]
@@ -237,6 +240,15 @@ class KBCategorySerializer(serializers.ModelSerializer):
     full_path = serializers.CharField(read_only=True)
     articles_count = serializers.SerializerMethodField()
 
+    prefetch_plan = PrefetchPlan(
+        select_related=("parent",),
+        annotations={
+            "published_articles_count": Count(
+                "articles", filter=Q(articles__status="published"), distinct=True
+            )
+        },
+    )
+
     class Meta:
         model = KBCategory
         fields = [
@@ -257,7 +269,10 @@ class KBCategorySerializer(serializers.ModelSerializer):
 
     def get_articles_count(self, obj):
         """Get number of articles in category."""
-        return obj.articles.filter(status="published").count()
+        count = getattr(obj, "published_articles_count", None)
+        if count is None:
+            count = obj.articles.filter(status="published").count()
+        return count
 
 
 class KBArticleSerializer(serializers.ModelSerializer):
@@ -325,8 +340,11 @@ class WorkOrderSerializer(serializers.ModelSerializer):
     duration_minutes = serializers.FloatField(read_only=True)
     assigned_technicians_names = serializers.SerializerMethodField()
 
+    prefetch_plan = PrefetchPlan(select_related=("customer",))
+
     class Meta:
         model = WorkOrder
+        list_serializer_class = PlannedListSerializer
         fields = [
             "id",
             "work_order_number",
@@ -368,15 +386,40 @@ class WorkOrderSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
 
+    def prepare_instances(self, instances):
+        """Load the technicians of a whole page of work orders in one query."""
+        self._technicians = self._load_technicians(instances)
+
+    def _load_technicians(self, work_orders):
+        ids = {
+            str(technician_id)
+            for work_order in work_orders
+            for technician_id in work_order.assigned_technicians or []
+        }
+        if not ids:
+            return {}
+        technicians = Technician._base_manager.filter(
+            id__in=ids,
+            organization_id__in={
+                work_order.organization_id for work_order in work_orders
+            },
+        ).select_related("user")
+        return {(tech.organization_id, str(tech.id)): tech for tech in technicians}
+
     def get_assigned_technicians_names(self, obj):
         """Get names of assigned technicians."""
         if not obj.assigned_technicians:
             return []
 
-        technicians = Technician.objects.filter(
-            id__in=obj.assigned_technicians, organization=obj.organization
-        )
-        return [tech.user.full_name for tech in technicians]
+        technicians = getattr(self, "_technicians", None)
+        if technicians is None:
+            technicians = self._load_technicians([obj])
+        names = []
+        for technician_id in obj.assigned_technicians:
+            tech = technicians.get((obj.organization_id, str(technician_id)))
+            if tech is not None:
+                names.append(tech.user.get_full_name())
+        return names
 
 
 class TechnicianSerializer(serializers.ModelSerializer):
@@ -638,3 +681,9 @@ class AnalyticsSerializer(serializers.Serializer):
 
     # This is a dynamic serializer for analytics data
     pass
+
+
+# Read-only fast paths for high-volume list and export endpoints
+ticket_fast_serializer = FastReadSerializer(TicketSerializer)
+ticket_comment_fast_serializer = FastReadSerializer(TicketCommentSerializer)
+work_order_fast_serializer = FastReadSerializer(WorkOrderSerializer)
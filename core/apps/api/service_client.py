@@ -0,0 +1,376 @@
+"""
+Shared HTTP client for calls to internal microservices (ai-service,
+realtime-service).
+
+Each process has one ``ServiceClient`` per service (see ``get_client``). It
+is built on a pooled ``requests.Session``, so connections are kept alive and
+reused across calls. Sync code (WSGI views, Celery tasks) calls ``post``.
+Async code (Channels consumers, async views) calls ``apost``, which runs the
+same pooled request in a thread pool.
+
+On top of pooling, each call gets:
+
+- a timeout per endpoint;
+- retries with jittered backoff for idempotent calls, plus an optional
+  hedged second request when the first is slower than the endpoint's p95;
+- a circuit breaker that fails fast after repeated failures;
+- coalescing, so identical concurrent idempotent calls share one request;
+- latency percentiles per endpoint, via ``stats``.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 5.0
+LATENCY_WINDOW = 1000
+
+
+class ServiceUnavailable(Exception):
+    """A microservice call failed, timed out or was short-circuited."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Opens after ``threshold`` consecutive failures and stays open for
+    ``reset_timeout`` seconds. After that one trial call is let through:
+    success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, threshold=5, reset_timeout=30.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        with self.lock:
+            state = self.state
+            if state == "half_open":
+                # Let one trial through; others wait for its outcome
+                self.opened_at = time.monotonic()
+                return True
+            return state == "closed"
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Recent latencies per endpoint, in milliseconds."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def record(self, endpoint, seconds):
+        with self.lock:
+            self.samples.setdefault(endpoint, deque(maxlen=self.window)).append(
+                seconds * 1000
+            )
+
+    def percentile(self, endpoint, pct):
+        with self.lock:
+            samples = sorted(self.samples.get(endpoint, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+    def summary(self):
+        with self.lock:
+            endpoints = {name: sorted(values) for name, values in self.samples.items()}
+        return {
+            name: {
+                "count": len(values),
+                "p50": values[len(values) // 2],
+                "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+                "p99": values[min(len(values) - 1, int(len(values) * 0.99))],
+            }
+            for name, values in endpoints.items()
+            if values
+        }
+
+
+class ServiceClient:
+    """Pooled, resilient JSON client for one microservice."""
+
+    def __init__(
+        self,
+        name,
+        base_url,
+        timeouts=None,
+        default_timeout=DEFAULT_TIMEOUT,
+        retries=2,
+        backoff=0.1,
+        hedge=True,
+        pool_size=20,
+        breaker=None,
+    ):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.hedge = hedge
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Callers (async and batch calls) and raw requests get separate pools
+        # so that a caller waiting on its hedged requests cannot starve them.
+        self.executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix=f"{name}-client"
+        )
+        self.request_executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix=f"{name}-request"
+        )
+        self.inflight = {}
+        self.inflight_lock = threading.Lock()
+
+    def timeout_for(self, endpoint):
+        return self.timeouts.get(endpoint, self.default_timeout)
+
+    def post(self, endpoint, data, idempotent=True):
+        """
+        POST ``data`` as JSON to ``endpoint`` and return the decoded response.
+
+        Raises:
+            ServiceUnavailable: If the call fails after retries, or the
+                circuit is open
+        """
+        future, owner = self._join(endpoint, data, idempotent)
+        if owner:
+            self._resolve(future, endpoint, data, idempotent)
+        return future.result()
+
+    async def apost(self, endpoint, data, idempotent=True):
+        """Async ``post``; the request runs on the client's thread pool."""
+        future, owner = self._join(endpoint, data, idempotent)
+        if owner:
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(
+                self.executor, self._resolve, future, endpoint, data, idempotent
+            )
+        # Waiters share the future; one waiter's cancellation must not
+        # cancel the call for the others
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def post_many(self, endpoint, items, chunk_size=100, idempotent=True):
+        """
+        POST ``items`` to a batch ``endpoint`` in chunks of ``chunk_size``
+        (concurrently), returning the concatenated ``results`` in order.
+        """
+        chunks = [
+            items[start : start + chunk_size]
+            for start in range(0, len(items), chunk_size)
+        ]
+        futures = [
+            self.executor.submit(self.post, endpoint, {"items": chunk}, idempotent)
+            for chunk in chunks
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result()["results"])
+        return results
+
+    async def apost_many(self, endpoint, items, chunk_size=100, idempotent=True):
+        """Async ``post_many``."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.post_many, endpoint, items, chunk_size, idempotent
+        )
+
+    def stats(self):
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "inflight": len(self.inflight),
+            "latency_ms": self.latency.summary(),
+        }
+
+    def _join(self, endpoint, data, idempotent=True):
+        """
+        The in-flight future for an identical call, or a new one to own.
+
+        Only idempotent calls are shared; two identical non-idempotent calls
+        (e.g. broadcasts) must both be sent.
+        """
+        if not idempotent:
+            return Future(), True
+        key = (endpoint, json.dumps(data, sort_keys=True, default=str))
+        with self.inflight_lock:
+            future = self.inflight.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            future.add_done_callback(lambda _: self._leave(key))
+            self.inflight[key] = future
+            return future, True
+
+    def _leave(self, key):
+        with self.inflight_lock:
+            self.inflight.pop(key, None)
+
+    def _resolve(self, future, endpoint, data, idempotent):
+        try:
+            result = self._call(endpoint, data, idempotent)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+
+    def _call(self, endpoint, data, idempotent):
+        if not self.breaker.allow():
+            raise ServiceUnavailable(f"{self.name} circuit open")
+
+        attempts = 1 + (self.retries if idempotent else 0)
+        for attempt in range(attempts):
+            try:
+                if idempotent and self.hedge:
+                    result = self._hedged(endpoint, data)
+                else:
+                    result = self._request(endpoint, data)
+            except requests.HTTPError:
+                # A 4xx is the caller's error; the service itself answered
+                self.breaker.record_success()
+                raise
+            except ServiceUnavailable as e:
+                if attempt + 1 >= attempts:
+                    self.breaker.record_failure()
+                    raise
+                delay = self.backoff * (2**attempt)
+                time.sleep(delay + random.uniform(0, delay))
+                logger.debug(f"Retrying {self.name}/{endpoint}: {e}")
+            else:
+                self.breaker.record_success()
+                return result
+
+    def _hedged(self, endpoint, data):
+        """Send a second request if the first outlives the endpoint's p95."""
+        hedge_after = self.latency.percentile(endpoint, 95)
+        primary = self.request_executor.submit(self._request, endpoint, data)
+        if hedge_after is None:
+            return primary.result()
+
+        done, _ = wait([primary], timeout=hedge_after / 1000)
+        if done:
+            return primary.result()
+
+        backup = self.request_executor.submit(self._request, endpoint, data)
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for attempt in done:
+                try:
+                    return attempt.result()
+                except ServiceUnavailable as e:
+                    error = e
+        raise error
+
+    def _request(self, endpoint, data):
+        started = time.monotonic()
+        try:
+            response = self.session.post(
+                f"{self.base_url}/{endpoint}",
+                json=data,
+                timeout=self.timeout_for(endpoint),
+            )
+        except requests.RequestException as e:
+            raise ServiceUnavailable(f"{self.name}/{endpoint}: {e}") from e
+        finally:
+            self.latency.record(endpoint, time.monotonic() - started)
+
+        if response.status_code >= 500:
+            raise ServiceUnavailable(
+                f"{self.name}/{endpoint}: HTTP {response.status_code}"
+            )
+        response.raise_for_status()
+        return response.json()
+
+
+SERVICES = {
+    "ai": lambda: ServiceClient(
+        "ai-service",
+        getattr(settings, "AI_SERVICE_URL", "http://ai-service:8001"),
+        timeouts=getattr(
+            settings,
+            "AI_SERVICE_TIMEOUTS",
+            {
+                "categorize": 3.0,
+                "sentiment": 3.0,
+                "batch": 30.0,
+                "realtime/process": 5.0,
+            },
+        ),
+        default_timeout=getattr(settings, "AI_SERVICE_TIMEOUT", 10.0),
+    ),
+    "realtime": lambda: ServiceClient(
+        "realtime-service",
+        getattr(settings, "REALTIME_SERVICE_URL", "http://realtime-service:8002"),
+        default_timeout=getattr(settings, "REALTIME_SERVICE_TIMEOUT", 2.0),
+        hedge=False,
+    ),
+}
+
+_clients = {}
+_clients_pid = None
+_clients_lock = threading.Lock()
+
+
+def get_client(service):
+    """This process's shared client for ``service`` ("ai" or "realtime")."""
+    global _clients_pid
+
+    with _clients_lock:
+        # Pools must not be shared across forks (Celery prefork, gunicorn)
+        if _clients_pid != os.getpid():
+            _clients.clear()
+            _clients_pid = os.getpid()
+        if service not in _clients:
+            _clients[service] = SERVICES[service]()
+        return _clients[service]
+
+
+def client_stats():
+    """Stats for every client created in this process."""
+    return {client.name: client.stats() for client in list(_clients.values())}
@@ -9,6 +9,7 @@ from .views import (
     WebhookViewSet,
     IntegrationLogViewSet,
     realtime_webhook,
+    realtime_deltas,
     microservice_status,
     api_documentation,
     system_status,
@@ -30,6 +31,7 @@ urlpatterns = [
     path("health/", microservice_status, name="health_check"),
     # Real-time Webhooks
     path("realtime/webhook/", realtime_webhook, name="realtime_webhook"),
+    path("realtime/deltas/", realtime_deltas, name="realtime_deltas"),
     # API Documentation
     path("docs/", api_documentation, name="api_documentation"),
     # Microservice Status
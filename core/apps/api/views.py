@@ -6,13 +6,16 @@ from django.shortcuts import render
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.http import JsonResponse
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
 from django.utils import timezone
 import json
 import asyncio
 import aiohttp
 from .models import APIService, Webhook, IntegrationLog
+from .realtime_deltas import FILTER_FIELDS, Subscriptions, catch_up_message
 from .serializers import (
     APIServiceSerializer,
     WebhookSerializer,
@@ -175,6 +178,40 @@ def realtime_webhook(request):
     return JsonResponse({"status": "error"})
 
 
+@login_required
+@require_http_methods(["GET"])
+def realtime_deltas(request):
+    """
+    Replay real-time deltas missed since sequence ``since``.
+
+    Optional ``ticket_id`` (repeatable) and filter fields (``status``,
+    ``priority``, ...) narrow the replay to what the client subscribes to.
+    """
+    try:
+        since = int(request.GET.get("since", 0))
+    except ValueError:
+        return JsonResponse({"error": "since must be an integer"}, status=400)
+
+    subscriptions = None
+    criteria = {
+        field: request.GET.getlist(field)
+        for field in FILTER_FIELDS
+        if field in request.GET
+    }
+    ticket_ids = request.GET.getlist("ticket_id")
+    if criteria or ticket_ids:
+        subscriptions = Subscriptions()
+        for ticket_id in ticket_ids:
+            subscriptions.add_id(ticket_id)
+        if criteria:
+            subscriptions.add_filter("request", criteria)
+
+    return HttpResponse(
+        catch_up_message(request.user.organization_id, since, subscriptions),
+        content_type="application/json",
+    )
+
+
 def microservice_status(request):
     """Get status of all microservices."""
     services = {
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class FeaturesConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.features"
+    verbose_name = "Features"
+
+    def ready(self):
+        from apps.organizations.tenant_cache import invalidate_on_change
+
+        invalidate_on_change(self.get_model("Feature"))
+        invalidate_on_change(self.get_model("FeatureConfiguration"))
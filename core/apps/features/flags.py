@@ -0,0 +1,128 @@
+"""
+Compiled feature flags.
+
+An organization's flags are built from its active features, the active
+global features, its feature configurations and ``settings.FEATURE_FLAGS``.
+They are compiled into an immutable ``FeatureFlagSet`` and cached in
+``tenant_cache``, so they are rebuilt only after a feature, configuration
+or organization changes.
+
+Flags don't depend on the requesting user, so one set per organization is
+shared by all of its users.
+"""
+
+import json
+import logging
+import threading
+from collections.abc import Mapping
+
+from django.conf import settings
+from django.db.models import Q
+
+from apps.features.models import Feature, FeatureConfiguration
+from apps.organizations.tenant_cache import tenant_cache
+
+logger = logging.getLogger(__name__)
+
+# Bit of each enabled-only flag name, shared by every FeatureFlagSet
+_flag_bits = {}
+_flag_bits_lock = threading.Lock()
+
+
+def _bit(name):
+    bit = _flag_bits.get(name)
+    if bit is None:
+        with _flag_bits_lock:
+            bit = _flag_bits.setdefault(name, len(_flag_bits))
+    return bit
+
+
+class FeatureFlagSet(Mapping):
+    """
+    Read-only flag mapping.
+
+    Flags that are simply enabled are stored as bits of one integer; flags
+    with other values (configurations, ``settings.FEATURE_FLAGS``) are kept
+    in a dict.
+    """
+
+    __slots__ = ("_bits", "_values")
+
+    def __init__(self, flags):
+        self._bits = 0
+        self._values = {}
+        for name, value in flags.items():
+            if value is True:
+                self._bits |= 1 << _bit(name)
+            else:
+                self._values[name] = value
+
+    def __getitem__(self, name):
+        bit = _flag_bits.get(name)
+        if bit is not None and self._bits >> bit & 1:
+            return True
+        return self._values[name]
+
+    def __iter__(self):
+        for name, bit in list(_flag_bits.items()):
+            if self._bits >> bit & 1:
+                yield name
+        yield from self._values
+
+    def __len__(self):
+        return self._bits.bit_count() + len(self._values)
+
+    def __repr__(self):
+        return f"FeatureFlagSet({dict(self)!r})"
+
+    def is_enabled(self, name, default=False):
+        return self.get(name.upper(), default)
+
+
+def _parse_configuration(config_type, value):
+    if config_type == "boolean":
+        return value.lower() in ("true", "1", "yes", "on")
+    if config_type == "integer":
+        return int(value)
+    if config_type == "json":
+        return json.loads(value)
+    return value
+
+
+def build_feature_flags(organization):
+    """Flags of ``organization`` (None for global flags only) from the database."""
+    feature_flags = {}
+
+    features = Q(is_global=True)
+    if organization:
+        features |= Q(organization=organization)
+    for name in Feature.objects.filter(features, status="active").values_list(
+        "name", flat=True
+    ):
+        feature_flags[name.upper()] = True
+
+    if organization:
+        configurations = FeatureConfiguration.objects.filter(
+            organization=organization
+        ).values_list("feature__name", "config_key", "config_type", "config_value")
+        for feature_name, config_key, config_type, config_value in configurations:
+            flag_name = f"{feature_name.upper()}_{config_key.upper()}"
+            try:
+                feature_flags[flag_name] = _parse_configuration(
+                    config_type, config_value
+                )
+            except (ValueError, json.JSONDecodeError) as e:
+                logger.warning(f"Invalid configuration value for {flag_name}: {e}")
+
+    # Add environment-specific flags
+    feature_flags.update(getattr(settings, "FEATURE_FLAGS", {}))
+    return feature_flags
+
+
+def get_feature_flags(organization):
+    """The cached ``FeatureFlagSet`` of ``organization``."""
+    organization_id = organization.id if organization else None
+    return tenant_cache.get(
+        ("feature_flags", organization_id),
+        lambda: FeatureFlagSet(build_feature_flags(organization)),
+    )
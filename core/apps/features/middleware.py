@@ -3,13 +3,11 @@ Feature Flag Middleware for Django
 Provides feature flags to request context
 """
 
-import json
 import logging
-from django.conf import settings
-from django.core.cache import cache
 from django.utils.deprecation import MiddlewareMixin
-from apps.features.models import Feature, FeatureConfiguration
-from apps.organizations.models import Organization
+from apps.features.flags import get_feature_flags
+from apps.features.models import Feature
+from apps.organizations.tenant_cache import get_organization
 
 logger = logging.getLogger(__name__)
 
@@ -50,84 +48,24 @@ class FeatureFlagMiddleware(MiddlewareMixin):
         if hasattr(request, 'organization'):
             return request.organization
         
-        if user and hasattr(user, 'organization'):
-            return user.organization
+        if user and getattr(user, 'organization_id', None):
+            return get_organization(user.organization_id, active_only=False)
         
         # Try to get from session
         organization_id = request.session.get('organization_id')
         if organization_id:
-            try:
-                return Organization.objects.get(id=organization_id)
-            except Organization.DoesNotExist:
-                pass
+            return get_organization(organization_id, active_only=False)
         
         return None
     
     def _get_feature_flags(self, user, organization):
         """
         Get feature flags for user and organization
-        """
-        cache_key = f"feature_flags_{user.id if user else 'anonymous'}_{organization.id if organization else 'none'}"
-        
-        # Try to get from cache first
-        cached_flags = cache.get(cache_key)
-        if cached_flags:
-            return cached_flags
-        
-        # Build feature flags
-        feature_flags = {}
         
-        # Get global features with optimized queries
-        global_features = Feature.objects.filter(
-            is_global=True,
-            status='active'
-        ).select_related('category').prefetch_related('permissions', 'configurations')
-        
-        for feature in global_features:
-            feature_flags[feature.name.upper()] = True
-        
-        # Get organization-specific features with optimized queries
-        if organization:
-            org_features = Feature.objects.filter(
-                organization=organization,
-                status='active'
-            ).select_related('category').prefetch_related('permissions', 'configurations')
-            
-            for feature in org_features:
-                feature_flags[feature.name.upper()] = True
-        
-        # Get feature configurations
-        if organization:
-            configurations = FeatureConfiguration.objects.filter(
-                organization=organization
-            ).select_related('feature')
-            
-            for config in configurations:
-                flag_name = f"{config.feature.name.upper()}_{config.config_key.upper()}"
-                try:
-                    # Parse configuration value based on type
-                    if config.config_type == 'boolean':
-                        value = config.config_value.lower() in ('true', '1', 'yes', 'on')
-                    elif config.config_type == 'integer':
-                        value = int(config.config_value)
-                    elif config.config_type == 'json':
-                        value = json.loads(config.config_value)
-                    else:
-                        value = config.config_value
-                    
-                    feature_flags[flag_name] = value
-                except (ValueError, json.JSONDecodeError) as e:
-                    logger.warning(f"Invalid configuration value for {flag_name}: {e}")
-                    continue
-        
-        # Add environment-specific flags
-        env_flags = getattr(settings, 'FEATURE_FLAGS', {})
-        feature_flags.update(env_flags)
-        
-        # Cache the results for 5 minutes
-        cache.set(cache_key, feature_flags, 300)
-        
-        return feature_flags
+        Flags are compiled once per organization and shared through the
+        tenant cache; see ``apps.features.flags``.
+        """
+        return get_feature_flags(organization)
     
     def _create_feature_checker(self, feature_flags):
         """
@@ -6,7 +6,6 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.core.cache import cache
 from django.conf import settings
 from django.utils import timezone
 import json
@@ -111,10 +110,6 @@ def update_feature_flag(request, flag_name):
             feature.status = 'active' if value else 'inactive'
             feature.save()
         
-        # Clear cache
-        cache_key = f"feature_flags_{request.user.id}_{getattr(request, 'organization', None).id if hasattr(request, 'organization') else 'none'}"
-        cache.delete(cache_key)
-        
         response_data = {
             'flag': flag_name,
             'enabled': value,
@@ -312,10 +307,6 @@ def toggle_feature_flag(request, flag_name):
             feature.status = 'active' if new_state else 'inactive'
             feature.save()
         
-        # Clear cache
-        cache_key = f"feature_flags_{request.user.id}_{getattr(request, 'organization', None).id if hasattr(request, 'organization') else 'none'}"
-        cache.delete(cache_key)
-        
         response_data = {
             'flag': flag_name,
             'enabled': new_state,
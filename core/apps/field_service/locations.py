@@ -0,0 +1,229 @@
+"""
+Live technician locations.
+
+GPS pings are written to Redis, not to the database:
+
+- ``technician_geo:{organization_id}`` is a GEO set of technician IDs, used
+  for nearest-technician searches.
+- ``technician_positions:{organization_id}`` is a hash of each technician's
+  latest ``{"lat", "lng", "ts"}``, used for position lookups.
+- ``technician_positions_dirty`` is a set of ``{organization_id}:{technician_id}``
+  for technicians that moved since the last flush.
+
+``flush_locations`` (run on a timer) copies dirty positions to
+``Technician.current_location`` with one ``bulk_update`` per batch, so the
+database sees one write per moving technician per flush interval instead of
+one full-row save per ping. When Redis is unavailable, pings fall back to a
+single-column update.
+"""
+
+import json
+import logging
+import time
+
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+
+from .models import Technician
+
+logger = logging.getLogger(__name__)
+
+GEO_KEY = "technician_geo:{organization_id}"
+POSITIONS_KEY = "technician_positions:{organization_id}"
+DIRTY_KEY = "technician_positions_dirty"
+ORGANIZATION_CACHE_KEY = "technician_organization:{technician_id}"
+ORGANIZATION_CACHE_TTL = 60 * 60  # 1 hour
+
+LIVE_TTL = 15 * 60  # positions older than 15 minutes are not live
+FLUSH_BATCH_SIZE = 500
+DEFAULT_SEARCH_RADIUS_KM = 50
+
+
+def get_redis():
+    """Raw Redis client behind the default cache, or ``None`` if not Redis."""
+    try:
+        from django_redis import get_redis_connection
+
+        return get_redis_connection("default")
+    except Exception:
+        return None
+
+
+def _text(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def technician_organization(technician_id):
+    """Organization ID of a technician, cached so pings skip the database."""
+    cache_key = ORGANIZATION_CACHE_KEY.format(technician_id=technician_id)
+    organization_id = cache.get(cache_key)
+    if organization_id is None:
+        organization_id = (
+            Technician._base_manager.filter(pk=technician_id)
+            .values_list("organization_id", flat=True)
+            .first()
+        )
+        if organization_id is not None:
+            cache.set(cache_key, organization_id, ORGANIZATION_CACHE_TTL)
+    return organization_id
+
+
+def _coordinates(latitude, longitude):
+    latitude, longitude = float(latitude), float(longitude)
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError(f"Invalid coordinates: {latitude}, {longitude}")
+    return latitude, longitude
+
+
+def _write_through(technician_id, latitude, longitude):
+    Technician._base_manager.filter(pk=technician_id).update(
+        current_location=Point(longitude, latitude, srid=4326)
+    )
+
+
+def record_location(organization_id, technician_id, latitude, longitude):
+    """
+    Store a technician's latest position.
+
+    Raises:
+        ValueError: If the coordinates are not valid latitude/longitude
+    """
+    latitude, longitude = _coordinates(latitude, longitude)
+    client = get_redis()
+    if client is None:
+        _write_through(technician_id, latitude, longitude)
+        return
+
+    position = json.dumps({"lat": latitude, "lng": longitude, "ts": time.time()})
+    pipeline = client.pipeline(transaction=False)
+    pipeline.geoadd(
+        GEO_KEY.format(organization_id=organization_id),
+        (longitude, latitude, str(technician_id)),
+    )
+    pipeline.hset(
+        POSITIONS_KEY.format(organization_id=organization_id),
+        str(technician_id),
+        position,
+    )
+    pipeline.sadd(DIRTY_KEY, f"{organization_id}:{technician_id}")
+    try:
+        pipeline.execute()
+    except Exception as e:
+        logger.warning(f"Live position write failed, updating database: {str(e)}")
+        _write_through(technician_id, latitude, longitude)
+
+
+def live_positions(organization_id, technician_ids=None):
+    """
+    Latest live ``(lat, lng)`` per technician ID (as ``str``).
+
+    Technicians without a recent ping are omitted; callers fall back to
+    ``current_location``.
+    """
+    client = get_redis()
+    if client is None:
+        return {}
+
+    key = POSITIONS_KEY.format(organization_id=organization_id)
+    try:
+        if technician_ids is None:
+            raw = client.hgetall(key)
+        else:
+            ids = [str(technician_id) for technician_id in technician_ids]
+            raw = dict(zip(ids, client.hmget(key, ids))) if ids else {}
+    except Exception as e:
+        logger.warning(f"Live position read failed: {str(e)}")
+        return {}
+
+    cutoff = time.time() - LIVE_TTL
+    positions = {}
+    for technician_id, value in raw.items():
+        if value is None:
+            continue
+        position = json.loads(value)
+        if position["ts"] >= cutoff:
+            positions[_text(technician_id)] = (position["lat"], position["lng"])
+    return positions
+
+
+def nearest_technicians(
+    organization_id, latitude, longitude, radius_km=DEFAULT_SEARCH_RADIUS_KM, count=50
+):
+    """Technician IDs within ``radius_km`` of a point, nearest first."""
+    client = get_redis()
+    if client is None:
+        return []
+
+    try:
+        members = client.geosearch(
+            GEO_KEY.format(organization_id=organization_id),
+            longitude=longitude,
+            latitude=latitude,
+            radius=radius_km,
+            unit="km",
+            sort="ASC",
+            count=count,
+        )
+    except Exception as e:
+        logger.warning(f"Nearest technician search failed: {str(e)}")
+        return []
+
+    members = [_text(member) for member in members]
+    live = live_positions(organization_id, members)
+    return [member for member in members if member in live]
+
+
+def forget_technician(organization_id, technician_id):
+    """Drop a technician from the live store (e.g. when going off duty)."""
+    client = get_redis()
+    if client is None:
+        return
+
+    technician_id = str(technician_id)
+    pipeline = client.pipeline(transaction=False)
+    pipeline.zrem(GEO_KEY.format(organization_id=organization_id), technician_id)
+    pipeline.hdel(POSITIONS_KEY.format(organization_id=organization_id), technician_id)
+    pipeline.execute()
+
+
+def flush_locations(batch_size=FLUSH_BATCH_SIZE):
+    """
+    Write positions of technicians that moved since the last flush to PostGIS.
+
+    Returns:
+        Number of technicians updated
+    """
+    client = get_redis()
+    if client is None:
+        return 0
+
+    # Take the dirty set atomically; pings arriving meanwhile start a new one
+    pipeline = client.pipeline(transaction=True)
+    pipeline.smembers(DIRTY_KEY)
+    pipeline.delete(DIRTY_KEY)
+    dirty, _ = pipeline.execute()
+    if not dirty:
+        return 0
+
+    by_organization = {}
+    for member in dirty:
+        organization_id, technician_id = _text(member).split(":", 1)
+        by_organization.setdefault(organization_id, []).append(technician_id)
+
+    technicians = []
+    for organization_id, technician_ids in by_organization.items():
+        positions = live_positions(organization_id, technician_ids)
+        technicians.extend(
+            Technician(pk=technician_id, current_location=Point(lng, lat, srid=4326))
+            for technician_id, (lat, lng) in positions.items()
+        )
+
+    try:
+        Technician._base_manager.bulk_update(
+            technicians, ["current_location"], batch_size=batch_size
+        )
+    except Exception:
+        # Keep the positions dirty so the next flush retries them
+        client.sadd(DIRTY_KEY, *dirty)
+        raise
+    return len(technicians)
@@ -0,0 +1,104 @@
+"""
+Management command to benchmark route optimization distance matrices.
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.field_service.distance import (
+    DistanceMatrix,
+    HaversineProvider,
+    clear_local_cache,
+    get_distance_matrix,
+)
+
+
+class Command(BaseCommand):
+    """Benchmark distance matrix command."""
+
+    help = "Time distance matrix builds, cache hits and incremental updates"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=str,
+            default="10,100,500,1000,2000",
+            help="Comma-separated location counts (default: 10,100,500,1000,2000)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Runs per measurement; the best is reported (default: 3)",
+        )
+        parser.add_argument(
+            "--geos-limit",
+            type=int,
+            default=200,
+            help="Largest size also timed with pairwise GEOS distances (default: 200)",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        try:
+            sizes = [int(size) for size in options["sizes"].split(",")]
+        except ValueError:
+            raise CommandError("--sizes must be comma-separated integers")
+
+        provider = HaversineProvider()
+        repeat = max(1, options["repeat"])
+        random.seed(42)
+
+        self.stdout.write(
+            f"{'locations':>10} {'numpy':>10} {'cached':>10} "
+            f"{'add one':>10} {'remove one':>10} {'geos':>10}   (ms)"
+        )
+        for size in sizes:
+            locations = [
+                (f"bench:{i}", (40.5 + random.random(), -74.5 + random.random()))
+                for i in range(size)
+            ]
+            points = [point for _, point in locations]
+
+            build = self._best(repeat, lambda: provider.matrix(points))
+
+            clear_local_cache()
+            get_distance_matrix(locations, provider)
+            cached = self._best(
+                repeat, lambda: get_distance_matrix(locations, provider)
+            )
+
+            matrix = DistanceMatrix(
+                [key for key, _ in locations], points, provider.matrix(points)
+            )
+            add = self._best(
+                repeat, lambda: matrix.add("bench:new", (40.7, -74.0), provider)
+            )
+            remove = self._best(repeat, lambda: matrix.remove(locations[0][0]))
+
+            geos = "-"
+            if size <= options["geos_limit"]:
+                geos = f"{self._best(1, lambda: self._geos_matrix(points)):.1f}"
+
+            self.stdout.write(
+                f"{size:>10} {build:>10.1f} {cached:>10.1f} "
+                f"{add:>10.1f} {remove:>10.1f} {geos:>10}"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Distance matrix benchmark complete"))
+
+    def _best(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return min(timings)
+
+    def _geos_matrix(self, points):
+        from django.contrib.gis.geos import Point
+
+        geometries = [Point(lng, lat, srid=4326) for lat, lng in points]
+        return [[a.distance(b) for b in geometries] for a in geometries]
@@ -0,0 +1,172 @@
+"""
+Technician matching for automatic work order assignment.
+
+``TechnicianMatcher.candidates`` returns the top-k technicians for a work
+order in a single query:
+
+- Required skills become one jsonb containment (``skills @> [...]``),
+  served by the GIN index on ``technicians.skills``.
+- "Nearest" ranks by live GPS position from the Redis GEO store first,
+  then fills up with PostGIS KNN distance on the last flushed
+  ``current_location`` (``current_location <-> point``, GiST index).
+- Workload is a correlated count instead of per-technician queries.
+- Round robin keeps a per-organization, per-rule pointer in the cache
+  (Redis), so the technician list is never materialised.
+"""
+
+import logging
+
+from django.contrib.gis.db import models as gis_models
+from django.core.cache import cache
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    FloatField,
+    Func,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+
+from .locations import nearest_technicians
+from .models import JobAssignment, Technician
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CANDIDATES = 5
+LIVE_SEARCH_SIZE = 50  # live positions fetched before the eligibility filter
+ACTIVE_JOB_STATUSES = ["assigned", "in_progress"]
+ROUND_ROBIN_KEY = "technician_round_robin:{organization_id}:{rule_id}"
+ROUND_ROBIN_TTL = 60 * 60 * 24 * 30  # 30 days
+
+
+class KNNDistance(Func):
+    """``a <-> b``: distance operator PostGIS can answer from a GiST index."""
+
+    arg_joiner = " <-> "
+    template = "%(expressions)s"
+    output_field = FloatField()
+
+
+class TechnicianMatcher:
+    """Rank technicians for a work order according to a rule's assignment logic."""
+
+    def __init__(self, organization):
+        self.organization = organization
+
+    def eligible(self, required_skills=None):
+        """Active, available technicians that have every required skill."""
+        technicians = Technician.objects.for_organization(self.organization).filter(
+            user__is_active=True, availability_status="available"
+        )
+        if required_skills:
+            technicians = technicians.filter(skills__contains=list(required_skills))
+        return technicians
+
+    def candidates(self, work_order, rule=None, limit=DEFAULT_CANDIDATES):
+        """Top ``limit`` technicians, best first."""
+        logic = rule.assignment_logic if rule else "nearest"
+        technicians = self.eligible(rule.required_skills if rule else None)
+
+        if logic == "nearest" and work_order.location_coordinates:
+            point = work_order.location_coordinates
+            nearest = self._live_nearest(technicians, point, limit)
+            if len(nearest) < limit:
+                location = Value(
+                    point, output_field=gis_models.PointField(srid=point.srid or 4326)
+                )
+                nearest += list(
+                    technicians.filter(current_location__isnull=False)
+                    .exclude(pk__in=[technician.pk for technician in nearest])
+                    .annotate(distance=KNNDistance(F("current_location"), location))
+                    .select_related("user")
+                    .order_by("distance")[: limit - len(nearest)]
+                )
+            if nearest:
+                return nearest
+
+        if logic == "skill_match":
+            technicians = technicians.annotate(
+                skill_count=Func(
+                    F("skills"),
+                    function="jsonb_array_length",
+                    output_field=IntegerField(),
+                )
+            ).order_by("-skill_count", "pk")
+        elif logic == "workload":
+            active_jobs = (
+                JobAssignment.objects.filter(
+                    technician=OuterRef("pk"), status__in=ACTIVE_JOB_STATUSES
+                )
+                .order_by()
+                .values("technician")
+                .annotate(count=Count("id"))
+                .values("count")
+            )
+            technicians = technicians.annotate(
+                active_jobs=Coalesce(Subquery(active_jobs), 0)
+            ).order_by("active_jobs", "pk")
+        elif logic == "round_robin":
+            last_id = self._round_robin_pointer(rule)
+            if last_id:
+                # Technicians after the pointer first, then wrap around
+                technicians = technicians.annotate(
+                    wrapped=Case(
+                        When(pk__gt=last_id, then=0),
+                        default=1,
+                        output_field=IntegerField(),
+                    )
+                ).order_by("wrapped", "pk")
+            else:
+                technicians = technicians.order_by("pk")
+        else:
+            technicians = technicians.order_by("pk")
+
+        return list(technicians.select_related("user")[:limit])
+
+    def _live_nearest(self, technicians, point, limit):
+        """Eligible technicians with a live GPS position, nearest first."""
+        ids = nearest_technicians(
+            self.organization.id, point.y, point.x, count=max(limit, LIVE_SEARCH_SIZE)
+        )
+        if not ids:
+            return []
+
+        eligible = {
+            str(technician.pk): technician
+            for technician in technicians.filter(pk__in=ids).select_related("user")
+        }
+        return [eligible[i] for i in ids if i in eligible][:limit]
+
+    def best(self, work_order, rule=None):
+        """Best technician, or ``None``. Advances the round-robin pointer."""
+        candidates = self.candidates(work_order, rule, limit=1)
+        if not candidates:
+            return None
+
+        technician = candidates[0]
+        if rule and rule.assignment_logic == "round_robin":
+            self._advance_round_robin(rule, technician)
+        return technician
+
+    def _round_robin_key(self, rule):
+        return ROUND_ROBIN_KEY.format(
+            organization_id=self.organization.id, rule_id=rule.id
+        )
+
+    def _round_robin_pointer(self, rule):
+        try:
+            return cache.get(self._round_robin_key(rule))
+        except Exception as e:
+            logger.warning(f"Round-robin pointer read failed: {str(e)}")
+            return None
+
+    def _advance_round_robin(self, rule, technician):
+        try:
+            cache.set(self._round_robin_key(rule), technician.pk, ROUND_ROBIN_TTL)
+        except Exception as e:
+            logger.warning(f"Round-robin pointer write failed: {str(e)}")
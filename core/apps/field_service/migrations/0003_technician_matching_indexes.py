@@ -0,0 +1,39 @@
+"""
+Add indexes backing technician matching.
+"""
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('field_service', '0002_add_performance_indexes'),
+    ]
+
+    operations = [
+        # Single jsonb containment filter: skills @> '["a", "b"]'
+        migrations.RunSQL(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_technicians_skills_path ON technicians USING GIN (skills jsonb_path_ops);",
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS idx_technicians_skills_path;"
+        ),
+
+        # KNN (<->) ordering over available technicians only
+        migrations.RunSQL(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_technicians_available_location ON technicians USING GIST (current_location) WHERE availability_status = 'available';",
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS idx_technicians_available_location;"
+        ),
+
+        migrations.RunSQL(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_technicians_org_availability ON technicians (organization_id, availability_status);",
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS idx_technicians_org_availability;"
+        ),
+
+        migrations.RunSQL(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_job_assignments_technician_status ON job_assignments (technician_id, status);",
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS idx_job_assignments_technician_status;"
+        ),
+    ]
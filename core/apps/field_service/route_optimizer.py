@@ -3,17 +3,42 @@ Route optimization for field service technicians.
 """
 
 import logging
-from datetime import datetime, timedelta
+import math
+from datetime import date as date_cls, datetime, time, timedelta
 from typing import List, Dict, Any
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 from django.contrib.gis.geos import Point
 from django.contrib.gis.measure import Distance
 
+from .distance import (
+    add_location,
+    get_distance_matrix,
+    haversine_matrix,
+    location_id,
+    path_distance,
+    remove_location,
+)
+from .locations import live_positions
 from .models import WorkOrder, Technician, Route
+from .vrp import DEFAULT_TIME_BUDGET, TRAVEL_SPEED_M_PER_MIN, Job, Vehicle, solve_fleet
 from apps.organizations.models import Organization
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_START = (40.7128, -74.006)  # (lat, lng) when a technician has no location
+DEFAULT_SHIFT = ("08:00", "17:00")
+PRIORITY_WEIGHTS = {"low": 1, "medium": 2, "high": 3, "urgent": 4}
+STARTED_STATUSES = ("in_progress", "completed")
+ROUTE_UPDATE_FIELDS = [
+    "work_orders",
+    "optimized_sequence",
+    "total_distance",
+    "total_duration",
+    "updated_at",
+]
+
 
 class RouteOptimizer:
     """Route optimization using Google OR-Tools."""
@@ -21,8 +46,17 @@ class RouteOptimizer:
     def __init__(self):
         self.google_maps_api_key = None  # Set from settings
 
-    def optimize_daily_routes(self, date, organization):
-        """Optimize routes for all technicians on a given date."""
+    def optimize_daily_routes(self, date, organization, mode="technician"):
+        """
+        Optimize routes for all technicians on a given date.
+
+        ``mode="fleet"`` solves every technician and work order together
+        (see ``optimize_fleet_routes``); the default assigns greedily and
+        solves one TSP per technician.
+        """
+        if mode == "fleet":
+            return self.optimize_fleet_routes(date, organization)
+
         try:
             # Get work orders for the date
             work_orders = WorkOrder.objects.filter(
@@ -63,6 +97,432 @@ class RouteOptimizer:
             logger.error(f"Error optimizing routes: {str(e)}")
             return []
 
+    def optimize_fleet_routes(self, date, organization, time_budget=None):
+        """
+        Plan the whole fleet for a date as one vehicle routing problem.
+
+        Skills restrict which technicians may take a job, ``max_jobs_per_day``
+        caps each route, scheduled start/end bound arrival times and working
+        hours bound the shift. Routes and assignments are written with bulk
+        updates. Returns the day's ``Route`` records.
+        """
+        route_date = date_cls.fromisoformat(date) if isinstance(date, str) else date
+        day_start = timezone.make_aware(datetime.combine(route_date, time.min))
+        if time_budget is None:
+            time_budget = getattr(
+                settings, "FIELD_SERVICE_VRP_TIME_BUDGET", DEFAULT_TIME_BUDGET
+            )
+
+        work_orders = list(
+            WorkOrder.objects.for_organization(organization).filter(
+                scheduled_start__date=route_date, status="scheduled"
+            )
+        )
+        technicians = list(
+            Technician.objects.for_organization(organization)
+            .filter(user__is_active=True)
+            .exclude(availability_status="off_duty")
+            .order_by("pk")
+        )
+        if not work_orders or not technicians:
+            return []
+
+        # Work orders without coordinates cannot be routed and are left as-is
+        work_orders = [
+            work_order for work_order in work_orders if work_order.location_coordinates
+        ]
+        live = live_positions(organization.id)
+        vehicles = [
+            self._fleet_vehicle(technician, route_date, live)
+            for technician in technicians
+        ]
+        jobs = [self._fleet_job(work_order, day_start) for work_order in work_orders]
+        matrix = get_distance_matrix(
+            [
+                (location_id("technician", vehicle.key, vehicle.start), vehicle.start)
+                for vehicle in vehicles
+            ]
+            + [
+                (location_id("work_order", job.key, job.location), job.location)
+                for job in jobs
+            ]
+        )
+        solution = solve_fleet(
+            vehicles, jobs, matrix=matrix.values, time_budget=time_budget
+        )
+
+        if solution.unassigned:
+            logger.warning(
+                f"Fleet plan for {route_date} left {len(solution.unassigned)} "
+                f"work orders unassigned"
+            )
+        logger.info(
+            f"Fleet plan for {route_date} ({solution.solver}): "
+            f"{len(solution.routes)} routes, {len(jobs)} work orders"
+        )
+
+        return self._save_fleet_plan(
+            organization,
+            route_date,
+            day_start,
+            technicians,
+            vehicles,
+            work_orders,
+            solution,
+        )
+
+    def _shift_minutes(self, technician, route_date):
+        """Shift bounds in minutes from midnight from ``working_hours``."""
+        hours = technician.working_hours or {}
+        day_hours = hours.get(route_date.strftime("%A").lower(), hours)
+        if not isinstance(day_hours, dict):
+            day_hours = {}
+
+        bounds = []
+        for key, default in zip(("start", "end"), DEFAULT_SHIFT):
+            try:
+                hour, minute = str(day_hours.get(key) or default).split(":")[:2]
+                bounds.append(int(hour) * 60 + int(minute))
+            except ValueError:
+                hour, minute = default.split(":")
+                bounds.append(int(hour) * 60 + int(minute))
+        return bounds
+
+    def _technician_start(self, technician, live=None):
+        """Live GPS position if recent, else the last flushed location."""
+        if live is None:
+            live = live_positions(technician.organization_id, [technician.id])
+        if str(technician.id) in live:
+            return live[str(technician.id)]
+        location = technician.current_location
+        return (location.y, location.x) if location else DEFAULT_START
+
+    def _fleet_vehicle(self, technician, route_date, live=None):
+        shift_start, shift_end = self._shift_minutes(technician, route_date)
+        return Vehicle(
+            key=technician.id,
+            start=self._technician_start(technician, live),
+            shift_start=shift_start,
+            shift_end=shift_end,
+            capacity=technician.max_jobs_per_day,
+            skills=frozenset(technician.skills or []),
+        )
+
+    def _fleet_job(self, work_order, day_start):
+        def minutes(value):
+            return int((value - day_start).total_seconds() // 60)
+
+        window_start = (
+            minutes(work_order.scheduled_start) if work_order.scheduled_start else None
+        )
+        window_end = None
+        if work_order.scheduled_end:
+            window_end = (
+                minutes(work_order.scheduled_end) - work_order.estimated_duration
+            )
+            if window_start is not None:
+                window_end = max(window_end, window_start)
+
+        location = work_order.location_coordinates
+        return Job(
+            key=work_order.id,
+            location=(location.y, location.x),
+            service_time=work_order.estimated_duration,
+            window_start=window_start,
+            window_end=window_end,
+            required_skills=frozenset(work_order.required_skills or []),
+            priority=PRIORITY_WEIGHTS.get(work_order.priority, 1),
+        )
+
+    def _save_fleet_plan(
+        self,
+        organization,
+        route_date,
+        day_start,
+        technicians,
+        vehicles,
+        work_orders,
+        solution,
+    ):
+        """Upsert one ``Route`` per technician and reassign work orders in bulk."""
+        now = timezone.now()
+        shift_starts = {vehicle.key: vehicle.shift_start for vehicle in vehicles}
+        assignments = {
+            stop.key: [str(technician_id)]
+            for technician_id, stops in solution.routes.items()
+            for stop in stops
+        }
+
+        changed_work_orders = []
+        for work_order in work_orders:
+            assigned = assignments.get(work_order.id, [])
+            if work_order.assigned_technicians != assigned:
+                work_order.assigned_technicians = assigned
+                work_order.updated_at = now
+                changed_work_orders.append(work_order)
+
+        existing = {
+            route.technician_id: route
+            for route in Route.objects.for_organization(organization).filter(
+                route_date=route_date
+            )
+        }
+        new_routes, updated_routes = [], []
+        for technician in technicians:
+            stops = solution.routes.get(technician.id, [])
+            route = existing.get(technician.id)
+            if route is None:
+                if not stops:
+                    continue
+                route = Route(
+                    organization=organization,
+                    technician=technician,
+                    route_date=route_date,
+                )
+                new_routes.append(route)
+            else:
+                route.updated_at = now
+                updated_routes.append(route)
+
+            route.work_orders = [str(stop.key) for stop in stops]
+            route.optimized_sequence = [
+                {
+                    "work_order": str(stop.key),
+                    "arrival": (
+                        day_start + timedelta(minutes=stop.arrival)
+                    ).isoformat(),
+                    "departure": (
+                        day_start + timedelta(minutes=stop.departure)
+                    ).isoformat(),
+                }
+                for stop in stops
+            ]
+            route.total_distance = round(
+                solution.distances.get(technician.id, 0) / 1000, 2
+            )
+            route.total_duration = (
+                stops[-1].departure - shift_starts[technician.id] if stops else 0
+            )
+
+        # Through for_organization: the tenant manager's default queryset is
+        # empty without a current organization, making bulk_update a no-op
+        routes = Route.objects.for_organization(organization)
+        with transaction.atomic():
+            WorkOrder.objects.for_organization(organization).bulk_update(
+                changed_work_orders,
+                ["assigned_technicians", "updated_at"],
+                batch_size=500,
+            )
+            routes.bulk_create(new_routes, batch_size=500)
+            routes.bulk_update(
+                updated_routes,
+                ROUTE_UPDATE_FIELDS,
+                batch_size=500,
+            )
+
+        return new_routes + updated_routes
+
+    def insert_work_order(self, route, work_order):
+        """
+        Add a work order to an existing route at its cheapest position.
+
+        Each position after the last started stop is scored by the distance
+        it adds, against the route's cached distance matrix extended by one
+        row. Only the route row and the work order's assignment are written.
+        Returns ``(route, position)``.
+        """
+        if not work_order.location_coordinates:
+            raise ValueError(f"Work order {work_order.id} has no coordinates")
+
+        with transaction.atomic():
+            route = self._lock_route(route)
+            if str(work_order.id) in map(str, route.work_orders):
+                raise ValueError(f"Work order {work_order.id} is already on the route")
+
+            stops = self._route_stops(route)
+            point = (
+                work_order.location_coordinates.y,
+                work_order.location_coordinates.x,
+            )
+            matrix = add_location(
+                self._route_matrix(route, stops),
+                location_id("work_order", work_order.id, point),
+                point,
+            )
+            values = matrix.values
+            new_node = len(stops) + 1
+
+            # Node 0 is the route start and node k is stops[k - 1], so
+            # inserting before stops[position] follows node ``position``
+            best_position, best_delta = None, None
+            for position in range(self._first_open_position(stops), len(stops) + 1):
+                delta = int(values[position, new_node])
+                if position < len(stops):
+                    delta += int(
+                        values[new_node, position + 1] - values[position, position + 1]
+                    )
+                if best_delta is None or delta < best_delta:
+                    best_position, best_delta = position, delta
+
+            nodes = list(range(1, len(stops) + 1))
+            nodes.insert(best_position, new_node)
+            stops.insert(best_position, work_order)
+            self._resequence_route(route, stops, nodes, values)
+            route.save(update_fields=ROUTE_UPDATE_FIELDS)
+
+            WorkOrder.objects.for_organization(route.organization_id).filter(
+                pk=work_order.pk
+            ).update(
+                assigned_technicians=[str(route.technician_id)],
+                updated_at=timezone.now(),
+            )
+
+        logger.info(
+            f"Inserted work order {work_order.id} into route {route.id} at "
+            f"position {best_position + 1} (+{best_delta} m)"
+        )
+        return route, best_position
+
+    def remove_work_order(self, route, work_order_id):
+        """
+        Remove a work order (e.g. after a cancellation) and repair the route.
+
+        Neighbouring stops are reconnected and later arrival times pulled
+        forward. Only the route row and the work order's assignment to the
+        route's technician are written. Returns the route.
+        """
+        with transaction.atomic():
+            route = self._lock_route(route)
+            work_order_id = str(work_order_id)
+            if work_order_id not in map(str, route.work_orders):
+                raise ValueError(f"Work order {work_order_id} is not on the route")
+
+            stops = self._route_stops(route)
+            matrix = self._route_matrix(route, stops)
+            position = next(
+                (i for i, stop in enumerate(stops) if str(stop.id) == work_order_id),
+                None,
+            )
+            if position is not None:
+                matrix = remove_location(matrix, matrix.keys[position + 1])
+                stops.pop(position)
+
+            self._resequence_route(
+                route, stops, list(range(1, len(stops) + 1)), matrix.values
+            )
+            route.save(update_fields=ROUTE_UPDATE_FIELDS)
+
+            technician_id = str(route.technician_id)
+            for work_order in (
+                WorkOrder.objects.for_organization(route.organization_id)
+                .select_for_update()
+                .filter(pk=work_order_id)
+            ):
+                assigned = work_order.assigned_technicians or []
+                if technician_id in assigned:
+                    work_order.assigned_technicians = [
+                        assignee for assignee in assigned if assignee != technician_id
+                    ]
+                    work_order.save(
+                        update_fields=["assigned_technicians", "updated_at"]
+                    )
+
+        logger.info(f"Removed work order {work_order_id} from route {route.id}")
+        return route
+
+    def _lock_route(self, route):
+        return (
+            Route.objects.for_organization(route.organization_id)
+            .select_related("technician")
+            .select_for_update(of=("self",))
+            .get(pk=route.pk)
+        )
+
+    def _route_stops(self, route):
+        """The route's work orders in visit order (deleted ones are skipped)."""
+        ids = [str(work_order_id) for work_order_id in route.work_orders]
+        work_orders = {
+            str(work_order.id): work_order
+            for work_order in WorkOrder.objects.for_organization(
+                route.organization_id
+            ).filter(id__in=ids)
+        }
+        return [work_orders[i] for i in ids if i in work_orders]
+
+    def _route_matrix(self, route, stops):
+        """Cached matrix over the route start and its stops, in visit order."""
+        point = self._technician_start(route.technician)
+        locations = [(location_id("technician", route.technician_id, point), point)]
+        for stop in stops:
+            # A stop without coordinates is treated as being at the previous one
+            if stop.location_coordinates:
+                point = (stop.location_coordinates.y, stop.location_coordinates.x)
+            locations.append((location_id("work_order", stop.id, point), point))
+        return get_distance_matrix(locations)
+
+    def _first_open_position(self, stops):
+        """Index of the first stop that may still be moved."""
+        position = 0
+        for index, stop in enumerate(stops):
+            if stop.status in STARTED_STATUSES:
+                position = index + 1
+        return position
+
+    def _resequence_route(self, route, stops, nodes, values):
+        """
+        Set the route's sequence, distance and timings from ``stops``.
+
+        ``nodes[i]`` is the matrix index of ``stops[i]``. Started stops
+        keep their recorded times; later ones are rescheduled from their
+        predecessor, never earlier than now or their scheduled start.
+        """
+        previous_entries = {
+            entry.get("work_order"): entry
+            for entry in route.optimized_sequence
+            if isinstance(entry, dict)
+        }
+        shift_start, _ = self._shift_minutes(route.technician, route.route_date)
+        shift_begins = timezone.make_aware(
+            datetime.combine(route.route_date, time.min)
+        ) + timedelta(minutes=shift_start)
+        clock = max(shift_begins, timezone.now())
+
+        sequence = []
+        distance = 0
+        current = 0
+        for stop, node in zip(stops, nodes):
+            key = str(stop.id)
+            distance += int(values[current, node])
+            entry = previous_entries.get(key)
+            if stop.status in STARTED_STATUSES and entry:
+                sequence.append(entry)
+                if entry.get("departure"):
+                    clock = max(clock, datetime.fromisoformat(entry["departure"]))
+            else:
+                clock += timedelta(
+                    minutes=math.ceil(values[current, node] / TRAVEL_SPEED_M_PER_MIN)
+                )
+                if stop.scheduled_start and stop.scheduled_start > clock:
+                    clock = stop.scheduled_start
+                arrival = clock
+                clock += timedelta(minutes=stop.estimated_duration)
+                sequence.append(
+                    {
+                        "work_order": key,
+                        "arrival": arrival.isoformat(),
+                        "departure": clock.isoformat(),
+                    }
+                )
+            current = node
+
+        route.work_orders = [str(stop.id) for stop in stops]
+        route.optimized_sequence = sequence
+        route.total_distance = round(distance / 1000, 2)
+        route.total_duration = (
+            max(0, int((clock - shift_begins).total_seconds() // 60)) if stops else 0
+        )
+        route.updated_at = timezone.now()
+
     def match_skills_to_technicians(self, work_orders, technicians):
         """Match work orders to technicians based on skills."""
         assignments = {tech: [] for tech in technicians}
@@ -138,11 +598,9 @@ class RouteOptimizer:
             if not work_orders:
                 return None
 
-            # Get technician's starting location
-            start_location = technician.current_location
-            if not start_location:
-                # Use organization's default location or technician's home
-                start_location = Point(-74.006, 40.7128)  # Default to NYC
+            # Start from the technician's live position when known
+            latitude, longitude = self._technician_start(technician)
+            start_location = Point(longitude, latitude, srid=4326)
 
             # Solve TSP using OR-Tools
             optimized_sequence = self.solve_tsp(start_location, work_orders)
@@ -186,7 +644,7 @@ class RouteOptimizer:
 
             # Create distance matrix
             locations = [start_location] + [
-                wo.location for wo in work_orders if wo.location
+                wo.location_coordinates for wo in work_orders if wo.location_coordinates
             ]
 
             if len(locations) < 2:
@@ -250,61 +708,40 @@ class RouteOptimizer:
         """Simple route optimization based on distance."""
         try:
             # Sort work orders by distance from start location
-            work_orders_with_distance = []
-
-            for work_order in work_orders:
-                if work_order.location:
-                    distance = start_location.distance(work_order.location)
-                    work_orders_with_distance.append((work_order, distance))
-                else:
-                    work_orders_with_distance.append((work_order, float("inf")))
+            located = [wo for wo in work_orders if wo.location_coordinates]
+            unlocated = [wo for wo in work_orders if not wo.location_coordinates]
+            if not located:
+                return unlocated
 
-            # Sort by distance
-            work_orders_with_distance.sort(key=lambda x: x[1])
+            distances = haversine_matrix(
+                [(start_location.y, start_location.x)],
+                [
+                    (wo.location_coordinates.y, wo.location_coordinates.x)
+                    for wo in located
+                ],
+            )[0]
 
-            return [wo for wo, _ in work_orders_with_distance]
+            return [located[i] for i in distances.argsort(kind="stable")] + unlocated
 
         except Exception as e:
             logger.error(f"Error in simple route optimization: {str(e)}")
             return work_orders
 
     def calculate_distance_matrix(self, locations):
-        """Calculate distance matrix between locations."""
-        matrix = []
-
-        for i, location1 in enumerate(locations):
-            row = []
-            for j, location2 in enumerate(locations):
-                if i == j:
-                    row.append(0)
-                else:
-                    try:
-                        distance = location1.distance(location2)
-                        # Convert to meters and round
-                        distance_meters = distance.m
-                        row.append(int(distance_meters))
-                    except:
-                        row.append(0)
-            matrix.append(row)
-
-        return matrix
+        """Calculate distance matrix (meters) between GEOS points."""
+        return haversine_matrix(
+            [(location.y, location.x) for location in locations]
+        ).tolist()
 
     def calculate_total_distance(self, work_orders):
-        """Calculate total distance for optimized route."""
-        if not work_orders:
-            return 0
-
-        total_distance = 0
-
-        for i in range(len(work_orders) - 1):
-            current = work_orders[i]
-            next_wo = work_orders[i + 1]
-
-            if current.location and next_wo.location:
-                distance = current.location.distance(next_wo.location)
-                total_distance += distance.m
-
-        return total_distance
+        """Calculate total distance (meters) for optimized route."""
+        return path_distance(
+            [
+                (wo.location_coordinates.y, wo.location_coordinates.x)
+                for wo in work_orders
+                if wo.location_coordinates
+            ]
+        )
 
     def calculate_total_duration(self, work_orders):
         """Calculate total duration for optimized route."""
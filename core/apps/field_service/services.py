@@ -3,21 +3,30 @@ Field Service automation services.
 """
 
 from typing import Optional, Dict, Any
-from django.db import transaction, models as django_models
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 import logging
 
+from .matching import TechnicianMatcher
 from .models import WorkOrder, TicketToWorkOrderRule, Technician, JobAssignment
 
 logger = logging.getLogger(__name__)
 
+# Assignment logics whose pick only depends on the rule, not the work order or
+# current workloads, so it can be reused for a whole batch of tickets.
+STATIC_ASSIGNMENT_LOGICS = {"skill_match"}
+
 
 class WorkOrderAutomationService:
     """Service for automatic work order creation from tickets."""
 
     def __init__(self, organization):
         self.organization = organization
+        self.matcher = TechnicianMatcher(organization)
+        # Lookups reused while one service instance processes a batch
+        self._rules = None
+        self._technicians = {}
 
     @transaction.atomic
     def create_work_order_from_ticket(
@@ -39,13 +48,15 @@ class WorkOrderAutomationService:
                 rule = self._find_matching_rule(ticket)
 
             if not rule:
-                logger.info(
-                    f"No matching rule found for ticket {ticket.ticket_number}"
-                )
+                logger.info(f"No matching rule found for ticket {ticket.ticket_number}")
                 return None
 
             # Check if work order already exists for this ticket
-            if WorkOrder.objects.filter(source_ticket=ticket).exists():
+            if (
+                WorkOrder.objects.for_organization(self.organization)
+                .filter(source_ticket=ticket)
+                .exists()
+            ):
                 logger.warning(
                     f"Work order already exists for ticket {ticket.ticket_number}"
                 )
@@ -64,12 +75,12 @@ class WorkOrderAutomationService:
             if rule.auto_schedule:
                 self._schedule_work_order(work_order, rule)
 
-            # Send notifications
+            # Send notifications once the work order is committed
             if rule.notify_customer:
-                self._notify_customer(work_order, ticket)
+                transaction.on_commit(lambda: self._notify_customer(work_order, ticket))
 
             if rule.notify_technician and work_order.assigned_technicians:
-                self._notify_technician(work_order)
+                transaction.on_commit(lambda: self._notify_technician(work_order))
 
             # Log the automation
             logger.info(
@@ -87,16 +98,54 @@ class WorkOrderAutomationService:
 
     def _find_matching_rule(self, ticket) -> Optional[TicketToWorkOrderRule]:
         """Find the first matching rule for the ticket."""
-        rules = TicketToWorkOrderRule.objects.filter(
-            organization=self.organization, is_active=True
-        ).order_by("-priority", "name")
+        if self._rules is None:
+            self._rules = list(
+                TicketToWorkOrderRule.objects.for_organization(self.organization)
+                .filter(is_active=True)
+                .order_by("-priority", "name")
+            )
 
-        for rule in rules:
+        for rule in self._rules:
             if rule.matches_ticket(ticket):
                 return rule
 
         return None
 
+    def process_ticket_events(self, events):
+        """
+        Create work orders for a batch of ticket "created" outbox events.
+
+        Each event runs in its own savepoint and is marked processed in the
+        same transaction as its work order, so a committed event is never
+        applied twice. Failed events keep ``processed_at`` empty and are
+        retried later. Must run inside a transaction.
+
+        Returns:
+            Number of events processed successfully
+        """
+        from apps.tickets.models import TicketEvent
+
+        processed = 0
+        now = timezone.now()
+
+        for event in events:
+            event.attempts += 1
+            try:
+                with transaction.atomic():
+                    self.create_work_order_from_ticket(event.ticket)
+            except Exception as e:
+                event.last_error = str(e)[:1000]
+                continue
+
+            event.processed_at = now
+            event.last_error = ""
+            processed += 1
+
+        TicketEvent.objects.bulk_update(
+            events, ["attempts", "processed_at", "last_error"]
+        )
+        return processed
+
     def _create_work_order(self, ticket, rule: TicketToWorkOrderRule) -> WorkOrder:
         """Create the work order from ticket and rule."""
         # Get customer location if available
@@ -122,106 +171,21 @@ class WorkOrderAutomationService:
         self, work_order: WorkOrder, rule: TicketToWorkOrderRule
     ) -> Optional[Technician]:
         """Find the best technician based on assignment logic."""
-        # Get available technicians with required skills
-        technicians = Technician.objects.filter(
-            organization=self.organization,
-            user__is_active=True,
-            availability_status="available",
+        static = rule.assignment_logic in STATIC_ASSIGNMENT_LOGICS or (
+            rule.assignment_logic == "nearest" and not work_order.location_coordinates
         )
-
-        # Filter by required skills
-        if rule.required_skills:
-            # Filter technicians who have all required skills
-            for skill in rule.required_skills:
-                technicians = technicians.filter(
-                    skills__contains=[skill]
-                )
-
-        if not technicians.exists():
+        if static and rule.id in self._technicians:
+            technician = self._technicians[rule.id]
+        else:
+            technician = self.matcher.best(work_order, rule)
+            if static:
+                self._technicians[rule.id] = technician
+
+        if not technician:
             logger.warning(
                 f"No available technicians found for work order {work_order.work_order_number}"
             )
-            return None
-
-        # Apply assignment logic
-        if rule.assignment_logic == "nearest":
-            return self._find_nearest_technician(technicians, work_order)
-        elif rule.assignment_logic == "skill_match":
-            return self._find_best_skill_match(technicians, work_order)
-        elif rule.assignment_logic == "workload":
-            return self._find_least_workload_technician(technicians)
-        elif rule.assignment_logic == "round_robin":
-            return self._find_round_robin_technician(technicians)
-
-        return technicians.first()
-
-    def _find_nearest_technician(self, technicians, work_order):
-        """Find nearest technician using PostGIS distance calculation."""
-        if not work_order.location_coordinates:
-            return technicians.first()
-
-        from django.contrib.gis.db.models.functions import Distance
-
-        nearest = (
-            technicians.filter(current_location__isnull=False)
-            .annotate(distance=Distance("current_location", work_order.location_coordinates))
-            .order_by("distance")
-            .first()
-        )
-
-        return nearest or technicians.first()
-
-    def _find_best_skill_match(self, technicians, work_order):
-        """Find technician with best skill match."""
-        # Score technicians based on number of skills
-        scored_technicians = []
-
-        for tech in technicians:
-            skill_count = len(tech.skills) if isinstance(tech.skills, list) else 0
-            scored_technicians.append((tech, skill_count))
-
-        # Sort by skill count descending
-        scored_technicians.sort(key=lambda x: x[1], reverse=True)
-
-        return scored_technicians[0][0] if scored_technicians else None
-
-    def _find_least_workload_technician(self, technicians):
-        """Find technician with least current workload."""
-        return (
-            technicians.annotate(
-                active_jobs=django_models.Count(
-                    "job_assignments",
-                    filter=django_models.Q(
-                        job_assignments__status__in=["assigned", "in_progress"]
-                    ),
-                )
-            )
-            .order_by("active_jobs")
-            .first()
-        )
-
-    def _find_round_robin_technician(self, technicians):
-        """Find next technician in round-robin rotation."""
-        # Get last assigned technician
-        last_assignment = (
-            JobAssignment.objects.filter(
-                work_order__organization=self.organization
-            )
-            .order_by("-created_at")
-            .first()
-        )
-
-        if not last_assignment:
-            return technicians.first()
-
-        # Find next technician after last assigned
-        tech_list = list(technicians)
-        try:
-            last_index = tech_list.index(last_assignment.technician)
-            next_index = (last_index + 1) % len(tech_list)
-            return tech_list[next_index]
-        except (ValueError, IndexError):
-            return technicians.first()
+        return technician
 
     def _assign_technician(self, work_order: WorkOrder, technician: Technician):
         """Assign technician to work order."""
@@ -278,7 +242,9 @@ class WorkOrderAutomationService:
             # Get first assigned technician
             if work_order.assigned_technicians:
                 technician_id = work_order.assigned_technicians[0]
-                technician = Technician.objects.get(id=technician_id)
+                technician = Technician.objects.for_organization(self.organization).get(
+                    id=technician_id
+                )
 
                 send_notification.delay(
                     organization_id=str(self.organization.id),
@@ -294,4 +260,3 @@ class WorkOrderAutomationService:
                 )
         except Exception as e:
             logger.error(f"Failed to send technician notification: {e}")
-
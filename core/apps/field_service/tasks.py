@@ -0,0 +1,63 @@
+"""
+Celery tasks for field service.
+"""
+
+import logging
+from itertools import groupby
+
+from celery import shared_task
+from django.db import transaction
+
+from apps.tickets.models import TicketEvent
+
+from .locations import flush_locations
+from .services import WorkOrderAutomationService
+
+logger = logging.getLogger(__name__)
+
+EVENT_BATCH_SIZE = 100
+MAX_EVENT_ATTEMPTS = 5
+
+
+@shared_task
+def process_ticket_events(batch_size=EVENT_BATCH_SIZE):
+    """
+    Create work orders for newly created tickets from the ticket outbox.
+
+    Pending events are claimed with ``SKIP LOCKED`` so concurrent workers
+    never pick up the same rows, and each batch shares one automation
+    service per organization so rules and technician picks are looked up
+    once per batch rather than once per ticket.
+    """
+    with transaction.atomic():
+        events = list(
+            TicketEvent.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(
+                event_type="created",
+                processed_at__isnull=True,
+                attempts__lt=MAX_EVENT_ATTEMPTS,
+            )
+            .select_related("organization", "ticket", "ticket__customer")
+            .order_by("id")[:batch_size]
+        )
+
+        processed = 0
+        events.sort(key=lambda event: (event.organization_id, event.id))
+        for _, group in groupby(events, key=lambda event: event.organization_id):
+            group = list(group)
+            service = WorkOrderAutomationService(group[0].organization)
+            processed += service.process_ticket_events(group)
+
+    failed = len(events) - processed
+    if failed:
+        logger.warning(f"{failed} ticket events failed and will be retried")
+    return {"claimed": len(events), "processed": processed, "failed": failed}
+
+
+@shared_task
+def flush_technician_locations():
+    """Copy live technician positions to the database in bulk."""
+    updated = flush_locations()
+    if updated:
+        logger.debug(f"Flushed {updated} technician locations")
+    return updated
@@ -11,6 +11,7 @@ from django.db.models import Q, Count, Avg
 from django.utils import timezone
 from datetime import timedelta
 
+from .locations import record_location
 from .models import WorkOrder, Technician, Asset, Inventory, ServiceReport, Route
 from .forms import WorkOrderForm, TechnicianForm, AssetForm, ServiceReportForm
 from apps.organizations.models import Organization
@@ -348,15 +349,74 @@ def optimize_routes(request):
 
         optimizer = RouteOptimizer()
         optimized_routes = optimizer.optimize_daily_routes(
-            date, request.user.organization
+            date,
+            request.user.organization,
+            mode=request.POST.get("mode", "technician"),
         )
 
-        return JsonResponse({"success": True, "routes": optimized_routes})
+        return JsonResponse(
+            {
+                "success": True,
+                "routes": [_route_payload(route) for route in optimized_routes],
+            }
+        )
 
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
 
+def _route_payload(route):
+    return {
+        "id": str(route.id),
+        "technician": str(route.technician_id),
+        "work_orders": route.work_orders,
+        "optimized_sequence": route.optimized_sequence,
+        "total_distance": float(route.total_distance),
+        "total_duration": route.total_duration,
+    }
+
+
+@login_required
+@require_http_methods(["POST"])
+def update_route(request, route_id):
+    """Insert an urgent work order into, or remove one from, a planned route."""
+    if request.user.role not in ["agent", "admin"]:
+        return JsonResponse({"error": "Permission denied"}, status=403)
+
+    route = get_object_or_404(
+        Route, id=route_id, organization=request.user.organization
+    )
+    action = request.POST.get("action")
+    work_order_id = request.POST.get("work_order_id")
+    if action not in ("insert", "remove") or not work_order_id:
+        return JsonResponse(
+            {"error": "action (insert/remove) and work_order_id required"}, status=400
+        )
+
+    from .route_optimizer import RouteOptimizer
+
+    optimizer = RouteOptimizer()
+    try:
+        if action == "insert":
+            work_order = get_object_or_404(
+                WorkOrder, id=work_order_id, organization=request.user.organization
+            )
+            route, position = optimizer.insert_work_order(route, work_order)
+            return JsonResponse(
+                {
+                    "success": True,
+                    "position": position + 1,
+                    "route": _route_payload(route),
+                }
+            )
+
+        route = optimizer.remove_work_order(route, work_order_id)
+        return JsonResponse({"success": True, "route": _route_payload(route)})
+
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+
 @login_required
 def field_service_dashboard(request):
     """Field service dashboard."""
@@ -448,15 +508,12 @@ def update_technician_location(request, technician_id):
         return JsonResponse({"error": "Latitude and longitude required"}, status=400)
 
     try:
-        from django.contrib.gis.geos import Point
-
-        # Update location
-        point = Point(float(longitude), float(latitude))
-        technician.current_location = point
-        technician.last_location_update = timezone.now()
-        technician.save()
+        # Live position; current_location is updated by the periodic flush
+        record_location(technician.organization_id, technician.id, latitude, longitude)
 
         return JsonResponse({"success": True})
 
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
@@ -0,0 +1,446 @@
+"""
+Fleet-wide vehicle routing for field service.
+
+``solve_fleet`` plans every technician's day in a single model. Each
+technician is a vehicle that starts at their current location, and each
+work order is a stop with a service time, an optional time window and the
+set of technicians whose skills cover it. Vehicles are limited by job count
+and shift length. Routes are open: a technician's day ends at their last
+job.
+
+OR-Tools is used when it is installed. Otherwise a pure-Python heuristic
+runs: nearest-technician seeding, Clarke-Wright savings per technician,
+cheapest feasible insertion for leftovers, then 2-opt. Both share one
+precomputed distance matrix and a total time budget.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from .distance import haversine_matrix
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+TRAVEL_SPEED_M_PER_MIN = 500  # ~30 km/h urban average
+DEFAULT_TIME_BUDGET = 45  # seconds for the whole fleet
+DROP_PENALTY = 10000000  # OR-Tools cost of leaving a job unassigned
+
+
+@dataclass
+class Vehicle:
+    """A technician's day: start point, shift and job capacity."""
+
+    key: object
+    start: Tuple[float, float]  # (lat, lng)
+    shift_start: int = 8 * 60  # minutes from midnight
+    shift_end: int = 17 * 60
+    capacity: int = 8
+    skills: FrozenSet[str] = frozenset()
+
+
+@dataclass
+class Job:
+    """A work order stop. Windows bound the arrival time, in minutes."""
+
+    key: object
+    location: Tuple[float, float]  # (lat, lng)
+    service_time: int = 60
+    window_start: Optional[int] = None
+    window_end: Optional[int] = None
+    required_skills: FrozenSet[str] = frozenset()
+    priority: int = 1  # weights the drop penalty
+
+
+@dataclass
+class PlannedStop:
+    key: object
+    arrival: int
+    departure: int
+
+
+@dataclass
+class FleetSolution:
+    routes: Dict[object, List[PlannedStop]] = field(default_factory=dict)
+    distances: Dict[object, int] = field(default_factory=dict)  # meters
+    unassigned: List[object] = field(default_factory=list)
+    solver: str = ""
+
+
+class FleetProblem:
+    """
+    Routing model shared by both solvers.
+
+    Node ``v`` (``0 <= v < len(vehicles)``) is vehicle ``v``'s start and
+    node ``len(vehicles) + j`` is job ``j``.
+    """
+
+    def __init__(self, vehicles, jobs, matrix=None):
+        self.vehicles = list(vehicles)
+        self.jobs = list(jobs)
+        self.offset = len(self.vehicles)
+        if matrix is None:
+            matrix = haversine_matrix(
+                [vehicle.start for vehicle in self.vehicles]
+                + [job.location for job in self.jobs]
+            )
+        matrix = np.asarray(matrix)
+        # Plain lists: the solvers index single cells, which is much faster
+        # on lists than on NumPy arrays
+        self.matrix = matrix.tolist()
+        self.travel = np.ceil(matrix / TRAVEL_SPEED_M_PER_MIN).astype(int).tolist()
+        self.windows = [
+            (
+                job.window_start if job.window_start is not None else 0,
+                job.window_end if job.window_end is not None else MINUTES_PER_DAY,
+            )
+            for job in self.jobs
+        ]
+        self.allowed = [
+            [
+                index
+                for index, vehicle in enumerate(self.vehicles)
+                if job.required_skills <= vehicle.skills
+            ]
+            for job in self.jobs
+        ]
+
+    def node(self, job_index):
+        return self.offset + job_index
+
+    def schedule(self, vehicle_index, sequence):
+        """Arrival minute per job, or ``None`` if a window or the shift is broken."""
+        vehicle = self.vehicles[vehicle_index]
+        clock = vehicle.shift_start
+        current = vehicle_index
+        arrivals = []
+        for job_index in sequence:
+            node = self.node(job_index)
+            clock += self.travel[current][node]
+            window_start, window_end = self.windows[job_index]
+            if clock > window_end:
+                return None
+            clock = max(clock, window_start)
+            arrivals.append(clock)
+            clock += self.jobs[job_index].service_time
+            current = node
+        if clock > vehicle.shift_end:
+            return None
+        return arrivals
+
+    def path_distance(self, vehicle_index, sequence):
+        distance = 0
+        current = vehicle_index
+        for job_index in sequence:
+            node = self.node(job_index)
+            distance += self.matrix[current][node]
+            current = node
+        return distance
+
+    def build_solution(self, sequences, unassigned, solver):
+        solution = FleetSolution(
+            unassigned=[self.jobs[index].key for index in unassigned], solver=solver
+        )
+        for vehicle_index, sequence in enumerate(sequences):
+            if not sequence:
+                continue
+            key = self.vehicles[vehicle_index].key
+            arrivals = self.schedule(vehicle_index, sequence)
+            solution.routes[key] = [
+                PlannedStop(
+                    key=self.jobs[job_index].key,
+                    arrival=arrival,
+                    departure=arrival + self.jobs[job_index].service_time,
+                )
+                for job_index, arrival in zip(sequence, arrivals)
+            ]
+            solution.distances[key] = self.path_distance(vehicle_index, sequence)
+        return solution
+
+
+def _savings_sequence(problem, vehicle_index, job_indices):
+    """
+    Clarke-Wright savings for one technician.
+
+    Chains are merged end-to-end in order of the distance saved by not
+    returning to the start point between them. A merge is kept only if the
+    merged chain still schedules. Returns ``(sequence, leftovers)``.
+    """
+    matrix = problem.matrix
+    chains = {job_index: [job_index] for job_index in job_indices}
+    savings = sorted(
+        (
+            (
+                matrix[vehicle_index][problem.node(a)]
+                + matrix[vehicle_index][problem.node(b)]
+                - matrix[problem.node(a)][problem.node(b)],
+                a,
+                b,
+            )
+            for a, b in combinations(job_indices, 2)
+        ),
+        key=lambda saving: saving[0],
+        reverse=True,
+    )
+
+    for _, a, b in savings:
+        chain_a, chain_b = chains[a], chains[b]
+        if chain_a is chain_b:
+            continue
+        if chain_a[-1] != a:
+            if chain_a[0] != a:
+                continue
+            chain_a = chain_a[::-1]
+        if chain_b[0] != b:
+            if chain_b[-1] != b:
+                continue
+            chain_b = chain_b[::-1]
+
+        for merged in (chain_a + chain_b, chain_b + chain_a):
+            if problem.schedule(vehicle_index, merged) is not None:
+                for job_index in merged:
+                    chains[job_index] = merged
+                break
+
+    # Chain the remaining pieces, earliest deadline first
+    distinct = {id(chain): chain for chain in chains.values()}.values()
+    sequence, leftovers = [], []
+    for chain in sorted(distinct, key=lambda c: min(problem.windows[j][1] for j in c)):
+        for candidate in (chain, chain[::-1]):
+            if problem.schedule(vehicle_index, sequence + candidate) is not None:
+                sequence += candidate
+                break
+        else:
+            leftovers.extend(chain)
+    return sequence, leftovers
+
+
+def _insert_cheapest(problem, sequences, job_index):
+    """Insert a job where it adds the least distance. Returns success."""
+    matrix = problem.matrix
+    node = problem.node(job_index)
+    candidates = []
+    for vehicle_index in problem.allowed[job_index]:
+        sequence = sequences[vehicle_index]
+        if len(sequence) >= problem.vehicles[vehicle_index].capacity:
+            continue
+        previous = vehicle_index
+        for position in range(len(sequence) + 1):
+            if position < len(sequence):
+                following = problem.node(sequence[position])
+                delta = (
+                    matrix[previous][node]
+                    + matrix[node][following]
+                    - matrix[previous][following]
+                )
+            else:
+                following = None
+                delta = matrix[previous][node]
+            candidates.append((delta, vehicle_index, position))
+            previous = following
+
+    for _, vehicle_index, position in sorted(candidates, key=lambda c: c[0]):
+        sequence = sequences[vehicle_index]
+        trial = sequence[:position] + [job_index] + sequence[position:]
+        if problem.schedule(vehicle_index, trial) is not None:
+            sequences[vehicle_index] = trial
+            return True
+    return False
+
+
+def _two_opt(problem, vehicle_index, sequence, deadline):
+    """Reverse segments of an open path while that shortens it and still schedules."""
+    matrix = problem.matrix
+    nodes = [vehicle_index] + [problem.node(job_index) for job_index in sequence]
+    improved = True
+    while improved and time.monotonic() < deadline:
+        improved = False
+        for i in range(1, len(nodes) - 1):
+            for k in range(i + 1, len(nodes)):
+                delta = matrix[nodes[i - 1]][nodes[k]] - matrix[nodes[i - 1]][nodes[i]]
+                if k + 1 < len(nodes):
+                    delta += (
+                        matrix[nodes[i]][nodes[k + 1]] - matrix[nodes[k]][nodes[k + 1]]
+                    )
+                if delta >= 0:
+                    continue
+                trial = nodes[:i] + nodes[i : k + 1][::-1] + nodes[k + 1 :]
+                trial_sequence = [node - problem.offset for node in trial[1:]]
+                if problem.schedule(vehicle_index, trial_sequence) is not None:
+                    nodes = trial
+                    improved = True
+    return [node - problem.offset for node in nodes[1:]]
+
+
+def _solve_heuristic(problem, deadline):
+    matrix = problem.matrix
+    clusters = [[] for _ in problem.vehicles]
+    pending = []
+
+    # Seed: tightest deadlines first, each to the nearest qualified technician
+    for job_index in sorted(
+        range(len(problem.jobs)),
+        key=lambda j: (problem.windows[j][1], -problem.jobs[j].priority),
+    ):
+        node = problem.node(job_index)
+        for vehicle_index in sorted(
+            problem.allowed[job_index], key=lambda v: matrix[v][node]
+        ):
+            if len(clusters[vehicle_index]) < problem.vehicles[vehicle_index].capacity:
+                clusters[vehicle_index].append(job_index)
+                break
+        else:
+            pending.append(job_index)
+
+    sequences = []
+    for vehicle_index, cluster in enumerate(clusters):
+        sequence, leftovers = _savings_sequence(problem, vehicle_index, cluster)
+        sequences.append(sequence)
+        pending.extend(leftovers)
+
+    unassigned = []
+    for job_index in sorted(pending, key=lambda j: -problem.jobs[j].priority):
+        if not _insert_cheapest(problem, sequences, job_index):
+            unassigned.append(job_index)
+
+    for vehicle_index, sequence in enumerate(sequences):
+        if len(sequence) > 2 and time.monotonic() < deadline:
+            sequences[vehicle_index] = _two_opt(
+                problem, vehicle_index, sequence, deadline
+            )
+
+    return problem.build_solution(sequences, unassigned, "savings")
+
+
+def _solve_ortools(problem, time_budget):
+    from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+
+    vehicle_count = len(problem.vehicles)
+    job_count = len(problem.jobs)
+    end_node = vehicle_count + job_count  # shared dummy end for open routes
+
+    manager = pywrapcp.RoutingIndexManager(
+        end_node + 1,
+        vehicle_count,
+        list(range(vehicle_count)),
+        [end_node] * vehicle_count,
+    )
+    routing = pywrapcp.RoutingModel(manager)
+
+    def service_time(node):
+        if problem.offset <= node < end_node:
+            return problem.jobs[node - problem.offset].service_time
+        return 0
+
+    def distance_callback(from_index, to_index):
+        from_node = manager.IndexToNode(from_index)
+        to_node = manager.IndexToNode(to_index)
+        if from_node == end_node or to_node == end_node:
+            return 0
+        return problem.matrix[from_node][to_node]
+
+    def time_callback(from_index, to_index):
+        from_node = manager.IndexToNode(from_index)
+        to_node = manager.IndexToNode(to_index)
+        if from_node == end_node or to_node == end_node:
+            return service_time(from_node)
+        return service_time(from_node) + problem.travel[from_node][to_node]
+
+    def demand_callback(index):
+        return 1 if problem.offset <= manager.IndexToNode(index) < end_node else 0
+
+    routing.SetArcCostEvaluatorOfAllVehicles(
+        routing.RegisterTransitCallback(distance_callback)
+    )
+    routing.AddDimension(
+        routing.RegisterTransitCallback(time_callback),
+        MINUTES_PER_DAY,
+        MINUTES_PER_DAY,
+        False,
+        "Time",
+    )
+    routing.AddDimensionWithVehicleCapacity(
+        routing.RegisterUnaryTransitCallback(demand_callback),
+        0,
+        [vehicle.capacity for vehicle in problem.vehicles],
+        True,
+        "Jobs",
+    )
+    time_dimension = routing.GetDimensionOrDie("Time")
+
+    for job_index, job in enumerate(problem.jobs):
+        index = manager.NodeToIndex(problem.node(job_index))
+        time_dimension.CumulVar(index).SetRange(*problem.windows[job_index])
+        routing.VehicleVar(index).SetValues([-1] + problem.allowed[job_index])
+        routing.AddDisjunction([index], DROP_PENALTY * job.priority)
+
+    for vehicle_index, vehicle in enumerate(problem.vehicles):
+        for index in (routing.Start(vehicle_index), routing.End(vehicle_index)):
+            time_dimension.CumulVar(index).SetRange(
+                vehicle.shift_start, vehicle.shift_end
+            )
+
+    search_parameters = pywrapcp.DefaultRoutingSearchParameters()
+    search_parameters.first_solution_strategy = (
+        routing_enums_pb2.FirstSolutionStrategy.PARALLEL_CHEAPEST_INSERTION
+    )
+    search_parameters.local_search_metaheuristic = (
+        routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
+    )
+    search_parameters.time_limit.FromSeconds(max(1, int(time_budget)))
+
+    solution = routing.SolveWithParameters(search_parameters)
+    if not solution:
+        return None
+
+    sequences = []
+    routed = set()
+    for vehicle_index in range(vehicle_count):
+        sequence = []
+        index = solution.Value(routing.NextVar(routing.Start(vehicle_index)))
+        while not routing.IsEnd(index):
+            job_index = manager.IndexToNode(index) - problem.offset
+            sequence.append(job_index)
+            routed.add(job_index)
+            index = solution.Value(routing.NextVar(index))
+        sequences.append(sequence)
+
+    unassigned = [index for index in range(job_count) if index not in routed]
+    return problem.build_solution(sequences, unassigned, "ortools")
+
+
+def solve_fleet(
+    vehicles, jobs, matrix=None, time_budget=DEFAULT_TIME_BUDGET, solver="auto"
+):
+    """
+    Plan routes for every vehicle at once.
+
+    ``matrix`` is an optional precomputed distance matrix in meters ordered
+    vehicles first, then jobs. ``solver`` is ``"auto"``, ``"ortools"`` or
+    ``"heuristic"``. ``time_budget`` covers the whole solve.
+    """
+    started = time.monotonic()
+    deadline = started + time_budget
+
+    if not vehicles or not jobs:
+        return FleetSolution(unassigned=[job.key for job in jobs], solver="none")
+
+    problem = FleetProblem(vehicles, jobs, matrix)
+
+    if solver in ("auto", "ortools"):
+        try:
+            solution = _solve_ortools(problem, deadline - time.monotonic())
+            if solution is not None:
+                return solution
+            logger.warning("OR-Tools found no fleet solution, using heuristic")
+        except ImportError:
+            if solver == "ortools":
+                raise
+            logger.info("OR-Tools not available, using savings + 2-opt heuristic")
+
+    return _solve_heuristic(problem, deadline)
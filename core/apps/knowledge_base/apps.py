@@ -5,3 +5,6 @@ class KnowledgeBaseConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.knowledge_base"
     verbose_name = "Knowledge Base"
+
+    def ready(self):
+        import apps.knowledge_base.signals
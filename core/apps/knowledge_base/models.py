@@ -263,3 +263,92 @@ class KBSearch(models.Model):
 
     def __str__(self):
         return f"Search: {self.query}"
+
+
+class KBArticleDailyStats(models.Model):
+    """
+    Daily per-article rollup of views and feedback votes.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    organization = models.ForeignKey(
+        "organizations.Organization", on_delete=models.CASCADE
+    )
+    article = models.ForeignKey(
+        KBArticle, on_delete=models.CASCADE, related_name="daily_stats"
+    )
+    date = models.DateField(help_text="Bucket date")
+    views_count = models.PositiveIntegerField(default=0)
+    helpful_count = models.PositiveIntegerField(default=0)
+    not_helpful_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "kb_article_daily_stats"
+        verbose_name = "KB Article Daily Stats"
+        verbose_name_plural = "KB Article Daily Stats"
+        unique_together = ["article", "date"]
+        indexes = [
+            models.Index(fields=["organization", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.article_id} @ {self.date}"
+
+
+class KBSearchDailyStats(models.Model):
+    """
+    Daily rollup of search query counts.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    organization = models.ForeignKey(
+        "organizations.Organization", on_delete=models.CASCADE
+    )
+    date = models.DateField(help_text="Bucket date")
+    query = models.CharField(max_length=500, help_text="Search query")
+    search_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "kb_search_daily_stats"
+        verbose_name = "KB Search Daily Stats"
+        verbose_name_plural = "KB Search Daily Stats"
+        unique_together = ["organization", "date", "query"]
+        indexes = [
+            models.Index(fields=["organization", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.query} @ {self.date}"
+
+
+class KBCategoryStats(models.Model):
+    """
+    Current article counts per category and status.
+
+    ``category`` is null for uncategorised articles so that the status
+    totals can be summed from this table alone.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    organization = models.ForeignKey(
+        "organizations.Organization", on_delete=models.CASCADE
+    )
+    category = models.ForeignKey(
+        KBCategory,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="stats",
+    )
+    status = models.CharField(max_length=20, choices=KBArticle.STATUS_CHOICES)
+    article_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "kb_category_stats"
+        verbose_name = "KB Category Stats"
+        verbose_name_plural = "KB Category Stats"
+        unique_together = ["organization", "category", "status"]
+
+    def __str__(self):
+        return f"{self.category_id} [{self.status}]: {self.article_count}"
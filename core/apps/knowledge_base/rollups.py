@@ -0,0 +1,296 @@
+"""
+Precomputed knowledge base analytics rollups.
+
+Raw events (article views, feedback votes, searches) are folded into daily
+buckets as they happen, and category/status article counts are kept as a
+small snapshot table. ``get_kb_analytics`` reads only from these tables, so
+dashboard cost depends on the requested date range rather than on the size
+of the raw history. ``rebuild_daily_stats`` recomputes a day from the raw
+tables and is run nightly to reconcile any increments that were lost.
+"""
+
+import logging
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import (
+    KBArticle,
+    KBArticleDailyStats,
+    KBArticleView,
+    KBCategory,
+    KBCategoryStats,
+    KBFeedback,
+    KBSearch,
+    KBSearchDailyStats,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RANGE_DAYS = 30
+TOP_N = 10
+
+
+def _increment(model, lookup, **deltas):
+    """Add ``deltas`` to the rollup row matching ``lookup``, creating it if missing."""
+    updates = {field: F(field) + value for field, value in deltas.items()}
+    if model.objects.filter(**lookup).update(**updates):
+        return
+
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another writer created the bucket first
+        model.objects.filter(**lookup).update(**updates)
+
+
+def _day_bounds(day):
+    """Return aware [start, end) datetimes covering ``day``."""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def record_article_view(article, day=None):
+    """Count one view of ``article`` in today's bucket."""
+    _increment(
+        KBArticleDailyStats,
+        {
+            "organization_id": article.organization_id,
+            "article_id": article.id,
+            "date": day or timezone.localdate(),
+        },
+        views_count=1,
+    )
+
+
+def record_feedback(article, feedback_type, day=None):
+    """Count a helpful/not-helpful vote for ``article`` in today's bucket."""
+    field = {
+        "helpful": "helpful_count",
+        "not_helpful": "not_helpful_count",
+    }.get(feedback_type)
+    if not field:
+        return
+
+    _increment(
+        KBArticleDailyStats,
+        {
+            "organization_id": article.organization_id,
+            "article_id": article.id,
+            "date": day or timezone.localdate(),
+        },
+        **{field: 1},
+    )
+
+
+def record_search(organization, query, day=None):
+    """Count one search for ``query`` in today's bucket."""
+    _increment(
+        KBSearchDailyStats,
+        {
+            "organization_id": organization.id,
+            "date": day or timezone.localdate(),
+            "query": query[:500],
+        },
+        search_count=1,
+    )
+
+
+def refresh_category_stats(organization):
+    """
+    Rebuild the category/status article count snapshot for an organization.
+
+    Every category gets a row for every status (zero counts included) so the
+    analytics view never needs to touch ``KBCategory`` or ``KBArticle``.
+    """
+    counts = {
+        (row["category_id"], row["status"]): row["article_count"]
+        for row in KBArticle.objects.for_organization(organization)
+        .values("category_id", "status")
+        .annotate(article_count=Count("id"))
+    }
+    category_ids = list(
+        KBCategory.objects.for_organization(organization).values_list("id", flat=True)
+    )
+    statuses = [status for status, _ in KBArticle.STATUS_CHOICES]
+
+    rows = [
+        KBCategoryStats(
+            organization=organization,
+            category_id=category_id,
+            status=status,
+            article_count=counts.get((category_id, status), 0),
+        )
+        for category_id in category_ids + [None]
+        for status in statuses
+    ]
+
+    with transaction.atomic():
+        KBCategoryStats.objects.filter(organization=organization).delete()
+        KBCategoryStats.objects.bulk_create(rows)
+
+
+def rebuild_daily_stats(organization, day):
+    """Recompute the daily buckets for ``day`` from the raw event tables."""
+    start, end = _day_bounds(day)
+
+    article_stats = {}
+    for row in (
+        KBArticleView.objects.filter(
+            article__organization=organization,
+            created_at__gte=start,
+            created_at__lt=end,
+        )
+        .values("article_id")
+        .annotate(views=Count("id"))
+    ):
+        article_stats.setdefault(row["article_id"], {})["views_count"] = row["views"]
+
+    for row in (
+        KBFeedback.objects.filter(
+            article__organization=organization,
+            created_at__gte=start,
+            created_at__lt=end,
+        )
+        .values("article_id")
+        .annotate(
+            helpful=Count("id", filter=Q(feedback_type="helpful")),
+            not_helpful=Count("id", filter=Q(feedback_type="not_helpful")),
+        )
+    ):
+        stats = article_stats.setdefault(row["article_id"], {})
+        stats["helpful_count"] = row["helpful"]
+        stats["not_helpful_count"] = row["not_helpful"]
+
+    search_stats = (
+        KBSearch.objects.filter(
+            organization=organization, created_at__gte=start, created_at__lt=end
+        )
+        .values("query")
+        .annotate(search_count=Count("id"))
+    )
+
+    with transaction.atomic():
+        KBArticleDailyStats.objects.filter(organization=organization, date=day).delete()
+        KBArticleDailyStats.objects.bulk_create(
+            [
+                KBArticleDailyStats(
+                    organization=organization,
+                    article_id=article_id,
+                    date=day,
+                    **stats,
+                )
+                for article_id, stats in article_stats.items()
+            ]
+        )
+
+        KBSearchDailyStats.objects.filter(organization=organization, date=day).delete()
+        KBSearchDailyStats.objects.bulk_create(
+            [
+                KBSearchDailyStats(
+                    organization=organization,
+                    date=day,
+                    query=row["query"][:500],
+                    search_count=row["search_count"],
+                )
+                for row in search_stats
+            ]
+        )
+
+    logger.info(
+        f"Rebuilt KB rollups for organization {organization.id} on {day}: "
+        f"{len(article_stats)} articles"
+    )
+
+
+def get_kb_analytics(organization, start_date=None, end_date=None):
+    """
+    Build the KB analytics payload from the rollup tables.
+
+    Daily metrics are summed over ``[start_date, end_date]`` (inclusive,
+    defaulting to the last ``DEFAULT_RANGE_DAYS`` days).
+    """
+    end_date = end_date or timezone.localdate()
+    start_date = start_date or end_date - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+
+    status_totals = {
+        row["status"]: row["total"] or 0
+        for row in KBCategoryStats.objects.filter(organization=organization)
+        .values("status")
+        .annotate(total=Sum("article_count"))
+    }
+
+    article_buckets = (
+        KBArticleDailyStats.objects.filter(
+            organization=organization,
+            date__gte=start_date,
+            date__lte=end_date,
+            article__status="published",
+        )
+        .values("article_id", "article__title")
+        .annotate(
+            views=Sum("views_count"),
+            helpful=Sum("helpful_count"),
+            not_helpful=Sum("not_helpful_count"),
+        )
+    )
+    most_viewed = article_buckets.order_by("-views")[:TOP_N]
+    most_helpful = article_buckets.order_by("-helpful")[:TOP_N]
+
+    popular_searches = (
+        KBSearchDailyStats.objects.filter(
+            organization=organization, date__gte=start_date, date__lte=end_date
+        )
+        .values("query")
+        .annotate(count=Sum("search_count"))
+        .order_by("-count")[:TOP_N]
+    )
+
+    category_stats = (
+        KBCategoryStats.objects.filter(
+            organization=organization, category__is_active=True
+        )
+        .values("category_id", "category__name")
+        .annotate(article_count=Sum("article_count"))
+        .order_by("-article_count")
+    )
+
+    return {
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "total_articles": sum(status_totals.values()),
+        "published_articles": status_totals.get("published", 0),
+        "draft_articles": status_totals.get("draft", 0),
+        "most_viewed": [
+            {
+                "id": str(row["article_id"]),
+                "title": row["article__title"],
+                "views_count": row["views"],
+                "helpful_count": row["helpful"],
+            }
+            for row in most_viewed
+        ],
+        "most_helpful": [
+            {
+                "id": str(row["article_id"]),
+                "title": row["article__title"],
+                "helpful_count": row["helpful"],
+                "not_helpful_count": row["not_helpful"],
+            }
+            for row in most_helpful
+        ],
+        "popular_searches": [
+            {"query": row["query"], "count": row["count"]} for row in popular_searches
+        ],
+        "category_stats": [
+            {
+                "id": str(row["category_id"]),
+                "name": row["category__name"],
+                "article_count": row["article_count"],
+            }
+            for row in category_stats
+        ],
+    }
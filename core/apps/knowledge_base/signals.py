@@ -0,0 +1,34 @@
+"""
+Signal handlers that keep knowledge base rollups in sync.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import KBArticle, KBCategory
+from .rollups import refresh_category_stats
+
+
+def _schedule_category_refresh(instance):
+    """Refresh category counts once the surrounding transaction commits."""
+    organization = instance.organization
+    transaction.on_commit(lambda: refresh_category_stats(organization))
+
+
+@receiver(post_save, sender=KBArticle)
+@receiver(post_delete, sender=KBArticle)
+def update_category_stats_for_article(sender, instance, **kwargs):
+    """Article status/category changes move counts between buckets."""
+    update_fields = kwargs.get("update_fields")
+    if update_fields and not {"status", "category"} & set(update_fields):
+        # Counter-only saves (views, votes) don't affect category counts
+        return
+    _schedule_category_refresh(instance)
+
+
+@receiver(post_save, sender=KBCategory)
+@receiver(post_delete, sender=KBCategory)
+def update_category_stats_for_category(sender, instance, **kwargs):
+    """New or removed categories add/drop their rows."""
+    _schedule_category_refresh(instance)
@@ -0,0 +1,35 @@
+"""
+Celery tasks for knowledge base analytics rollups.
+"""
+
+from celery import shared_task
+from django.utils import timezone
+from datetime import timedelta
+import logging
+
+from apps.organizations.models import Organization
+from .rollups import rebuild_daily_stats, refresh_category_stats
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def rebuild_kb_rollups(days=1):
+    """
+    Nightly reconciliation of KB rollups.
+
+    Recomputes the last ``days`` daily buckets (excluding today) from the raw
+    view/feedback/search tables and refreshes the category count snapshot.
+    Passing a large ``days`` value doubles as a backfill.
+    """
+    today = timezone.localdate()
+
+    for organization in Organization.objects.filter(is_active=True):
+        try:
+            for offset in range(1, days + 1):
+                rebuild_daily_stats(organization, today - timedelta(days=offset))
+            refresh_category_stats(organization)
+        except Exception as e:
+            logger.error(
+                f"Error rebuilding KB rollups for organization {organization.id}: {str(e)}"
+            )
@@ -9,9 +9,16 @@ from django.views.decorators.http import require_http_methods
 from django.core.paginator import Paginator
 from django.db.models import Q, Count
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 from .models import KBArticle, KBCategory, KBFeedback, KBSearch
 from .forms import KBArticleForm, KBCategoryForm, KBFeedbackForm
+from .rollups import (
+    get_kb_analytics,
+    record_article_view,
+    record_feedback,
+    record_search,
+)
 from apps.organizations.models import Organization
 
 
@@ -125,6 +132,7 @@ def kb_search(request):
         user=request.user if request.user.is_authenticated else None,
         ip_address=request.META.get("REMOTE_ADDR"),
     )
+    record_search(organization, query)
 
     # Format results
     results = []
@@ -179,6 +187,7 @@ def track_article_view(article, request):
     # Update view count
     article.views_count += 1
     article.save(update_fields=["views_count"])
+    record_article_view(article)
 
 
 @login_required
@@ -204,6 +213,7 @@ def kb_feedback(request, article_id):
             article.not_helpful_count += 1
 
         article.save(update_fields=["helpful_count", "not_helpful_count"])
+        record_feedback(article, feedback.feedback_type)
 
         return JsonResponse(
             {"success": True, "message": "Feedback submitted successfully"}
@@ -331,80 +341,27 @@ def kb_article_publish(request, article_id):
 
 @login_required
 def kb_analytics(request):
-    """Knowledge base analytics dashboard."""
+    """
+    Knowledge base analytics dashboard.
+
+    Served entirely from the precomputed rollups; ``start_date``/``end_date``
+    (YYYY-MM-DD) select the range of daily buckets to sum.
+    """
     if request.user.role not in ["agent", "admin"]:
         return JsonResponse({"error": "Permission denied"}, status=403)
 
-    organization = request.user.organization
+    start_date = end_date = None
+    try:
+        if request.GET.get("start_date"):
+            start_date = parse_date(request.GET["start_date"])
+        if request.GET.get("end_date"):
+            end_date = parse_date(request.GET["end_date"])
+    except ValueError:
+        start_date = end_date = None
 
-    # Article statistics
-    total_articles = KBArticle.objects.filter(organization=organization).count()
-    published_articles = KBArticle.objects.filter(
-        organization=organization, status="published"
-    ).count()
-    draft_articles = KBArticle.objects.filter(
-        organization=organization, status="draft"
-    ).count()
-
-    # Most viewed articles
-    most_viewed = KBArticle.objects.filter(
-        organization=organization, status="published"
-    ).order_by("-views_count")[:10]
-
-    # Most helpful articles
-    most_helpful = KBArticle.objects.filter(
-        organization=organization, status="published"
-    ).order_by("-helpful_count")[:10]
-
-    # Search analytics
-    popular_searches = (
-        KBSearch.objects.filter(organization=organization)
-        .values("query")
-        .annotate(count=Count("query"))
-        .order_by("-count")[:10]
-    )
+    if start_date and end_date and start_date > end_date:
+        return JsonResponse({"error": "start_date must be before end_date"}, status=400)
 
-    # Category statistics
-    category_stats = (
-        KBCategory.objects.filter(organization=organization, is_active=True)
-        .annotate(article_count=Count("articles"))
-        .order_by("-article_count")
-    )
-
-    analytics = {
-        "total_articles": total_articles,
-        "published_articles": published_articles,
-        "draft_articles": draft_articles,
-        "most_viewed": [
-            {
-                "id": str(article.id),
-                "title": article.title,
-                "views_count": article.views_count,
-                "helpful_count": article.helpful_count,
-            }
-            for article in most_viewed
-        ],
-        "most_helpful": [
-            {
-                "id": str(article.id),
-                "title": article.title,
-                "helpful_count": article.helpful_count,
-                "not_helpful_count": article.not_helpful_count,
-            }
-            for article in most_helpful
-        ],
-        "popular_searches": [
-            {"query": search["query"], "count": search["count"]}
-            for search in popular_searches
-        ],
-        "category_stats": [
-            {
-                "id": str(category.id),
-                "name": category.name,
-                "article_count": category.article_count,
-            }
-            for category in category_stats
-        ],
-    }
+    analytics = get_kb_analytics(request.user.organization, start_date, end_date)
 
     return JsonResponse(analytics)
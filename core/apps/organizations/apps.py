@@ -5,3 +5,8 @@ class OrganizationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.organizations"
     verbose_name = "Organizations"
+
+    def ready(self):
+        from .tenant_cache import invalidate_on_change
+
+        invalidate_on_change(self.get_model("Organization"))
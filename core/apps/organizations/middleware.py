@@ -3,14 +3,16 @@ Multi-tenant middleware for organization isolation.
 """
 
 from django.http import Http404
-from django.shortcuts import get_object_or_404
 from django.utils.deprecation import MiddlewareMixin
-from .models import Organization
+from .tenant_cache import get_organization, get_organization_by_slug
 
 
 class TenantMiddleware(MiddlewareMixin):
     """
     Middleware to handle multi-tenant organization isolation.
+
+    Organizations are resolved through ``tenant_cache``, so a warm process
+    runs no queries here.
     """
 
     def process_request(self, request):
@@ -26,26 +28,23 @@ class TenantMiddleware(MiddlewareMixin):
         ):
             return
 
-        # Get organization from subdomain
+        # Get organization from subdomain (the organization's slug)
         if hasattr(request, "subdomain") and request.subdomain:
-            try:
-                request.organization = Organization.objects.get(
-                    subdomain=request.subdomain, is_active=True
-                )
-            except Organization.DoesNotExist:
+            request.organization = get_organization_by_slug(request.subdomain)
+            if request.organization is None:
                 raise Http404("Organization not found")
 
         # Get organization from user if authenticated
-        elif request.user.is_authenticated and hasattr(request.user, "organization"):
-            request.organization = request.user.organization
+        elif request.user.is_authenticated and hasattr(request.user, "organization_id"):
+            if request.user.organization_id:
+                request.organization = get_organization(
+                    request.user.organization_id, active_only=False
+                )
 
         # Get organization from session
         elif "organization_id" in request.session:
-            try:
-                request.organization = Organization.objects.get(
-                    id=request.session["organization_id"], is_active=True
-                )
-            except Organization.DoesNotExist:
+            request.organization = get_organization(request.session["organization_id"])
+            if request.organization is None:
                 del request.session["organization_id"]
 
         # Set organization in thread local for models
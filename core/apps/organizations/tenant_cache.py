@@ -0,0 +1,213 @@
+"""
+In-process cache of tenant context.
+
+TenantMiddleware and FeatureFlagMiddleware resolve the request's
+organization, and its feature flags, on every request. ``tenant_cache``
+keeps the results in a bounded per-process TTL map, so a warm worker
+resolves both without a query:
+
+- organizations are stored as immutable ``OrganizationSnapshot`` values,
+  keyed by slug or id. Each request gets its own ``Organization`` instance
+  built from the snapshot;
+- other apps store values derived from tenant data in the same map, such
+  as the compiled feature flags.
+
+Changes are broadcast through one generation counter in the shared cache.
+Saving or deleting a model registered with ``invalidate_on_change`` bumps
+the counter on commit and clears the writing process's map. Every other
+process reads the counter at most once per ``GENERATION_POLL_INTERVAL``
+and clears its map when the counter has moved.
+"""
+
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import Organization
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "tenant_context:generation"
+TENANT_CACHE_TTL = 5 * 60
+TENANT_CACHE_MAX_ENTRIES = 1000
+TENANT_CACHE_MAX_MISSES = 256
+GENERATION_POLL_INTERVAL = 1.0
+
+# Encrypted fields are left out; they load on first access
+SNAPSHOT_FIELDS = (
+    "id",
+    "name",
+    "slug",
+    "domain",
+    "subscription_tier",
+    "settings",
+    "is_active",
+    "created_at",
+    "updated_at",
+)
+
+
+@dataclass(frozen=True)
+class OrganizationSnapshot:
+    """Field values of one organization, shared between requests."""
+
+    values: tuple
+
+    @classmethod
+    def from_organization(cls, organization):
+        return cls(
+            tuple(
+                copy.deepcopy(getattr(organization, name)) for name in SNAPSHOT_FIELDS
+            )
+        )
+
+    @property
+    def id(self):
+        return self.values[0]
+
+    def to_organization(self):
+        """A fresh ``Organization``, as if loaded from the database."""
+        values = [copy.deepcopy(value) for value in self.values]
+        return Organization.from_db(DEFAULT_DB_ALIAS, SNAPSHOT_FIELDS, values)
+
+
+class TenantCache:
+    """
+    LRU map with a TTL, invalidated through the shared generation counter.
+
+    Missing values (``None``) are cached too, so unknown subdomains don't
+    reach the database on every request. They are kept apart under their
+    own, smaller limit, so arbitrary request hosts can't evict real entries.
+    Expired entries are dropped when read, and on writes to a full map.
+    """
+
+    def __init__(
+        self,
+        ttl=TENANT_CACHE_TTL,
+        poll_interval=GENERATION_POLL_INTERVAL,
+        max_entries=TENANT_CACHE_MAX_ENTRIES,
+        max_misses=TENANT_CACHE_MAX_MISSES,
+    ):
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.max_entries = max_entries
+        self.max_misses = max_misses
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.misses = OrderedDict()
+        self.epoch = 0
+        self.generation = None
+        self.checked_at = None
+
+    def get(self, key, loader):
+        """The cached value of ``key``; ``loader()`` computes it on a miss."""
+        now = time.monotonic()
+        self._sync(now)
+        with self.lock:
+            for entries in (self.entries, self.misses):
+                entry = entries.get(key)
+                if entry is None:
+                    continue
+                if entry[0] > now:
+                    entries.move_to_end(key)
+                    return entry[1]
+                del entries[key]
+            epoch = self.epoch
+
+        value = loader()
+        with self.lock:
+            # Don't store a value loaded before an invalidation
+            if epoch == self.epoch:
+                if value is None:
+                    self._store(self.misses, self.max_misses, key, value, now)
+                else:
+                    self._store(self.entries, self.max_entries, key, value, now)
+        return value
+
+    def _store(self, entries, limit, key, value, now):
+        entries[key] = (now + self.ttl, value)
+        entries.move_to_end(key)
+        if len(entries) <= limit:
+            return
+        for stale in [k for k, (expires, _) in entries.items() if expires <= now]:
+            del entries[stale]
+        while len(entries) > limit:
+            entries.popitem(last=False)
+
+    def clear(self):
+        """Drop this process's entries."""
+        with self.lock:
+            self.entries = OrderedDict()
+            self.misses = OrderedDict()
+            self.epoch += 1
+
+    def invalidate(self):
+        """Clear every process's entries once the current transaction commits."""
+
+        def bump():
+            try:
+                cache.incr(GENERATION_KEY)
+            except ValueError:
+                cache.add(GENERATION_KEY, time.time_ns(), None)
+            self.clear()
+
+        transaction.on_commit(bump)
+
+    def _sync(self, now):
+        if self.checked_at is not None and now - self.checked_at < self.poll_interval:
+            return
+        self.checked_at = now
+        try:
+            generation = cache.get(GENERATION_KEY)
+        except Exception as e:
+            logger.warning(f"Tenant cache generation unavailable: {e}")
+            return
+        if generation != self.generation:
+            self.generation = generation
+            self.clear()
+
+
+tenant_cache = TenantCache()
+
+
+def _invalidate(sender, **kwargs):
+    tenant_cache.invalidate()
+
+
+def invalidate_on_change(model):
+    """Invalidate the tenant cache on every save and delete of ``model``."""
+    uid = f"tenant_cache:{model._meta.label_lower}"
+    post_save.connect(_invalidate, sender=model, dispatch_uid=uid)
+    post_delete.connect(_invalidate, sender=model, dispatch_uid=uid)
+
+
+def _load(**lookup):
+    organization = Organization.objects.filter(**lookup).only(*SNAPSHOT_FIELDS).first()
+    if organization is None:
+        return None
+    return OrganizationSnapshot.from_organization(organization)
+
+
+def _resolve(key, **lookup):
+    snapshot = tenant_cache.get(key, lambda: _load(**lookup))
+    return snapshot.to_organization() if snapshot is not None else None
+
+
+def get_organization_by_slug(slug):
+    """The active organization with ``slug``, or None."""
+    return _resolve(("organization", "slug", slug), slug=slug, is_active=True)
+
+
+def get_organization(organization_id, active_only=True):
+    """The organization with ``organization_id``, or None."""
+    lookup = {"id": organization_id}
+    if active_only:
+        lookup["is_active"] = True
+    return _resolve(("organization", "id", organization_id, active_only), **lookup)
@@ -0,0 +1,40 @@
+# Generated manually for the ticket event outbox
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+        ('tickets', '0007_add_sla_performance_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('created', 'Created')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_events', to='organizations.organization')),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='tickets.ticket')),
+            ],
+            options={
+                'db_table': 'ticket_outbox_events',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ticketevent',
+            constraint=models.UniqueConstraint(fields=('ticket', 'event_type'), name='ticket_event_once'),
+        ),
+        migrations.AddIndex(
+            model_name='ticketevent',
+            index=models.Index(condition=models.Q(processed_at__isnull=True), fields=['id'], name='ticket_event_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated manually for cursor pagination of ticket lists
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0008_add_ticket_outbox_events'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['organization', '-created_at', '-id'], name='ticket_org_created_keyset_idx'),
+        ),
+    ]
@@ -2,7 +2,7 @@
 Ticket system models with multi-tenant support.
 """
 
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.contrib.postgres.fields import JSONField
 from apps.organizations.models import Organization
@@ -116,6 +116,10 @@ class Ticket(models.Model):
             models.Index(fields=["organization", "customer"]),
             models.Index(fields=["ticket_number"]),
             models.Index(fields=["created_at"]),
+            models.Index(
+                fields=["organization", "-created_at", "-id"],
+                name="ticket_org_created_keyset_idx",
+            ),  # For cursor pagination
             models.Index(fields=["priority", "status"]),
             models.Index(fields=["assigned_agent", "status"]),  # For agent workload queries
             models.Index(fields=["sla_policy"]),  # For SLA queries
@@ -130,22 +134,54 @@ class Ticket(models.Model):
     def save(self, *args, **kwargs):
         if not self.ticket_number:
             self.ticket_number = self.generate_ticket_number()
-        super().save(*args, **kwargs)
+        if not self._state.adding:
+            super().save(*args, **kwargs)
+            return
+
+        # The outbox event commits or rolls back together with the ticket
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            TicketEvent.objects.create(
+                organization=self.organization, ticket=self, event_type="created"
+            )
+
+    @classmethod
+    def bulk_create_with_events(cls, tickets, batch_size=None):
+        """
+        Insert unsaved tickets in bulk, with what save() would add: a ticket
+        number each (reserved per organization in one step) and a "created"
+        outbox event.
+        """
+        by_organization = {}
+        for ticket in tickets:
+            if not ticket.ticket_number:
+                by_organization.setdefault(ticket.organization, []).append(ticket)
+
+        with transaction.atomic():
+            for organization, pending in by_organization.items():
+                sequence = TicketNumberSequence.for_organization(organization)
+                numbers = sequence.get_next_numbers(len(pending))
+                for ticket, number in zip(pending, numbers):
+                    ticket.ticket_number = number
+
+            created = cls._base_manager.bulk_create(tickets, batch_size=batch_size)
+            TicketEvent.objects.bulk_create(
+                [
+                    TicketEvent(
+                        organization_id=ticket.organization_id,
+                        ticket=ticket,
+                        event_type="created",
+                    )
+                    for ticket in created
+                ],
+                batch_size=batch_size,
+            )
+        return created
 
     def generate_ticket_number(self):
         """Generate unique sequential ticket number."""
         # Get or create sequence for organization
-        sequence, created = TicketNumberSequence.objects.get_or_create(
-            organization=self.organization,
-            defaults={
-                "prefix": "TK",
-                "current_number": 0,
-                "padding_length": 5,
-                "include_year": True,
-                "include_month": False,
-                "year_reset": True,
-            },
-        )
+        sequence = TicketNumberSequence.for_organization(self.organization)
 
         return sequence.get_next_number()
 
@@ -168,6 +204,47 @@ class Ticket(models.Model):
         self.save(update_fields=["time_to_first_response", "time_to_resolution"])
 
 
+class TicketEvent(models.Model):
+    """
+    Transactional outbox of ticket events.
+
+    Rows are written in the same transaction as the ticket and consumed in
+    batches by background workers, so slow follow-up work (such as work
+    order automation) stays off the request path.
+    """
+
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, related_name="ticket_events"
+    )
+    ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE, related_name="events")
+    event_type = models.CharField(max_length=20, choices=[("created", "Created")])
+
+    # Processing state
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        db_table = "ticket_outbox_events"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ticket", "event_type"], name="ticket_event_once"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["id"],
+                name="ticket_event_pending_idx",
+                condition=models.Q(processed_at__isnull=True),
+            ),
+        ]
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.ticket.ticket_number} - {self.event_type}"
+
+
 class TicketComment(models.Model):
     """Comments and notes on tickets."""
 
@@ -398,8 +475,6 @@ class CannedResponse(models.Model):
         self.save(update_fields=["usage_count"])
 
 
-
-
 class TicketNumberSequence(models.Model):
     """Database sequence for ticket numbering per organization."""
 
@@ -433,6 +508,22 @@ class TicketNumberSequence(models.Model):
     def __str__(self):
         return f"{self.organization.name} - {self.prefix}"
 
+    @classmethod
+    def for_organization(cls, organization):
+        """The organization's sequence, created with defaults if missing."""
+        sequence, created = cls.objects.get_or_create(
+            organization=organization,
+            defaults={
+                "prefix": "TK",
+                "current_number": 0,
+                "padding_length": 5,
+                "include_year": True,
+                "include_month": False,
+                "year_reset": True,
+            },
+        )
+        return sequence
+
     def get_next_number(self):
         """
         Get next ticket number with atomic increment.
@@ -440,8 +531,15 @@ class TicketNumberSequence(models.Model):
         Returns:
             str: Formatted ticket number (e.g., "TK-2025-00001")
         """
-        from django.db import transaction
+        return self.get_next_numbers(1)[0]
 
+    def get_next_numbers(self, count):
+        """
+        Reserve ``count`` consecutive ticket numbers with one atomic increment.
+
+        Returns:
+            list: Formatted ticket numbers, in order
+        """
         with transaction.atomic():
             # Lock the row for update
             sequence = TicketNumberSequence.objects.select_for_update().get(id=self.id)
@@ -450,7 +548,10 @@ class TicketNumberSequence(models.Model):
             current_date = timezone.now().date()
             should_reset = False
 
-            if sequence.year_reset and current_date.year > sequence.last_reset_date.year:
+            if (
+                sequence.year_reset
+                and current_date.year > sequence.last_reset_date.year
+            ):
                 should_reset = True
             elif sequence.month_reset and (
                 current_date.year > sequence.last_reset_date.year
@@ -463,11 +564,15 @@ class TicketNumberSequence(models.Model):
                 sequence.last_reset_date = current_date
 
             # Increment counter
-            sequence.current_number += 1
+            first = sequence.current_number + 1
+            sequence.current_number += count
             sequence.save()
 
-            # Format the number
-            return sequence.format_ticket_number(sequence.current_number)
+            # Format the numbers
+            return [
+                sequence.format_ticket_number(number)
+                for number in range(first, sequence.current_number + 1)
+            ]
 
     def format_ticket_number(self, number):
         """
@@ -499,4 +604,3 @@ class TicketNumberSequence(models.Model):
         parts.append(padded_number)
 
         return self.separator.join(parts)
-
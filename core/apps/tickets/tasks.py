@@ -343,7 +343,7 @@ def check_sla_breaches():
             send_sla_breach_email.delay(ticket.id)
 
             # Log activity
-            from apps.accounts.signals import log_activity
+            from apps.accounts.activity_log import log_activity
 
             log_activity(
                 action="sla_breach",
@@ -354,6 +354,7 @@ def check_sla_breaches():
                 changes={"sla_breach": True},
                 user=None,  # System action
                 description=f"SLA breached for ticket {ticket.ticket_number}",
+                organization=ticket.organization_id,
             )
 
         logger.info(
@@ -110,7 +110,7 @@ def ticket_create(request):
             ticket.save()
 
             # Log activity
-            from apps.accounts.signals import log_activity
+            from apps.accounts.activity_log import log_activity
 
             log_activity(
                 action="create",
@@ -163,7 +163,7 @@ def ticket_assign(request, ticket_id):
         ticket.save()
 
         # Log activity
-        from apps.accounts.signals import log_activity
+        from apps.accounts.activity_log import log_activity
 
         log_activity(
             action="assign",
@@ -223,7 +223,7 @@ def ticket_status_update(request, ticket_id):
     ticket.save()
 
     # Log activity
-    from apps.accounts.signals import log_activity
+    from apps.accounts.activity_log import log_activity
 
     log_activity(
         action="update",
@@ -259,7 +259,7 @@ def ticket_comment_add(request, ticket_id):
         comment.save()
 
         # Log activity
-        from apps.accounts.signals import log_activity
+        from apps.accounts.activity_log import log_activity
 
         log_activity(
             action="comment",
@@ -65,6 +65,7 @@ LOCAL_APPS = [
     'apps.integrations',
     'apps.notifications',
     'apps.api',
+    'apps.features',
     # Enhanced Enterprise Features
     'apps.security',
     'apps.i18n',
@@ -327,6 +328,26 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'apps.tickets.tasks.send_sla_reminders',
         'schedule': 3600.0,  # Run hourly
     },
+    'rebuild-kb-rollups': {
+        'task': 'apps.knowledge_base.tasks.rebuild_kb_rollups',
+        'schedule': 86400.0,  # Run nightly
+    },
+    'refresh-daily-metrics': {
+        'task': 'apps.analytics.tasks.refresh_daily_metrics',
+        'schedule': 60.0,  # Run every minute
+    },
+    'reconcile-daily-metrics': {
+        'task': 'apps.analytics.tasks.reconcile_daily_metrics',
+        'schedule': 86400.0,  # Run nightly
+    },
+    'process-ticket-events': {
+        'task': 'apps.field_service.tasks.process_ticket_events',
+        'schedule': 10.0,  # Drain the ticket outbox every 10 seconds
+    },
+    'flush-technician-locations': {
+        'task': 'apps.field_service.tasks.flush_technician_locations',
+        'schedule': 30.0,  # Persist live GPS positions every 30 seconds
+    },
 }
 
 # Cache Configuration
@@ -468,6 +489,12 @@ MASTER_ENCRYPTION_KEY = os.environ.get('MASTER_ENCRYPTION_KEY', '')
 # Multi-tenant settings
 TENANT_MODEL = 'organizations.Organization'
 
+# Activity Log Writer (see apps.accounts.activity_log)
+ACTIVITY_LOG_BATCH_SIZE = int(os.environ.get('ACTIVITY_LOG_BATCH_SIZE', '500'))
+ACTIVITY_LOG_FLUSH_INTERVAL = float(os.environ.get('ACTIVITY_LOG_FLUSH_INTERVAL', '1.0'))
+ACTIVITY_LOG_MAX_QUEUE = int(os.environ.get('ACTIVITY_LOG_MAX_QUEUE', '10000'))
+ACTIVITY_LOG_SPOOL_DIR = os.environ.get('ACTIVITY_LOG_SPOOL_DIR', str(BASE_DIR / 'logs' / 'activity_spool'))
+
 # OpenAPI/Swagger Documentation Settings
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Helpdesk Platform API',
@@ -80,4 +80,8 @@ ALLOWED_HOSTS = ['*']
 SECURE_SSL_REDIRECT = False
 SECURE_HSTS_SECONDS = 0
 SECURE_HSTS_INCLUDE_SUBDOMAINS = False
-SECURE_HSTS_PRELOAD = False
\ No newline at end of file
+SECURE_HSTS_PRELOAD = False
+
+# Write activity logs on commit, without the flush thread or spool
+ACTIVITY_LOG_FLUSH_INTERVAL = None
+ACTIVITY_LOG_SPOOL_DIR = None
@@ -45,6 +45,7 @@ LOCAL_APPS = [
     'apps.integrations',
     'apps.notifications',
     'apps.api',
+    'apps.features',
     'apps.security',
     'apps.i18n',
     'apps.customization',
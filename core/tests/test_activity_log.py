@@ -0,0 +1,186 @@
+"""
+Activity Log Tests
+Tests the batched, spooled activity log writer.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from apps.accounts import activity_log
+from apps.accounts.activity_log import (
+    ActivityLogWriter,
+    ingest_entries,
+    log_activity,
+    make_entry,
+    read_entries,
+    replay_spool,
+)
+from apps.accounts.models import ActivityLog
+
+from .test_utilities import TestDataFactory
+
+
+class ActivityLogTestCase(TestCase):
+    def setUp(self):
+        self.organization = TestDataFactory.create_organization()
+        self.user = TestDataFactory.create_user(self.organization, "a@example.com")
+        # Flush threads would write outside the test transaction
+        thread = patch.object(ActivityLogWriter, "_ensure_thread")
+        thread.start()
+        self.addCleanup(thread.stop)
+
+    def entries(self, count):
+        return [
+            make_entry(self.organization.id, "update", "ticket", index)
+            for index in range(count)
+        ]
+
+
+class LogActivityTest(ActivityLogTestCase):
+    """Test entries are written when their transaction commits."""
+
+    def setUp(self):
+        super().setUp()
+        writer = patch.object(
+            activity_log, "_writer", ActivityLogWriter(flush_interval=None)
+        )
+        writer.start()
+        self.addCleanup(writer.stop)
+
+    def test_written_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            log_activity("create", "ticket", 42, user=self.user)
+            self.assertFalse(ActivityLog.objects.exists())
+
+        entry = ActivityLog.objects.get()
+        self.assertEqual(entry.organization_id, self.organization.id)
+        self.assertEqual(entry.user_id, self.user.id)
+        self.assertEqual(entry.entity_id, "42")
+
+    def test_rolled_back_entries_dropped(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    log_activity("create", "ticket", 42, user=self.user)
+                    raise ValueError
+            except ValueError:
+                pass
+
+        self.assertEqual(callbacks, [])
+
+    def test_no_organization_skipped(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            log_activity("create", "ticket", 42)
+
+        self.assertEqual(callbacks, [])
+
+
+class ActivityLogWriterTest(ActivityLogTestCase):
+    """Test batching, backpressure and failed flushes."""
+
+    def test_queued_until_flush(self):
+        writer = ActivityLogWriter(batch_size=10)
+        writer.submit(self.entries(3))
+
+        self.assertFalse(ActivityLog.objects.exists())
+        self.assertEqual(writer.flush(), 3)
+        self.assertEqual(ActivityLog.objects.count(), 3)
+
+    def test_backpressure_flushes_synchronously(self):
+        writer = ActivityLogWriter(max_queue=3)
+        writer.submit(self.entries(2))
+        writer.submit(self.entries(1))
+
+        self.assertEqual(ActivityLog.objects.count(), 3)
+        self.assertEqual(writer.stats()["backpressure_flushes"], 1)
+        self.assertEqual(writer.stats()["queued"], 0)
+
+    def test_failed_flush_requeues(self):
+        writer = ActivityLogWriter()
+        writer.submit(self.entries(2))
+
+        with patch.object(activity_log, "write_entries", side_effect=Exception):
+            self.assertEqual(writer.flush(), 0)
+
+        self.assertEqual(writer.stats()["queued"], 2)
+        self.assertEqual(writer.stats()["failed_flushes"], 1)
+        self.assertEqual(writer.flush(), 2)
+        self.assertEqual(ActivityLog.objects.count(), 2)
+
+
+class SpoolTest(ActivityLogTestCase):
+    """Test queued entries survive a crashed writer."""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def test_flushed_segments_removed(self):
+        writer = ActivityLogWriter(spool_dir=self.directory)
+        writer.submit(self.entries(2))
+        self.assertEqual(len(list(self.directory.glob("*.jsonl"))), 1)
+
+        writer.flush()
+
+        self.assertEqual(list(self.directory.glob("*.jsonl")), [])
+
+    def test_replay_after_crash(self):
+        writer = ActivityLogWriter(spool_dir=self.directory)
+        entries = self.entries(2)
+        writer.submit(entries)
+
+        # The live writer holds the lock on its segment
+        self.assertEqual(replay_spool(self.directory, stale_after=0), 0)
+
+        writer.spool.file.close()
+        self.assertEqual(replay_spool(self.directory, stale_after=0), 2)
+        self.assertEqual(list(self.directory.glob("*.jsonl")), [])
+
+        # Entries already written are skipped
+        ingest_entries(entries)
+        self.assertEqual(ActivityLog.objects.count(), 2)
+
+    def test_failed_segment_quarantined(self):
+        """A segment that can't be written doesn't block later ones."""
+        for name, count in [("a", 1), ("b", 2)]:
+            (self.directory / f"{name}.jsonl").write_text(
+                "".join(
+                    json.dumps(entry, cls=DjangoJSONEncoder) + "\n"
+                    for entry in self.entries(count)
+                )
+            )
+
+        with patch.object(
+            activity_log,
+            "ingest_entries",
+            side_effect=[IntegrityError("user does not exist"), 2],
+        ):
+            self.assertEqual(replay_spool(self.directory, stale_after=0), 2)
+
+        self.assertEqual([path.name for path in self.directory.iterdir()], ["a.bad"])
+
+    def test_backfill_file(self):
+        path = self.directory / "backfill.jsonl"
+        path.write_text(
+            json.dumps(
+                {
+                    "organization_id": self.organization.id,
+                    "action": "import",
+                    "entity_type": "ticket",
+                    "entity_id": "7",
+                }
+            )
+            + "\n"
+            + '{"truncated'
+        )
+
+        self.assertEqual(ingest_entries(read_entries(path)), 1)
+        self.assertEqual(ActivityLog.objects.get().description, "")
@@ -0,0 +1,245 @@
+"""
+Analytics Query Tests
+Tests the aggregate report builders against the per-row computation they
+replaced, and that each report costs a fixed number of queries.
+"""
+
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.analytics.metrics import OPEN_TICKET_STATUSES, backfill
+from apps.analytics.queries import get_field_service_report, get_ticket_report
+from apps.field_service.models import WorkOrder
+from apps.tickets.models import Ticket
+
+from .test_utilities import TestDataFactory
+
+
+def _noon(day):
+    return timezone.make_aware(datetime.combine(day, time(12)))
+
+
+def _average_hours(durations):
+    if not durations:
+        return None
+    hours = [duration.total_seconds() / 3600 for duration in durations]
+    return round(sum(hours) / len(hours), 2)
+
+
+def _daily(records, start_date, end_date, created_at, finished_at, key):
+    """Per-day created counts and those finished on the day they were created."""
+    trends = []
+    day = start_date
+    while day <= end_date:
+        created = [r for r in records if timezone.localdate(created_at(r)) == day]
+        trends.append(
+            {
+                "date": day.isoformat(),
+                "created": len(created),
+                key: sum(
+                    1
+                    for r in created
+                    if finished_at(r) and timezone.localdate(finished_at(r)) == day
+                ),
+            }
+        )
+        day += timedelta(days=1)
+    return trends
+
+
+def per_row_ticket_report(tickets, start_date, end_date):
+    """The ticket report as the views computed it, one ticket at a time."""
+    tickets = list(tickets)
+    total = len(tickets)
+    breached = sum(1 for ticket in tickets if ticket.sla_breach)
+    statuses = Counter(ticket.status for ticket in tickets)
+    return {
+        "total_tickets": total,
+        "open_tickets": sum(statuses[status] for status in OPEN_TICKET_STATUSES),
+        "resolved_tickets": statuses["resolved"],
+        "closed_tickets": statuses["closed"],
+        "sla_breached": breached,
+        "sla_compliance": round((total - breached) / total * 100, 2) if total else 100,
+        "avg_response_time": _average_hours(
+            [t.first_response_at - t.created_at for t in tickets if t.first_response_at]
+        ),
+        "avg_resolution_time": _average_hours(
+            [t.resolved_at - t.created_at for t in tickets if t.resolved_at]
+        ),
+        "status_distribution": dict(statuses),
+        "priority_distribution": dict(Counter(t.priority for t in tickets)),
+        "channel_distribution": dict(Counter(t.channel for t in tickets)),
+        "daily_trends": _daily(
+            tickets,
+            start_date,
+            end_date,
+            lambda t: t.created_at,
+            lambda t: t.resolved_at,
+            "resolved",
+        ),
+    }
+
+
+def per_row_field_service_report(work_orders, start_date, end_date):
+    """The field service report computed one work order at a time."""
+    work_orders = list(work_orders)
+    total = len(work_orders)
+    statuses = Counter(work_order.status for work_order in work_orders)
+    return {
+        "total_work_orders": total,
+        "completed_work_orders": statuses["completed"],
+        "in_progress_work_orders": statuses["in_progress"],
+        "scheduled_work_orders": statuses["scheduled"],
+        "completion_rate": (
+            round(statuses["completed"] / total * 100, 2) if total else 0
+        ),
+        "avg_completion_time": _average_hours(
+            [
+                w.actual_end - w.created_at
+                for w in work_orders
+                if w.status == "completed" and w.actual_end
+            ]
+        ),
+        "type_distribution": dict(Counter(w.work_type for w in work_orders)),
+        "priority_distribution": dict(Counter(w.priority for w in work_orders)),
+        "daily_trends": _daily(
+            work_orders,
+            start_date,
+            end_date,
+            lambda w: w.created_at,
+            lambda w: w.actual_end,
+            "completed",
+        ),
+    }
+
+
+def _distribution(rows, key):
+    return {row[key]: row["count"] for row in rows}
+
+
+class AnalyticsQueryTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organization = TestDataFactory.create_organization()
+        self.customer = TestDataFactory.create_user(
+            self.organization, "c@example.com", role="customer"
+        )
+        TestDataFactory.create_user(self.organization, "a@example.com")
+        # Whole days in the past, so the range never depends on the clock
+        self.end_date = timezone.localdate() - timedelta(days=1)
+        self.start_date = self.end_date - timedelta(days=2)
+        self.days = [self.start_date + timedelta(days=n) for n in range(3)]
+
+
+class TicketReportTest(AnalyticsQueryTestCase):
+    """Test the fact-table ticket report matches per-row results."""
+
+    def setUp(self):
+        super().setUp()
+        for day, status, priority, channel, response, resolution, breach in [
+            (self.days[0], "open", "high", "web", None, None, True),
+            (self.days[0], "resolved", "low", "email", 1, 3, False),
+            (self.days[1], "closed", "high", "web", 0.5, 5, False),
+            (self.days[2], "pending", "medium", "phone", None, None, False),
+        ]:
+            created_at = _noon(day)
+            ticket = TestDataFactory.create_ticket(self.organization, self.customer)
+            Ticket.objects.filter(pk=ticket.pk).update(
+                created_at=created_at,
+                status=status,
+                priority=priority,
+                channel=channel,
+                sla_breach=breach,
+                first_response_at=(
+                    created_at + timedelta(hours=response) if response else None
+                ),
+                resolved_at=(
+                    created_at + timedelta(hours=resolution) if resolution else None
+                ),
+            )
+        backfill(self.organization.id, self.start_date, self.end_date)
+
+    def test_matches_per_row_computation(self):
+        report = get_ticket_report(self.organization, self.start_date, self.end_date)
+        expected = per_row_ticket_report(
+            Ticket.objects.filter(organization=self.organization),
+            self.start_date,
+            self.end_date,
+        )
+
+        for key in ("status", "priority", "channel"):
+            distribution = report.pop(f"{key}_distribution")
+            self.assertEqual(
+                _distribution(distribution, key), expected.pop(f"{key}_distribution")
+            )
+        report.pop("top_agents")
+        self.assertEqual(report, expected)
+
+    def test_fixed_query_count(self):
+        """One fact-table GROUP BY and one top-agents query, then cached."""
+        with self.assertNumQueries(2):
+            get_ticket_report(self.organization, self.start_date, self.end_date)
+        with self.assertNumQueries(0):
+            get_ticket_report(self.organization, self.start_date, self.end_date)
+
+
+class FieldServiceReportTest(AnalyticsQueryTestCase):
+    """Test the aggregated field service report matches per-row results."""
+
+    def setUp(self):
+        super().setUp()
+        for index, (day, status, work_type, priority, hours) in enumerate(
+            [
+                (self.days[0], "completed", "repair", "high", 2),
+                (self.days[0], "completed", "installation", "low", 30),
+                (self.days[1], "in_progress", "repair", "high", None),
+                (self.days[2], "scheduled", "maintenance", "medium", None),
+            ]
+        ):
+            created_at = _noon(day)
+            work_order = WorkOrder.objects.create(
+                organization=self.organization,
+                customer=self.customer,
+                work_order_number=f"WO-{index:06d}",
+                title=f"Visit {index}",
+                description="On site",
+                status=status,
+                work_type=work_type,
+                priority=priority,
+            )
+            WorkOrder._base_manager.filter(pk=work_order.pk).update(
+                created_at=created_at,
+                actual_end=created_at + timedelta(hours=hours) if hours else None,
+            )
+
+    def test_matches_per_row_computation(self):
+        report = get_field_service_report(
+            self.organization, self.start_date, self.end_date
+        )
+        expected = per_row_field_service_report(
+            WorkOrder.objects.for_organization(self.organization),
+            self.start_date,
+            self.end_date,
+        )
+
+        self.assertEqual(
+            _distribution(report.pop("type_distribution"), "work_order_type"),
+            expected.pop("type_distribution"),
+        )
+        self.assertEqual(
+            _distribution(report.pop("priority_distribution"), "priority"),
+            expected.pop("priority_distribution"),
+        )
+        report.pop("technician_performance")
+        self.assertEqual(report, expected)
+
+    def test_fixed_query_count(self):
+        """Totals, distributions, technician totals and technicians, then cached."""
+        with self.assertNumQueries(4):
+            get_field_service_report(self.organization, self.start_date, self.end_date)
+        with self.assertNumQueries(0):
+            get_field_service_report(self.organization, self.start_date, self.end_date)
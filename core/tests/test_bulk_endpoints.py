@@ -0,0 +1,98 @@
+"""
+Bulk Endpoint Tests
+Tests the set-based bulk create, update and delete actions.
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.analytics.models import DailyOrgMetricsDirtyDay
+from apps.api.enhanced_viewsets import EnhancedTicketViewSet
+from apps.api.serializers import TicketSerializer
+from apps.tickets.models import Ticket
+
+from .test_utilities import TestDataFactory
+
+
+class BulkEndpointTest(TestCase):
+    """Test partial failures are reported per item and metrics days marked."""
+
+    def setUp(self):
+        cache.clear()
+        self.organization = TestDataFactory.create_organization()
+        self.agent = TestDataFactory.create_user(self.organization, "a@example.com")
+        self.customer = TestDataFactory.create_user(
+            self.organization, "c@example.com", role="customer"
+        )
+        self.ticket = TestDataFactory.create_ticket(self.organization, self.customer)
+
+    def post(self, action, data):
+        view = EnhancedTicketViewSet.as_view(
+            {"post": action}, serializer_class=TicketSerializer
+        )
+        request = APIRequestFactory().post("/", data, format="json")
+        force_authenticate(request, user=self.agent)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = view(request)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data["data"]
+
+    def assertDayMarked(self):
+        self.assertTrue(
+            DailyOrgMetricsDirtyDay.objects.filter(
+                organization=self.organization, date=timezone.localdate()
+            ).exists()
+        )
+
+    def test_bulk_create(self):
+        item = {
+            "subject": "Printer",
+            "description": "Jammed",
+            "customer": self.customer.id,
+        }
+        data = self.post("bulk_create", [item, {**item, "subject": ""}])
+
+        self.assertEqual(data["created_count"], 1)
+        self.assertEqual([error["index"] for error in data["errors"]], [1])
+        self.assertTrue(Ticket.objects.filter(subject="Printer").exists())
+        self.assertDayMarked()
+
+    def test_bulk_update(self):
+        data = self.post(
+            "bulk_update",
+            [
+                {"id": self.ticket.id, "priority": "high"},
+                {"id": "abc", "priority": "low"},
+                {"id": 999999, "priority": "low"},
+                {"priority": "low"},
+            ],
+        )
+
+        self.assertEqual(data["updated_count"], 1)
+        self.assertEqual(
+            [(error["index"], error["errors"]) for error in data["errors"]],
+            [
+                (1, ["Invalid ID"]),
+                (2, ["Not found"]),
+                (3, ["ID field is required for bulk update"]),
+            ],
+        )
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.priority, "high")
+        self.assertDayMarked()
+
+    def test_bulk_delete(self):
+        data = self.post("bulk_delete", {"ids": [self.ticket.id, "abc", 999999]})
+
+        self.assertEqual(data["deleted_count"], 1)
+        self.assertEqual(
+            data["errors"],
+            [
+                {"id": "abc", "error": "Invalid ID"},
+                {"id": 999999, "error": "Not found"},
+            ],
+        )
+        self.assertFalse(Ticket.objects.filter(pk=self.ticket.pk).exists())
+        self.assertDayMarked()
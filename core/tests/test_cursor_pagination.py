@@ -0,0 +1,98 @@
+"""
+Cursor Pagination Tests
+Tests keyset pagination of list endpoints.
+"""
+
+from django.test import TestCase
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.api.enhanced_pagination import (
+    AdvancedPaginationViewSet,
+    EnhancedPageNumberPagination,
+    KeysetCursorPagination,
+)
+from apps.tickets.models import Ticket
+
+from .test_utilities import TestDataFactory
+
+
+class TicketListView:
+    ordering = ["-created_at"]
+
+
+class KeysetCursorPaginationTest(TestCase):
+    """Test walking ticket lists with cursors."""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.organization = TestDataFactory.create_organization()
+        customer = TestDataFactory.create_user(self.organization, "c@example.com")
+        for index in range(7):
+            TestDataFactory.create_ticket(
+                self.organization, customer, subject=f"Ticket {index}"
+            )
+        self.queryset = Ticket._base_manager.filter(organization=self.organization)
+
+    def get_page(self, url):
+        paginator = KeysetCursorPagination()
+        request = Request(self.factory.get(url))
+        rows = paginator.paginate_queryset(self.queryset, request, TicketListView())
+        return paginator.get_paginated_response([row.id for row in rows]).data
+
+    def test_pages_cover_every_row_once(self):
+        """Following next links returns every ticket once, in order."""
+        url = "/tickets/?page_size=3&count=exact"
+        pages = []
+        while url:
+            pages.append(self.get_page(url))
+            url = pages[-1]["next"]
+
+        ids = [ticket_id for page in pages for ticket_id in page["results"]]
+        expected = list(
+            self.queryset.order_by("-created_at", "-pk").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(pages[0]["count"], 7)
+        self.assertEqual(pages[0]["pagination"]["ordering"], ["-created_at", "-pk"])
+
+    def test_previous_link_returns_prior_page(self):
+        """The previous link of page two yields page one."""
+        first = self.get_page("/tickets/?page_size=3")
+        second = self.get_page(first["next"])
+
+        self.assertEqual(self.get_page(second["previous"])["results"], first["results"])
+        self.assertIsNone(first["previous"])
+
+    def test_count_can_be_skipped(self):
+        """count=none skips the total entirely."""
+        page = self.get_page("/tickets/?count=none")
+
+        self.assertIsNone(page["count"])
+        self.assertEqual(page["pagination"]["count_type"], "none")
+
+    def test_invalid_cursor_rejected(self):
+        """Malformed cursors raise NotFound."""
+        with self.assertRaises(NotFound):
+            self.get_page("/tickets/?cursor=not-a-cursor")
+
+
+class PaginatorSelectionTest(TestCase):
+    """Test opting into cursor pagination by query parameter."""
+
+    def get_paginator(self, url):
+        view = AdvancedPaginationViewSet()
+        view.request = Request(APIRequestFactory().get(url))
+        return view.paginator
+
+    def test_page_numbers_by_default(self):
+        self.assertIsInstance(
+            self.get_paginator("/tickets/"), EnhancedPageNumberPagination
+        )
+
+    def test_cursor_on_request(self):
+        self.assertIsInstance(
+            self.get_paginator("/tickets/?pagination=cursor"), KeysetCursorPagination
+        )
@@ -0,0 +1,122 @@
+"""
+Daily Metrics Fact Table Tests
+Tests incremental refresh of daily_org_metrics and the range reads built on it.
+"""
+
+from datetime import datetime, time, timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.analytics.metrics import (
+    backfill,
+    daily_series,
+    mark_dirty,
+    metrics_queryset,
+    refresh_day,
+    refresh_dirty_days,
+    summarize,
+)
+from apps.analytics.models import DailyOrgMetrics, DailyOrgMetricsDirtyDay
+from apps.tickets.models import Ticket
+
+from .test_utilities import TestDataFactory
+
+
+class DailyOrgMetricsTest(TestCase):
+    """Test daily metrics refresh and aggregation."""
+
+    def setUp(self):
+        self.organization = TestDataFactory.create_organization()
+        self.customer = TestDataFactory.create_user(self.organization)
+        # Pin the clock to midday so offsets of a few hours stay on the same day
+        self.today = timezone.localdate()
+        self.now = timezone.make_aware(datetime.combine(self.today, time(12)))
+        clock = patch("django.utils.timezone.now", return_value=self.now)
+        self.clock = clock.start()
+        self.addCleanup(clock.stop)
+
+    def _ticket(self, **fields):
+        ticket = TestDataFactory.create_ticket(self.organization, self.customer)
+        Ticket.objects.filter(pk=ticket.pk).update(**fields)
+        return ticket
+
+    def test_refresh_day_groups_by_dimensions(self):
+        """Tickets created today are counted per channel/priority/status."""
+        now = self.now
+        self._ticket(status="open", priority="high")
+        self._ticket(status="open", priority="high", sla_breach=True)
+        self._ticket(
+            status="resolved",
+            first_response_at=now + timedelta(hours=1),
+            resolved_at=now + timedelta(hours=2),
+        )
+
+        refresh_day(self.organization.id, self.today)
+
+        stats = summarize(metrics_queryset(self.organization, "ticket"))
+        self.assertEqual(stats["created"], 3)
+        self.assertEqual(stats["open"], 2)
+        self.assertEqual(stats["breached"], 1)
+        self.assertEqual(stats["current_resolved"], 1)
+        self.assertAlmostEqual(stats["avg_response_time"], 1.0, places=1)
+        self.assertEqual(
+            DailyOrgMetrics.objects.filter(
+                organization=self.organization, source="ticket"
+            ).count(),
+            2,
+        )
+
+    def test_refresh_day_is_idempotent(self):
+        """Refreshing a day twice replaces rather than duplicates rows."""
+        self._ticket()
+        refresh_day(self.organization.id, self.today)
+        refresh_day(self.organization.id, self.today)
+
+        self.assertEqual(
+            summarize(metrics_queryset(self.organization, "ticket"))["created"], 1
+        )
+
+    def test_dirty_days_are_drained(self):
+        """Marked days are refreshed and cleared."""
+        self._ticket()
+        mark_dirty(self.organization.id, self.now)
+
+        self.assertEqual(refresh_dirty_days(), 1)
+        self.assertFalse(DailyOrgMetricsDirtyDay.objects.exists())
+        self.assertTrue(DailyOrgMetrics.objects.filter(date=self.today).exists())
+
+    def test_mark_during_refresh_is_kept(self):
+        """A day marked again while it is being refreshed stays dirty."""
+        self._ticket()
+        mark_dirty(self.organization.id, self.now)
+
+        def change_during_refresh(organization_id, day):
+            self.clock.return_value = self.now + timedelta(seconds=1)
+            mark_dirty(organization_id, self.now)
+
+        with patch(
+            "apps.analytics.metrics.refresh_day", side_effect=change_during_refresh
+        ):
+            self.assertEqual(refresh_dirty_days(), 1)
+
+        dirty = DailyOrgMetricsDirtyDay.objects.get()
+        self.assertEqual(dirty.marked_at, self.now + timedelta(seconds=1))
+        self.assertEqual(refresh_dirty_days(), 1)
+        self.assertFalse(DailyOrgMetricsDirtyDay.objects.exists())
+
+    def test_daily_series_is_dense(self):
+        """Days without facts are reported as zero."""
+        self._ticket(created_at=self.now - timedelta(days=2))
+        start_date = self.today - timedelta(days=3)
+        backfill(self.organization.id, start_date, self.today)
+
+        series = daily_series(
+            metrics_queryset(self.organization, "ticket", start_date, self.today),
+            start_date,
+            self.today,
+        )
+
+        self.assertEqual(len(series), 4)
+        self.assertEqual([point["value"] for point in series], [0, 1, 0, 0])
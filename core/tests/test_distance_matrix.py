@@ -0,0 +1,76 @@
+"""
+Distance Matrix Tests
+Tests vectorised distance matrices, their cache and incremental updates.
+"""
+
+import numpy as np
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.field_service.distance import (
+    HaversineProvider,
+    add_location,
+    clear_local_cache,
+    get_distance_matrix,
+    haversine_matrix,
+    path_distance,
+    remove_location,
+)
+
+
+class CountingProvider(HaversineProvider):
+    name = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    def matrix(self, origins, destinations=None):
+        self.calls += 1
+        return super().matrix(origins, destinations)
+
+
+class DistanceMatrixTest(TestCase):
+    """Test distance matrix building and caching."""
+
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+        self.provider = CountingProvider()
+        self.locations = [
+            ("a", (40.70, -74.00)),
+            ("b", (40.75, -73.98)),
+            ("c", (40.80, -73.95)),
+        ]
+
+    def test_haversine_matrix_is_symmetric(self):
+        """One degree of latitude is roughly 111 km."""
+        matrix = haversine_matrix([(40.0, -74.0), (41.0, -74.0)])
+        self.assertEqual(matrix[0][0], 0)
+        self.assertEqual(matrix[0][1], matrix[1][0])
+        self.assertAlmostEqual(matrix[0][1] / 1000, 111.2, places=0)
+        self.assertEqual(path_distance([(40.0, -74.0), (41.0, -74.0)]), matrix[0][1])
+
+    def test_cache_is_keyed_by_location_set(self):
+        """The same locations in another order are served from cache."""
+        matrix = get_distance_matrix(self.locations, self.provider)
+        reordered = get_distance_matrix(self.locations[::-1], self.provider)
+
+        self.assertEqual(self.provider.calls, 1)
+        self.assertEqual(reordered.keys, ["c", "b", "a"])
+        self.assertEqual(reordered.distance("a", "c"), matrix.distance("a", "c"))
+
+        clear_local_cache()
+        get_distance_matrix(self.locations, self.provider)
+        self.assertEqual(self.provider.calls, 1)
+
+    def test_incremental_updates_match_full_build(self):
+        """Adding then removing a location matches rebuilding from scratch."""
+        matrix = get_distance_matrix(self.locations[:2], self.provider)
+
+        extended = add_location(matrix, "c", (40.80, -73.95), self.provider)
+        full = haversine_matrix([point for _, point in self.locations])
+        self.assertTrue(np.array_equal(extended.values, full))
+
+        reduced = remove_location(extended, "b", self.provider)
+        self.assertEqual(reduced.keys, ["a", "c"])
+        self.assertEqual(reduced.distance("a", "c"), full[0][2])
@@ -0,0 +1,169 @@
+"""
+Fast Serializer Tests
+Tests that the row-based read path renders the same bytes as DRF serializers.
+"""
+
+import json
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.api.enhanced_viewsets import (
+    EnhancedTicketCommentViewSet,
+    EnhancedTicketViewSet,
+    EnhancedWorkOrderViewSet,
+)
+from apps.api.fast_serializers import FastJSONRenderer
+from apps.api.prefetch_plans import apply_prefetch_plan
+from apps.api.serializers import (
+    TicketCommentSerializer,
+    TicketSerializer,
+    WorkOrderSerializer,
+    ticket_comment_fast_serializer,
+    ticket_fast_serializer,
+    work_order_fast_serializer,
+)
+from apps.field_service.models import Technician, WorkOrder
+from apps.tickets.models import Ticket, TicketComment
+
+from .test_utilities import TestDataFactory
+
+
+class FastSerializerEquivalenceTest(TestCase):
+    """Test fast output is byte-identical to the serializers it wraps."""
+
+    def setUp(self):
+        self.organization = TestDataFactory.create_organization()
+        self.customer = TestDataFactory.create_user(
+            self.organization, "c@example.com", role="customer"
+        )
+        self.agent = TestDataFactory.create_user(self.organization, "a@example.com")
+
+    def assert_same_bytes(self, serializer_class, fast, queryset):
+        queryset = apply_prefetch_plan(serializer_class, queryset)
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        actual = FastJSONRenderer().render(fast.serialize(queryset))
+
+        self.assertEqual(actual, expected)
+        return actual
+
+    def test_tickets(self):
+        """Null agents, unicode, JSON fields and annotations match."""
+        for index in range(3):
+            ticket = TestDataFactory.create_ticket(
+                self.organization,
+                self.customer,
+                subject=f"Drucker défekt {index} \u2028",
+            )
+            ticket.tags = ["printer", index]
+            ticket.custom_fields = {"floor": index, "nested": {"a": [1.5, None]}}
+            ticket.assigned_agent = self.agent if index else None
+            ticket.resolved_at = timezone.now() if index == 2 else None
+            ticket.save()
+            TicketComment.objects.create(
+                ticket=ticket, author=self.agent, content="On it"
+            )
+        queryset = Ticket._base_manager.filter(organization=self.organization)
+
+        content = self.assert_same_bytes(
+            TicketSerializer, ticket_fast_serializer, queryset.order_by("subject")
+        )
+
+        self.assertIn(b"\\u2028", content)
+
+    def test_ticket_comments(self):
+        ticket = TestDataFactory.create_ticket(self.organization, self.customer)
+        for index in range(3):
+            TicketComment.objects.create(
+                ticket=ticket, author=self.agent, content=f"Update {index}"
+            )
+
+        self.assert_same_bytes(
+            TicketCommentSerializer,
+            ticket_comment_fast_serializer,
+            TicketComment.objects.filter(ticket=ticket).order_by("created_at"),
+        )
+
+    def test_work_orders(self):
+        """Properties, decimals and technician names match."""
+        technician = Technician.objects.create(
+            organization=self.organization, user=self.agent, skills=["hvac"]
+        )
+        start = timezone.now()
+        for index in range(3):
+            WorkOrder.objects.create(
+                organization=self.organization,
+                customer=self.customer,
+                work_order_number=f"WO-{index:06d}",
+                title=f"Repair {index}",
+                description="Compressor",
+                status="in_progress" if index else "completed",
+                actual_start=start,
+                actual_end=start + timedelta(minutes=45) if index != 1 else None,
+                assigned_technicians=[str(technician.id)] if index else [],
+                cost_estimate="125.50",
+            )
+        queryset = WorkOrder._base_manager.filter(
+            organization=self.organization
+        ).order_by("work_order_number")
+
+        self.assert_same_bytes(
+            WorkOrderSerializer, work_order_fast_serializer, queryset
+        )
+
+
+class FastListViewSetTest(SimpleTestCase):
+    """Test the list viewsets read through the fast path."""
+
+    def test_fast_serializers_wired(self):
+        for viewset, fast in [
+            (EnhancedTicketViewSet, ticket_fast_serializer),
+            (EnhancedTicketCommentViewSet, ticket_comment_fast_serializer),
+            (EnhancedWorkOrderViewSet, work_order_fast_serializer),
+        ]:
+            with self.subTest(viewset=viewset.__name__):
+                view = viewset()
+                self.assertIs(view.get_fast_serializer(), fast)
+                self.assertIsInstance(view.get_renderers()[0], FastJSONRenderer)
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    """Test orjson rendering against JSONRenderer."""
+
+    def test_same_bytes(self):
+        data = {
+            "when": timezone.now(),
+            "duration": timedelta(minutes=3),
+            "text": "naïve \u2028 \u2029 ✓",
+            "values": [1, 2.5, None, True],
+        }
+
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_floats(self):
+        """Fixed-notation floats are byte-identical; others only equal in value."""
+        data = {"fixed": [0.0, 0.0001, 0.1, 123.456, -2.5, 1e15]}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+        data = {"exponent": [1e16, 1e-7, -2.5e-5, 1e22]}
+        fast = FastJSONRenderer().render(data)
+        self.assertNotEqual(fast, JSONRenderer().render(data))
+        self.assertEqual(json.loads(fast), data)
+
+    def test_non_finite_floats(self):
+        """NaN is written as null where JSONRenderer refuses it."""
+        data = {"value": float("nan")}
+
+        self.assertEqual(FastJSONRenderer().render(data), b'{"value":null}')
+        with self.assertRaises(ValueError):
+            JSONRenderer().render(data)
+
+    def test_indented_output_falls_back(self):
+        context = {"indent": 2}
+
+        self.assertEqual(
+            FastJSONRenderer().render({"a": [1]}, renderer_context=context),
+            JSONRenderer().render({"a": [1]}, renderer_context=context),
+        )
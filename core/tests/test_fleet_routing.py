@@ -0,0 +1,149 @@
+"""
+Fleet Routing Tests
+Tests the fleet-wide vehicle routing heuristic used by RouteOptimizer and
+how its plans are saved.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.field_service.distance import clear_local_cache
+from apps.field_service.models import Route, Technician, WorkOrder
+from apps.field_service.route_optimizer import RouteOptimizer
+from apps.field_service.vrp import Job, Vehicle, solve_fleet
+
+from .test_utilities import TestDataFactory
+
+
+class FleetRoutingTest(TestCase):
+    """Test fleet-wide route planning constraints."""
+
+    def _solve(self, vehicles, jobs):
+        return solve_fleet(vehicles, jobs, time_budget=5, solver="heuristic")
+
+    def test_skills_restrict_technicians(self):
+        """Jobs only go to technicians with every required skill."""
+        vehicles = [
+            Vehicle(key="electrician", start=(40.70, -74.00), skills={"electrical"}),
+            Vehicle(key="hvac", start=(40.80, -73.95), skills={"hvac"}),
+        ]
+        jobs = [
+            Job(key="wiring", location=(40.80, -73.95), required_skills={"electrical"}),
+            Job(key="ac", location=(40.70, -74.00), required_skills={"hvac"}),
+        ]
+
+        solution = self._solve(vehicles, jobs)
+
+        self.assertEqual(
+            [stop.key for stop in solution.routes["electrician"]], ["wiring"]
+        )
+        self.assertEqual([stop.key for stop in solution.routes["hvac"]], ["ac"])
+        self.assertEqual(solution.unassigned, [])
+
+    def test_capacity_and_time_windows(self):
+        """Jobs beyond capacity or outside any reachable window stay unassigned."""
+        vehicles = [Vehicle(key="tech", start=(40.70, -74.00), capacity=2)]
+        jobs = [
+            Job(key="a", location=(40.71, -74.00)),
+            Job(key="b", location=(40.72, -74.00)),
+            Job(key="c", location=(40.73, -74.00)),
+            Job(key="early", location=(40.71, -74.01), window_start=0, window_end=60),
+        ]
+
+        solution = self._solve(vehicles, jobs)
+
+        self.assertEqual(len(solution.routes["tech"]), 2)
+        self.assertIn("early", solution.unassigned)
+        self.assertEqual(len(solution.unassigned), 2)
+
+    def test_route_visits_stops_in_travel_order(self):
+        """Stops along a line are visited outward from the start point."""
+        vehicles = [Vehicle(key="tech", start=(40.70, -74.00), capacity=10)]
+        jobs = [
+            Job(key=str(step), location=(40.70 + step * 0.01, -74.00), service_time=15)
+            for step in (3, 1, 4, 2, 5)
+        ]
+
+        solution = self._solve(vehicles, jobs)
+
+        stops = solution.routes["tech"]
+        self.assertEqual([stop.key for stop in stops], ["1", "2", "3", "4", "5"])
+        self.assertTrue(all(a.departure <= b.arrival for a, b in zip(stops, stops[1:])))
+
+
+class FleetPlanSaveTest(TestCase):
+    """Test optimize_fleet_routes writes assignments and routes."""
+
+    def setUp(self):
+        clear_local_cache()
+        self.organization = TestDataFactory.create_organization()
+        self.customer = TestDataFactory.create_user(
+            self.organization, "customer@example.com", "customer"
+        )
+        self.date = timezone.localdate() + timedelta(days=1)
+        self.electrician = self._technician("e@example.com", "electrical", 40.70)
+        self.hvac = self._technician("h@example.com", "hvac", 40.80)
+        self.wiring = self._work_order("Wiring", "electrical", 40.71)
+        self.cooling = self._work_order("Cooling", "hvac", 40.81)
+
+        # An earlier plan gave the electrician nothing; it must be updated
+        self.existing = Route.objects.create(
+            organization=self.organization,
+            technician=self.electrician,
+            route_date=self.date,
+            work_orders=[],
+        )
+
+    def _technician(self, email, skill, lat):
+        return Technician.objects.create(
+            organization=self.organization,
+            user=TestDataFactory.create_user(self.organization, email),
+            skills=[skill],
+            current_location=Point(-74.00, lat, srid=4326),
+        )
+
+    def _work_order(self, title, skill, lat):
+        start = timezone.make_aware(datetime.combine(self.date, time(10)))
+        return WorkOrder.objects.create(
+            organization=self.organization,
+            customer=self.customer,
+            work_order_number=f"WO-{title.upper()}",
+            title=title,
+            description=title,
+            status="scheduled",
+            scheduled_start=start,
+            scheduled_end=start + timedelta(hours=4),
+            estimated_duration=30,
+            required_skills=[skill],
+            location_coordinates=Point(-74.00, lat, srid=4326),
+        )
+
+    def test_plan_is_saved(self):
+        routes = RouteOptimizer().optimize_fleet_routes(
+            self.date, self.organization, time_budget=5
+        )
+
+        self.assertEqual(len(routes), 2)
+        for work_order, technician in [
+            (self.wiring, self.electrician),
+            (self.cooling, self.hvac),
+        ]:
+            work_order.refresh_from_db()
+            self.assertEqual(work_order.assigned_technicians, [str(technician.id)])
+
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.work_orders, [str(self.wiring.id)])
+        self.assertEqual(
+            [stop["work_order"] for stop in self.existing.optimized_sequence],
+            [str(self.wiring.id)],
+        )
+        self.assertGreater(self.existing.total_distance, 0)
+        self.assertGreater(self.existing.total_duration, 0)
+
+        created = Route._base_manager.get(
+            organization=self.organization, technician=self.hvac
+        )
+        self.assertEqual(created.work_orders, [str(self.cooling.id)])
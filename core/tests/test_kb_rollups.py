@@ -0,0 +1,120 @@
+"""
+Knowledge Base Rollup Tests
+Tests incremental maintenance of KB analytics rollups and the rollup-only analytics payload.
+"""
+
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.knowledge_base.models import (
+    KBArticle,
+    KBArticleDailyStats,
+    KBArticleView,
+    KBCategory,
+    KBCategoryStats,
+    KBSearch,
+    KBSearchDailyStats,
+)
+from apps.knowledge_base.rollups import (
+    get_kb_analytics,
+    rebuild_daily_stats,
+    record_article_view,
+    record_feedback,
+    record_search,
+    refresh_category_stats,
+)
+
+from .test_utilities import TestDataFactory
+
+
+class KBRollupTest(TestCase):
+    """Test KB rollup maintenance and reads."""
+
+    def setUp(self):
+        self.organization = TestDataFactory.create_organization()
+        self.user = TestDataFactory.create_user(self.organization)
+        self.category = KBCategory.objects.create(
+            organization=self.organization, name="Billing", slug="billing"
+        )
+        self.article = KBArticle.objects.create(
+            organization=self.organization,
+            title="Reset your password",
+            content="Steps...",
+            category=self.category,
+            status="published",
+            author=self.user,
+        )
+        self.today = timezone.localdate()
+
+    def test_record_article_view_increments_daily_bucket(self):
+        """Repeated views accumulate in one bucket per day."""
+        record_article_view(self.article)
+        record_article_view(self.article)
+        record_article_view(self.article, day=self.today - timedelta(days=1))
+
+        buckets = KBArticleDailyStats.objects.filter(article=self.article)
+        self.assertEqual(buckets.count(), 2)
+        self.assertEqual(buckets.get(date=self.today).views_count, 2)
+
+    def test_record_feedback_ignores_non_vote_types(self):
+        """Only helpful/not helpful feedback is counted."""
+        record_feedback(self.article, "helpful")
+        record_feedback(self.article, "outdated")
+
+        bucket = KBArticleDailyStats.objects.get(article=self.article)
+        self.assertEqual(bucket.helpful_count, 1)
+        self.assertEqual(bucket.not_helpful_count, 0)
+
+    def test_analytics_sums_buckets_in_range(self):
+        """Daily buckets are summed only within the requested range."""
+        record_article_view(self.article, day=self.today)
+        record_article_view(self.article, day=self.today - timedelta(days=2))
+        record_article_view(self.article, day=self.today - timedelta(days=40))
+        record_search(self.organization, "password", day=self.today)
+        record_search(self.organization, "password", day=self.today)
+        refresh_category_stats(self.organization)
+
+        analytics = get_kb_analytics(
+            self.organization, self.today - timedelta(days=7), self.today
+        )
+
+        self.assertEqual(analytics["most_viewed"][0]["views_count"], 2)
+        self.assertEqual(analytics["popular_searches"][0]["count"], 2)
+        self.assertEqual(analytics["total_articles"], 1)
+        self.assertEqual(analytics["published_articles"], 1)
+        self.assertEqual(analytics["category_stats"][0]["article_count"], 1)
+
+    def test_refresh_category_stats_includes_empty_categories(self):
+        """Every category/status pair gets a row, including zero counts."""
+        KBCategory.objects.create(
+            organization=self.organization, name="Empty", slug="empty"
+        )
+        refresh_category_stats(self.organization)
+
+        statuses = len(KBArticle.STATUS_CHOICES)
+        # Two categories plus the uncategorised bucket
+        self.assertEqual(
+            KBCategoryStats.objects.filter(organization=self.organization).count(),
+            3 * statuses,
+        )
+
+    def test_rebuild_daily_stats_reconciles_from_raw_events(self):
+        """Nightly rebuild replaces drifted buckets with raw counts."""
+        KBArticleView.objects.create(article=self.article)
+        KBSearch.objects.create(organization=self.organization, query="invoice")
+        KBArticleDailyStats.objects.create(
+            organization=self.organization,
+            article=self.article,
+            date=self.today,
+            views_count=99,
+        )
+
+        rebuild_daily_stats(self.organization, self.today)
+
+        self.assertEqual(
+            KBArticleDailyStats.objects.get(article=self.article).views_count, 1
+        )
+        self.assertEqual(
+            KBSearchDailyStats.objects.get(query="invoice").search_count, 1
+        )
@@ -0,0 +1,100 @@
+"""
+List Cache Tests
+Tests generation-keyed list caching and ETag validation.
+"""
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from apps.api.enhanced_viewsets import EnhancedTicketViewSet
+from apps.api.list_cache import (
+    etag_for,
+    etag_matches,
+    list_cache_key,
+    track_model,
+)
+from apps.tickets.models import Ticket
+
+from .test_utilities import TestDataFactory
+
+
+class ListCacheKeyTest(TestCase):
+    """Test cache keys follow writes and permission scope."""
+
+    def setUp(self):
+        cache.clear()
+        track_model(Ticket)
+        self.organization = TestDataFactory.create_organization()
+        self.agent = TestDataFactory.create_user(self.organization, "a@example.com")
+        self.other_agent = TestDataFactory.create_user(
+            self.organization, "b@example.com"
+        )
+
+    def key(self, user, scope="user", query=""):
+        return list_cache_key("TicketViewSet", [Ticket], user, query, scope=scope)
+
+    def test_write_changes_key(self):
+        """Saving a ticket invalidates the organization's cached lists."""
+        before = self.key(self.agent)
+        self.assertEqual(self.key(self.agent), before)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TestDataFactory.create_ticket(self.organization, self.agent)
+
+        self.assertNotEqual(self.key(self.agent), before)
+
+    def test_user_save_changes_ticket_list_key(self):
+        """Ticket lists show user names, so saving a user invalidates them."""
+        models = EnhancedTicketViewSet().get_list_cache_models()
+        before = list_cache_key("EnhancedTicketViewSet", models, self.agent, "")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_agent.first_name = "Renamed"
+            self.other_agent.save()
+
+        self.assertNotEqual(
+            list_cache_key("EnhancedTicketViewSet", models, self.agent, ""), before
+        )
+
+    def test_other_organization_writes_keep_key(self):
+        """Writes in another organization leave cached lists valid."""
+        before = self.key(self.agent)
+        other = TestDataFactory.create_organization("Other")
+        customer = TestDataFactory.create_user(other, "c@example.com")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TestDataFactory.create_ticket(other, customer)
+
+        self.assertEqual(self.key(self.agent), before)
+
+    def test_permission_scope(self):
+        """User scope separates users; role scope shares within a role."""
+        self.assertNotEqual(self.key(self.agent), self.key(self.other_agent))
+        self.assertEqual(
+            self.key(self.agent, scope="role"),
+            self.key(self.other_agent, scope="role"),
+        )
+
+    def test_role_scope_separates_organizations(self):
+        """Role-scoped lists are never shared across organizations."""
+        other = TestDataFactory.create_organization("Other")
+        outsider = TestDataFactory.create_user(other, "d@example.com")
+
+        self.assertNotEqual(
+            self.key(self.agent, scope="role"), self.key(outsider, scope="role")
+        )
+
+
+class ETagTest(TestCase):
+    """Test If-None-Match handling."""
+
+    def test_matching(self):
+        etag = etag_for("list_cache:abc123")
+        factory = RequestFactory()
+
+        self.assertEqual(etag, '"abc123"')
+        self.assertTrue(
+            etag_matches(factory.get("/", HTTP_IF_NONE_MATCH=f'"x", W/{etag}'), etag)
+        )
+        self.assertFalse(etag_matches(factory.get("/", HTTP_IF_NONE_MATCH='"x"'), etag))
+        self.assertFalse(etag_matches(factory.get("/"), etag))
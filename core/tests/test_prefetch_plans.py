@@ -0,0 +1,113 @@
+"""
+Prefetch Plan Tests
+Tests that list serialization costs a fixed number of queries per page.
+"""
+
+from django.db.models import Count
+from django.test import TestCase
+
+from apps.api.prefetch_plans import PrefetchPlan, apply_prefetch_plan
+from apps.api.serializers import KBCategorySerializer, TicketSerializer
+from apps.knowledge_base.models import KBArticle, KBCategory
+from apps.tickets.models import Ticket, TicketComment
+
+from .test_utilities import TestDataFactory, TestPerformanceMixin
+
+
+class TicketListSerializer(TicketSerializer):
+    class Meta(TicketSerializer.Meta):
+        fields = [
+            "id",
+            "subject",
+            "customer",
+            "customer_name",
+            "assigned_agent",
+            "assigned_agent_name",
+            "comments_count",
+        ]
+
+
+class PrefetchPlanTest(TestCase):
+    """Test applying plans to querysets."""
+
+    def test_existing_annotation_kept(self):
+        """Annotations the view already added are not applied twice."""
+        plan = PrefetchPlan(annotations={"comments_count": Count("comments")})
+        queryset = Ticket._base_manager.annotate(comments_count=Count("comments"))
+
+        self.assertIs(
+            plan.apply(queryset).query.annotations["comments_count"],
+            queryset.query.annotations["comments_count"],
+        )
+
+    def test_serializer_without_plan(self):
+        queryset = Ticket._base_manager.all()
+
+        self.assertIs(apply_prefetch_plan(object, queryset), queryset)
+
+
+class ListQueryCountTest(TestPerformanceMixin, TestCase):
+    """Test list pages do not issue queries per row."""
+
+    def setUp(self):
+        self.organization = TestDataFactory.create_organization()
+        self.customer = TestDataFactory.create_user(
+            self.organization, "c@example.com", role="customer"
+        )
+        self.agent = TestDataFactory.create_user(self.organization, "a@example.com")
+
+    def test_ticket_page_query_count_is_fixed(self):
+        """Ticket names and comment counts come from the page query."""
+        for index in range(6):
+            ticket = TestDataFactory.create_ticket(
+                self.organization, self.customer, subject=f"Ticket {index}"
+            )
+            ticket.assigned_agent = self.agent
+            ticket.save()
+            for _ in range(index):
+                TicketComment.objects.create(
+                    ticket=ticket, author=self.agent, content="Looking into it"
+                )
+        queryset = Ticket._base_manager.filter(organization=self.organization)
+
+        queries = self.assert_constant_list_queries(
+            TicketListSerializer, queryset.order_by("subject"), page_sizes=(1, 6)
+        )
+
+        self.assertEqual(queries, 1)
+        data = TicketListSerializer(
+            apply_prefetch_plan(TicketListSerializer, queryset.order_by("subject")),
+            many=True,
+        ).data
+        self.assertEqual([row["comments_count"] for row in data], list(range(6)))
+
+    def test_category_page_query_count_is_fixed(self):
+        """Published article counts come from the page query."""
+        for index in range(4):
+            category = KBCategory.objects.create(
+                organization=self.organization,
+                name=f"Category {index}",
+                slug=f"category-{index}",
+            )
+            for status in ("published", "draft"):
+                KBArticle.objects.create(
+                    organization=self.organization,
+                    category=category,
+                    author=self.agent,
+                    title=f"{status} article",
+                    content="Steps",
+                    status=status,
+                )
+        queryset = KBCategory._base_manager.filter(
+            organization=self.organization
+        ).order_by("name")
+
+        queries = self.assert_constant_list_queries(
+            KBCategorySerializer, queryset, page_sizes=(1, 4)
+        )
+
+        self.assertEqual(queries, 1)
+        data = KBCategorySerializer(
+            apply_prefetch_plan(KBCategorySerializer, queryset), many=True
+        ).data
+        self.assertEqual([row["articles_count"] for row in data], [1, 1, 1, 1])
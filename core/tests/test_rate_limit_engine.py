@@ -0,0 +1,199 @@
+"""
+Rate Limit Engine Tests
+Tests the rate limiting algorithms, multi-limit checks and route bucketing.
+"""
+
+import os
+import uuid
+from types import SimpleNamespace
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import path, resolve
+
+from apps.api.enhanced_rate_limiting import (
+    RateLimiter,
+    RateLimitMiddleware,
+    get_route_key,
+)
+from apps.api.rate_limit_engine import (
+    ALGORITHMS,
+    Limit,
+    MemoryBackend,
+    RateLimitEngine,
+    RedisBackend,
+)
+
+urlpatterns = [
+    path("api/v1/tickets/<uuid:ticket_id>/", lambda request, ticket_id: HttpResponse())
+]
+
+TICKET_1 = "/api/v1/tickets/00000000-0000-0000-0000-000000000001/"
+TICKET_2 = "/api/v1/tickets/00000000-0000-0000-0000-000000000002/"
+
+
+def redis_client():
+    """A Redis client able to run Lua scripts, or None."""
+    try:
+        import redis
+
+        client = redis.Redis.from_url(
+            os.environ.get("REDIS_TEST_URL", "redis://localhost:6379/15")
+        )
+        client.ping()
+        return client
+    except Exception:
+        pass
+    try:
+        import fakeredis
+
+        client = fakeredis.FakeRedis()
+        client.eval("return 1", 0)  # scripting needs lupa
+        return client
+    except Exception:
+        return None
+
+
+class RateLimitEngineTest(SimpleTestCase):
+    """Test each algorithm against the in-process backend."""
+
+    def backend(self):
+        return MemoryBackend()
+
+    def key(self, name):
+        return name
+
+    def engine(self, **kwargs):
+        kwargs.setdefault("local_threshold", 0)
+        return RateLimitEngine(self.backend(), **kwargs)
+
+    def test_limit_enforced(self):
+        """Every algorithm admits exactly ``limit`` requests per window."""
+        for algorithm in ALGORITHMS:
+            with self.subTest(algorithm=algorithm):
+                engine = self.engine()
+                limit = Limit(self.key("user:1"), 5, 60, algorithm)
+
+                results = [engine.check([limit]) for _ in range(7)]
+
+                self.assertEqual(
+                    [result.allowed for result in results], [True] * 5 + [False] * 2
+                )
+                self.assertEqual(results[4].tightest.remaining, 0)
+                self.assertGreater(results[-1].retry_after, 0)
+
+    def test_denied_check_consumes_nothing(self):
+        """A request denied by one limit is not counted against the others."""
+        for algorithm in ALGORITHMS:
+            with self.subTest(algorithm=algorithm):
+                engine = self.engine()
+                user = Limit(self.key("user:1"), 2, 60, algorithm)
+                organization = Limit(self.key("org:1"), 10, 60, algorithm)
+
+                for _ in range(4):
+                    engine.check([user, organization])
+                other_user = Limit(self.key("user:2"), 2, 60, algorithm)
+                result = engine.check([other_user, organization])
+
+                self.assertTrue(result.allowed)
+                self.assertEqual(result.statuses[1].remaining, 7)
+
+    def test_local_allowance_is_charged_later(self):
+        """Locally admitted requests are counted on the next backend check."""
+        backend = self.backend()
+        engine = RateLimitEngine(backend, local_share=0.1)
+        limit = Limit(self.key("user:1"), 100, 60, "gcra")
+
+        results = [engine.check([limit]) for _ in range(30)]
+
+        self.assertTrue(any(result.local for result in results))
+        self.assertTrue(all(result.allowed for result in results))
+        pending = engine.allowances[(limit.key,)].pending
+        counted = 100 - backend.check([limit], 0, 0).tightest.remaining
+        self.assertEqual(counted + pending, 30)
+
+
+class RedisRateLimitEngineTest(RateLimitEngineTest):
+    """Test ``CHECK_SCRIPT`` agrees with the in-process backend."""
+
+    def setUp(self):
+        self.client = redis_client()
+        if self.client is None:
+            self.skipTest("Redis with Lua scripting is not available")
+        self.keys = []
+        self.addCleanup(lambda: self.keys and self.client.delete(*self.keys))
+
+    def backend(self):
+        return RedisBackend(self.client)
+
+    def key(self, name):
+        key = f"test_rate_limit:{uuid.uuid4().hex}:{name}"
+        self.keys.append(key)
+        return key
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class RateLimiterTest(SimpleTestCase):
+    """Test request checks bucket by route template and scope."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.limiter = RateLimiter(
+            engine=RateLimitEngine(MemoryBackend(), local_threshold=0)
+        )
+        self.limiter.rate_limits["api_general"]["requests"] = 2
+
+    def request(self, path):
+        request = self.factory.get(path, REMOTE_ADDR="10.0.0.1")
+        request.resolver_match = resolve(path)
+        request.user = SimpleNamespace(
+            pk=1, organization_id=None, is_authenticated=True
+        )
+        return request
+
+    def test_route_template_key(self):
+        """Different objects on one route share a bucket."""
+        first = self.request(TICKET_1)
+        second = self.request(TICKET_2)
+
+        self.assertEqual(get_route_key(first), get_route_key(second))
+
+        self.assertTrue(self.limiter.check_request(first, "api_general")[0])
+        self.assertTrue(self.limiter.check_request(second, "api_general")[0])
+        allowed, info = self.limiter.check_request(second, "api_general")
+        self.assertFalse(allowed)
+        self.assertTrue(info["limit_exceeded"])
+
+    def test_middleware_rejects_with_retry_after(self):
+        middleware = RateLimitMiddleware(lambda request: None)
+        middleware.rate_limiter = self.limiter
+        request = self.request(TICKET_1)
+
+        for _ in range(2):
+            self.assertIsNone(middleware.process_view(request, None, (), {}))
+        response = middleware.process_view(request, None, (), {})
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+
+    def test_ip_limit_only_for_anonymous_requests(self):
+        """Authenticated users behind one NAT address do not share a bucket."""
+        user = SimpleNamespace(pk=1, organization_id=3, is_authenticated=True)
+        keys = [
+            limit.key
+            for limit in self.limiter.get_limits(
+                "api_general", "GET:x", user, "10.0.0.1"
+            )
+        ]
+        self.assertEqual(len(keys), 2)
+        self.assertFalse(any(":ip:" in key for key in keys))
+
+        limits = self.limiter.get_limits(
+            "api_general", "GET:x", AnonymousUser(), "10.0.0.1"
+        )
+        self.assertEqual(
+            [limit.key for limit in limits],
+            ["rate_limit:api_general:ip:10.0.0.1:GET:x"],
+        )
+        self.assertEqual(limits[0].limit, 4)
@@ -0,0 +1,73 @@
+"""
+Real-time Broadcast Tests
+Tests batched, per-organization fan-out of real-time updates.
+"""
+
+import json
+
+from django.test import SimpleTestCase
+
+from apps.api.real_time_integration import BroadcastBatcher, RealTimeIntegration
+
+
+class RecordingChannelLayer:
+    """Channel layer stand-in that records group messages."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def group_send(self, group, message):
+        self.sent.append((group, message))
+
+
+class BroadcastBatcherTest(SimpleTestCase):
+    """Test per-group batching and coalescing."""
+
+    def setUp(self):
+        self.layer = RecordingChannelLayer()
+        self.batcher = BroadcastBatcher(self.layer, window=60)
+
+    def test_one_message_per_group(self):
+        """Pending events for a group are sent as one batch."""
+        self.batcher.add(["org_1_tickets", "user_2"], "a")
+        self.batcher.add(["org_1_tickets"], "b")
+
+        self.assertEqual(self.batcher.flush(), 2)
+        self.assertEqual(
+            dict(self.layer.sent)["org_1_tickets"],
+            {"type": "realtime.batch", "events": ["a", "b"]},
+        )
+
+    def test_coalesced_events_keep_latest(self):
+        """Events sharing a coalesce key collapse to the latest one."""
+        self.batcher.add(["g"], "first", coalesce_key="t1")
+        self.batcher.add(["g"], "other")
+        self.batcher.add(["g"], "second", coalesce_key="t1")
+        self.batcher.flush()
+
+        self.assertEqual(self.layer.sent[0][1]["events"], ["other", "second"])
+
+
+class RealTimeIntegrationTest(SimpleTestCase):
+    """Test routing of real-time updates."""
+
+    def setUp(self):
+        self.layer = RecordingChannelLayer()
+        self.integration = RealTimeIntegration()
+        self.integration.batcher = BroadcastBatcher(self.layer, window=0)
+
+    def test_work_order_update_stays_in_organization(self):
+        """Work order updates reach the organization's topic, not every client."""
+        self.integration.send_work_order_update(1, "updated", {}, organization_id=7)
+
+        groups = [group for group, _ in self.layer.sent]
+        self.assertEqual(groups, ["org_7_work_orders"])
+        event = json.loads(self.layer.sent[0][1]["events"][0])
+        self.assertEqual(event["event_type"], "work_order_update")
+        self.assertEqual(self.integration.update_counts["work_order_update"], 1)
+
+    def test_system_status_without_organization_broadcasts(self):
+        """System-wide status is the only implicit broadcast."""
+        self.integration.send_system_status_update("degraded", {})
+
+        self.assertEqual([group for group, _ in self.layer.sent], ["broadcast"])
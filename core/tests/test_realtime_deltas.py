@@ -0,0 +1,98 @@
+"""
+Real-time Delta Tests
+Tests subscription filtering and delta serialisation for real-time clients.
+"""
+
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+from django.test import SimpleTestCase
+
+from apps.api.realtime_deltas import (
+    Subscriptions,
+    catch_up_message,
+    filter_attributes,
+    publish_delta,
+    validate_filter,
+    with_sequence,
+)
+
+
+class SubscriptionsTest(SimpleTestCase):
+    """Test server-side subscription matching."""
+
+    def setUp(self):
+        self.subscriptions = Subscriptions()
+
+    def test_ticket_subscription(self):
+        """Deltas for a subscribed ticket are wanted regardless of attributes."""
+        self.subscriptions.add_id(42)
+
+        self.assertTrue(self.subscriptions.wants("42", {}))
+        self.assertFalse(self.subscriptions.wants("43", {}))
+
+    def test_queue_filter(self):
+        """Named filters match on every criteria field."""
+        self.subscriptions.add_filter(
+            "my-queue", {"status": ["new", "open"], "assigned_agent": 7}
+        )
+
+        attributes = filter_attributes({"status": "open", "assigned_agent": 7})
+        self.assertTrue(self.subscriptions.wants("1", attributes))
+        attributes = filter_attributes({"status": "closed", "assigned_agent": 7})
+        self.assertFalse(self.subscriptions.wants("1", attributes))
+
+        self.subscriptions.remove(name="my-queue")
+        self.assertFalse(self.subscriptions)
+
+    def test_ticket_leaving_filtered_view(self):
+        """Views the ticket matched before the change are notified too."""
+        self.subscriptions.add_filter("my-queue", {"status": "open"})
+        other = Subscriptions()
+        other.add_filter("pending", {"status": "pending"})
+        layer = Mock(group_send=AsyncMock())
+
+        with patch("apps.api.realtime_deltas.get_channel_layer", return_value=layer):
+            publish_delta(
+                1,
+                "ticket",
+                5,
+                {"status": "closed"},
+                attributes=filter_attributes({"status": "closed", "priority": "high"}),
+                previous_attributes=filter_attributes(
+                    {"status": "open", "priority": "high"}
+                ),
+            )
+
+        event = layer.group_send.call_args.args[1]
+        self.assertTrue(self.subscriptions.wants(event["id"], event["attributes"]))
+        self.assertFalse(other.wants(event["id"], event["attributes"]))
+
+    def test_invalid_filter_rejected(self):
+        """Unknown filter fields raise ValueError."""
+        with self.assertRaises(ValueError):
+            validate_filter({"subject": "printer"})
+
+
+class DeltaSerialisationTest(SimpleTestCase):
+    """Test compact delta payloads."""
+
+    def test_sequence_added_without_reencoding(self):
+        """The sequence number is spliced into the serialised delta."""
+        body = json.dumps(
+            {"entity": "ticket", "id": "1", "changes": {"status": "open"}}
+        )
+
+        delta = json.loads(with_sequence(12, body))
+
+        self.assertEqual(delta["seq"], 12)
+        self.assertEqual(delta["changes"], {"status": "open"})
+
+    def test_catch_up_without_stream_requests_reload(self):
+        """Without a delta stream, catch-up reports an incomplete replay."""
+        message = json.loads(catch_up_message(1, since=5))
+
+        self.assertEqual(message["type"], "catch_up")
+        self.assertFalse(message["complete"])
+        self.assertEqual(message["deltas"], [])
+        self.assertEqual(message["seq"], 5)
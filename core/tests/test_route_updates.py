@@ -0,0 +1,95 @@
+"""
+Incremental Route Update Tests
+Tests cheapest insertion and removal of single work orders on planned routes.
+"""
+
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.field_service.distance import clear_local_cache
+from apps.field_service.models import Route, Technician, WorkOrder
+from apps.field_service.route_optimizer import RouteOptimizer
+
+from .test_utilities import TestDataFactory
+
+
+class RouteUpdateTest(TestCase):
+    """Test incremental insertion into and removal from a route."""
+
+    def setUp(self):
+        clear_local_cache()
+        self.organization = TestDataFactory.create_organization()
+        self.customer = TestDataFactory.create_user(
+            self.organization, "customer@example.com", "customer"
+        )
+        self.technician = Technician.objects.create(
+            organization=self.organization,
+            user=TestDataFactory.create_user(self.organization, "tech@example.com"),
+            current_location=Point(-74.00, 40.70, srid=4326),
+        )
+        self.optimizer = RouteOptimizer()
+
+        # Stops every ~1.1 km due north of the technician
+        self.near = self._work_order("Near", 40.71)
+        self.far = self._work_order("Far", 40.73)
+        self.route = Route.objects.create(
+            organization=self.organization,
+            technician=self.technician,
+            route_date=timezone.localdate(),
+            work_orders=[str(self.near.id), str(self.far.id)],
+        )
+
+    def _work_order(self, title, lat):
+        return WorkOrder.objects.create(
+            organization=self.organization,
+            customer=self.customer,
+            title=title,
+            description=title,
+            status="scheduled",
+            estimated_duration=30,
+            location_coordinates=Point(-74.00, lat, srid=4326),
+        )
+
+    def test_insert_at_cheapest_position(self):
+        """A stop between two others is inserted between them and assigned."""
+        middle = self._work_order("Middle", 40.72)
+
+        route, position = self.optimizer.insert_work_order(self.route, middle)
+
+        self.assertEqual(position, 1)
+        self.assertEqual(
+            route.work_orders,
+            [str(self.near.id), str(middle.id), str(self.far.id)],
+        )
+        self.assertEqual(len(route.optimized_sequence), 3)
+        middle.refresh_from_db()
+        self.assertEqual(middle.assigned_technicians, [str(self.technician.id)])
+
+    def test_insert_skips_started_stops(self):
+        """Stops already in progress keep their place at the head of the route."""
+        WorkOrder._base_manager.filter(pk=self.far.pk).update(status="in_progress")
+        Route._base_manager.filter(pk=self.route.pk).update(
+            work_orders=[str(self.far.id), str(self.near.id)]
+        )
+        closer = self._work_order("Closer", 40.705)
+
+        route, position = self.optimizer.insert_work_order(self.route, closer)
+
+        self.assertGreaterEqual(position, 1)
+        self.assertEqual(route.work_orders[0], str(self.far.id))
+
+    def test_remove_repairs_route(self):
+        """Removing a stop reconnects its neighbours and shortens the route."""
+        middle = self._work_order("Middle", 40.72)
+        route, _ = self.optimizer.insert_work_order(self.route, middle)
+        distance_with_middle = route.total_distance
+
+        route = self.optimizer.remove_work_order(route, middle.id)
+
+        self.assertEqual(route.work_orders, [str(self.near.id), str(self.far.id)])
+        self.assertLessEqual(route.total_distance, distance_with_middle)
+        middle.refresh_from_db()
+        self.assertEqual(middle.assigned_technicians, [])
+        with self.assertRaises(ValueError):
+            self.optimizer.remove_work_order(route, middle.id)
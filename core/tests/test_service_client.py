@@ -0,0 +1,204 @@
+"""
+Service Client Tests
+Tests pooling, retries, circuit breaking and coalescing of microservice calls.
+"""
+
+import asyncio
+import threading
+from unittest.mock import Mock
+
+import requests
+from django.test import SimpleTestCase
+
+from apps.api.service_client import (
+    CircuitBreaker,
+    LatencyTracker,
+    ServiceClient,
+    ServiceUnavailable,
+)
+
+
+def json_response(data, status_code=200):
+    response = Mock(status_code=status_code)
+    response.json.return_value = data
+    return response
+
+
+class ServiceClientTest(SimpleTestCase):
+    """Test resilient calls against a stubbed session."""
+
+    def setUp(self):
+        self.client = ServiceClient(
+            "ai-service",
+            "http://ai-service:8001/",
+            backoff=0,
+            hedge=False,
+            breaker=CircuitBreaker(threshold=2, reset_timeout=60),
+        )
+        self.client.session = Mock()
+
+    def test_post_uses_endpoint_timeout(self):
+        """Calls go through the pooled session with the endpoint's timeout."""
+        self.client.timeouts = {"categorize": 1.5}
+        self.client.session.post.return_value = json_response({"category": "Billing"})
+
+        result = self.client.post("categorize", {"subject": "Invoice"})
+
+        self.assertEqual(result, {"category": "Billing"})
+        self.client.session.post.assert_called_once_with(
+            "http://ai-service:8001/categorize",
+            json={"subject": "Invoice"},
+            timeout=1.5,
+        )
+        self.assertEqual(self.client.latency.summary()["categorize"]["count"], 1)
+
+    def test_transient_failures_retried(self):
+        """Connection errors and 503s are retried for idempotent calls."""
+        self.client.session.post.side_effect = [
+            requests.ConnectionError("reset"),
+            json_response({}, status_code=503),
+            json_response({"ok": True}),
+        ]
+
+        self.assertEqual(self.client.post("sentiment", {"text": "hi"}), {"ok": True})
+        self.assertEqual(self.client.session.post.call_count, 3)
+
+    def test_non_idempotent_calls_not_retried(self):
+        """Non-idempotent calls fail after one attempt."""
+        self.client.session.post.side_effect = requests.ConnectionError("reset")
+
+        with self.assertRaises(ServiceUnavailable):
+            self.client.post("broadcast", {}, idempotent=False)
+        self.assertEqual(self.client.session.post.call_count, 1)
+
+    def test_circuit_opens_after_repeated_failures(self):
+        """An open circuit fails fast without calling the service."""
+        self.client.retries = 0
+        self.client.session.post.side_effect = requests.Timeout("slow")
+
+        for _ in range(2):
+            with self.assertRaises(ServiceUnavailable):
+                self.client.post("categorize", {})
+        self.assertEqual(self.client.breaker.state, "open")
+
+        with self.assertRaises(ServiceUnavailable):
+            self.client.post("categorize", {})
+        self.assertEqual(self.client.session.post.call_count, 2)
+
+    def test_identical_calls_coalesced(self):
+        """Concurrent identical calls share one request."""
+        release = threading.Event()
+
+        def slow_post(*args, **kwargs):
+            release.wait(5)
+            return json_response({"category": "Technical"})
+
+        self.client.session.post.side_effect = slow_post
+
+        async def categorize_twice():
+            calls = asyncio.gather(
+                self.client.apost("categorize", {"subject": "VPN"}),
+                self.client.apost("categorize", {"subject": "VPN"}),
+            )
+            await asyncio.sleep(0.05)
+            release.set()
+            return await calls
+
+        results = asyncio.run(categorize_twice())
+
+        self.assertEqual(results, [{"category": "Technical"}] * 2)
+        self.assertEqual(self.client.session.post.call_count, 1)
+        self.assertEqual(self.client.inflight, {})
+
+    def test_non_idempotent_calls_not_coalesced(self):
+        """Identical non-idempotent calls are each sent."""
+        release = threading.Event()
+
+        def slow_post(*args, **kwargs):
+            release.wait(5)
+            return json_response({"sent": True})
+
+        self.client.session.post.side_effect = slow_post
+
+        async def broadcast_twice():
+            calls = asyncio.gather(
+                self.client.apost("broadcast", {"event": "x"}, idempotent=False),
+                self.client.apost("broadcast", {"event": "x"}, idempotent=False),
+            )
+            await asyncio.sleep(0.05)
+            release.set()
+            return await calls
+
+        results = asyncio.run(broadcast_twice())
+
+        self.assertEqual(results, [{"sent": True}] * 2)
+        self.assertEqual(self.client.session.post.call_count, 2)
+
+    def test_server_errors_open_circuit(self):
+        """Any 5xx counts as a failure, not only the retryable gateway errors."""
+        self.client.retries = 0
+        self.client.session.post.return_value = json_response({}, status_code=500)
+
+        for _ in range(2):
+            with self.assertRaises(ServiceUnavailable):
+                self.client.post("categorize", {})
+
+        self.assertEqual(self.client.breaker.state, "open")
+
+    def test_cancelled_waiter_leaves_others_running(self):
+        """Cancelling one coalesced caller does not cancel the shared call."""
+        release = threading.Event()
+
+        def slow_post(*args, **kwargs):
+            release.wait(5)
+            return json_response({"category": "Technical"})
+
+        self.client.session.post.side_effect = slow_post
+
+        async def cancel_first():
+            first = asyncio.ensure_future(
+                self.client.apost("categorize", {"subject": "VPN"})
+            )
+            second = asyncio.ensure_future(
+                self.client.apost("categorize", {"subject": "VPN"})
+            )
+            await asyncio.sleep(0.05)
+            first.cancel()
+            await asyncio.sleep(0.05)
+            release.set()
+            return first, await second
+
+        first, result = asyncio.run(cancel_first())
+
+        self.assertTrue(first.cancelled())
+        self.assertEqual(result, {"category": "Technical"})
+        self.assertEqual(self.client.session.post.call_count, 1)
+
+    def test_post_many_chunks_in_order(self):
+        """Batch calls are chunked and their results concatenated in order."""
+        self.client.session.post.side_effect = lambda url, json, timeout: (
+            json_response({"results": [item["n"] for item in json["items"]]})
+        )
+
+        results = self.client.post_many(
+            "batch", [{"n": n} for n in range(5)], chunk_size=2
+        )
+
+        self.assertEqual(results, [0, 1, 2, 3, 4])
+        self.assertEqual(self.client.session.post.call_count, 3)
+
+
+class LatencyTrackerTest(SimpleTestCase):
+    """Test latency percentiles."""
+
+    def test_percentiles(self):
+        """Percentiles are reported in milliseconds per endpoint."""
+        tracker = LatencyTracker()
+        for ms in range(1, 101):
+            tracker.record("categorize", ms / 1000)
+
+        summary = tracker.summary()["categorize"]
+
+        self.assertEqual(summary["count"], 100)
+        self.assertAlmostEqual(summary["p50"], 51)
+        self.assertAlmostEqual(summary["p95"], 96)
@@ -21,6 +21,7 @@ from apps.notifications.models import Notification
 from apps.api.models import APIService
 from apps.api.system_checker import system_checker
 from apps.api.real_time_integration import realtime_integration
+from apps.api.service_client import get_client
 
 from .test_utils import (
     TestDataFactory, TestClientFactory, TestAssertions, 
@@ -903,37 +904,20 @@ class RealTimeIntegrationTest(TestCase):
     
     def test_external_service_sync(self):
         """Test external service synchronization."""
-        # Test AI service sync
-        with patch('aiohttp.ClientSession.post') as mock_post:
-            mock_response = AsyncMock()
-            mock_response.status = 200
-            mock_response.json.return_value = {'success': True}
-            mock_post.return_value.__aenter__.return_value = mock_response
-            
-            async def test_ai_sync():
-                return await realtime_integration.sync_with_ai_service(
-                    'ticket_created',
-                    {'ticket_id': self.ticket.id}
-                )
-            
-            result = asyncio.run(test_ai_sync())
-            self.assertIsNotNone(result)
-        
-        # Test real-time service sync
-        with patch('aiohttp.ClientSession.post') as mock_post:
-            mock_response = AsyncMock()
-            mock_response.status = 200
-            mock_response.json.return_value = {'success': True}
-            mock_post.return_value.__aenter__.return_value = mock_response
-            
-            async def test_realtime_sync():
-                return await realtime_integration.sync_with_realtime_service(
-                    'ticket_updated',
-                    {'ticket_id': self.ticket.id}
-                )
+        # Both go through the shared pooled clients
+        for service, sync in [
+            ('ai', realtime_integration.sync_with_ai_service),
+            ('realtime', realtime_integration.sync_with_realtime_service),
+        ]:
+            apost = AsyncMock(return_value={'success': True})
+            with patch.object(get_client(service), 'apost', apost):
+                result = asyncio.run(sync('ticket_created', {'ticket_id': self.ticket.id}))
             
-            result = asyncio.run(test_realtime_sync())
-            self.assertIsNotNone(result)
+            self.assertEqual(result, {'success': True})
+            endpoint, payload = apost.call_args.args
+            self.assertEqual(endpoint, 'realtime/process')
+            self.assertEqual(payload['event_type'], 'ticket_created')
+            self.assertFalse(apost.call_args.kwargs['idempotent'])
 
 
 class ServiceIntegrationTest(TransactionTestCase):
@@ -0,0 +1,75 @@
+"""
+Statistics Tests
+Tests the single-query statistics engine behind the statistics action.
+"""
+
+from datetime import datetime, timedelta
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from apps.api.statistics import compute_statistics, period_bounds
+from apps.tickets.models import Ticket
+
+from .test_utilities import TestDataFactory
+
+
+class PeriodBoundsTest(SimpleTestCase):
+    """Test period ranges are anchored to the current year."""
+
+    def test_bounds(self):
+        now = timezone.make_aware(datetime(2024, 2, 29, 15, 30))
+        bounds = period_bounds(now)
+
+        self.assertEqual(bounds["today"][0], timezone.make_aware(datetime(2024, 2, 29)))
+        self.assertEqual(bounds["today"][1], timezone.make_aware(datetime(2024, 3, 1)))
+        self.assertEqual(
+            bounds["this_week"][0], timezone.make_aware(datetime(2024, 2, 26))
+        )
+        self.assertEqual(
+            bounds["this_month"],
+            (
+                timezone.make_aware(datetime(2024, 2, 1)),
+                timezone.make_aware(datetime(2024, 3, 1)),
+            ),
+        )
+
+
+class ComputeStatisticsTest(TestCase):
+    """Test counters and distributions come from one query."""
+
+    def setUp(self):
+        self.organization = TestDataFactory.create_organization()
+        customer = TestDataFactory.create_user(self.organization, "c@example.com")
+        for status, priority in [
+            ("open", "high"),
+            ("open", "low"),
+            ("resolved", "high"),
+        ]:
+            TestDataFactory.create_ticket(
+                self.organization, customer, status=status, priority=priority
+            )
+        self.queryset = Ticket._base_manager.filter(organization=self.organization)
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            stats = compute_statistics(self.queryset.order_by("-created_at"))
+
+        self.assertEqual(stats["total_count"], 3)
+        self.assertEqual(stats["active_count"], 3)
+        self.assertEqual(stats["created_today"], 3)
+        self.assertEqual(stats["status_distribution"], {"open": 2, "resolved": 1})
+        self.assertEqual(stats["priority_distribution"], {"high": 2, "low": 1})
+
+    def test_same_week_last_year_not_counted(self):
+        """Rows from the same ISO week of another year are excluded."""
+        ticket = self.queryset.first()
+        self.queryset.filter(pk=ticket.pk).update(
+            created_at=timezone.now() - timedelta(weeks=52)
+        )
+
+        stats = compute_statistics(self.queryset)
+
+        self.assertEqual(stats["total_count"], 3)
+        self.assertEqual(stats["created_this_week"], 2)
+        self.assertEqual(stats["created_this_month"], 2)
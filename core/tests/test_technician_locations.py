@@ -0,0 +1,92 @@
+"""
+Technician Location Tests
+Tests live GPS position recording and coalesced dashboard fan-out.
+"""
+
+import asyncio
+
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, TestCase
+
+from apps.api.real_time import LocationBroadcaster
+from apps.field_service.locations import (
+    live_positions,
+    record_location,
+    technician_organization,
+)
+from apps.field_service.models import Technician
+from apps.field_service.route_optimizer import RouteOptimizer
+
+from .test_utilities import TestDataFactory
+
+
+class RecordingChannelLayer:
+    """Channel layer stand-in that records group messages."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def group_send(self, group, message):
+        self.sent.append((group, message))
+
+
+class LocationStoreTest(TestCase):
+    """Test location recording without a Redis-backed cache."""
+
+    def setUp(self):
+        self.organization = TestDataFactory.create_organization()
+        self.technician = Technician.objects.create(
+            organization=self.organization,
+            user=TestDataFactory.create_user(self.organization, "tech@example.com"),
+        )
+
+    def test_record_falls_back_to_database(self):
+        """Without Redis, a ping updates only the location column."""
+        record_location(self.organization.id, self.technician.id, 40.75, -73.99)
+
+        self.technician.refresh_from_db()
+        self.assertAlmostEqual(self.technician.current_location.y, 40.75)
+        self.assertAlmostEqual(self.technician.current_location.x, -73.99)
+        self.assertEqual(live_positions(self.organization.id), {})
+
+    def test_invalid_coordinates_rejected(self):
+        """Out-of-range coordinates raise ValueError."""
+        with self.assertRaises(ValueError):
+            record_location(self.organization.id, self.technician.id, 140, 0)
+
+    def test_technician_organization_lookup(self):
+        """The technician's organization is resolved for pings."""
+        self.assertEqual(
+            technician_organization(self.technician.id), self.organization.id
+        )
+
+    def test_route_start_uses_last_known_location(self):
+        """Without a live position, routes start at current_location."""
+        self.technician.current_location = Point(-74.01, 40.72, srid=4326)
+
+        start = RouteOptimizer()._technician_start(self.technician)
+
+        self.assertEqual(start, (40.72, -74.01))
+
+
+class LocationBroadcasterTest(SimpleTestCase):
+    """Test coalescing of location pings."""
+
+    def test_pings_coalesced_into_one_batch(self):
+        """Pings in one window become a single message, latest per technician."""
+        layer = RecordingChannelLayer()
+        broadcaster = LocationBroadcaster(interval=0.01)
+
+        async def ping():
+            broadcaster.add(layer, "admin_dashboard", "t1", {"latitude": 1})
+            broadcaster.add(layer, "admin_dashboard", "t2", {"latitude": 2})
+            broadcaster.add(layer, "admin_dashboard", "t1", {"latitude": 3})
+            await asyncio.sleep(0.05)
+
+        asyncio.run(ping())
+
+        self.assertEqual(len(layer.sent), 1)
+        group, message = layer.sent[0]
+        self.assertEqual(group, "admin_dashboard")
+        self.assertEqual(message["type"], "location_batch")
+        self.assertEqual(message["locations"], [{"latitude": 3}, {"latitude": 2}])
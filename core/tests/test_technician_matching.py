@@ -0,0 +1,89 @@
+"""
+Technician Matching Tests
+Tests index-backed technician candidate selection for work order automation.
+"""
+
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.field_service.matching import TechnicianMatcher
+from apps.field_service.models import (
+    JobAssignment,
+    Technician,
+    TicketToWorkOrderRule,
+    WorkOrder,
+)
+
+from .test_utilities import TestDataFactory
+
+
+class TechnicianMatcherTest(TestCase):
+    """Test technician candidate ranking."""
+
+    def setUp(self):
+        cache.clear()
+        self.organization = TestDataFactory.create_organization()
+        self.customer = TestDataFactory.create_user(
+            self.organization, "customer@example.com", "customer"
+        )
+        self.electrician = self._technician("e@example.com", ["electrical"], 40.70)
+        self.all_rounder = self._technician(
+            "a@example.com", ["electrical", "hvac"], 40.80
+        )
+        self.plumber = self._technician("p@example.com", ["plumbing"], 40.71)
+        self.work_order = WorkOrder.objects.create(
+            organization=self.organization,
+            customer=self.customer,
+            title="Repair",
+            description="Repair",
+            location_coordinates=Point(-74.00, 40.70, srid=4326),
+        )
+        self.matcher = TechnicianMatcher(self.organization)
+
+    def _technician(self, email, skills, lat):
+        return Technician.objects.create(
+            organization=self.organization,
+            user=TestDataFactory.create_user(self.organization, email),
+            skills=skills,
+            current_location=Point(-74.00, lat, srid=4326),
+        )
+
+    def _rule(self, logic, skills=None):
+        return TicketToWorkOrderRule(
+            organization=self.organization,
+            name=logic,
+            assignment_logic=logic,
+            required_skills=skills or [],
+        )
+
+    def test_required_skills_all_match(self):
+        """Only technicians holding every required skill are candidates."""
+        rule = self._rule("skill_match", ["electrical", "hvac"])
+        self.assertEqual(
+            self.matcher.candidates(self.work_order, rule), [self.all_rounder]
+        )
+
+    def test_nearest_orders_by_distance(self):
+        """Nearest technicians come first."""
+        rule = self._rule("nearest", ["electrical"])
+        self.assertEqual(
+            self.matcher.candidates(self.work_order, rule),
+            [self.electrician, self.all_rounder],
+        )
+
+    def test_workload_prefers_fewest_active_jobs(self):
+        """Technicians with fewer active assignments rank higher."""
+        JobAssignment.objects.create(
+            work_order=self.work_order, technician=self.electrician
+        )
+        rule = self._rule("workload", ["electrical"])
+        self.assertEqual(self.matcher.best(self.work_order, rule), self.all_rounder)
+
+    def test_round_robin_rotates(self):
+        """Successive picks rotate through eligible technicians and wrap."""
+        rule = self._rule("round_robin", ["electrical"])
+        picks = [self.matcher.best(self.work_order, rule) for _ in range(3)]
+
+        self.assertNotEqual(picks[0], picks[1])
+        self.assertEqual(picks[0], picks[2])
@@ -0,0 +1,167 @@
+"""
+Tenant Cache Tests
+Tests cached organization resolution and its invalidation.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+
+from apps.features.flags import get_feature_flags
+from apps.features.models import Feature, FeatureCategory
+from apps.organizations.middleware import TenantMiddleware
+from apps.organizations.tenant_cache import TenantCache, tenant_cache
+
+from .test_utilities import TestDataFactory
+
+
+class TenantMiddlewareCacheTest(TestCase):
+    """Test warm requests resolve their organization without queries."""
+
+    def setUp(self):
+        cache.clear()
+        tenant_cache.clear()
+        self.organization = TestDataFactory.create_organization()
+        self.organization.slug = "acme"
+        self.organization.save()
+        self.middleware = TenantMiddleware(lambda request: None)
+
+    def request(self, subdomain="acme"):
+        request = RequestFactory().get("/tickets/")
+        request.subdomain = subdomain
+        request.user = AnonymousUser()
+        request.session = {}
+        return request
+
+    def test_warm_request_runs_no_queries(self):
+        first = self.request()
+        self.middleware.process_request(first)
+
+        second = self.request()
+        with self.assertNumQueries(0):
+            self.middleware.process_request(second)
+
+        self.assertEqual(second.organization.pk, self.organization.pk)
+        self.assertIsNot(second.organization, first.organization)
+
+    def test_unknown_subdomain_cached(self):
+        with self.assertRaises(Http404):
+            self.middleware.process_request(self.request("missing"))
+        with self.assertNumQueries(0), self.assertRaises(Http404):
+            self.middleware.process_request(self.request("missing"))
+
+    def test_save_invalidates(self):
+        self.middleware.process_request(self.request())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.organization.name = "Acme Renamed"
+            self.organization.save()
+        request = self.request()
+        self.middleware.process_request(request)
+
+        self.assertEqual(request.organization.name, "Acme Renamed")
+
+    def test_deactivated_organization_not_resolved(self):
+        self.middleware.process_request(self.request())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.organization.is_active = False
+            self.organization.save()
+
+        with self.assertRaises(Http404):
+            self.middleware.process_request(self.request())
+
+
+class TenantCacheTest(TestCase):
+    """Test the TTL map and cross-process invalidation."""
+
+    def setUp(self):
+        cache.clear()
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        return self.loads
+
+    def test_hit(self):
+        tenant = TenantCache()
+
+        self.assertEqual(tenant.get("key", self.load), 1)
+        self.assertEqual(tenant.get("key", self.load), 1)
+        self.assertEqual(self.loads, 1)
+
+    def test_expiry(self):
+        tenant = TenantCache(ttl=0)
+
+        tenant.get("key", self.load)
+        tenant.get("key", self.load)
+
+        self.assertEqual(self.loads, 2)
+
+    def test_least_recently_used_evicted(self):
+        tenant = TenantCache(max_entries=2)
+        tenant.get("a", self.load)
+        tenant.get("b", self.load)
+        tenant.get("a", self.load)
+
+        tenant.get("c", self.load)
+
+        self.assertEqual(list(tenant.entries), ["a", "c"])
+        self.assertEqual(tenant.get("b", self.load), 4)
+
+    def test_expired_entries_dropped_when_full(self):
+        tenant = TenantCache(ttl=10, max_entries=2)
+        with patch("apps.organizations.tenant_cache.time.monotonic", return_value=0):
+            tenant.get("a", self.load)
+            tenant.get("b", self.load)
+        with patch("apps.organizations.tenant_cache.time.monotonic", return_value=5):
+            tenant.get("b", self.load)
+        with patch("apps.organizations.tenant_cache.time.monotonic", return_value=20):
+            tenant.get("c", self.load)
+
+        self.assertEqual(list(tenant.entries), ["c"])
+
+    def test_misses_capped_separately(self):
+        """Unknown keys can't grow the map or evict found values."""
+        tenant = TenantCache(max_entries=2, max_misses=2)
+        tenant.get("found", self.load)
+        for host in ["x", "y", "z"]:
+            tenant.get(host, lambda: None)
+
+        self.assertEqual(list(tenant.entries), ["found"])
+        self.assertEqual(list(tenant.misses), ["y", "z"])
+        self.assertEqual(tenant.get("found", self.load), 1)
+
+    def test_generation_clears_other_processes(self):
+        """A bump by one process clears the maps of the others."""
+        writer = TenantCache(poll_interval=0)
+        reader = TenantCache(poll_interval=0)
+        reader.get("key", self.load)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            writer.invalidate()
+
+        self.assertEqual(reader.get("key", self.load), 2)
+
+
+class FeatureFlagInvalidationTest(TestCase):
+    """Test feature writes outside the flags module invalidate cached flags."""
+
+    def test_feature_save_invalidates(self):
+        cache.clear()
+        tenant_cache.clear()
+        organization = TestDataFactory.create_organization()
+        self.assertIsNone(get_feature_flags(organization).get("SLA"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Feature.objects.create(
+                name="sla",
+                description="SLA tracking",
+                feature_type="core",
+                category=FeatureCategory.objects.create(name="Core"),
+            )
+
+        self.assertTrue(get_feature_flags(organization).get("SLA"))
@@ -0,0 +1,111 @@
+"""
+Ticket Outbox Tests
+Tests asynchronous work order automation driven by ticket outbox events.
+"""
+
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from apps.field_service.models import TicketToWorkOrderRule, WorkOrder
+from apps.field_service.services import WorkOrderAutomationService
+from apps.field_service.tasks import process_ticket_events
+from apps.tickets.models import Ticket, TicketEvent
+
+from .test_utilities import TestDataFactory
+
+
+class TicketOutboxTest(TestCase):
+    """Test ticket event recording and batch consumption."""
+
+    def setUp(self):
+        self.organization = TestDataFactory.create_organization()
+        self.customer = TestDataFactory.create_user(
+            self.organization, "customer@example.com", "customer"
+        )
+        TicketToWorkOrderRule.objects.create(
+            organization=self.organization,
+            name="All tickets",
+            auto_assign=False,
+            notify_customer=False,
+            notify_technician=False,
+        )
+
+    def test_ticket_creation_records_one_event(self):
+        """Creating a ticket writes a single pending event; updates add none."""
+        ticket = TestDataFactory.create_ticket(self.organization, self.customer)
+        ticket.subject = "Updated"
+        ticket.save()
+
+        events = TicketEvent.objects.filter(ticket=ticket)
+        self.assertEqual(events.count(), 1)
+        self.assertIsNone(events.get().processed_at)
+        self.assertFalse(WorkOrder.objects.for_organization(self.organization).exists())
+
+    def test_batch_creates_work_orders_exactly_once(self):
+        """Each event yields one work order, and reprocessing is a no-op."""
+        tickets = [
+            TestDataFactory.create_ticket(
+                self.organization, self.customer, f"Ticket {i}"
+            )
+            for i in range(3)
+        ]
+
+        result = process_ticket_events()
+        process_ticket_events()
+
+        self.assertEqual(result["processed"], 3)
+        self.assertFalse(TicketEvent.objects.filter(processed_at__isnull=True).exists())
+        for ticket in tickets:
+            self.assertEqual(
+                WorkOrder.objects.for_organization(self.organization)
+                .filter(source_ticket=ticket)
+                .count(),
+                1,
+            )
+
+    def test_failed_event_is_retried(self):
+        """A failing event stays pending with its error and attempt count."""
+        ticket = TestDataFactory.create_ticket(self.organization, self.customer)
+
+        with patch.object(
+            WorkOrderAutomationService,
+            "create_work_order_from_ticket",
+            side_effect=RuntimeError("boom"),
+        ):
+            result = process_ticket_events()
+
+        event = TicketEvent.objects.get(ticket=ticket)
+        self.assertEqual(result["failed"], 1)
+        self.assertEqual(event.attempts, 1)
+        self.assertEqual(event.last_error, "boom")
+        self.assertIsNone(event.processed_at)
+
+        process_ticket_events()
+        event.refresh_from_db()
+        self.assertIsNotNone(event.processed_at)
+
+    def test_bulk_created_tickets_get_numbers_and_events(self):
+        """Bulk inserts reserve ticket numbers and record one event each."""
+        tickets = Ticket.bulk_create_with_events(
+            [
+                Ticket(
+                    organization=self.organization,
+                    customer=self.customer,
+                    subject=f"Import {i}",
+                    description="Imported",
+                    channel="web",
+                )
+                for i in range(5)
+            ]
+        )
+
+        numbers = [ticket.ticket_number for ticket in tickets]
+        self.assertEqual(len(set(numbers)), 5)
+        self.assertEqual(numbers, sorted(numbers))
+        self.assertEqual(
+            TicketEvent.objects.filter(
+                ticket__in=tickets, event_type="created"
+            ).count(),
+            5,
+        )
@@ -14,7 +14,8 @@ from unittest.mock import Mock, patch, MagicMock
 from django.test import TestCase, TransactionTestCase, Client
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
-from django.db import transaction
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework.test import APITestCase, APIClient
@@ -34,6 +35,7 @@ from apps.analytics.models import AnalyticsDashboard, Report
 from apps.integrations.models import Webhook, IntegrationLog
 from apps.notifications.models import Notification
 from apps.api.models import APIService
+from apps.api.prefetch_plans import apply_prefetch_plan
 from apps.features.models import Feature, FeatureCategory, FeatureConnection
 
 User = get_user_model()
@@ -276,6 +278,25 @@ class TestPerformanceMixin:
             self.fail(f"Function took {execution_time:.2f}s, expected < {max_time_seconds}s")
         
         return result
+    
+    def assert_constant_list_queries(self, serializer_class, queryset, page_sizes=(1, 5), context=None):
+        """
+        Assert a list page costs the same number of queries at every page size.
+        
+        Each page is fetched through the serializer's prefetch plan and
+        serialized with many=True; returns the per-page query count.
+        """
+        counts = {}
+        for page_size in page_sizes:
+            with CaptureQueriesContext(connection) as queries:
+                page = apply_prefetch_plan(serializer_class, queryset)[:page_size]
+                serializer_class(page, many=True, context=context or {}).data
+            counts[page_size] = len(queries)
+        
+        if len(set(counts.values())) > 1:
+            self.fail(f"Query count grows with page size: {counts}")
+        
+        return next(iter(counts.values()))
 
 
 class TestSecurityMixin:
@@ -0,0 +1,100 @@
+"""
+Widget Data Planner Tests
+Tests that dashboard widgets sharing a source are resolved together.
+"""
+
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.analytics.models import DailyOrgMetrics
+from apps.analytics.widgets import WidgetDataPlanner, invalidate_widget_data
+
+from .test_utilities import TestDataFactory
+
+FACT_WIDGETS = ("ticket_stats", "work_order_stats", "sla_compliance")
+
+
+class WidgetDataPlannerTest(TestCase):
+    """Test batched widget resolution against one widget at a time."""
+
+    def setUp(self):
+        cache.clear()
+        self.organization = TestDataFactory.create_organization()
+        today = timezone.localdate()
+        for source, status, created, breached in [
+            ("ticket", "open", 3, 1),
+            ("ticket", "pending", 1, 0),
+            ("ticket", "resolved", 2, 0),
+            ("work_order", "completed", 2, 0),
+            ("work_order", "in_progress", 1, 0),
+            ("work_order", "scheduled", 4, 0),
+        ]:
+            DailyOrgMetrics.objects.create(
+                organization=self.organization,
+                date=today,
+                source=source,
+                status=status,
+                created_count=created,
+                breached_count=breached,
+            )
+
+    def widgets(self, *widget_types):
+        return [
+            SimpleNamespace(id=index, widget_type=widget_type)
+            for index, widget_type in enumerate(widget_types)
+        ]
+
+    def test_shared_source_uses_one_query(self):
+        """Every fact-table widget is served by one aggregate, then the cache."""
+        planner = WidgetDataPlanner(self.organization, self.widgets(*FACT_WIDGETS))
+
+        with self.assertNumQueries(1):
+            planner.widget_data()
+        with self.assertNumQueries(0):
+            planner.widget_data()
+
+    def test_technician_rankings_add_one_query(self):
+        widgets = self.widgets(*FACT_WIDGETS, "technician_performance")
+
+        with self.assertNumQueries(2):
+            WidgetDataPlanner(self.organization, widgets).widget_data()
+
+    def test_results_match_single_widget_plans(self):
+        """Batching does not change any widget's data."""
+        data = WidgetDataPlanner(
+            self.organization, self.widgets(*FACT_WIDGETS)
+        ).widget_data()
+
+        for index, widget_type in enumerate(FACT_WIDGETS):
+            with self.subTest(widget_type=widget_type):
+                invalidate_widget_data(self.organization.id)
+                (widget,) = self.widgets(widget_type)
+                single = WidgetDataPlanner(self.organization, [widget]).widget_data()
+                self.assertEqual(data[index], single[0])
+
+        self.assertEqual(
+            data[0], {"total_tickets": 6, "open_tickets": 4, "resolved_tickets": 2}
+        )
+        self.assertEqual(
+            data[1],
+            {
+                "total_work_orders": 7,
+                "completed_work_orders": 2,
+                "in_progress_work_orders": 1,
+            },
+        )
+        self.assertEqual(
+            data[2],
+            {"total_tickets": 6, "breached_tickets": 1, "compliance_rate": 83.33},
+        )
+
+    def test_unknown_widget_type_gets_no_data(self):
+        with self.assertNumQueries(0):
+            data = WidgetDataPlanner(
+                self.organization, self.widgets("custom")
+            ).widget_data()
+
+        self.assertEqual(data, {0: {}})